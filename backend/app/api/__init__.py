@@ -1,20 +1,28 @@
-from fastapi import APIRouter
-from app.api.endpoints import auth, users, organizations, sites, buildings, lots, production, feed, health, sales, expenses, analytics, dashboard, invitations, admin
+from fastapi import APIRouter, Depends
+from app.api.endpoints import auth, users, organizations, sites, buildings, lots, production, feed, health, sales, expenses, analytics, dashboard, invitations, admin, standards, live, sync
+from app.core.http_cache import conditional_get
 
 api_router = APIRouter()
 
+# Conditional GET (ETag / 304) on the organization data routes; auth and admin are not per
+# organization, live updates are an event stream
+cached = [Depends(conditional_get)]
+
 api_router.include_router(auth.router, prefix="/auth", tags=["Authentication"])
-api_router.include_router(users.router, prefix="/users", tags=["Users"])
-api_router.include_router(invitations.router, prefix="/invitations", tags=["Invitations"])
-api_router.include_router(organizations.router, prefix="/organizations", tags=["Organizations"])
-api_router.include_router(sites.router, prefix="/sites", tags=["Sites"])
-api_router.include_router(buildings.router, prefix="/buildings", tags=["Buildings"])
-api_router.include_router(lots.router, prefix="/lots", tags=["Lots"])
-api_router.include_router(production.router, prefix="/production", tags=["Production"])
-api_router.include_router(feed.router, prefix="/feed", tags=["Feed & Water"])
-api_router.include_router(health.router, prefix="/health", tags=["Health & Veterinary"])
-api_router.include_router(sales.router, prefix="/sales", tags=["Sales"])
-api_router.include_router(expenses.router, prefix="/expenses", tags=["Expenses"])
-api_router.include_router(analytics.router, prefix="/analytics", tags=["Analytics"])
-api_router.include_router(dashboard.router, prefix="/dashboard", tags=["Dashboard"])
+api_router.include_router(users.router, prefix="/users", tags=["Users"], dependencies=cached)
+api_router.include_router(invitations.router, prefix="/invitations", tags=["Invitations"], dependencies=cached)
+api_router.include_router(organizations.router, prefix="/organizations", tags=["Organizations"], dependencies=cached)
+api_router.include_router(sites.router, prefix="/sites", tags=["Sites"], dependencies=cached)
+api_router.include_router(buildings.router, prefix="/buildings", tags=["Buildings"], dependencies=cached)
+api_router.include_router(lots.router, prefix="/lots", tags=["Lots"], dependencies=cached)
+api_router.include_router(production.router, prefix="/production", tags=["Production"], dependencies=cached)
+api_router.include_router(feed.router, prefix="/feed", tags=["Feed & Water"], dependencies=cached)
+api_router.include_router(standards.router, prefix="/standards", tags=["Breed Standards"], dependencies=cached)
+api_router.include_router(health.router, prefix="/health", tags=["Health & Veterinary"], dependencies=cached)
+api_router.include_router(sales.router, prefix="/sales", tags=["Sales"], dependencies=cached)
+api_router.include_router(expenses.router, prefix="/expenses", tags=["Expenses"], dependencies=cached)
+api_router.include_router(analytics.router, prefix="/analytics", tags=["Analytics"], dependencies=cached)
+api_router.include_router(dashboard.router, prefix="/dashboard", tags=["Dashboard"], dependencies=cached)
+api_router.include_router(sync.router, prefix="/sync", tags=["Offline sync"], dependencies=cached)
 api_router.include_router(admin.router, prefix="/admin", tags=["Admin"])
+api_router.include_router(live.router, prefix="/live", tags=["Live updates"])
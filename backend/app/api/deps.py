@@ -1,14 +1,18 @@
 from typing import Generator
 from uuid import UUID
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 from jose import JWTError
 
 from app.core.config import settings
-from app.db.session import SessionLocal
+from app.core.metrics import expose_timings
+from app.core.profiling import start_profiling
+from app.db.session import SessionLocal, engine, get_read_session
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_PREFIX}/auth/login")
+# Same, for routes that also work without an access token (logout)
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_PREFIX}/auth/login", auto_error=False)
 
 
 def get_db() -> Generator:
@@ -20,6 +24,27 @@ def get_db() -> Generator:
         db.close()
 
 
+def get_read_db(request: Request, token: str = Depends(oauth2_scheme)) -> Generator:
+    """Dependency for read-only endpoints: routes to the replica when configured.
+
+    Falls back to the primary when no replica is configured, when it is
+    unreachable, or when the caller committed a write in the last
+    READ_YOUR_WRITES_SECONDS (read-your-writes). On the replica, the ETag of
+    the response is dropped while the replica lags behind its data version.
+    """
+    from app.core.http_cache import replica_validators
+    from app.core.security import decode_token
+
+    payload = decode_token(token) or {}
+    db = get_read_session(payload.get("sub"))
+    try:
+        if db.get_bind() is not engine and payload.get("sub"):
+            replica_validators(request, db.connection(), payload["sub"])
+        yield db
+    finally:
+        db.close()
+
+
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
     db: Session = Depends(get_db)
@@ -57,6 +82,15 @@ async def get_current_user(
             detail="Inactive user"
         )
 
+    # Lets commits on this session mark the user as a recent writer
+    # and bump the data version of their organization
+    db.info["user_id"] = user_id
+    db.info["organization_id"] = user.organization_id
+
+    if user.is_superuser:
+        if settings.METRICS_SUPERUSER_HEADERS:
+            expose_timings()
+        start_profiling(user.id)  # Only if the request asked for it
     return user
 
 
@@ -4,12 +4,12 @@ Admin endpoints for superusers to monitor the platform.
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from sqlalchemy import func, desc
-from typing import List, Optional
+from typing import Dict, List, Optional
 from datetime import datetime, timedelta
 from pydantic import BaseModel
 from uuid import UUID
 
-from app.api.deps import get_db, get_current_user
+from app.api.deps import get_db, get_read_db, get_current_user, get_current_active_superuser
 from app.models.user import User, UserRole
 from app.models.organization import Organization
 from app.models.site import Site
@@ -17,6 +17,9 @@ from app.models.building import Building
 from app.models.lot import Lot, LotStatus
 from app.models.finance import Sale, Expense
 from app.models.production import EggProduction, Mortality
+from app.services.token_service import TokenService
+from app.services.census import DependencyCensus
+from app.db.engine import get_pool_metrics
 
 router = APIRouter()
 
@@ -80,6 +83,14 @@ class OrganizationAdminView(BaseModel):
         from_attributes = True
 
 
+class OrganizationDataSize(BaseModel):
+    """Row counts of an organization's data, by kind."""
+    organization_id: str
+    name: str
+    total_rows: int
+    counts: Dict[str, int]
+
+
 class ActivityLog(BaseModel):
     """Activity log entry."""
     timestamp: datetime
@@ -103,6 +114,14 @@ def require_superuser(current_user: User):
         )
 
 
+def organization_names(db: Session, organization_ids) -> dict:
+    """Names of the given organizations, in one query."""
+    organization_ids = {org_id for org_id in organization_ids if org_id}
+    if not organization_ids:
+        return {}
+    return dict(db.query(Organization.id, Organization.name).filter(Organization.id.in_(organization_ids)).all())
+
+
 # ============================================================================
 # ENDPOINTS
 # ============================================================================
@@ -110,7 +129,7 @@ def require_superuser(current_user: User):
 @router.get("/stats", response_model=PlatformStats)
 async def get_platform_stats(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get global platform statistics. Superuser only."""
     require_superuser(current_user)
@@ -160,10 +179,36 @@ async def get_platform_stats(
     )
 
 
+@router.get("/db-pool")
+async def get_db_pool_metrics(current_user: User = Depends(get_current_user)):
+    """Connection pool metrics (checked out, overflow, wait time) per engine. Superuser only."""
+    require_superuser(current_user)
+    return get_pool_metrics()
+
+
+@router.get("/profiles")
+async def list_profiles(current_user: User = Depends(get_current_active_superuser)):
+    """Stored request profiles (X-Profile: 1), most recent first. Superuser only."""
+    from app.core.profiling import profile_store
+    return profile_store.list()
+
+
+@router.get("/profiles/{profile_id}")
+async def download_profile(profile_id: str, current_user: User = Depends(get_current_active_superuser)):
+    """Download a request profile (speedscope JSON, with its SQL statements). Superuser only."""
+    from fastapi.responses import FileResponse
+    from app.core.profiling import profile_store
+
+    path = profile_store.path(profile_id)
+    if not path:
+        raise HTTPException(status_code=404, detail="Profil non trouvé")
+    return FileResponse(path, media_type="application/json", filename=f"profile-{profile_id}.speedscope.json")
+
+
 @router.get("/users", response_model=List[UserAdminView])
 async def get_all_users(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
     search: Optional[str] = None,
@@ -202,9 +247,9 @@ async def get_all_users(
     users = query.offset(skip).limit(limit).all()
 
     # Build response with organization names
+    org_names = organization_names(db, (user.organization_id for user in users))
     result = []
     for user in users:
-        org = db.query(Organization).filter(Organization.id == user.organization_id).first() if user.organization_id else None
 
         result.append(UserAdminView(
             id=str(user.id),
@@ -217,7 +262,7 @@ async def get_all_users(
             is_verified=user.is_verified,
             is_superuser=user.is_superuser,
             organization_id=str(user.organization_id) if user.organization_id else None,
-            organization_name=org.name if org else None,
+            organization_name=org_names.get(user.organization_id),
             created_at=user.created_at,
             last_login=None,  # TODO: Add last_login tracking
         ))
@@ -228,7 +273,7 @@ async def get_all_users(
 @router.get("/organizations", response_model=List[OrganizationAdminView])
 async def get_all_organizations(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
     search: Optional[str] = None,
@@ -249,19 +294,17 @@ async def get_all_organizations(
     query = query.order_by(desc(Organization.created_at))
     organizations = query.offset(skip).limit(limit).all()
 
+    # Count related entities of the whole page in one query
+    counts = DependencyCensus(db).count_many(
+        "organization", [org.id for org in organizations], kinds=["utilisateurs", "sites", "lots"]
+    )
+
     result = []
     for org in organizations:
-        # Count related entities
-        user_count = db.query(func.count(User.id)).filter(User.organization_id == org.id).scalar()
-        site_count = db.query(func.count(Site.id)).filter(Site.organization_id == org.id).scalar()
-
-        # Count lots through sites and buildings
-        site_ids = [s.id for s in db.query(Site.id).filter(Site.organization_id == org.id).all()]
-        building_ids = [b.id for b in db.query(Building.id).filter(Building.site_id.in_(site_ids)).all()] if site_ids else []
-        lot_count = db.query(func.count(Lot.id)).filter(
-            Lot.building_id.in_(building_ids),
-            Lot.status != LotStatus.DELETED
-        ).scalar() if building_ids else 0
+        org_counts = counts[str(org.id)]
+        user_count = org_counts["utilisateurs"]
+        site_count = org_counts["sites"]
+        lot_count = org_counts["lots"]
 
         result.append(OrganizationAdminView(
             id=str(org.id),
@@ -280,10 +323,37 @@ async def get_all_organizations(
     return result
 
 
+@router.get("/data-size", response_model=List[OrganizationDataSize])
+async def get_data_size(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=100),
+):
+    """Rows stored per organization and kind, largest first. Superuser only."""
+    require_superuser(current_user)
+
+    organizations = db.query(Organization.id, Organization.name).order_by(
+        desc(Organization.created_at)
+    ).offset(skip).limit(limit).all()
+    counts = DependencyCensus(db).count_many("organization", [org_id for org_id, _ in organizations])
+
+    result = [
+        OrganizationDataSize(
+            organization_id=str(org_id),
+            name=name,
+            total_rows=sum(counts[str(org_id)].values()),
+            counts=counts[str(org_id)],
+        )
+        for org_id, name in organizations
+    ]
+    return sorted(result, key=lambda entry: entry.total_rows, reverse=True)
+
+
 @router.get("/activity", response_model=List[ActivityLog])
 async def get_recent_activity(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     limit: int = Query(50, ge=1, le=100),
 ):
     """Get recent platform activity. Superuser only."""
@@ -291,45 +361,51 @@ async def get_recent_activity(
 
     activities = []
 
-    # Recent user registrations
     recent_users = db.query(User).order_by(desc(User.created_at)).limit(20).all()
+    recent_sales = db.query(Sale).order_by(desc(Sale.created_at)).limit(20).all()
+    recent_lots = db.query(Lot).filter(Lot.status != LotStatus.DELETED).order_by(desc(Lot.created_at)).limit(20).all()
+
+    # Authors and organizations, batch fetched
+    author_ids = {sale.recorded_by for sale in recent_sales} | {lot.created_by for lot in recent_lots}
+    author_ids.discard(None)
+    authors = {user.id: user for user in db.query(User).filter(User.id.in_(author_ids)).all()} if author_ids else {}
+    org_names = organization_names(
+        db, [user.organization_id for user in recent_users] + [user.organization_id for user in authors.values()]
+    )
+
+    # Recent user registrations
     for user in recent_users:
-        org = db.query(Organization).filter(Organization.id == user.organization_id).first() if user.organization_id else None
         activities.append(ActivityLog(
             timestamp=user.created_at,
             user_email=user.email,
             user_name=f"{user.first_name or ''} {user.last_name or ''}".strip() or user.email,
-            organization_name=org.name if org else None,
+            organization_name=org_names.get(user.organization_id),
             action="Inscription",
             details=f"Nouvel utilisateur inscrit ({user.role.value if user.role else 'viewer'})"
         ))
 
     # Recent sales
-    recent_sales = db.query(Sale).order_by(desc(Sale.created_at)).limit(20).all()
     for sale in recent_sales:
-        user = db.query(User).filter(User.id == sale.recorded_by).first() if sale.recorded_by else None
-        org = db.query(Organization).filter(Organization.id == user.organization_id).first() if user and user.organization_id else None
+        user = authors.get(sale.recorded_by)
         if user:
             activities.append(ActivityLog(
                 timestamp=sale.created_at,
-                user_email=user.email if user else "inconnu",
-                user_name=f"{user.first_name or ''} {user.last_name or ''}".strip() if user else "Inconnu",
-                organization_name=org.name if org else None,
+                user_email=user.email,
+                user_name=f"{user.first_name or ''} {user.last_name or ''}".strip(),
+                organization_name=org_names.get(user.organization_id),
                 action="Vente",
                 details=f"Vente de {sale.quantity} {sale.sale_type.value if sale.sale_type else 'produits'} - {int(sale.total_amount or 0):,} FCFA".replace(",", " ")
             ))
 
     # Recent lots created
-    recent_lots = db.query(Lot).filter(Lot.status != LotStatus.DELETED).order_by(desc(Lot.created_at)).limit(20).all()
     for lot in recent_lots:
-        user = db.query(User).filter(User.id == lot.created_by).first() if lot.created_by else None
-        org = db.query(Organization).filter(Organization.id == user.organization_id).first() if user and user.organization_id else None
+        user = authors.get(lot.created_by)
         if user:
             activities.append(ActivityLog(
                 timestamp=lot.created_at,
-                user_email=user.email if user else "inconnu",
-                user_name=f"{user.first_name or ''} {user.last_name or ''}".strip() if user else "Inconnu",
-                organization_name=org.name if org else None,
+                user_email=user.email,
+                user_name=f"{user.first_name or ''} {user.last_name or ''}".strip(),
+                organization_name=org_names.get(user.organization_id),
                 action="Nouvelle bande",
                 details=f"Bande {lot.code} créée - {lot.initial_quantity} sujets ({lot.type.value if lot.type else 'inconnu'})"
             ))
@@ -357,6 +433,8 @@ async def toggle_user_active(
         raise HTTPException(status_code=400, detail="Vous ne pouvez pas vous désactiver vous-même")
 
     user.is_active = not user.is_active
+    if not user.is_active:
+        TokenService(db).revoke_all_for_user(user.id)
     db.commit()
 
     return {"message": f"Utilisateur {'activé' if user.is_active else 'désactivé'}", "is_active": user.is_active}
@@ -406,6 +484,7 @@ async def delete_user_admin(
     if user.is_superuser:
         raise HTTPException(status_code=400, detail="Impossible de supprimer un autre administrateur")
 
+    TokenService(db).revoke_all_for_user(user.id)
     db.delete(user)
     db.commit()
 
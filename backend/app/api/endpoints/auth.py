@@ -2,20 +2,22 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
+from typing import Optional
 
-from app.api.deps import get_db, get_current_user
-from app.core.security import verify_password, get_password_hash, create_access_token
+from app.api.deps import get_db, get_current_user, optional_oauth2_scheme
+from app.core.security import verify_password, get_password_hash, decode_token, revoke_access_token
 from app.core.config import settings
 from app.models.user import User
 from app.models.organization import Organization
 from app.models.email_verification import EmailVerificationToken
 from app.models.password_reset import PasswordResetToken
 from app.schemas.user import (
-    UserCreate, UserResponse, UserLogin, Token,
+    UserCreate, UserResponse, UserLogin, Token, RefreshTokenRequest, LogoutRequest,
     EmailVerificationRequest, ResendVerificationRequest, RegistrationResponse,
     ForgotPasswordRequest, ResetPasswordRequest, PasswordResetResponse
 )
 from app.services.email import email_service
+from app.services.token_service import TokenService, RefreshTokenError
 
 router = APIRouter()
 
@@ -119,13 +121,7 @@ async def verify_email(data: EmailVerificationRequest, db: Session = Depends(get
     db.commit()
     db.refresh(user)
 
-    # Create access token
-    access_token = create_access_token(data={"sub": str(user.id)})
-
-    return Token(
-        access_token=access_token,
-        user=UserResponse.model_validate(user)
-    )
+    return TokenService(db).issue_tokens(user)
 
 
 @router.post("/resend-verification")
@@ -205,13 +201,7 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session =
     user.last_login = datetime.utcnow()
     db.commit()
 
-    # Create token
-    access_token = create_access_token(data={"sub": str(user.id)})
-
-    return Token(
-        access_token=access_token,
-        user=UserResponse.model_validate(user)
-    )
+    return TokenService(db).issue_tokens(user)
 
 
 @router.post("/login/phone", response_model=Token)
@@ -238,12 +228,7 @@ async def login_with_phone(phone: str, password: str, db: Session = Depends(get_
             detail="Veuillez verifier votre email avant de vous connecter. Consultez votre boite mail."
         )
 
-    access_token = create_access_token(data={"sub": str(user.id)})
-
-    return Token(
-        access_token=access_token,
-        user=UserResponse.model_validate(user)
-    )
+    return TokenService(db).issue_tokens(user)
 
 
 @router.get("/me", response_model=UserResponse)
@@ -253,13 +238,42 @@ async def get_current_user_info(current_user: User = Depends(get_current_user)):
 
 
 @router.post("/refresh", response_model=Token)
-async def refresh_token(current_user: User = Depends(get_current_user)):
-    """Refresh access token."""
-    access_token = create_access_token(data={"sub": str(current_user.id)})
-    return Token(
-        access_token=access_token,
-        user=UserResponse.model_validate(current_user)
-    )
+async def refresh_token(data: RefreshTokenRequest, db: Session = Depends(get_db)):
+    """Exchange a refresh token for a new access/refresh token pair."""
+    try:
+        return TokenService(db).rotate(data.refresh_token)
+    except RefreshTokenError as e:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=str(e),
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+@router.post("/logout")
+async def logout(
+    data: Optional[LogoutRequest] = None,
+    token: Optional[str] = Depends(optional_oauth2_scheme),
+    db: Session = Depends(get_db)
+):
+    """Revoke the refresh token's session and the access token, if still valid.
+
+    The refresh token is enough: a client whose access token expired still
+    logs out its session.
+    """
+    payload = decode_token(token) if token else None
+    refresh_token = data.refresh_token if data else None
+    if payload is None and not refresh_token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    if payload:
+        revoke_access_token(payload)
+    if refresh_token:
+        TokenService(db).revoke(refresh_token)
+    return {"message": "Deconnexion reussie"}
 
 
 @router.post("/forgot-password", response_model=PasswordResetResponse)
@@ -343,9 +357,10 @@ async def reset_password(data: ResetPasswordRequest, db: Session = Depends(get_d
             detail="Utilisateur non trouve"
         )
 
-    # Update password and mark token as used
+    # Update password, mark token as used and end existing sessions
     user.password_hash = get_password_hash(data.new_password)
     reset_token.is_used = True
+    TokenService(db).revoke_all_for_user(user.id)
     db.commit()
 
     return PasswordResetResponse(message="Votre mot de passe a ete reinitialise avec succes.")
@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, contains_eager, selectinload
 from sqlalchemy import func
 from typing import List, Dict, Optional
 from uuid import UUID
@@ -99,7 +99,9 @@ async def get_buildings(
     db: Session = Depends(get_db)
 ):
     """Récupère les bâtiments, avec filtre optionnel par site - optimized with batch fetch."""
-    query = db.query(Building).join(Site).filter(
+    query = db.query(Building).join(Site).options(
+        contains_eager(Building.site), selectinload(Building.sections)
+    ).filter(
         Site.organization_id == current_user.organization_id,
         Site.is_active == True,
         Building.is_active == True
@@ -129,8 +131,9 @@ async def get_buildings(
         for row in lot_stats
     }
 
+    # Buildings without active lots have no stats row (not a lazy load of their lots)
     return [
-        build_building_response(b, include_lots=False, lot_stats=lot_stats_map.get(b.id))
+        build_building_response(b, include_lots=False, lot_stats=lot_stats_map.get(b.id, {}))
         for b in buildings
     ]
 
@@ -264,18 +267,13 @@ async def delete_building(
     if not site or str(site.organization_id) != str(current_user.organization_id):
         raise HTTPException(status_code=403, detail="Acces non autorise")
 
-    # Check for lots in this building
-    lots_in_building = db.query(Lot).filter(
-        Lot.building_id == building_id,
-        Lot.status != LotStatus.DELETED
-    ).all()
-
-    # Count lots by status
-    active_lots = [l for l in lots_in_building if l.status == LotStatus.ACTIVE]
-    other_lots = [l for l in lots_in_building if l.status != LotStatus.ACTIVE]
+    # Count lots by status; lots are only loaded to describe a refusal
+    from app.services.census import DependencyCensus
+    lot_counts = DependencyCensus(db).count("building", building_id)
 
     # Block if there are active lots
-    if active_lots:
+    if lot_counts["lots_actifs"]:
+        active_lots = db.query(Lot).filter(Lot.building_id == building_id, Lot.status == LotStatus.ACTIVE).all()
         raise HTTPException(
             status_code=400,
             detail={
@@ -299,7 +297,13 @@ async def delete_building(
         )
 
     # Warn if there are other lots (completed, preparation, suspended)
-    if other_lots and not force:
+    other_lots_count = lot_counts["lots_autres"]
+    if other_lots_count and not force:
+        other_lots = db.query(Lot).filter(
+            Lot.building_id == building_id,
+            Lot.status != LotStatus.ACTIVE,
+            Lot.status != LotStatus.DELETED
+        ).all()
         raise HTTPException(
             status_code=400,
             detail={
@@ -323,7 +327,7 @@ async def delete_building(
     db.commit()
 
     message = "Batiment supprime avec succes"
-    if other_lots:
-        message += f" ({len(other_lots)} lot(s) associe(s) seront masques)"
+    if other_lots_count:
+        message += f" ({other_lots_count} lot(s) associe(s) seront masques)"
 
     return {"message": message, "deleted_building": building.name}
@@ -1,10 +1,16 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+import anyio
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session, selectinload
 from sqlalchemy import func, or_
 from datetime import date, timedelta
 from decimal import Decimal
+from typing import List, Optional
 
-from app.api.deps import get_db, get_current_user
+from app.api.deps import get_read_db, get_current_user
+from app.api.endpoints.sites import site_response
+from app.core.config import settings
+from app.core.single_flight import single_flight
+from app.db.session import get_read_session
 from app.models.user import User
 from app.models.site import Site
 from app.models.building import Building
@@ -12,25 +18,72 @@ from app.models.lot import Lot, LotType, LotStatus
 from app.models.production import EggProduction, Mortality, WeightRecord
 from app.models.finance import Sale, Expense, SaleType
 from app.models.alert import Alert, AlertStatus
+from app.schemas.site import SiteResponse
 from app.services.financial_service import get_financial_service
 
 router = APIRouter()
 
+# Sections of /bootstrap, each the response of its own endpoint
+BOOTSTRAP_SECTIONS = ("overview", "eggs_trend", "financial_trend", "alerts", "sites")
+
+
+class OrgTopology:
+    """Active sites of an organization with their buildings and lots, loaded in one pass.
+
+    The dashboard sections derive site ids, layer lots and per-site counts
+    from it instead of each querying them again.
+    """
+
+    def __init__(self, sites: List[Site]):
+        self.sites = sites
+        self.site_ids = [site.id for site in sites]
+
+    @classmethod
+    def load(cls, db: Session, org_id) -> "OrgTopology":
+        return cls(db.query(Site).options(
+            selectinload(Site.buildings).selectinload(Building.lots)
+        ).filter(
+            Site.organization_id == org_id,
+            Site.is_active == True
+        ).all())
+
+    def layer_lot_ids(self) -> List:
+        """Layer lots (not deleted) of the active buildings, as the eggs trend counts them."""
+        return [
+            lot.id
+            for site in self.sites for building in site.buildings if building.is_active
+            for lot in building.lots if lot.type == LotType.LAYER and lot.status != LotStatus.DELETED
+        ]
+
+    def site_list(self) -> List[SiteResponse]:
+        """The sites list (GET /sites) without its stats queries."""
+        result = []
+        for site in self.sites:
+            buildings = [b for b in site.buildings if b.is_active]
+            lots = [l for b in buildings for l in b.lots if l.status == LotStatus.ACTIVE]
+            result.append(site_response(
+                site,
+                buildings_count=len(buildings),
+                total_capacity=sum(b.capacity or 0 for b in buildings),
+                active_lots=len(lots),
+                total_birds=sum(l.current_quantity or 0 for l in lots),
+            ))
+        return result
+
 
 @router.get("/overview")
-async def get_dashboard_overview(
+@single_flight()
+def get_dashboard_overview(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get main dashboard overview data."""
     org_id = current_user.organization_id
+    return _overview(db, org_id, OrgTopology.load(db, org_id).sites)
 
-    # Get sites
-    sites = db.query(Site).filter(
-        Site.organization_id == org_id,
-        Site.is_active == True
-    ).all()
 
+def _overview(db: Session, org_id, sites: List[Site]) -> dict:
+    """Overview of the active sites, loaded with the buildings and lots the per-site counts walk through."""
     site_ids = [s.id for s in sites]
 
     # Get active lots (including lots without buildings)
@@ -104,6 +157,12 @@ async def get_dashboard_overview(
         ).group_by(Mortality.lot_id).all()
         mortality_map = {row.lot_id: int(row.total or 0) for row in mortality_query}
 
+    # Fitted growth curves (cached, refitted only when new weighings arrive)
+    growth_forecasts = {}
+    if broiler_lots_list:
+        from app.services.ml.forecast import FlockForecaster
+        growth_forecasts = FlockForecaster(db).growth_forecasts(broiler_lots_list, 1, date.today())
+
     # Build broiler data using pre-fetched maps
     broiler_data = []
     for lot in broiler_lots_list:
@@ -115,8 +174,12 @@ async def get_dashboard_overview(
         # Calculate GMQ (daily weight gain)
         gmq = current_weight / age_days if age_days > 0 else 0
 
-        # Estimate days to target weight
-        if gmq > 0 and current_weight < target_weight:
+        # Estimate days to target weight: growth curve when fitted, else average gain
+        forecast = growth_forecasts.get(str(lot.id))
+        if forecast and forecast["days_to_target"] is not None and current_weight < target_weight:
+            days_to_target = forecast["days_to_target"]
+            estimated_sale_date = forecast["estimated_sale_date"]
+        elif gmq > 0 and current_weight < target_weight:
             days_to_target = int((target_weight - current_weight) / gmq)
             estimated_sale_date = (date.today() + timedelta(days=days_to_target)).isoformat()
         else:
@@ -253,17 +316,17 @@ async def get_dashboard_overview(
 
 
 @router.get("/charts/eggs-trend")
-async def get_eggs_trend(
+@single_flight()
+def get_eggs_trend(
     days: int = 30,
     site_id: str = None,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get egg production trend for charts."""
     from uuid import UUID as UUIDType
 
     org_id = current_user.organization_id
-    start_date = date.today() - timedelta(days=days)
 
     # Get lot IDs
     query = db.query(Lot.id).join(Building).join(Site).filter(
@@ -278,6 +341,11 @@ async def get_eggs_trend(
         query = query.filter(Site.id == UUIDType(site_id))
 
     lot_ids = [r[0] for r in query.all()]
+    return _eggs_trend(db, lot_ids, days)
+
+
+def _eggs_trend(db: Session, lot_ids: List, days: int) -> dict:
+    start_date = date.today() - timedelta(days=days)
 
     # Get daily production
     results = db.query(
@@ -305,17 +373,21 @@ async def get_eggs_trend(
 
 
 @router.get("/charts/financial-trend")
-async def get_financial_trend(
+@single_flight()
+def get_financial_trend(
     months: int = 6,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get monthly financial trend using optimized centralized service."""
     org_id = current_user.organization_id
 
     # Get site IDs
     site_ids = [s.id for s in db.query(Site.id).filter(Site.organization_id == org_id, Site.is_active == True).all()]
+    return _financial_trend(db, site_ids, months)
 
+
+def _financial_trend(db: Session, site_ids: List, months: int) -> dict:
     # Use centralized financial service for optimized monthly data
     financial_service = get_financial_service(db)
     results = financial_service.get_monthly_financial_data(site_ids, months, include_lot_costs=True)
@@ -331,14 +403,19 @@ async def get_financial_trend(
 
 
 @router.get("/alerts")
-async def get_active_alerts(
+@single_flight()
+def get_active_alerts(
     limit: int = 10,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get active alerts for dashboard."""
+    return _alerts(db, current_user.organization_id, limit)
+
+
+def _alerts(db: Session, org_id, limit: int) -> list:
     alerts = db.query(Alert).filter(
-        Alert.organization_id == current_user.organization_id,
+        Alert.organization_id == org_id,
         Alert.status == AlertStatus.ACTIVE
     ).order_by(Alert.created_at.desc()).limit(limit).all()
 
@@ -355,12 +432,84 @@ async def get_active_alerts(
     ]
 
 
+@router.get("/bootstrap")
+@single_flight()
+async def get_dashboard_bootstrap(
+    sections: Optional[str] = None,
+    eggs_days: int = 14,
+    months: int = 6,
+    alerts_limit: int = 10,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
+):
+    """First screen of the dashboard in one round trip.
+
+    `sections` (comma separated, all by default) picks among
+    BOOTSTRAP_SECTIONS; each section is the response of its own endpoint.
+    The sites, buildings and lots are loaded once and shared, then the
+    sections that query run concurrently, each on its own read session
+    (DASHBOARD_BOOTSTRAP_CONCURRENCY at once).
+    """
+    requested = list(BOOTSTRAP_SECTIONS)
+    if sections:
+        requested = list(dict.fromkeys(name.strip() for name in sections.split(",") if name.strip()))
+        unknown = [name for name in requested if name not in BOOTSTRAP_SECTIONS]
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Section inconnue : {', '.join(unknown)}. Sections disponibles : {', '.join(BOOTSTRAP_SECTIONS)}."
+            )
+
+    org_id = current_user.organization_id
+    topology = await anyio.to_thread.run_sync(OrgTopology.load, db, org_id)
+    builders = {
+        "overview": lambda session: _overview(session, org_id, topology.sites),
+        "eggs_trend": lambda session: _eggs_trend(session, topology.layer_lot_ids(), eggs_days),
+        "financial_trend": lambda session: _financial_trend(session, topology.site_ids, months),
+        "alerts": lambda session: _alerts(session, org_id, alerts_limit),
+        "sites": lambda session: topology.site_list(),
+    }
+
+    results = {}
+    concurrency = settings.DASHBOARD_BOOTSTRAP_CONCURRENCY
+    if concurrency <= 1:
+        def build_all():
+            for name in requested:
+                results[name] = builders[name](db)
+
+        await anyio.to_thread.run_sync(build_all)
+    else:
+        limiter = anyio.CapacityLimiter(concurrency)
+
+        async def build(name):
+            results[name] = await anyio.to_thread.run_sync(
+                _in_read_session, builders[name], current_user.id, limiter=limiter
+            )
+
+        async with anyio.create_task_group() as group:
+            for name in requested:
+                if name == "sites":
+                    results[name] = topology.site_list()  # No query
+                else:
+                    group.start_soon(build, name)
+    return {name: results[name] for name in requested}
+
+
+def _in_read_session(build, user_id):
+    db = get_read_session(str(user_id))
+    try:
+        return build(db)
+    finally:
+        db.close()
+
+
 @router.get("/financial-summary")
-async def get_financial_summary(
+@single_flight()
+def get_financial_summary(
     start_date: date = None,
     end_date: date = None,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get financial summary with transactions for the finance page."""
     org_id = current_user.organization_id
@@ -450,17 +599,17 @@ async def get_financial_summary(
 
 
 @router.get("/ai-insights")
-async def get_ai_insights(
+@single_flight()
+def get_ai_insights(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Generate AI-powered insights based on farm data."""
     from app.models.production import WeightRecord
     from app.models.feed import FeedConsumption
     from app.models.lot import LotType, LotStatus
     from app.services.laying_curve import (
-        get_laying_phase, get_phase_label, get_expected_laying_rate,
-        get_age_weeks, LayingPhase
+        get_laying_phase, get_phase_label, get_age_weeks, LayingPhase
     )
 
     org_id = current_user.organization_id
@@ -482,16 +631,69 @@ async def get_ai_insights(
         Lot.status == LotStatus.ACTIVE
     ).all()
 
-    for lot in active_lots:
+    # Breed standards of every lot, and expected laying rates at the current
+    # week of age for all lots in one array lookup
+    from app.services.standards.curves import batch_values
+    from app.services.standards.data import LAYING, LAYING_MAX, LAYING_MIN, WEIGHT
+    from app.services.standards.registry import standards_registry
+
+    lot_curves = [standards_registry.resolve_lot(lot, db=db, organization_id=org_id) for lot in active_lots]
+    week_start_days = [get_age_weeks(lot.age_days or 0) * 7 for lot in active_lots]
+    expected_laying = {
+        key: batch_values(lot_curves, metric, week_start_days).round(1).tolist()
+        for key, metric in (("min_expected", LAYING_MIN), ("max_expected", LAYING_MAX), ("optimal_expected", LAYING))
+    } if active_lots else {}
+
+    # Fitted laying curves for egg output predictions
+    from app.services.ml.forecast import FlockForecaster
+    layer_lots = [lot for lot in active_lots if lot.type == LotType.LAYER]
+    laying_forecasts = FlockForecaster(db).laying_forecasts(layer_lots, 7, today) if layer_lots else {}
+
+    # Recent entries of every lot, batch fetched instead of per-lot queries
+    lot_ids = [lot.id for lot in active_lots]
+    broiler_ids = [lot.id for lot in active_lots if lot.type == LotType.BROILER]
+    eggs_by_lot, weights_by_lot = {}, {}
+    mortality_by_lot, feed_by_lot, last_entry_by_lot = {}, {}, {}
+    if layer_lots:
+        for egg in db.query(EggProduction).filter(
+            EggProduction.lot_id.in_([lot.id for lot in layer_lots]),
+            EggProduction.date >= week_ago
+        ).order_by(EggProduction.date.desc()).all():
+            eggs_by_lot.setdefault(egg.lot_id, []).append(egg)
+        last_entry_by_lot.update(db.query(EggProduction.lot_id, func.max(EggProduction.date)).filter(
+            EggProduction.lot_id.in_([lot.id for lot in layer_lots])
+        ).group_by(EggProduction.lot_id).all())
+    if broiler_ids:
+        # Three latest weighings per lot
+        rank = func.row_number().over(
+            partition_by=WeightRecord.lot_id, order_by=WeightRecord.date.desc()
+        ).label("rank")
+        ranked = db.query(WeightRecord.id, rank).filter(WeightRecord.lot_id.in_(broiler_ids)).subquery()
+        for weight in db.query(WeightRecord).join(ranked, WeightRecord.id == ranked.c.id).filter(
+            ranked.c.rank <= 3
+        ).order_by(WeightRecord.date.desc()).all():
+            weights_by_lot.setdefault(weight.lot_id, []).append(weight)
+        last_entry_by_lot.update(db.query(WeightRecord.lot_id, func.max(WeightRecord.date)).filter(
+            WeightRecord.lot_id.in_(broiler_ids)
+        ).group_by(WeightRecord.lot_id).all())
+    if lot_ids:
+        mortality_by_lot = dict(db.query(Mortality.lot_id, func.coalesce(func.sum(Mortality.quantity), 0)).filter(
+            Mortality.lot_id.in_(lot_ids),
+            Mortality.date >= week_ago
+        ).group_by(Mortality.lot_id).all())
+        feed_by_lot = dict(db.query(FeedConsumption.lot_id, func.coalesce(func.sum(FeedConsumption.quantity_kg), 0)).filter(
+            FeedConsumption.lot_id.in_(lot_ids),
+            FeedConsumption.date >= week_ago
+        ).group_by(FeedConsumption.lot_id).all())
+
+    for lot_index, lot in enumerate(active_lots):
         lot_code = lot.code or lot.name or "Bande"
+        lot_curve = lot_curves[lot_index]
 
         # === LAYER INSIGHTS ===
         if lot.type == LotType.LAYER:
-            # Get recent egg production
-            recent_eggs = db.query(EggProduction).filter(
-                EggProduction.lot_id == lot.id,
-                EggProduction.date >= week_ago
-            ).order_by(EggProduction.date.desc()).all()
+            # Recent egg production
+            recent_eggs = eggs_by_lot.get(lot.id, [])
 
             if recent_eggs:
                 # Check for laying rate drop
@@ -521,7 +723,7 @@ async def get_ai_insights(
                 avg_rate = sum(float(e.laying_rate or 0) for e in recent_eggs) / len(recent_eggs)
                 age_weeks = get_age_weeks(lot.age_days) if lot.age_days else 0
                 phase = get_laying_phase(age_weeks)
-                expected = get_expected_laying_rate(age_weeks)
+                expected = {key: values[lot_index] for key, values in expected_laying.items()}
 
                 # Use age-based expected rate instead of static target
                 target_rate = expected["optimal_expected"]
@@ -599,10 +801,14 @@ async def get_ai_insights(
                         "phase": get_phase_label(phase)
                     })
 
-                # Egg production prediction
-                if len(recent_eggs) >= 5:
-                    daily_avg = sum(e.total_eggs or 0 for e in recent_eggs[:5]) / 5
-                    weekly_prediction = int(daily_avg * 7)
+                # Egg production prediction: fitted laying curve, else 5-day average
+                laying_forecast = laying_forecasts.get(str(lot.id))
+                if laying_forecast or len(recent_eggs) >= 5:
+                    if laying_forecast:
+                        weekly_prediction = laying_forecast["eggs_next_7_days"]
+                    else:
+                        daily_avg = sum(e.total_eggs or 0 for e in recent_eggs[:5]) / 5
+                        weekly_prediction = int(daily_avg * 7)
                     insights.append({
                         "type": "prediction",
                         "priority": "low",
@@ -616,10 +822,8 @@ async def get_ai_insights(
 
         # === BROILER INSIGHTS ===
         if lot.type == LotType.BROILER:
-            # Get recent weights
-            recent_weights = db.query(WeightRecord).filter(
-                WeightRecord.lot_id == lot.id
-            ).order_by(WeightRecord.date.desc()).limit(3).all()
+            # Recent weights
+            recent_weights = weights_by_lot.get(lot.id, [])
 
             if recent_weights:
                 current_weight = float(recent_weights[0].average_weight_g or 0)
@@ -644,9 +848,13 @@ async def get_ai_insights(
                         }
                     })
 
-                # Weight vs target analysis
-                if age_days > 0:
-                    expected_weight = (target_weight / 42) * age_days  # Linear approximation for 42-day cycle
+                # Weight vs breed standard at the age of the last weighing
+                weighing = recent_weights[0]
+                weighing_age = age_days
+                if lot.placement_date and weighing.date:
+                    weighing_age = (weighing.date - lot.placement_date).days + (lot.age_at_placement or 0)
+                if age_days > 0 and lot_curve.has(WEIGHT):
+                    expected_weight = lot_curve.value(WEIGHT, weighing_age)
                     weight_ratio = current_weight / expected_weight if expected_weight > 0 else 1
 
                     if weight_ratio >= 1.05:
@@ -655,7 +863,7 @@ async def get_ai_insights(
                             "priority": "low",
                             "icon": "bird",
                             "title": "Croissance excellente",
-                            "message": f"Poids actuel {current_weight:.0f}g, +{((weight_ratio - 1) * 100):.0f}% vs standard J{age_days}.",
+                            "message": f"Poids actuel {current_weight:.0f}g, +{((weight_ratio - 1) * 100):.0f}% vs standard {lot_curve.name} J{weighing_age}.",
                             "value": f"{current_weight:.0f}g",
                             "trend": "up",
                             "lot_id": str(lot.id),
@@ -667,7 +875,7 @@ async def get_ai_insights(
                             "priority": "high",
                             "icon": "bird",
                             "title": "Retard de croissance",
-                            "message": f"Poids {current_weight:.0f}g, -{((1 - weight_ratio) * 100):.0f}% vs standard. Verifiez l'aliment.",
+                            "message": f"Poids {current_weight:.0f}g, -{((1 - weight_ratio) * 100):.0f}% vs standard {lot_curve.name} J{weighing_age}. Verifiez l'aliment.",
                             "value": f"{current_weight:.0f}g",
                             "trend": "down",
                             "lot_id": str(lot.id),
@@ -699,9 +907,14 @@ async def get_ai_insights(
 
                 # Predict final weight
                 if age_days < 42 and current_weight > 0:
-                    days_remaining = 42 - age_days
-                    avg_gmq = current_weight / age_days if age_days > 0 else 50
-                    predicted_final = current_weight + (avg_gmq * days_remaining)
+                    standard_now = lot_curve.value(WEIGHT, weighing_age) if lot_curve.has(WEIGHT) else 0
+                    if standard_now > 0:
+                        # Follow the breed growth curve from the last weighing
+                        predicted_final = current_weight * lot_curve.value(WEIGHT, 42) / standard_now
+                    else:
+                        days_remaining = 42 - age_days
+                        avg_gmq = current_weight / age_days if age_days > 0 else 50
+                        predicted_final = current_weight + (avg_gmq * days_remaining)
                     insights.append({
                         "type": "prediction",
                         "priority": "low",
@@ -714,13 +927,8 @@ async def get_ai_insights(
                     })
 
         # === MORTALITY INSIGHTS (ALL LOTS) ===
-        recent_mortality = db.query(Mortality).filter(
-            Mortality.lot_id == lot.id,
-            Mortality.date >= week_ago
-        ).all()
-
-        if recent_mortality:
-            total_mort = sum(m.quantity or 0 for m in recent_mortality)
+        if lot.id in mortality_by_lot:
+            total_mort = int(mortality_by_lot[lot.id])
             mort_rate = (total_mort / (lot.initial_quantity or 1)) * 100
 
             if mort_rate > 2:  # More than 2% weekly mortality
@@ -741,13 +949,8 @@ async def get_ai_insights(
                 })
 
         # === FEED INSIGHTS ===
-        recent_feed = db.query(FeedConsumption).filter(
-            FeedConsumption.lot_id == lot.id,
-            FeedConsumption.date >= week_ago
-        ).all()
-
-        if recent_feed and lot.current_quantity:
-            total_feed_kg = sum((Decimal(str(f.quantity_kg)) if f.quantity_kg else Decimal(0)) for f in recent_feed)
+        if lot.id in feed_by_lot and lot.current_quantity:
+            total_feed_kg = Decimal(str(feed_by_lot[lot.id]))
             daily_per_bird = float((total_feed_kg * 1000 / 7) / lot.current_quantity)
 
             # Check feed consumption anomaly
@@ -780,18 +983,9 @@ async def get_ai_insights(
 
     # Check for lots without recent data
     for lot in active_lots:
-        last_entry = None
-        if lot.type == LotType.LAYER:
-            last_entry = db.query(EggProduction.date).filter(
-                EggProduction.lot_id == lot.id
-            ).order_by(EggProduction.date.desc()).first()
-        else:
-            last_entry = db.query(WeightRecord.date).filter(
-                WeightRecord.lot_id == lot.id
-            ).order_by(WeightRecord.date.desc()).first()
-
+        last_entry = last_entry_by_lot.get(lot.id)
         if last_entry:
-            days_since = (today - last_entry[0]).days
+            days_since = (today - last_entry).days
             if days_since >= 3:
                 insights.append({
                     "type": "recommendation",
@@ -847,3 +1041,31 @@ async def get_ai_insights(
     insights.sort(key=lambda x: priority_order.get(x["priority"], 2))
 
     return {"insights": insights[:10]}
+
+
+@router.get("/forecasts")
+@single_flight()
+def get_forecasts(
+    horizon_days: int = 30,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
+):
+    """Laying, growth and feed demand forecasts for all active lots.
+
+    Models are cached per lot and only refitted when the lot has new data.
+    """
+    from app.services.ml.forecast import FlockForecaster
+
+    horizon_days = max(1, min(horizon_days, 180))
+    active_lots = db.query(Lot).join(Building).join(Site).filter(
+        Site.organization_id == current_user.organization_id,
+        Site.is_active == True,
+        Building.is_active == True,
+        Lot.status == LotStatus.ACTIVE
+    ).all()
+
+    return FlockForecaster(db).forecast(
+        active_lots,
+        horizon_days=horizon_days,
+        organization_id=current_user.organization_id
+    )
@@ -7,14 +7,19 @@ from datetime import date
 
 from app.api.deps import get_db, get_current_user
 from app.models.user import User
-from app.models.finance import Expense, Supplier
+from app.models.finance import Expense, Supplier, ExpenseCategoryDefinition, canonical_expense_category
 from app.models.lot import Lot, LotStatus
 from app.models.building import Building
 from app.schemas.finance import ExpenseCreate, ExpenseUpdate, ExpenseResponse, SupplierCreate, SupplierUpdate, SupplierResponse
 from app.core.permissions import Permission, has_permission
+from app.core.serialization import FastJSONResponse, RowSerializer
+from app.services.lot_financials import LotFinancialService
 
 router = APIRouter()
 
+# Row tuples -> response JSON of the expense list
+expense_rows = RowSerializer(ExpenseResponse)
+
 
 @router.get("", response_model=List[ExpenseResponse])
 async def get_expenses(
@@ -50,33 +55,28 @@ async def get_expenses(
         else:
             query = query.filter(Expense.site_id == site_id)
     if category:
-        query = query.filter(Expense.category == category)
+        query = query.filter(Expense.category_id == canonical_expense_category(category))
     if start_date:
         query = query.filter(Expense.date >= start_date)
     if end_date:
         query = query.filter(Expense.date <= end_date)
 
-    expenses = query.order_by(Expense.created_at.desc()).limit(500).all()
+    # Row tuples with the lot code joined, serialized without ORM objects or re-validation
+    rows = query.with_entities(*expense_rows.columns(Expense), Lot.code.label("lot_code")).outerjoin(
+        Lot, (Lot.id == Expense.lot_id) & (Lot.status != LotStatus.DELETED)
+    ).order_by(Expense.created_at.desc()).limit(500).all()
 
-    # Get all lot codes in a single query to avoid N+1
-    lot_ids = [e.lot_id for e in expenses if e.lot_id]
-    lot_codes_map = {}
-    if lot_ids:
-        lots_data = db.query(Lot.id, Lot.code).filter(
-            Lot.id.in_(lot_ids),
-            Lot.status != LotStatus.DELETED
-        ).all()
-        lot_codes_map = {lot_id: code for lot_id, code in lots_data}
+    return FastJSONResponse(expense_rows.rows(rows))
 
-    result = []
-    for e in expenses:
-        expense_data = ExpenseResponse.model_validate(e)
-        # Add lot code from pre-fetched map
-        if e.lot_id and e.lot_id in lot_codes_map:
-            expense_data.lot_code = lot_codes_map[e.lot_id]
-        result.append(expense_data)
 
-    return result
+@router.get("/categories")
+async def get_expense_categories(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Canonical expense categories."""
+    categories = db.query(ExpenseCategoryDefinition).order_by(ExpenseCategoryDefinition.sort_order).all()
+    return [{"id": c.id, "label": c.label} for c in categories]
 
 
 @router.post("", response_model=ExpenseResponse)
@@ -100,6 +100,8 @@ async def create_expense(
 
     expense = Expense(**expense_data, recorded_by=current_user.id)
     db.add(expense)
+    db.flush()
+    LotFinancialService(db).refresh_many([expense.lot_id])
     db.commit()
     db.refresh(expense)
 
@@ -129,10 +131,13 @@ async def update_expense(
     if not expense:
         raise HTTPException(status_code=404, detail="Expense not found")
 
+    previous_lot_id = expense.lot_id
     update_data = data.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(expense, field, value)
 
+    db.flush()
+    LotFinancialService(db).refresh_many([expense.lot_id, previous_lot_id])
     db.commit()
     db.refresh(expense)
 
@@ -155,6 +160,8 @@ async def delete_expense(
         raise HTTPException(status_code=404, detail="Expense not found")
 
     db.delete(expense)
+    db.flush()
+    LotFinancialService(db).refresh_many([expense.lot_id])
     db.commit()
 
     return {"message": "Expense deleted"}
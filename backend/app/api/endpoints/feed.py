@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import or_, func
+from sqlalchemy.orm import Session, contains_eager, joinedload
+from sqlalchemy import or_, func, select
 from typing import List, Optional
 from uuid import UUID
 from datetime import date, datetime, timedelta
@@ -12,6 +12,7 @@ from app.models.lot import Lot, LotStatus
 from app.models.site import Site
 from app.models.building import Building
 from app.models.feed import FeedConsumption, WaterConsumption, FeedStock, FeedStockMovement, FeedType, StockMovementType
+from app.core.serialization import FastJSONResponse, RowSerializer, decimal_as_number
 from app.schemas.feed import (
     FeedConsumptionCreate, FeedConsumptionResponse,
     WaterConsumptionCreate, WaterConsumptionResponse,
@@ -22,54 +23,36 @@ from app.schemas.feed import (
 
 router = APIRouter()
 
+# Row tuples -> response JSON of /stock/all; the route has no response_model,
+# so Decimals stay JSON numbers as jsonable_encoder outputs them
+feed_stock_rows = RowSerializer(FeedStockResponse, decimal=decimal_as_number)
 
-def get_optimal_feed_consumption(age_days: int, lot_type: str = "broiler") -> int:
+
+def get_optimal_feed_consumption(age_days: int, lot_type: str = "broiler", curve=None) -> int:
     """
     Calculate optimal feed consumption (g/bird/day) based on age and lot type.
-    Based on Ross 308 performance objectives for broilers.
+    Uses the lot's breed standard when `curve` is given, otherwise the
+    generic standard of the lot type.
     """
-    if lot_type == "layer":
-        # Layers in production phase: ~110-120g/day
-        if age_days < 126:  # Before 18 weeks (growing phase)
-            if age_days <= 14:
-                return 20
-            elif age_days <= 28:
-                return 35
-            elif age_days <= 42:
-                return 50
-            elif age_days <= 56:
-                return 60
-            elif age_days <= 84:
-                return 75
-            else:
-                return 90
-        else:  # Production phase
-            return 115
-    else:
-        # Broilers - Ross 308 standard
-        if age_days <= 7:
-            return 20  # 15-25g average
-        elif age_days <= 14:
-            return 45  # 35-55g average
-        elif age_days <= 21:
-            return 80  # 65-95g average
-        elif age_days <= 28:
-            return 115  # 100-135g average
-        elif age_days <= 35:
-            return 155  # 140-170g average
-        elif age_days <= 42:
-            return 178  # 165-190g average
-        else:
-            return 190  # 180-200g
+    from app.services.standards.data import FEED
 
+    if curve is None:
+        from app.services.standards.registry import standards_registry
+        curve = standards_registry.generic(lot_type)
+    return int(round(curve.value(FEED, age_days)))
 
-def get_optimal_water_consumption(age_days: int, lot_type: str = "broiler") -> int:
+
+def get_optimal_water_consumption(age_days: int, lot_type: str = "broiler", curve=None) -> int:
     """
     Calculate optimal water consumption (ml/bird/day) based on age.
     Water is typically 1.8-2.1x feed consumption.
     """
-    optimal_feed = get_optimal_feed_consumption(age_days, lot_type)
-    return int(optimal_feed * 2.0)  # Water = ~2x feed
+    from app.services.standards.data import WATER
+
+    if curve is None:
+        from app.services.standards.registry import standards_registry
+        curve = standards_registry.generic(lot_type)
+    return int(curve.value(WATER, age_days))
 
 
 # Feed Consumption
@@ -98,18 +81,13 @@ async def get_feed_consumptions(
     return [FeedConsumptionResponse.model_validate(r) for r in records]
 
 
-@router.post("/consumption", response_model=FeedConsumptionResponse)
-async def create_feed_consumption(
-    data: FeedConsumptionCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    """Record feed consumption."""
-    lot = db.query(Lot).filter(Lot.id == data.lot_id, Lot.status != LotStatus.DELETED).first()
-    if not lot:
+def record_feed_consumption(db: Session, data: FeedConsumptionCreate, recorded_by) -> FeedConsumption:
+    """Add a feed consumption (not committed); data may carry the id."""
+    lot = db.get(Lot, data.lot_id)
+    if not lot or lot.status == LotStatus.DELETED:
         raise HTTPException(status_code=404, detail="Lot not found")
 
-    record = FeedConsumption(**data.model_dump(), recorded_by=current_user.id)
+    record = FeedConsumption(**data.model_dump(), recorded_by=recorded_by)
 
     # Calculate total cost
     if data.quantity_kg and data.price_per_kg:
@@ -121,6 +99,17 @@ async def create_feed_consumption(
         record.feed_per_bird_g = (data.quantity_kg * 1000) / Decimal(bird_count)
 
     db.add(record)
+    return record
+
+
+@router.post("/consumption", response_model=FeedConsumptionResponse)
+async def create_feed_consumption(
+    data: FeedConsumptionCreate,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Record feed consumption."""
+    record = record_feed_consumption(db, data, current_user.id)
     db.commit()
     db.refresh(record)
 
@@ -147,18 +136,13 @@ async def get_water_consumptions(
     return [WaterConsumptionResponse.model_validate(r) for r in records]
 
 
-@router.post("/water", response_model=WaterConsumptionResponse)
-async def create_water_consumption(
-    data: WaterConsumptionCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    """Record water consumption."""
-    lot = db.query(Lot).filter(Lot.id == data.lot_id, Lot.status != LotStatus.DELETED).first()
-    if not lot:
+def record_water_consumption(db: Session, data: WaterConsumptionCreate, recorded_by) -> WaterConsumption:
+    """Add a water consumption (not committed); data may carry the id."""
+    lot = db.get(Lot, data.lot_id)
+    if not lot or lot.status == LotStatus.DELETED:
         raise HTTPException(status_code=404, detail="Lot not found")
 
-    record = WaterConsumption(**data.model_dump(), recorded_by=current_user.id)
+    record = WaterConsumption(**data.model_dump(), recorded_by=recorded_by)
 
     # Calculate water per bird
     bird_count = data.bird_count or lot.current_quantity
@@ -166,6 +150,17 @@ async def create_water_consumption(
         record.water_per_bird_ml = (data.quantity_liters * 1000) / Decimal(bird_count)
 
     db.add(record)
+    return record
+
+
+@router.post("/water", response_model=WaterConsumptionResponse)
+async def create_water_consumption(
+    data: WaterConsumptionCreate,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Record water consumption."""
+    record = record_water_consumption(db, data, current_user.id)
     db.commit()
     db.refresh(record)
 
@@ -183,7 +178,7 @@ async def get_all_feed_stocks(
     db: Session = Depends(get_db)
 ):
     """Get all feed stocks for the user's organization."""
-    query = db.query(FeedStock).filter(
+    query = db.query(*feed_stock_rows.columns(FeedStock)).filter(
         FeedStock.organization_id == current_user.organization_id
     )
 
@@ -198,24 +193,26 @@ async def get_all_feed_stocks(
         feed_type_enum = FeedType(feed_type)
         query = query.filter(FeedStock.feed_type == feed_type_enum)
 
-    stocks = query.order_by(FeedStock.feed_type).all()
-
-    # Enrich with site/building names
-    result = []
-    for stock in stocks:
-        data = FeedStockResponse.model_validate(stock).model_dump()
-
-        # Add names for display
-        if stock.site_id:
-            site = db.query(Site).filter(Site.id == stock.site_id, Site.is_active == True).first()
-            data['site_name'] = site.name if site else None
-        if stock.building_id:
-            building = db.query(Building).filter(Building.id == stock.building_id, Building.is_active == True).first()
-            data['building_name'] = building.name if building else None
-
-        result.append(data)
-
-    return result
+    rows = query.order_by(FeedStock.feed_type).all()
+
+    # Site/building names for display, batch fetched
+    site_ids = {row.site_id for row in rows if row.site_id}
+    building_ids = {row.building_id for row in rows if row.building_id}
+    site_names = dict(db.query(Site.id, Site.name).filter(
+        Site.id.in_(site_ids), Site.is_active == True
+    ).all()) if site_ids else {}
+    building_names = dict(db.query(Building.id, Building.name).filter(
+        Building.id.in_(building_ids), Building.is_active == True
+    ).all()) if building_ids else {}
+
+    return FastJSONResponse([
+        feed_stock_rows({
+            **row._mapping,
+            "site_name": site_names.get(row.site_id),
+            "building_name": building_names.get(row.building_id),
+        })
+        for row in rows
+    ])
 
 
 @router.get("/stock", response_model=List[FeedStockResponse])
@@ -323,6 +320,9 @@ async def restock_feed(
         date=date.today()
     )
     db.add(movement)
+
+    from app.services.feed_planner import FeedPlanner
+    FeedPlanner(db).on_movement(stock)
     db.commit()
     db.refresh(stock)
     db.refresh(movement)
@@ -463,36 +463,45 @@ async def get_monitoring_stats(
     """Get aggregated monitoring statistics for feed and water."""
     start_date = date.today() - timedelta(days=days)
 
-    # Build base query filters
-    feed_query = db.query(FeedConsumption).filter(FeedConsumption.date >= start_date)
-    water_query = db.query(WaterConsumption).filter(WaterConsumption.date >= start_date)
-
+    # Daily totals, grouped in SQL
     if lot_id:
-        feed_query = feed_query.filter(FeedConsumption.lot_id == lot_id)
-        water_query = water_query.filter(WaterConsumption.lot_id == lot_id)
+        feed_scope = FeedConsumption.lot_id == lot_id
+        water_scope = WaterConsumption.lot_id == lot_id
     else:
         # Filter by organization's lots
-        from app.models.building import Building
-        lot_ids = db.query(Lot.id).join(Building).join(Site).filter(
+        org_lots = select(Lot.id).join(Building, Lot.building_id == Building.id).join(
+            Site, Building.site_id == Site.id
+        ).where(
             Site.organization_id == current_user.organization_id,
             Site.is_active == True,
             Building.is_active == True,
             Lot.status != LotStatus.DELETED
-        ).all()
-        lot_ids = [l[0] for l in lot_ids]
-        feed_query = feed_query.filter(FeedConsumption.lot_id.in_(lot_ids))
-        water_query = water_query.filter(WaterConsumption.lot_id.in_(lot_ids))
+        )
+        feed_scope = FeedConsumption.lot_id.in_(org_lots)
+        water_scope = WaterConsumption.lot_id.in_(org_lots)
 
-    feed_records = feed_query.all()
-    water_records = water_query.all()
+    feed_days = db.query(
+        FeedConsumption.date,
+        func.coalesce(func.sum(FeedConsumption.quantity_kg), 0),
+        func.avg(FeedConsumption.feed_per_bird_g)
+    ).filter(FeedConsumption.date >= start_date, feed_scope).group_by(
+        FeedConsumption.date
+    ).order_by(FeedConsumption.date).all()
+    water_days = db.query(
+        WaterConsumption.date,
+        func.coalesce(func.sum(WaterConsumption.quantity_liters), 0),
+        func.avg(WaterConsumption.water_per_bird_ml)
+    ).filter(WaterConsumption.date >= start_date, water_scope).group_by(
+        WaterConsumption.date
+    ).order_by(WaterConsumption.date).all()
 
     # Calculate totals
-    total_feed_kg = sum((Decimal(str(f.quantity_kg)) if f.quantity_kg else Decimal(0)) for f in feed_records)
-    total_water_liters = sum((Decimal(str(w.quantity_liters)) if w.quantity_liters else Decimal(0)) for w in water_records)
+    total_feed_kg = sum((Decimal(str(total)) for _, total, _ in feed_days), Decimal(0))
+    total_water_liters = sum((Decimal(str(total)) for _, total, _ in water_days), Decimal(0))
 
     # Count actual days with data (not just the period parameter)
-    feed_dates = set(f.date for f in feed_records if f.quantity_kg)
-    water_dates = set(w.date for w in water_records if w.quantity_liters)
+    feed_dates = set(d for d, total, _ in feed_days if total)
+    water_dates = set(d for d, total, _ in water_days if total)
     actual_feed_days = len(feed_dates) if feed_dates else 1
     actual_water_days = len(water_dates) if water_dates else 1
 
@@ -503,14 +512,16 @@ async def get_monitoring_stats(
     # Get total active birds and lot info for optimal calculation
     lot_age = None
     lot_type = "broiler"
+    standard_curve = None
     if lot_id:
         lot = db.query(Lot).filter(Lot.id == lot_id, Lot.status != LotStatus.DELETED).first()
         total_birds = lot.current_quantity or 0 if lot else 0
         if lot:
             lot_age = lot.age_days
             lot_type = lot.type.value if lot.type else "broiler"
+            from app.services.standards.registry import standards_registry
+            standard_curve = standards_registry.resolve_lot(lot, db=db, organization_id=current_user.organization_id)
     else:
-        from app.models.building import Building
         active_lots = db.query(Lot).join(Building).join(Site).filter(
             Site.organization_id == current_user.organization_id,
             Site.is_active == True,
@@ -529,8 +540,8 @@ async def get_monitoring_stats(
     # Calculate optimal consumption based on age
     # Note: lot_age can be 0 which is valid, so use "is not None" instead of truthy check
     if lot_age is not None:
-        optimal_feed_g = get_optimal_feed_consumption(lot_age, lot_type)
-        optimal_water_ml = get_optimal_water_consumption(lot_age, lot_type)
+        optimal_feed_g = get_optimal_feed_consumption(lot_age, lot_type, standard_curve)
+        optimal_water_ml = get_optimal_water_consumption(lot_age, lot_type, standard_curve)
     else:
         # Default fallback when no lot age is available
         optimal_feed_g = 138
@@ -547,25 +558,25 @@ async def get_monitoring_stats(
     daily_trend = {}
     day_labels = ['Lun', 'Mar', 'Mer', 'Jeu', 'Ven', 'Sam', 'Dim']
 
-    for f in feed_records:
-        d = f.date.strftime('%d/%m')
-        day_name = day_labels[f.date.weekday()]
+    for day, total, per_bird in feed_days:
+        d = day.strftime('%d/%m')
+        day_name = day_labels[day.weekday()]
         key = f"{day_name}"
         if key not in daily_trend:
             daily_trend[key] = {'day': day_name, 'date': d, 'feed_kg': Decimal(0), 'water_liters': Decimal(0), 'feed_g_bird': Decimal(0), 'water_ml_bird': Decimal(0)}
-        daily_trend[key]['feed_kg'] += Decimal(str(f.quantity_kg or 0))
-        if f.feed_per_bird_g:
-            daily_trend[key]['feed_g_bird'] = Decimal(str(f.feed_per_bird_g))
+        daily_trend[key]['feed_kg'] += Decimal(str(total or 0))
+        if per_bird:
+            daily_trend[key]['feed_g_bird'] = Decimal(str(per_bird))
 
-    for w in water_records:
-        d = w.date.strftime('%d/%m')
-        day_name = day_labels[w.date.weekday()]
+    for day, total, per_bird in water_days:
+        d = day.strftime('%d/%m')
+        day_name = day_labels[day.weekday()]
         key = f"{day_name}"
         if key not in daily_trend:
             daily_trend[key] = {'day': day_name, 'date': d, 'feed_kg': Decimal(0), 'water_liters': Decimal(0), 'feed_g_bird': Decimal(0), 'water_ml_bird': Decimal(0)}
-        daily_trend[key]['water_liters'] += Decimal(str(w.quantity_liters or 0))
-        if w.water_per_bird_ml:
-            daily_trend[key]['water_ml_bird'] = Decimal(str(w.water_per_bird_ml))
+        daily_trend[key]['water_liters'] += Decimal(str(total or 0))
+        if per_bird:
+            daily_trend[key]['water_ml_bird'] = Decimal(str(per_bird))
 
     # Calculate ratio for each day
     for key in daily_trend:
@@ -574,21 +585,39 @@ async def get_monitoring_stats(
         else:
             daily_trend[key]['ratio'] = Decimal(0)
 
-    # Get stock stats
-    stocks = db.query(FeedStock).filter(
+    # Stock by type with the supply plan's projected demand
+    from app.services.feed_planner import FeedPlanner
+    FeedPlanner(db).ensure_planned(current_user.organization_id)
+    db.commit()  # The plan is derived data: storing it leaves the data version as is
+
+    stock_rows = db.query(
+        FeedStock.feed_type,
+        func.coalesce(func.sum(FeedStock.quantity_kg), 0),
+        func.coalesce(func.sum(FeedStock.daily_demand_kg), 0),
+        func.min(FeedStock.depletion_date)
+    ).filter(
         FeedStock.organization_id == current_user.organization_id
-    ).all()
+    ).group_by(FeedStock.feed_type).all()
 
-    total_stock_kg = sum((Decimal(str(s.quantity_kg)) if s.quantity_kg else Decimal(0)) for s in stocks)
+    total_stock_kg = sum((Decimal(str(stock_kg)) for _, stock_kg, _, _ in stock_rows), Decimal(0))
+    planned_daily_kg = sum((Decimal(str(demand_kg)) for _, _, demand_kg, _ in stock_rows), Decimal(0))
+    depletion_dates = [depletion for _, _, _, depletion in stock_rows if depletion]
     stock_by_type = {}
-    for s in stocks:
-        t = s.feed_type.value if s.feed_type else 'other'
-        if t not in stock_by_type:
-            stock_by_type[t] = {'stock_kg': Decimal(0), 'name': t.capitalize()}
-        stock_by_type[t]['stock_kg'] += Decimal(str(s.quantity_kg or 0))
-
-    # Days of autonomy
-    days_autonomy = total_stock_kg / avg_feed_per_day if avg_feed_per_day > 0 else Decimal(0)
+    for feed_type, stock_kg, demand_kg, depletion in stock_rows:
+        t = feed_type.value if feed_type else 'other'
+        stock_by_type[t] = {
+            'stock_kg': Decimal(str(stock_kg)),
+            'name': t.capitalize(),
+            'daily_demand_kg': Decimal(str(demand_kg)),
+            'depletion_date': depletion
+        }
+
+    # Days of autonomy: stock over the projected demand of the lots it
+    # serves, or over the recent average when nothing is planned
+    if planned_daily_kg > 0:
+        days_autonomy = total_stock_kg / planned_daily_kg
+    else:
+        days_autonomy = total_stock_kg / avg_feed_per_day if avg_feed_per_day > 0 else Decimal(0)
 
     # Convert daily_trend Decimals to float and add optimal values
     daily_trend_list = []
@@ -606,7 +635,15 @@ async def get_monitoring_stats(
         })
 
     # Convert stock_by_type Decimals to float
-    stock_by_type_list = [{'stock_kg': float(round(v['stock_kg'], 2)), 'name': v['name']} for v in stock_by_type.values()]
+    stock_by_type_list = [
+        {
+            'stock_kg': float(round(v['stock_kg'], 2)),
+            'name': v['name'],
+            'daily_demand_kg': float(round(v['daily_demand_kg'], 2)),
+            'depletion_date': v['depletion_date'].isoformat() if v['depletion_date'] else None
+        }
+        for v in stock_by_type.values()
+    ]
 
     return {
         "summary": {
@@ -627,13 +664,51 @@ async def get_monitoring_stats(
             "water_feed_ratio": float(round(water_feed_ratio, 2)),
             "optimal_ratio": {"min": 1.8, "max": 2.1},
             "total_stock_kg": float(round(total_stock_kg, 2)),
-            "days_autonomy": float(round(days_autonomy, 1))
+            "days_autonomy": float(round(days_autonomy, 1)),
+            "planned_daily_feed_kg": float(round(planned_daily_kg, 2)),
+            "next_depletion_date": min(depletion_dates).isoformat() if depletion_dates else None
         },
         "daily_trend": daily_trend_list,
         "stock_by_type": stock_by_type_list
     }
 
 
+# Supply plan - MUST be before {stock_id} routes
+@router.get("/stock/plan")
+async def get_stock_plan(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Depletion date and suggested reorder of every feed stock of the organization."""
+    from app.services.feed_planner import FeedPlanner
+
+    planner = FeedPlanner(db)
+    planner.ensure_planned(current_user.organization_id)
+    db.commit()
+
+    rows = db.query(FeedStock, Site.name, Building.name).outerjoin(
+        Site, FeedStock.site_id == Site.id
+    ).outerjoin(
+        Building, FeedStock.building_id == Building.id
+    ).filter(
+        FeedStock.organization_id == current_user.organization_id
+    ).order_by(FeedStock.depletion_date.is_(None), FeedStock.depletion_date, FeedStock.feed_type).all()
+
+    today = date.today()
+    stocks = []
+    for stock, site_name, building_name in rows:
+        entry = planner.summary(stock, today)
+        entry["site_name"] = site_name
+        entry["building_name"] = building_name
+        stocks.append(entry)
+
+    return {
+        "generated_on": today.isoformat(),
+        "stocks": stocks,
+        "to_reorder": [entry for entry in stocks if entry["reorder_date"] and entry["reorder_date"] <= today.isoformat()]
+    }
+
+
 # Stock Movements - MUST be before {stock_id} routes
 @router.get("/stock/movements/all")
 async def get_all_stock_movements(
@@ -646,7 +721,9 @@ async def get_all_stock_movements(
     db: Session = Depends(get_db)
 ):
     """Get stock movement history."""
-    query = db.query(FeedStockMovement).join(FeedStock).filter(
+    query = db.query(FeedStockMovement).join(FeedStock).options(
+        contains_eager(FeedStockMovement.stock)
+    ).filter(
         FeedStock.organization_id == current_user.organization_id
     )
 
@@ -665,13 +742,17 @@ async def get_all_stock_movements(
 
     movements = query.order_by(FeedStockMovement.created_at.desc()).limit(limit).all()
 
+    lot_ids = {m.lot_id for m in movements if m.lot_id}
+    lot_codes = dict(db.query(Lot.id, Lot.code).filter(
+        Lot.id.in_(lot_ids), Lot.status != LotStatus.DELETED
+    ).all()) if lot_ids else {}
+
     result = []
     for m in movements:
         data = FeedStockMovementResponse.model_validate(m).model_dump()
         data['feed_type'] = m.stock.feed_type.value if m.stock else None
         if m.lot_id:
-            lot = db.query(Lot).filter(Lot.id == m.lot_id, Lot.status != LotStatus.DELETED).first()
-            data['lot_code'] = lot.code if lot else None
+            data['lot_code'] = lot_codes.get(m.lot_id)
         result.append(data)
 
     return result
@@ -708,6 +789,9 @@ async def update_feed_stock(
     for field, value in update_data.items():
         setattr(stock, field, value)
 
+    if "quantity_kg" in update_data or "min_quantity_kg" in update_data:
+        from app.services.feed_planner import FeedPlanner
+        FeedPlanner(db).on_movement(stock)
     db.commit()
     db.refresh(stock)
 
@@ -124,25 +124,32 @@ async def get_upcoming_vaccinations(
 
     upcoming = []
     today = date.today()
+    if not lots:
+        return upcoming
+    lot_ids = [lot.id for lot in lots]
+
+    # Schedules and vaccinations already given, batch fetched for all lots
+    lot_schedules = {}
+    for schedule in db.query(VaccinationSchedule).filter(VaccinationSchedule.lot_id.in_(lot_ids)).all():
+        lot_schedules.setdefault(schedule.lot_id, []).append(schedule)
+    global_schedules = db.query(VaccinationSchedule).filter(
+        VaccinationSchedule.lot_id == None,
+        (VaccinationSchedule.organization_id == current_user.organization_id) |
+        (VaccinationSchedule.is_system == True)
+    ).all()
+    # Case-insensitive matching on the product name
+    done = {(lot_id, (product_name or "").lower()) for lot_id, product_name in db.query(
+        HealthEvent.lot_id, HealthEvent.product_name
+    ).filter(
+        HealthEvent.lot_id.in_(lot_ids),
+        HealthEvent.event_type == HealthEventType.VACCINATION
+    ).all()}
 
     for lot in lots:
         lot_age = lot.age_days
 
-        # First check for lot-specific schedules
-        lot_schedules = db.query(VaccinationSchedule).filter(
-            VaccinationSchedule.lot_id == lot.id
-        ).all()
-
-        # If lot has specific schedules, use those
-        if lot_schedules:
-            schedules = lot_schedules
-        else:
-            # Otherwise use global schedules (organization or system)
-            schedules = db.query(VaccinationSchedule).filter(
-                VaccinationSchedule.lot_id == None,
-                (VaccinationSchedule.organization_id == current_user.organization_id) |
-                (VaccinationSchedule.is_system == True)
-            ).all()
+        # Lot-specific schedules if any, otherwise global ones (organization or system)
+        schedules = lot_schedules.get(lot.id) or global_schedules
 
         for schedule in schedules:
             # Check if this schedule applies to this lot type (only for global schedules)
@@ -151,14 +158,7 @@ async def get_upcoming_vaccinations(
 
             # Check if vaccination is due
             if schedule.day_from <= lot_age + days_ahead:
-                # Check if already done (case-insensitive matching)
-                existing = db.query(HealthEvent).filter(
-                    HealthEvent.lot_id == lot.id,
-                    HealthEvent.event_type == HealthEventType.VACCINATION,
-                    func.lower(HealthEvent.product_name) == func.lower(schedule.vaccine_name)
-                ).first()
-
-                if not existing:
+                if (lot.id, (schedule.vaccine_name or "").lower()) not in done:
                     due_date = lot.placement_date + timedelta(days=schedule.day_from - lot.age_at_placement)
 
                     upcoming.append(UpcomingVaccination(
@@ -5,7 +5,7 @@ from uuid import UUID
 from datetime import datetime
 
 from app.api.deps import get_db, get_current_user
-from app.core.security import get_password_hash, create_access_token
+from app.core.security import get_password_hash
 from app.models.user import User
 from app.models.organization import Organization
 from app.models.invitation import Invitation, InvitationStatus
@@ -15,8 +15,9 @@ from app.schemas.invitation import (
     AcceptInvitation,
     InvitationInfo
 )
-from app.schemas.user import Token, UserResponse
+from app.schemas.user import Token
 from app.services.email import email_service
+from app.services.token_service import TokenService
 
 router = APIRouter()
 
@@ -255,13 +256,7 @@ async def accept_invitation(
     db.commit()
     db.refresh(user)
 
-    # Create token
-    access_token = create_access_token(data={"sub": str(user.id)})
-
-    return Token(
-        access_token=access_token,
-        user=UserResponse.model_validate(user)
-    )
+    return TokenService(db).issue_tokens(user)
 
 
 @router.post("/{invitation_id}/resend")
@@ -0,0 +1,57 @@
+import json
+import time
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_db, get_current_user, oauth2_scheme
+from app.core.config import settings
+from app.core.live_events import broker
+from app.core.security import decode_token
+from app.models.user import User
+
+router = APIRouter()
+
+
+@router.get("/events")
+async def live_events(
+    token: str = Depends(oauth2_scheme),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Server-Sent Events of the changes of the user's organization.
+
+    Each `change` event lists the topics written (app.core.live_events.TOPICS)
+    so the client refetches those only. The stream ends when the access
+    token expires or is revoked; the client reconnects with a fresh one.
+    """
+    if not settings.LIVE_EVENTS_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not current_user.organization_id:
+        raise HTTPException(status_code=400, detail="User has no organization")
+
+    # The stream holds no database connection while it waits
+    db.close()
+    subscription = broker.subscribe(current_user.organization_id)
+    expires_at = decode_token(token).get("exp", time.time())
+
+    async def stream():
+        try:
+            yield f"retry: {settings.LIVE_RETRY_MS}\nevent: ready\ndata: {{}}\n\n"
+            while True:
+                remaining = expires_at - time.time()
+                if remaining <= 0 or decode_token(token) is None:
+                    return
+                topics = await subscription.next(min(settings.LIVE_HEARTBEAT_SECONDS, remaining))
+                if topics is None:
+                    yield ": ping\n\n"
+                elif topics:
+                    yield f"event: change\ndata: {json.dumps({'topics': sorted(topics)})}\n\n"
+        finally:
+            broker.unsubscribe(subscription)
+
+    return StreamingResponse(stream(), media_type="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",  # Unbuffered behind nginx
+    })
@@ -14,22 +14,18 @@ from app.models.building import Building
 from app.models.lot import Lot, LotStats, LotStatus, LotType
 from app.schemas.lot import LotCreate, LotUpdate, LotResponse, LotSummary, LotStatsResponse, LotDailyEntry, LotSplitRequest, LotSplitResponse
 from app.core.permissions import Permission, has_permission, can_write
+from app.services.sequences import generate_lot_code
+from app.services.egg_inventory import EggInventoryService
+from app.services.lot_financials import LotFinancialService
+from app.core.serialization import FastJSONResponse, RowSerializer
 
 router = APIRouter()
 
+# Row tuples -> response JSON of the lot list
+lot_rows = RowSerializer(LotSummary)
 
-def generate_lot_code(db: Session, lot_type: str) -> str:
-    """Generate a unique lot code."""
-    from datetime import datetime
-    year = datetime.now().year
-    prefix = "LC" if lot_type == "broiler" else "LP"  # LC=Chair, LP=Pondeuse
-
-    # Get count of lots this year
-    count = db.query(Lot).filter(
-        Lot.code.like(f"{prefix}-{year}-%")
-    ).count()
-
-    return f"{prefix}-{year}-{str(count + 1).zfill(4)}"
+# Lot fields the feed supply plan depends on (app.services.feed_planner)
+FEED_PLAN_FIELDS = {"building_id", "current_quantity", "age_at_placement", "status"}
 
 
 def update_lot_stats(db: Session, lot_id: UUID) -> None:
@@ -37,7 +33,6 @@ def update_lot_stats(db: Session, lot_id: UUID) -> None:
     from sqlalchemy import func
     from app.models.production import EggProduction, WeightRecord, Mortality
     from app.models.feed import FeedConsumption
-    from app.models.finance import Sale, Expense
 
     lot = db.query(Lot).filter(Lot.id == lot_id, Lot.status != LotStatus.DELETED).first()
     if not lot:
@@ -106,17 +101,8 @@ def update_lot_stats(db: Session, lot_id: UUID) -> None:
         if total_weight_kg > 0 and feed_sum > 0:
             stats.feed_conversion_ratio = float(feed_sum) / total_weight_kg
 
-    # Financial stats
-    sales_sum = db.query(func.coalesce(func.sum(Sale.total_amount), 0)).filter(
-        Sale.lot_id == lot_id
-    ).scalar()
-    expenses_sum = db.query(func.coalesce(func.sum(Expense.amount), 0)).filter(
-        Expense.lot_id == lot_id
-    ).scalar()
-
-    stats.total_sales = float(sales_sum)
-    stats.total_expenses = float(expenses_sum)
-    stats.gross_margin = float(sales_sum) - float(expenses_sum)
+    # Financial stats and summary
+    LotFinancialService(db).refresh(lot_id)
 
     db.commit()
 
@@ -136,11 +122,12 @@ async def get_lots(
     db: Session = Depends(get_db)
 ):
     """Récupère les lots avec filtres."""
-    from sqlalchemy.orm import outerjoin
-
     # Utiliser outerjoin pour inclure les lots sans bâtiment
-    # Filter by active sites and buildings only
-    query = db.query(Lot).outerjoin(Building).outerjoin(Site).filter(
+    # Filter by active sites and buildings only; building and site names come with the row
+    query = db.query(
+        *lot_rows.columns(Lot, exclude=("site_id",)), Lot.age_at_placement,
+        Building.name.label("building_name"), Site.id.label("site_id"), Site.name.label("site_name")
+    ).select_from(Lot).outerjoin(Building).outerjoin(Site).filter(
         (
             (Site.organization_id == current_user.organization_id) &
             (Site.is_active == True) &
@@ -165,36 +152,19 @@ async def get_lots(
         type_enum = LotType(lot_type)
         query = query.filter(Lot.type == type_enum)
 
-    lots = query.order_by(Lot.placement_date.desc()).all()
-
-    result = []
-    for lot in lots:
-        building = lot.building
-        site = building.site if building else None
-        data = LotSummary(
-            id=lot.id,
-            code=lot.code,
-            name=lot.name,
-            type=lot.type.value if lot.type else "broiler",
-            breed=lot.breed,
-            current_quantity=lot.current_quantity,
-            initial_quantity=lot.initial_quantity,
-            age_days=lot.age_days,
-            status=lot.status.value if lot.status else "active",
-            building_id=lot.building_id,
-            building_name=building.name if building else None,
-            site_id=site.id if site else None,
-            site_name=site.name if site else None,
-            # Financial fields for analytics
-            chick_price_unit=lot.chick_price_unit,
-            transport_cost=lot.transport_cost,
-            other_initial_costs=lot.other_initial_costs,
-            # Date for period filtering
-            placement_date=lot.placement_date
-        )
-        result.append(data)
+    rows = query.order_by(Lot.placement_date.desc()).all()
 
-    return result
+    today = date.today()
+    return FastJSONResponse([
+        lot_rows({
+            **row._mapping,
+            "type": row.type or LotType.BROILER,
+            "status": row.status or LotStatus.ACTIVE,
+            # Lot.age_days, from the selected columns
+            "age_days": (today - row.placement_date).days + (row.age_at_placement or 0) if row.placement_date else 0,
+        })
+        for row in rows
+    ])
 
 
 @router.post("", response_model=LotResponse)
@@ -219,7 +189,7 @@ async def create_lot(
             raise HTTPException(status_code=403, detail="Not authorized")
 
     # Generate code
-    code = generate_lot_code(db, lot_data.type)
+    code = generate_lot_code(db, current_user.organization_id, lot_data.type)
 
     lot = Lot(
         **lot_data.model_dump(),
@@ -234,6 +204,10 @@ async def create_lot(
     stats = LotStats(lot_id=lot.id)
     db.add(stats)
 
+    # The new lot eats from the organization's feed stocks
+    from app.services.feed_planner import FeedPlanner
+    FeedPlanner(db).invalidate(current_user.organization_id)
+
     db.commit()
     db.refresh(lot)
 
@@ -306,6 +280,11 @@ async def update_lot(
     for field, value in update_data.items():
         setattr(lot, field, value)
 
+    if update_data.keys() & FEED_PLAN_FIELDS:
+        from app.services.feed_planner import FeedPlanner
+        FeedPlanner(db).invalidate(current_user.organization_id)
+
+    LotFinancialService(db).refresh(lot.id)
     db.commit()
     db.refresh(lot)
 
@@ -396,6 +375,8 @@ async def record_daily_entry(
             egg_prod.laying_rate = (egg_prod.total_eggs / lot.current_quantity) * 100
 
         db.add(egg_prod)
+        db.flush()
+        EggInventoryService(db).sync_production(egg_prod, recorded_by=current_user.id)
 
     # Weight (for broilers mainly)
     if entry.average_weight_g is not None:
@@ -410,6 +391,7 @@ async def record_daily_entry(
         db.add(weight)
 
     # Feed
+    debited_stock = None
     if entry.feed_quantity_kg is not None:
         from app.models.feed import FeedStock, FeedStockMovement, StockMovementType
 
@@ -454,6 +436,7 @@ async def record_daily_entry(
                 date=entry.date
             )
             db.add(movement)
+            debited_stock = stock
 
     # Water
     if entry.water_liters is not None:
@@ -468,6 +451,11 @@ async def record_daily_entry(
             water.water_per_bird_ml = (float(entry.water_liters) * 1000) / lot.current_quantity
         db.add(water)
 
+    # Re-project the debited stock's depletion and reorder
+    if debited_stock is not None:
+        from app.services.feed_planner import FeedPlanner
+        FeedPlanner(db).on_movement(debited_stock)
+
     db.commit()
 
     # Update lot stats
@@ -606,6 +594,10 @@ async def update_daily_entry(
             if lot.current_quantity and lot.current_quantity > 0:
                 egg_prod.laying_rate = (egg_prod.total_eggs / lot.current_quantity) * 100
             db.add(egg_prod)
+            existing_eggs = egg_prod
+
+        db.flush()
+        EggInventoryService(db).sync_production(existing_eggs, recorded_by=current_user.id)
 
     # Update feed
     if entry.feed_quantity_kg is not None:
@@ -809,6 +801,8 @@ async def close_lot(
 
     lot.status = "completed"
     lot.actual_end_date = end_date or date.today()
+    from app.services.feed_planner import FeedPlanner
+    FeedPlanner(db).invalidate(current_user.organization_id)
     db.commit()
 
     return {"message": "Lot closed successfully"}
@@ -837,10 +831,7 @@ async def delete_lot(
         force: Si True, supprime meme si le lot contient des donnees. Sinon, retourne un
                avertissement avec les donnees trouvees.
     """
-    from app.models.production import EggProduction, WeightRecord, Mortality
-    from app.models.feed import FeedConsumption, WaterConsumption
-    from app.models.health import HealthEvent
-    from app.models.finance import Sale, Expense
+    from app.services.census import DependencyCensus
 
     # Permission check: only owner and manager can delete lots
     if not has_permission(current_user, Permission.DELETE_LOT):
@@ -885,17 +876,8 @@ async def delete_lot(
         if site and str(site.organization_id) != str(current_user.organization_id):
             raise HTTPException(status_code=403, detail="Not authorized")
 
-    # Check if lot has any associated data
-    data_counts = {
-        "ventes": db.query(Sale).filter(Sale.lot_id == lot_id).count(),
-        "depenses": db.query(Expense).filter(Expense.lot_id == lot_id).count(),
-        "production_oeufs": db.query(EggProduction).filter(EggProduction.lot_id == lot_id).count(),
-        "pesees": db.query(WeightRecord).filter(WeightRecord.lot_id == lot_id).count(),
-        "mortalites": db.query(Mortality).filter(Mortality.lot_id == lot_id).count(),
-        "consommation_aliment": db.query(FeedConsumption).filter(FeedConsumption.lot_id == lot_id).count(),
-        "consommation_eau": db.query(WaterConsumption).filter(WaterConsumption.lot_id == lot_id).count(),
-        "evenements_sante": db.query(HealthEvent).filter(HealthEvent.lot_id == lot_id).count(),
-    }
+    # Check if lot has any associated data (one grouped query)
+    data_counts = DependencyCensus(db).count("lot", lot_id)
 
     has_data = any(count > 0 for count in data_counts.values())
     total_records = sum(data_counts.values())
@@ -955,6 +937,9 @@ async def delete_lot(
 
     # Proceed with soft delete
     lot.status = LotStatus.DELETED
+    EggInventoryService(db).withdraw_lot(lot.id)
+    from app.services.feed_planner import FeedPlanner
+    FeedPlanner(db).invalidate(current_user.organization_id)
     db.commit()
 
     message = "Lot supprime avec succes"
@@ -970,266 +955,36 @@ async def get_lot_financial_summary(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get detailed financial summary for a lot with expenses breakdown and sales list."""
-    from sqlalchemy import func
-    from app.models.finance import Sale, Expense
-    from app.models.production import EggProduction
-
+    """Get detailed financial summary for a lot with expenses breakdown and sales list (stored snapshot)."""
     lot = db.query(Lot).filter(Lot.id == lot_id, Lot.status != LotStatus.DELETED).first()
     if not lot:
         raise HTTPException(status_code=404, detail="Lot not found")
 
-    is_layer = lot.type and lot.type.value.lower() == 'layer'
-
-    # Get expenses grouped by category
-    expenses_by_category = db.query(
-        Expense.category,
-        func.sum(Expense.amount).label('total'),
-        func.count(Expense.id).label('count')
-    ).filter(
-        Expense.lot_id == lot_id
-    ).group_by(Expense.category).all()
-
-    expenses_breakdown = {}
-    total_expenses = 0
-    # Use a set of lowercase category names for case-insensitive duplicate checking
-    expense_categories_lower = set()
-    for category, total, count in expenses_by_category:
-        cat_total = float(total or 0)
-        # Normalize category name to lowercase for consistency
-        cat_lower = category.lower() if category else 'other'
-        expense_categories_lower.add(cat_lower)
-        # Store with normalized lowercase key
-        if cat_lower in expenses_breakdown:
-            # Merge if same category with different case exists
-            expenses_breakdown[cat_lower]['total'] += cat_total
-            expenses_breakdown[cat_lower]['count'] += count
-        else:
-            expenses_breakdown[cat_lower] = {
-                'total': cat_total,
-                'count': count
-            }
-        total_expenses += cat_total
-
-    # Check if this lot has been split (has child lots)
-    child_lots_exist = db.query(Lot).filter(Lot.parent_lot_id == lot_id, Lot.status != LotStatus.DELETED).first() is not None
-
-    # DEBUG: Log lot financial fields
-    logger.warning(f"[FINANCIAL DEBUG] lot_id={lot_id}, code={lot.code}")
-    logger.warning(f"[FINANCIAL DEBUG] chick_price_unit={lot.chick_price_unit}, initial_quantity={lot.initial_quantity}")
-    logger.warning(f"[FINANCIAL DEBUG] current_quantity={lot.current_quantity}, has_children={child_lots_exist}")
-    logger.warning(f"[FINANCIAL DEBUG] transport_cost={lot.transport_cost}")
-    logger.warning(f"[FINANCIAL DEBUG] expense_categories_lower={expense_categories_lower}")
-
-    # Add chick cost from lot fields ONLY if not already in expenses table
-    # This prevents double counting
-    if lot.chick_price_unit and lot.initial_quantity:
-        # For lots that have been split (have children), use current_quantity
-        # because part of the chick cost has been transferred to child lots
-        # For unsplit lots or child lots, use initial_quantity
-        if child_lots_exist and lot.current_quantity:
-            # This lot has been split, calculate cost based on remaining birds
-            chick_quantity_for_cost = lot.current_quantity
-            logger.warning(f"[FINANCIAL DEBUG] Lot has children, using current_quantity={chick_quantity_for_cost} for chick cost")
-        else:
-            chick_quantity_for_cost = lot.initial_quantity
-            logger.warning(f"[FINANCIAL DEBUG] Using initial_quantity={chick_quantity_for_cost} for chick cost")
-
-        chick_cost = float(lot.chick_price_unit) * chick_quantity_for_cost
-        logger.warning(f"[FINANCIAL DEBUG] chick_cost calculated={chick_cost}, 'chicks' in categories: {'chicks' in expense_categories_lower}")
-        if 'chicks' not in expense_categories_lower:
-            # Only add if not already recorded as expense
-            expenses_breakdown['chicks'] = {'total': chick_cost, 'count': 1, 'source': 'lot'}
-            total_expenses += chick_cost
-            logger.warning(f"[FINANCIAL DEBUG] Added chick_cost to total_expenses, new total={total_expenses}")
-
-    # Add transport cost from lot fields ONLY if not already in expenses table
-    if lot.transport_cost:
-        transport_cost = float(lot.transport_cost)
-        logger.warning(f"[FINANCIAL DEBUG] transport_cost calculated={transport_cost}, 'transport' in categories: {'transport' in expense_categories_lower}")
-        if 'transport' not in expense_categories_lower:
-            # Only add if not already recorded as expense
-            expenses_breakdown['transport'] = {'total': transport_cost, 'count': 1, 'source': 'lot'}
-            total_expenses += transport_cost
-            logger.warning(f"[FINANCIAL DEBUG] Added transport_cost to total_expenses, new total={total_expenses}")
-
-    # Add other initial costs if available
-    if lot.other_initial_costs:
-        other_cost = float(lot.other_initial_costs)
-        if 'other' not in expense_categories_lower:
-            expenses_breakdown['other'] = {'total': other_cost, 'count': 1, 'source': 'lot'}
-        else:
-            expenses_breakdown['other']['total'] += other_cost
-        total_expenses += other_cost
-
-    # Get all sales for this lot with details
-    sales = db.query(Sale).filter(Sale.lot_id == lot_id).order_by(Sale.created_at.desc()).all()
-
-    sales_list = []
-    total_revenue = 0
-    total_quantity_sold = 0
-
-    for sale in sales:
-        sale_amount = float(sale.total_amount or 0)
-        sale_qty = float(sale.quantity or 0)
-        total_revenue += sale_amount
-        total_quantity_sold += sale_qty
-
-        # Calculate cost per unit at time of sale
-        cost_per_unit = total_expenses / lot.initial_quantity if lot.initial_quantity else 0
-        profit_per_unit = (sale_amount / sale_qty) - cost_per_unit if sale_qty > 0 else 0
-
-        sales_list.append({
-            'id': str(sale.id),
-            'date': sale.date.isoformat() if sale.date else None,
-            'sale_type': sale.sale_type.value if sale.sale_type else 'other',
-            'quantity': sale_qty,
-            'unit': sale.unit,
-            'unit_price': float(sale.unit_price or 0),
-            'total_amount': sale_amount,
-            'client_name': sale.client_name,
-            'payment_status': sale.payment_status.value if sale.payment_status else 'pending',
-            'total_weight_kg': float(sale.total_weight_kg) if sale.total_weight_kg else None,
-            'average_weight_kg': float(sale.average_weight_kg) if sale.average_weight_kg else None,
-        })
-
-    # For LAYER lots: Calculate estimated revenue from egg production
-    eggs_revenue_estimate = None
-    eggs_produced_trays = 0
-    avg_price_per_tray = 0
-
-    logger.warning(f"[EGGS DEBUG] lot_type={lot.type}, is_layer={is_layer}")
-
-    if is_layer:
-        # Get total eggs produced by this lot
-        total_eggs_produced = db.query(func.sum(EggProduction.sellable_eggs)).filter(
-            EggProduction.lot_id == lot_id
-        ).scalar() or 0
-
-        # Convert eggs to trays (1 tray = 30 eggs)
-        eggs_produced_trays = total_eggs_produced / 30
-        logger.warning(f"[EGGS DEBUG] total_eggs={total_eggs_produced}, trays={eggs_produced_trays}")
-
-        # Get average price per tray from recent egg sales
-        from app.models.finance import SaleType
-        from app.models.site import Site
-
-        site_id = lot.building.site_id if lot.building else None
-        org_id = lot.building.site.organization_id if lot.building and lot.building.site else None
-
-        avg_price_result = None
-
-        # 1) Try site-level first (fast)
-        if site_id:
-            avg_price_result = db.query(
-                func.avg(Sale.unit_price)
-            ).filter(
-                Sale.site_id == site_id,
-                Sale.sale_type == SaleType.EGGS_TRAY,
-                Sale.unit_price > 0
-            ).scalar()
-            logger.warning(f"[EGGS DEBUG] site_id={site_id}, site_avg_price={avg_price_result}")
-
-        # 2) Fallback: organization-level if no site sales
-        if (not avg_price_result or avg_price_result <= 0) and org_id:
-            org_site_ids = db.query(Site.id).filter(Site.organization_id == org_id, Site.is_active == True).all()
-            org_site_ids = [s[0] for s in org_site_ids]
-            if org_site_ids:
-                avg_price_result = db.query(
-                    func.avg(Sale.unit_price)
-                ).filter(
-                    Sale.site_id.in_(org_site_ids),
-                    Sale.sale_type == SaleType.EGGS_TRAY,
-                    Sale.unit_price > 0
-                ).scalar()
-                logger.warning(f"[EGGS DEBUG] org fallback, org_avg_price={avg_price_result}")
-
-        if avg_price_result and avg_price_result > 0:
-            avg_price_per_tray = float(avg_price_result)
-        else:
-            # Default price per tray if no sales history
-            avg_price_per_tray = 1500
-            logger.warning(f"[EGGS DEBUG] using default price={avg_price_per_tray}")
-
-        # Calculate estimated revenue
-        eggs_revenue_estimate = eggs_produced_trays * avg_price_per_tray
-        logger.warning(f"[EGGS DEBUG] avg_price={avg_price_per_tray}, eggs_revenue_estimate={eggs_revenue_estimate}")
-
-        # Add estimated egg revenue to total revenue for layer lots
-        total_revenue += eggs_revenue_estimate
-
-    # Calculate profit metrics
-    gross_profit = total_revenue - total_expenses
-    profit_margin_percent = (gross_profit / total_revenue * 100) if total_revenue > 0 else 0
-
-    # Per unit metrics
-    current_birds = lot.current_quantity or 0
-    birds_sold = total_quantity_sold if lot.type and lot.type.value == 'broiler' else 0
-    cost_per_bird = total_expenses / lot.initial_quantity if lot.initial_quantity else 0
-    revenue_per_bird = total_revenue / birds_sold if birds_sold > 0 else 0
-    profit_per_bird = gross_profit / birds_sold if birds_sold > 0 else 0
-
-    # Check if this lot was split from another (inherited expenses indicator)
-    is_split_lot = lot.parent_lot_id is not None
-    inherited_expenses = 0
-    if is_split_lot:
-        # Count expenses that came from split
-        inherited_expenses = db.query(func.coalesce(func.sum(Expense.amount), 0)).filter(
-            Expense.lot_id == lot_id,
-            Expense.from_split_lot_id.isnot(None)
-        ).scalar() or 0
-        inherited_expenses = float(inherited_expenses)
-
-    # Check if this lot has been split (has child lots)
-    child_lots_count = db.query(Lot).filter(Lot.parent_lot_id == lot_id, Lot.status != LotStatus.DELETED).count()
+    summary = LotFinancialService(db).get(lot)
+    db.commit()
+    return summary
 
-    # Build response
-    response = {
-        'lot_id': str(lot_id),
-        'lot_code': lot.code,
-        'lot_type': lot.type.value if lot.type else 'broiler',
-        'initial_quantity': lot.initial_quantity,
-        'current_quantity': current_birds,
-        'split_info': {
-            'is_split_lot': is_split_lot,
-            'parent_lot_id': str(lot.parent_lot_id) if lot.parent_lot_id else None,
-            'split_date': lot.split_date.isoformat() if lot.split_date else None,
-            'split_ratio': float(lot.split_ratio) if lot.split_ratio else None,
-            'inherited_expenses': round(inherited_expenses, 2),
-            'has_child_lots': child_lots_count > 0,
-            'child_lots_count': child_lots_count
-        },
-        'summary': {
-            'total_expenses': round(total_expenses, 2),
-            'total_revenue': round(total_revenue, 2),
-            'gross_profit': round(gross_profit, 2),
-            'profit_margin_percent': round(profit_margin_percent, 1),
-            'profit_status': 'profit' if gross_profit > 0 else 'loss' if gross_profit < 0 else 'break_even'
-        },
-        'expenses_breakdown': expenses_breakdown,
-        'per_unit': {
-            'cost_per_bird': round(cost_per_bird, 2),
-            'revenue_per_bird': round(revenue_per_bird, 2),
-            'profit_per_bird': round(profit_per_bird, 2),
-            'birds_sold': int(birds_sold)
-        },
-        'sales': sales_list,
-        'sales_count': len(sales_list)
-    }
 
-    # Add egg production info for layer lots
-    if is_layer and eggs_revenue_estimate is not None:
-        response['eggs_production'] = {
-            'total_trays_produced': round(eggs_produced_trays, 1),
-            'avg_price_per_tray': round(avg_price_per_tray, 2),
-            'estimated_revenue': round(eggs_revenue_estimate, 2),
-            'is_estimate': True,
-            'note': 'Revenus estimés basés sur la production et le prix moyen de vente'
-        }
-        # Update summary to indicate estimate
-        response['summary']['revenue_is_estimate'] = True
+@router.post("/{lot_id}/financial-summary/recompute")
+async def recompute_lot_financial_summary(
+    lot_id: UUID,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Recompute the stored financial summary of a lot."""
+    lot = db.query(Lot).join(Building, Lot.building_id == Building.id).join(
+        Site, Building.site_id == Site.id
+    ).filter(
+        Lot.id == lot_id,
+        Lot.status != LotStatus.DELETED,
+        Site.organization_id == current_user.organization_id
+    ).first()
+    if not lot:
+        raise HTTPException(status_code=404, detail="Lot not found")
 
-    return response
+    summary = LotFinancialService(db).refresh(lot.id)
+    db.commit()
+    return summary
 
 
 @router.post("/{lot_id}/split", response_model=LotSplitResponse)
@@ -1291,7 +1046,7 @@ async def split_lot(
     split_ratio = Decimal(str(split_data.quantity)) / Decimal(str(lot.current_quantity))
 
     # Generate new lot code
-    new_lot_code = generate_lot_code(db, lot.type.value if lot.type else "broiler")
+    new_lot_code = generate_lot_code(db, current_user.organization_id, lot.type.value if lot.type else "broiler")
 
     # Calculate proportional initial quantity for cost tracking
     # This is important: we use the ratio of current birds being moved
@@ -1488,6 +1243,9 @@ async def split_lot(
     split_note = f"\n[{date.today()}] Split: {split_data.quantity} birds transferred to lot {new_lot_code}"
     lot.notes = (lot.notes or '') + split_note
 
+    from app.services.feed_planner import FeedPlanner
+    FeedPlanner(db).invalidate(current_user.organization_id)
+
     db.commit()
     db.refresh(new_lot)
     db.refresh(lot)
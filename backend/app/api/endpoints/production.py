@@ -17,10 +17,12 @@ from app.schemas.production import (
 )
 from app.services.laying_curve import (
     get_laying_phase, get_phase_label, get_expected_laying_rate,
-    analyze_laying_performance, get_full_laying_curve,
+    get_expected_laying_rates, analyze_laying_performance, get_full_laying_curve,
     estimate_peak_date, get_feed_recommendation_by_phase,
     get_age_weeks, LayingPhase
 )
+from app.services.egg_inventory import EggInventoryService
+from app.services.lot_financials import LotFinancialService
 
 router = APIRouter()
 
@@ -55,15 +57,11 @@ async def get_egg_productions(
     return [EggProductionResponse.model_validate(p) for p in productions]
 
 
-@router.post("/eggs", response_model=EggProductionResponse)
-async def create_egg_production(
-    data: EggProductionCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    """Record egg production."""
-    lot = db.query(Lot).filter(Lot.id == data.lot_id, Lot.status != LotStatus.DELETED).first()
-    if not lot:
+def record_egg_production(db: Session, data: EggProductionCreate, recorded_by,
+                          refresh_financials: bool = True) -> EggProduction:
+    """Add an egg production with its stock movement (not committed); data may carry the id."""
+    lot = db.get(Lot, data.lot_id)
+    if not lot or lot.status == LotStatus.DELETED:
         raise HTTPException(status_code=404, detail="Lot not found")
 
     # Check for duplicate date
@@ -74,7 +72,7 @@ async def create_egg_production(
     if existing:
         raise HTTPException(status_code=400, detail="Production already recorded for this date")
 
-    production = EggProduction(**data.model_dump(), recorded_by=current_user.id)
+    production = EggProduction(**data.model_dump(), recorded_by=recorded_by)
     production.calculate_totals()
 
     # Calculate laying rate
@@ -82,6 +80,21 @@ async def create_egg_production(
         production.laying_rate = (production.total_eggs / data.hen_count) * 100
 
     db.add(production)
+    db.flush()
+    EggInventoryService(db).sync_production(production, recorded_by=recorded_by)
+    if refresh_financials:
+        LotFinancialService(db).refresh(lot.id)
+    return production
+
+
+@router.post("/eggs", response_model=EggProductionResponse)
+async def create_egg_production(
+    data: EggProductionCreate,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Record egg production."""
+    production = record_egg_production(db, data, current_user.id)
     db.commit()
     db.refresh(production)
 
@@ -118,18 +131,13 @@ async def get_weight_records(
     return [WeightRecordResponse.model_validate(r) for r in records]
 
 
-@router.post("/weights", response_model=WeightRecordResponse)
-async def create_weight_record(
-    data: WeightRecordCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    """Record weight measurement."""
-    lot = db.query(Lot).filter(Lot.id == data.lot_id, Lot.status != LotStatus.DELETED).first()
-    if not lot:
+def record_weight(db: Session, data: WeightRecordCreate, recorded_by) -> WeightRecord:
+    """Add a weight record (not committed); data may carry the id."""
+    lot = db.get(Lot, data.lot_id)
+    if not lot or lot.status == LotStatus.DELETED:
         raise HTTPException(status_code=404, detail="Lot not found")
 
-    record = WeightRecord(**data.model_dump(), recorded_by=current_user.id)
+    record = WeightRecord(**data.model_dump(), recorded_by=recorded_by)
 
     # Calculate age in days
     if lot.placement_date:
@@ -140,6 +148,17 @@ async def create_weight_record(
         record.uniformity_cv = (Decimal(str(data.std_deviation)) / Decimal(str(data.average_weight_g))) * 100
 
     db.add(record)
+    return record
+
+
+@router.post("/weights", response_model=WeightRecordResponse)
+async def create_weight_record(
+    data: WeightRecordCreate,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Record weight measurement."""
+    record = record_weight(db, data, current_user.id)
     db.commit()
     db.refresh(record)
 
@@ -166,23 +185,32 @@ async def get_mortalities(
     return [MortalityResponse.model_validate(r) for r in records]
 
 
-@router.post("/mortalities", response_model=MortalityResponse)
-async def create_mortality(
-    data: MortalityCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    """Record mortality."""
-    lot = db.query(Lot).filter(Lot.id == data.lot_id, Lot.status != LotStatus.DELETED).first()
-    if not lot:
+def record_mortality(db: Session, data: MortalityCreate, recorded_by,
+                     refresh_financials: bool = True) -> Mortality:
+    """Add a mortality and take it off the lot (not committed); data may carry the id."""
+    lot = db.get(Lot, data.lot_id)
+    if not lot or lot.status == LotStatus.DELETED:
         raise HTTPException(status_code=404, detail="Lot not found")
 
-    record = Mortality(**data.model_dump(), recorded_by=current_user.id)
+    record = Mortality(**data.model_dump(), recorded_by=recorded_by)
     db.add(record)
 
     # Update lot current quantity
     lot.current_quantity = (lot.current_quantity or lot.initial_quantity) - data.quantity
 
+    if refresh_financials:
+        LotFinancialService(db).refresh(lot.id)
+    return record
+
+
+@router.post("/mortalities", response_model=MortalityResponse)
+async def create_mortality(
+    data: MortalityCreate,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Record mortality."""
+    record = record_mortality(db, data, current_user.id)
     db.commit()
     db.refresh(record)
 
@@ -192,9 +220,19 @@ async def create_mortality(
 # Laying Curve Analysis
 @router.get("/laying-curve/standard")
 async def get_standard_laying_curve(
-    current_user: User = Depends(get_current_user)
+    breed: Optional[str] = Query(None),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
 ):
-    """Get the standard laying curve for charting (week 16-72)."""
+    """Get the standard laying curve for charting (week 16-72), for a breed if given."""
+    if breed:
+        from app.services.standards.registry import standards_registry
+        curve = standards_registry.resolve(breed, "layer", db=db, organization_id=current_user.organization_id)
+        return {
+            "curve": get_full_laying_curve(curve),
+            "breed": curve.name,
+            "description": f"Courbe de ponte standard {curve.name}"
+        }
     return {
         "curve": get_full_laying_curve(),
         "description": "Courbe de ponte standard basee sur les souches commerciales (ISA Brown, Lohmann, etc.)"
@@ -218,9 +256,13 @@ async def analyze_lot_laying_performance(
     age_days = lot.age_days or 0
     age_weeks = get_age_weeks(age_days)
 
+    # Breed standard of the lot (organization curve if any)
+    from app.services.standards.registry import standards_registry
+    curve = standards_registry.resolve_lot(lot, db=db, organization_id=current_user.organization_id)
+
     # Get current phase
     phase = get_laying_phase(age_weeks)
-    expected = get_expected_laying_rate(age_weeks)
+    expected = get_expected_laying_rate(age_weeks, curve)
 
     # Get recent laying data (last 7 days)
     week_ago = date.today() - timedelta(days=7)
@@ -240,29 +282,30 @@ async def analyze_lot_laying_performance(
         EggProduction.lot_id == lot_id
     ).order_by(EggProduction.date).all()
 
-    laying_history = []
-    for e in all_eggs:
-        if lot.placement_date:
-            egg_age_days = (e.date - lot.placement_date).days + lot.age_at_placement
-            egg_age_weeks = egg_age_days // 7
-        else:
-            egg_age_weeks = 0
-
-        # Get expected for this week
-        exp = get_expected_laying_rate(egg_age_weeks)
+    # Expected rates for the whole history in one lookup
+    if lot.placement_date:
+        egg_ages_days = [(e.date - lot.placement_date).days + lot.age_at_placement for e in all_eggs]
+    else:
+        egg_ages_days = [0] * len(all_eggs)
+    history_expected = get_expected_laying_rates(egg_ages_days, curve)
+    history_min = history_expected["min_expected"].round(1).tolist()
+    history_max = history_expected["max_expected"].round(1).tolist()
+    history_optimal = history_expected["optimal_expected"].round(1).tolist()
 
+    laying_history = []
+    for i, e in enumerate(all_eggs):
         laying_history.append({
             "date": e.date.isoformat(),
-            "age_weeks": egg_age_weeks,
+            "age_weeks": max(egg_ages_days[i], 0) // 7,
             "actual_rate": float(round(Decimal(str(e.laying_rate or 0)), 2)),
-            "expected_min": exp["min_expected"],
-            "expected_max": exp["max_expected"],
-            "expected_optimal": exp["optimal_expected"],
+            "expected_min": history_min[i],
+            "expected_max": history_max[i],
+            "expected_optimal": history_optimal[i],
             "total_eggs": e.total_eggs
         })
 
     # Perform analysis
-    analysis = analyze_laying_performance(age_days, avg_laying_rate)
+    analysis = analyze_laying_performance(age_days, avg_laying_rate, curve)
 
     # Get feed recommendation and format as string
     feed_rec_data = get_feed_recommendation_by_phase(phase)
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.responses import FileResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import func, or_, case
+from sqlalchemy import func, or_
 from typing import List, Optional
 from uuid import UUID
 from datetime import date, datetime
@@ -13,14 +13,19 @@ from pydantic import BaseModel
 from app.api.deps import get_db, get_current_user
 from app.models.user import User
 from app.models.finance import Sale, Client, SaleType, PaymentStatus
-from app.models.production import EggProduction
 from app.models.lot import Lot, LotStatus
 from app.models.building import Building
 from app.schemas.finance import SaleCreate, SaleUpdate, SaleResponse, ClientCreate, ClientUpdate, ClientResponse
 from app.core.permissions import Permission, has_permission
+from app.core.serialization import FastJSONResponse, RowSerializer
+from app.services.lot_financials import LotFinancialService
 
 router = APIRouter()
 
+# Serializers of the list endpoints (row tuples -> response JSON)
+sale_rows = RowSerializer(SaleResponse)
+client_rows = RowSerializer(ClientResponse)
+
 
 # Request model for sending invoice email
 class SendInvoiceEmailRequest(BaseModel):
@@ -33,9 +38,10 @@ async def get_eggs_stock(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get available eggs stock per site (produced - sold) - optimized with aggregated queries."""
+    """Get available eggs stock per site, read from the egg inventory ledger."""
     from app.models.lot import LotType, LotStatus
     from app.models.site import Site
+    from app.services.egg_inventory import EggInventoryService, DEFAULT_GRADE, EGGS_PER_TRAY
 
     # Get all sites for the organization
     sites = db.query(Site).filter(
@@ -61,36 +67,14 @@ async def get_eggs_stock(
 
     lots_count_map = {row.site_id: row.lots_count for row in lots_count_query}
 
-    # Get egg production totals grouped by site (via lot -> building -> site)
-    prod_query = db.query(
-        Building.site_id,
-        func.coalesce(func.sum(EggProduction.sellable_eggs), 0).label('total_produced')
-    ).join(Lot, Lot.id == EggProduction.lot_id).join(
-        Building, Building.id == Lot.building_id
-    ).filter(
-        Building.site_id.in_(site_ids),
-        Building.is_active == True,
-        Lot.type == LotType.LAYER,
-        Lot.status == LotStatus.ACTIVE
-    ).group_by(Building.site_id).all()
+    inventory = EggInventoryService(db)
+    stocks = inventory.balances(current_user.organization_id, site_ids)
 
-    production_by_site = {row.site_id: int(row.total_produced) for row in prod_query}
-
-    # Get egg sales totals grouped by site - use SQL CASE for carton conversion
-    sales_by_site = db.query(
-        Sale.site_id,
-        func.sum(
-            case(
-                (Sale.sale_type == SaleType.EGGS_CARTON, Sale.quantity * 12),  # 1 carton = 12 trays
-                else_=Sale.quantity
-            )
-        ).label('total_trays')
-    ).filter(
-        Sale.site_id.in_(site_ids),
-        Sale.sale_type.in_([SaleType.EGGS_TRAY, SaleType.EGGS_CARTON])
-    ).group_by(Sale.site_id).all()
-
-    sales_map = {row.site_id: int(row.total_trays or 0) for row in sales_by_site}
+    # Sites without a stock yet show the balance their first write will open it with
+    missing = [site.id for site in sites if lots_count_map.get(site.id) and str(site.id) not in stocks]
+    if missing:
+        for site_id, stock in inventory.preview_stocks(current_user.organization_id, missing).items():
+            stocks[site_id] = {DEFAULT_GRADE: stock}
 
     # Build results
     result = []
@@ -99,26 +83,113 @@ async def get_eggs_stock(
         if lots_count == 0:
             continue
 
-        total_produced = production_by_site.get(site.id, 0)
-        total_sold_trays = sales_map.get(site.id, 0)
-        total_sold_eggs = total_sold_trays * 30
-
-        available_eggs = total_produced - total_sold_eggs
-        available_trays = available_eggs // 30
+        grades = stocks.get(str(site.id), {}).values()
+        available_eggs = sum(stock.quantity for stock in grades)
 
         result.append({
             "site_id": str(site.id),
             "site_name": site.name or f"Site {site.code or str(site.id)[:8]}",
-            "total_produced": total_produced,
-            "total_sold_eggs": total_sold_eggs,
+            "total_produced": sum(stock.total_produced for stock in grades),
+            "total_sold_eggs": sum(stock.total_sold for stock in grades),
+            "total_lost_eggs": sum(stock.total_lost for stock in grades),
             "available_eggs": available_eggs,
-            "available_trays": available_trays,
+            "available_trays": available_eggs // EGGS_PER_TRAY,
             "lots_count": lots_count,
         })
 
     return result
 
 
+class EggStockAdjustment(BaseModel):
+    site_id: UUID
+    movement_type: str = "breakage"  # breakage, adjustment
+    quantity: int  # Oeufs; negatif pour une sortie
+    grade: str = "standard"
+    date: Optional[date] = None
+    notes: Optional[str] = None
+
+
+@router.post("/eggs-stock/adjustments")
+async def adjust_eggs_stock(
+    data: EggStockAdjustment,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Record egg breakage or an inventory correction."""
+    from app.models.egg_inventory import EggMovementType
+    from app.models.site import Site
+    from app.services.egg_inventory import EggInventoryService, InsufficientEggStock
+
+    site = db.query(Site).filter(
+        Site.id == data.site_id,
+        Site.organization_id == current_user.organization_id
+    ).first()
+    if not site:
+        raise HTTPException(status_code=404, detail="Site non trouve")
+
+    if data.movement_type not in ("breakage", "adjustment"):
+        raise HTTPException(status_code=400, detail="Type de mouvement invalide")
+    movement_type = EggMovementType(data.movement_type)
+    # Breakage always takes eggs out of the stock
+    quantity = -abs(data.quantity) if movement_type == EggMovementType.BREAKAGE else data.quantity
+    if quantity == 0:
+        raise HTTPException(status_code=400, detail="La quantite doit etre non nulle")
+
+    try:
+        movement = EggInventoryService(db).adjust(
+            site.id, current_user.organization_id, quantity, movement_type, grade=data.grade,
+            notes=data.notes, recorded_by=current_user.id, day=data.date
+        )
+    except InsufficientEggStock as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+    db.commit()
+
+    return {
+        "id": str(movement.id),
+        "movement_type": movement.movement_type.value,
+        "quantity": movement.quantity,
+        "balance_after": movement.balance_after,
+        "date": movement.date.isoformat() if movement.date else None,
+    }
+
+
+@router.get("/eggs-stock/{site_id}/movements")
+async def get_eggs_stock_movements(
+    site_id: UUID,
+    grade: Optional[str] = None,
+    limit: int = 50,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Latest movements of a site's egg stock."""
+    from app.models.site import Site
+    from app.services.egg_inventory import EggInventoryService
+
+    site = db.query(Site).filter(
+        Site.id == site_id,
+        Site.organization_id == current_user.organization_id
+    ).first()
+    if not site:
+        raise HTTPException(status_code=404, detail="Site non trouve")
+
+    movements = EggInventoryService(db).movements(site.id, grade=grade, limit=min(limit, 500))
+    return [
+        {
+            "id": str(m.id),
+            "movement_type": m.movement_type.value,
+            "quantity": m.quantity,
+            "balance_after": m.balance_after,
+            "date": m.date.isoformat() if m.date else None,
+            "egg_production_id": str(m.egg_production_id) if m.egg_production_id else None,
+            "sale_id": str(m.sale_id) if m.sale_id else None,
+            "notes": m.notes,
+            "created_at": m.created_at.isoformat() if m.created_at else None,
+        }
+        for m in movements
+    ]
+
+
 @router.get("", response_model=List[SaleResponse])
 async def get_sales(
     lot_id: Optional[UUID] = None,
@@ -167,27 +238,12 @@ async def get_sales(
         payment_status_enum = PaymentStatus(payment_status)
         query = query.filter(Sale.payment_status == payment_status_enum)
 
-    sales = query.order_by(Sale.created_at.desc()).limit(500).all()
+    # Row tuples with the lot code joined, serialized without ORM objects or re-validation
+    rows = query.with_entities(*sale_rows.columns(Sale), Lot.code.label("lot_code")).outerjoin(
+        Lot, (Lot.id == Sale.lot_id) & (Lot.status != LotStatus.DELETED)
+    ).order_by(Sale.created_at.desc()).limit(500).all()
 
-    # Get all lot codes in a single query to avoid N+1
-    lot_ids = [s.lot_id for s in sales if s.lot_id]
-    lot_codes_map = {}
-    if lot_ids:
-        lots_data = db.query(Lot.id, Lot.code).filter(
-            Lot.id.in_(lot_ids),
-            Lot.status != LotStatus.DELETED
-        ).all()
-        lot_codes_map = {lot_id: code for lot_id, code in lots_data}
-
-    result = []
-    for s in sales:
-        sale_data = SaleResponse.model_validate(s)
-        # Add lot code from pre-fetched map
-        if s.lot_id and s.lot_id in lot_codes_map:
-            sale_data.lot_code = lot_codes_map[s.lot_id]
-        result.append(sale_data)
-
-    return result
+    return FastJSONResponse(sale_rows.rows(rows))
 
 
 @router.post("", response_model=SaleResponse)
@@ -201,11 +257,11 @@ async def create_sale(
     if not has_permission(current_user, Permission.CREATE_SALE):
         raise HTTPException(status_code=403, detail="Acces refuse. Seuls les proprietaires, gestionnaires et comptables peuvent enregistrer des ventes.")
 
-    from app.services.invoice import generate_invoice_pdf, generate_invoice_number
+    from app.services.invoice import generate_invoice_pdf, generate_invoice_number, generate_delivery_note_number
     from app.models.organization import Organization
     import uuid as uuid_module
 
-    # Generate sale ID upfront for invoice number
+    # Generate sale ID upfront (used for the invoice PDF)
     sale_id = uuid_module.uuid4()
 
     # Prepare sale data (exclude deduct_from_stock which is not a model field)
@@ -239,61 +295,11 @@ async def create_sale(
         # Standard single-price sale
         sale.total_amount = data.quantity * data.unit_price
 
-    # Generate invoice number
+    # Generate invoice and delivery note numbers
     sale_date = datetime.combine(data.date, datetime.min.time())
-    invoice_number = generate_invoice_number(str(sale_id), sale_date)
+    invoice_number = generate_invoice_number(db, current_user.organization_id, sale_date)
     sale.invoice_number = invoice_number
-
-    # Stock deduction for egg sales (1 carton = 12 plateaux, 1 plateau = 30 oeufs)
-    if data.deduct_from_stock and data.site_id and data.sale_type in ['eggs_tray', 'eggs_carton']:
-        from app.models.lot import LotType
-
-        # Get all layer lots in this site
-        buildings = db.query(Building).filter(Building.site_id == data.site_id, Building.is_active == True).all()
-        building_ids = [b.id for b in buildings]
-
-        if building_ids:
-            lots = db.query(Lot).filter(
-                Lot.building_id.in_(building_ids),
-                Lot.type == LotType.LAYER,
-                Lot.status == LotStatus.ACTIVE
-            ).all()
-            lot_ids = [lot.id for lot in lots]
-
-            if lot_ids:
-                # Total eggs produced
-                total_produced = db.query(func.sum(EggProduction.sellable_eggs)).filter(
-                    EggProduction.lot_id.in_(lot_ids)
-                ).scalar() or 0
-
-                # Calculate total sold: consider cartons vs trays
-                # Query previous sales to calculate properly
-                previous_sales = db.query(Sale).filter(
-                    Sale.site_id == data.site_id,
-                    Sale.sale_type.in_([SaleType.EGGS_TRAY, SaleType.EGGS_CARTON])
-                ).all()
-
-                total_sold_trays = Decimal(0)
-                for s in previous_sales:
-                    if s.sale_type == SaleType.EGGS_CARTON:
-                        total_sold_trays += Decimal(str(s.quantity)) * 12  # 1 carton = 12 plateaux
-                    else:
-                        total_sold_trays += Decimal(str(s.quantity))
-
-                available_trays = int(Decimal(str(total_produced)) / 30) - int(total_sold_trays)
-
-                # Calculate requested trays
-                if data.sale_type == 'eggs_carton':
-                    requested_trays = int(data.quantity * 12)  # 1 carton = 12 plateaux
-                else:
-                    requested_trays = int(data.quantity)
-
-                if requested_trays > available_trays:
-                    available_cartons = available_trays // 12
-                    raise HTTPException(
-                        status_code=400,
-                        detail=f"Stock insuffisant. Disponible: {available_trays} plateaux ({available_cartons} cartons)"
-                    )
+    sale.delivery_note_number = generate_delivery_note_number(db, current_user.organization_id, sale_date)
 
     # Stock deduction for bird sales
     if data.deduct_from_stock and data.lot_id and data.sale_type in ['live_birds', 'dressed_birds', 'culled_hens']:
@@ -312,6 +318,19 @@ async def create_sale(
             lot.current_quantity = available_birds - requested_birds
 
     db.add(sale)
+    db.flush()
+
+    # Egg sales leave the site's egg stock (1 carton = 12 plateaux, 1 plateau = 30 oeufs)
+    if data.site_id and data.sale_type in ['eggs_tray', 'eggs_carton']:
+        from app.services.egg_inventory import EggInventoryService, InsufficientEggStock
+        try:
+            EggInventoryService(db).sync_sale(sale, current_user.organization_id,
+                                              check_balance=data.deduct_from_stock, recorded_by=current_user.id)
+        except InsufficientEggStock as e:
+            db.rollback()
+            raise HTTPException(status_code=400, detail=str(e))
+
+    LotFinancialService(db).on_sale(sale, current_user.organization_id)
     db.commit()
     db.refresh(sale)
 
@@ -499,6 +518,7 @@ async def update_sale(
     if not sale:
         raise HTTPException(status_code=404, detail="Sale not found")
 
+    previous_lot_id = sale.lot_id
     update_data = data.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(sale, field, value)
@@ -507,6 +527,12 @@ async def update_sale(
     if 'quantity' in update_data or 'unit_price' in update_data:
         sale.total_amount = Decimal(str(sale.quantity)) * Decimal(str(sale.unit_price))
 
+    if update_data.keys() & {'quantity', 'sale_type', 'site_id', 'date'}:
+        from app.services.egg_inventory import EggInventoryService
+        db.flush()
+        EggInventoryService(db).sync_sale(sale, current_user.organization_id, recorded_by=current_user.id)
+
+    LotFinancialService(db).on_sale(sale, current_user.organization_id, previous_lot_id=previous_lot_id)
     db.commit()
     db.refresh(sale)
 
@@ -544,6 +570,8 @@ async def record_payment(
     elif sale.amount_paid > 0:
         sale.payment_status = "partial"
 
+    # Payment status is listed in the lot's financial summary
+    LotFinancialService(db).refresh_many([sale.lot_id])
     db.commit()
     db.refresh(sale)
 
@@ -636,45 +664,32 @@ async def get_clients(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get all clients with their purchase statistics using optimized query."""
-    clients = db.query(Client).filter(
+    """Get all clients with their purchase statistics, in one query."""
+    totals = db.query(
+        Sale.client_id,
+        func.coalesce(func.sum(Sale.total_amount), 0).label('total_purchases'),
+        func.coalesce(func.sum(Sale.amount_paid), 0).label('total_paid')
+    ).join(Client, Client.id == Sale.client_id).filter(
+        Client.organization_id == current_user.organization_id
+    ).group_by(Sale.client_id).subquery()
+
+    rows = db.query(*client_rows.columns(Client), totals.c.total_purchases, totals.c.total_paid).outerjoin(
+        totals, totals.c.client_id == Client.id
+    ).filter(
         Client.organization_id == current_user.organization_id,
         Client.is_active == True
     ).order_by(Client.name).all()
 
-    # Get all client stats in a single aggregated query
-    client_ids = [c.id for c in clients]
-    stats_map = {}
-    if client_ids:
-        stats_query = db.query(
-            Sale.client_id,
-            func.coalesce(func.sum(Sale.total_amount), 0).label('total_purchases'),
-            func.coalesce(func.sum(Sale.amount_paid), 0).label('total_paid')
-        ).filter(
-            Sale.client_id.in_(client_ids)
-        ).group_by(Sale.client_id).all()
-
-        stats_map = {
-            row.client_id: {
-                'total_purchases': Decimal(str(row.total_purchases)),
-                'total_paid': Decimal(str(row.total_paid))
-            }
-            for row in stats_query
-        }
-
-    # Build responses with pre-fetched stats
     results = []
-    for client in clients:
-        stats = stats_map.get(client.id, {'total_purchases': Decimal(0), 'total_paid': Decimal(0)})
-        total_purchases = stats['total_purchases']
-        outstanding_balance = total_purchases - stats['total_paid']
-
-        response = ClientResponse.model_validate(client)
-        response.total_purchases = total_purchases
-        response.outstanding_balance = outstanding_balance
-        results.append(response)
-
-    return results
+    for row in rows:
+        total_purchases = Decimal(str(row.total_purchases or 0))
+        results.append(client_rows({
+            **row._mapping,
+            "total_purchases": total_purchases,
+            "outstanding_balance": total_purchases - Decimal(str(row.total_paid or 0)),
+        }))
+
+    return FastJSONResponse(results)
 
 
 @router.post("/clients", response_model=ClientResponse)
@@ -1,10 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 from sqlalchemy import func
 from typing import List
 from uuid import UUID
 
 from app.api.deps import get_db, get_current_user
+from app.core.single_flight import single_flight
 from app.models.user import User
 from app.models.site import Site, SiteMember
 from app.models.building import Building
@@ -15,7 +16,8 @@ router = APIRouter()
 
 
 @router.get("", response_model=List[SiteResponse])
-async def get_sites(
+@single_flight()
+def get_sites(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -67,21 +69,24 @@ async def get_sites(
     # Build response using pre-fetched stats
     result = []
     for site in sites:
-        site_data = SiteResponse.model_validate(site)
         b_stats = building_stats_map.get(site.id, {'buildings_count': 0, 'total_capacity': 0})
         l_stats = lot_stats_map.get(site.id, {'active_lots': 0, 'total_birds': 0})
+        result.append(site_response(site, **b_stats, **l_stats))
 
-        site_data.buildings_count = b_stats['buildings_count']
-        site_data.active_lots_count = l_stats['active_lots']
-        site_data.total_birds = l_stats['total_birds']
+    return result
 
-        # Use site's total_capacity if defined, otherwise sum of buildings
-        if not site.total_capacity and b_stats['total_capacity'] > 0:
-            site_data.total_capacity = b_stats['total_capacity']
 
-        result.append(site_data)
+def site_response(site: Site, buildings_count: int, total_capacity: int, active_lots: int, total_birds: int) -> SiteResponse:
+    """Site of the list with the stats of its active buildings and active lots."""
+    site_data = SiteResponse.model_validate(site)
+    site_data.buildings_count = buildings_count
+    site_data.active_lots_count = active_lots
+    site_data.total_birds = total_birds
 
-    return result
+    # Use site's total_capacity if defined, otherwise sum of buildings
+    if not site.total_capacity and total_capacity > 0:
+        site_data.total_capacity = total_capacity
+    return site_data
 
 
 @router.post("", response_model=SiteResponse)
@@ -133,7 +138,7 @@ async def get_site(
         raise HTTPException(status_code=403, detail="Not authorized")
 
     # Get buildings for this site (only active ones)
-    buildings = db.query(Building).filter(
+    buildings = db.query(Building).options(selectinload(Building.sections)).filter(
         Building.site_id == site_id,
         Building.is_active == True
     ).all()
@@ -249,6 +254,7 @@ async def delete_site(
                Les lots ACTIFS bloquent toujours la suppression.
     """
     from app.models.lot import Lot, LotStatus
+    from app.services.census import DependencyCensus
 
     site = db.query(Site).filter(Site.id == site_id).first()
     if not site:
@@ -257,48 +263,38 @@ async def delete_site(
     if str(site.organization_id) != str(current_user.organization_id):
         raise HTTPException(status_code=403, detail="Not authorized")
 
-    # Check for active buildings
-    active_buildings = db.query(Building).filter(
-        Building.site_id == site_id,
-        Building.is_active == True
-    ).all()
-
-    # Check for active lots in these buildings
-    building_ids = [b.id for b in active_buildings]
-    active_lots = []
-    other_lots = []
+    # Active buildings and their lots by status, in one query
+    counts = DependencyCensus(db).count("site", site_id)
+    buildings_count = counts["batiments"]
+    other_lots_count = counts["lots_autres"]
 
-    if building_ids:
-        lots = db.query(Lot).filter(
-            Lot.building_id.in_(building_ids),
-            Lot.status != LotStatus.DELETED
+    # Block if there are active lots
+    if counts["lots_actifs"]:
+        active_lots = db.query(Lot.id, Lot.code, Lot.current_quantity, Building.name).join(
+            Building, Lot.building_id == Building.id
+        ).filter(
+            Building.site_id == site_id,
+            Building.is_active == True,
+            Lot.status == LotStatus.ACTIVE
         ).all()
-        active_lots = [l for l in lots if l.status == LotStatus.ACTIVE]
-        other_lots = [l for l in lots if l.status != LotStatus.ACTIVE]
 
-    # Block if there are active lots
-    if active_lots:
         # Group lots by building for clearer display
         lots_by_building = {}
-        for lot in active_lots:
-            building = next((b for b in active_buildings if b.id == lot.building_id), None)
-            building_name = building.name if building else "Inconnu"
-            if building_name not in lots_by_building:
-                lots_by_building[building_name] = []
-            lots_by_building[building_name].append({
-                "id": str(lot.id),
-                "code": lot.code,
-                "current_quantity": lot.current_quantity
+        for lot_id, code, current_quantity, building_name in active_lots:
+            lots_by_building.setdefault(building_name or "Inconnu", []).append({
+                "id": str(lot_id),
+                "code": code,
+                "current_quantity": current_quantity
             })
 
         raise HTTPException(
             status_code=400,
             detail={
                 "error": "site_has_active_lots",
-                "message": f"Ce site contient {len(active_lots)} lot(s) actif(s) dans {len(active_buildings)} batiment(s). Vous devez d'abord les terminer ou les deplacer.",
+                "message": f"Ce site contient {len(active_lots)} lot(s) actif(s) dans {buildings_count} batiment(s). Vous devez d'abord les terminer ou les deplacer.",
                 "active_lots_by_building": lots_by_building,
                 "total_active_lots": len(active_lots),
-                "total_active_buildings": len(active_buildings),
+                "total_active_buildings": buildings_count,
                 "actions_requises": [
                     "1. Terminer tous les lots actifs (PATCH /api/v1/lots/{id} avec status='completed')",
                     "2. Ou deplacer les lots vers un autre site/batiment",
@@ -309,17 +305,21 @@ async def delete_site(
         )
 
     # Warn if there are buildings or non-active lots
-    if (active_buildings or other_lots) and not force:
+    if (buildings_count or other_lots_count) and not force:
+        active_buildings = db.query(Building.id, Building.name).filter(
+            Building.site_id == site_id,
+            Building.is_active == True
+        ).all()
         raise HTTPException(
             status_code=400,
             detail={
                 "error": "site_has_data",
-                "message": f"Ce site contient {len(active_buildings)} batiment(s) et {len(other_lots)} lot(s) non-actif(s). Tout sera masque si vous supprimez le site.",
+                "message": f"Ce site contient {buildings_count} batiment(s) et {other_lots_count} lot(s) non-actif(s). Tout sera masque si vous supprimez le site.",
                 "buildings": [
-                    {"id": str(b.id), "name": b.name}
-                    for b in active_buildings
+                    {"id": str(building_id), "name": name}
+                    for building_id, name in active_buildings
                 ],
-                "lots_count": len(other_lots),
+                "lots_count": other_lots_count,
                 "recommendation": "Verifiez que ces donnees n'ont plus besoin d'etre consultees.",
                 "alternatives": [
                     {
@@ -346,14 +346,16 @@ async def delete_site(
     site.is_active = False
 
     # Also soft delete all active buildings in this site
-    for building in active_buildings:
-        building.is_active = False
+    db.query(Building).filter(
+        Building.site_id == site_id,
+        Building.is_active == True
+    ).update({Building.is_active: False}, synchronize_session=False)
 
     db.commit()
 
     message = "Site supprime avec succes"
-    if active_buildings:
-        message += f" ({len(active_buildings)} batiment(s) et {len(other_lots)} lot(s) associes seront masques)"
+    if buildings_count:
+        message += f" ({buildings_count} batiment(s) et {other_lots_count} lot(s) associes seront masques)"
 
     return {"message": message, "deleted_site": site.name}
 
@@ -0,0 +1,175 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import List, Literal, Optional
+from uuid import UUID
+
+from app.api.deps import get_db, get_current_user
+from app.models.user import User
+from app.models.breed_standard import BreedStandard
+from app.schemas.standard import (
+    BreedStandardCreate, BreedStandardUpdate, BreedStandardResponse,
+    StandardSummary, StandardCurveResponse
+)
+
+router = APIRouter()
+
+
+def _require_editor(current_user: User) -> None:
+    if not current_user.organization_id:
+        raise HTTPException(status_code=400, detail="User has no organization")
+    if current_user.role not in ["owner", "manager"]:
+        raise HTTPException(status_code=403, detail="Acces refuse. Seuls les proprietaires et gestionnaires peuvent modifier les standards.")
+
+
+def _get_custom_standard(db: Session, standard_id: UUID, current_user: User) -> BreedStandard:
+    standard = db.query(BreedStandard).filter(
+        BreedStandard.id == standard_id,
+        BreedStandard.organization_id == current_user.organization_id
+    ).first()
+    if not standard:
+        raise HTTPException(status_code=404, detail="Standard non trouve.")
+    return standard
+
+
+@router.get("", response_model=List[StandardSummary])
+async def get_standards(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """List built-in breed standards and the organization's custom ones."""
+    from app.services.standards.registry import standards_registry
+
+    return [
+        StandardSummary(
+            key=curve.key,
+            name=curve.name,
+            lot_type=curve.lot_type,
+            metrics=curve.metrics,
+            is_custom=curve.is_custom
+        )
+        for curve in standards_registry.catalog(db, current_user.organization_id)
+    ]
+
+
+@router.get("/curve", response_model=StandardCurveResponse)
+async def get_standard_curve(
+    breed: Optional[str] = Query(None),
+    lot_type: Optional[Literal["broiler", "layer"]] = Query(None),
+    unit: Literal["day", "week"] = Query("week"),
+    max_age: int = Query(72, ge=0, le=104 * 7),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Standard curves of a breed (or of a lot type) for charting."""
+    import numpy as np
+    from app.services.standards.registry import standards_registry
+
+    curve = standards_registry.resolve(breed, lot_type, db=db, organization_id=current_user.organization_id)
+    ages = np.arange(max_age + 1)
+    age_days = ages * 7 if unit == "week" else ages
+    return StandardCurveResponse(
+        key=curve.key,
+        name=curve.name,
+        lot_type=curve.lot_type,
+        is_custom=curve.is_custom,
+        unit=unit,
+        ages=ages.tolist(),
+        series={metric: curve.values(metric, age_days).round(1).tolist() for metric in curve.metrics}
+    )
+
+
+@router.get("/custom", response_model=List[BreedStandardResponse])
+async def get_custom_standards(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get the organization's custom breed standards."""
+    standards = db.query(BreedStandard).filter(
+        BreedStandard.organization_id == current_user.organization_id
+    ).order_by(BreedStandard.breed).all()
+    return [BreedStandardResponse.model_validate(s) for s in standards]
+
+
+@router.post("/custom", response_model=BreedStandardResponse)
+async def create_custom_standard(
+    standard_data: BreedStandardCreate,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Create a custom breed standard. It overrides the built-in one of the same breed."""
+    from app.services.standards.curves import normalize_breed
+    from app.services.standards.registry import standards_registry
+
+    _require_editor(current_user)
+    breed_key = normalize_breed(standard_data.breed)
+    if not breed_key:
+        raise HTTPException(status_code=400, detail="Nom de souche invalide.")
+
+    existing = db.query(BreedStandard).filter(
+        BreedStandard.organization_id == current_user.organization_id,
+        BreedStandard.breed_key == breed_key
+    ).first()
+    if existing:
+        raise HTTPException(status_code=409, detail="Un standard existe deja pour cette souche.")
+
+    standard = BreedStandard(
+        organization_id=current_user.organization_id,
+        breed=standard_data.breed,
+        breed_key=breed_key,
+        lot_type=standard_data.lot_type,
+        curves={metric: spec.model_dump() for metric, spec in standard_data.curves.items()},
+        notes=standard_data.notes,
+        created_by=current_user.id
+    )
+    db.add(standard)
+    db.commit()
+    db.refresh(standard)
+    standards_registry.invalidate(current_user.organization_id)
+
+    return BreedStandardResponse.model_validate(standard)
+
+
+@router.put("/custom/{standard_id}", response_model=BreedStandardResponse)
+async def update_custom_standard(
+    standard_id: UUID,
+    standard_data: BreedStandardUpdate,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Update a custom breed standard."""
+    from app.services.standards.registry import standards_registry
+
+    _require_editor(current_user)
+    standard = _get_custom_standard(db, standard_id, current_user)
+
+    update_data = standard_data.model_dump(exclude_unset=True)
+    if "curves" in update_data and update_data["curves"] is not None:
+        update_data["curves"] = {
+            metric: spec.model_dump() for metric, spec in standard_data.curves.items()
+        }
+    for field, value in update_data.items():
+        setattr(standard, field, value)
+
+    db.commit()
+    db.refresh(standard)
+    standards_registry.invalidate(current_user.organization_id)
+
+    return BreedStandardResponse.model_validate(standard)
+
+
+@router.delete("/custom/{standard_id}")
+async def delete_custom_standard(
+    standard_id: UUID,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Delete a custom breed standard (the built-in one applies again)."""
+    from app.services.standards.registry import standards_registry
+
+    _require_editor(current_user)
+    standard = _get_custom_standard(db, standard_id, current_user)
+    db.delete(standard)
+    db.commit()
+    standards_registry.invalidate(current_user.organization_id)
+
+    return {"message": "Standard supprime"}
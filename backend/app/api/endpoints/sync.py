@@ -0,0 +1,117 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_db, get_current_user
+from app.api.endpoints.feed import record_feed_consumption, record_water_consumption
+from app.api.endpoints.production import record_egg_production, record_weight, record_mortality
+from app.core.config import settings
+from app.core.serialization import FastJSONResponse
+from app.models.lot import Lot
+from app.models.user import User
+from app.schemas.sync import SyncPage, SyncRejection, SyncUpload, SyncUploadResult
+from app.services.lot_financials import LotFinancialService
+from app.services.sync import MODELS, SyncCursorError, SyncService, organization_filter
+
+router = APIRouter()
+
+# Entries a client can record offline: recording function and its options
+# (lot financials are refreshed once per lot after the whole upload)
+UPLOADS = (
+    ("egg_productions", record_egg_production, {"refresh_financials": False}),
+    ("weight_records", record_weight, {}),
+    ("mortalities", record_mortality, {"refresh_financials": False}),
+    ("feed_consumptions", record_feed_consumption, {}),
+    ("water_consumptions", record_water_consumption, {}),
+)
+
+
+@router.get("", response_model=SyncPage)
+async def get_changes(
+    since: Optional[int] = Query(None, ge=0, description="seq of the last sync; omitted for a full sync"),
+    cursor: Optional[str] = Query(None, description="cursor of the previous page when it has_more"),
+    limit: Optional[int] = Query(None, ge=1, le=5000),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Rows of the organization changed since `since`, in pages (app.services.sync).
+
+    Each entity of `changes` lists its column names once, then its rows as
+    arrays, and the ids of its deleted rows. Pages go on while `has_more`
+    with the returned `cursor`; the `seq` of the last one is the next `since`.
+    On `reset`, the client drops its copy and syncs again without `since`.
+    """
+    if not current_user.organization_id:
+        raise HTTPException(status_code=400, detail="User has no organization")
+    try:
+        page = SyncService(db).changes(current_user.organization_id, since=since, cursor=cursor,
+                                       limit=limit or settings.SYNC_PAGE_SIZE)
+    except SyncCursorError:
+        raise HTTPException(status_code=400, detail="Curseur de synchronisation invalide")
+    return FastJSONResponse(page)
+
+
+@router.post("", response_model=SyncUploadResult)
+async def upload_changes(
+    data: SyncUpload,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Record the daily entries of an offline client, with the ids it generated.
+
+    Idempotent: an entry already recorded (same id) is reported as a
+    duplicate, so an upload interrupted before its answer is sent again as
+    is. Each entry is applied on its own savepoint: a rejected one (unknown
+    lot, production already recorded for its date...) does not hold back
+    the others. The client then pulls with GET /sync, which returns them.
+    """
+    if not current_user.organization_id:
+        raise HTTPException(status_code=400, detail="User has no organization")
+    count = sum(len(getattr(data, entity)) for entity, _, _ in UPLOADS)
+    if count > settings.SYNC_UPLOAD_MAX_ITEMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Trop d'entrées ({count}) : {settings.SYNC_UPLOAD_MAX_ITEMS} au plus par envoi"
+        )
+
+    # The organization's lots of the upload, loaded at once: the recording functions find them in the session
+    lot_ids = {entry.lot_id for entity, _, _ in UPLOADS for entry in getattr(data, entity)}
+    own_lots = {lot.id for lot in db.scalars(
+        select(Lot).where(Lot.id.in_(lot_ids), organization_filter(Lot, current_user.organization_id))
+    )} if lot_ids else set()
+
+    result = SyncUploadResult()
+    refreshed_lots = set()
+    for entity, record, options in UPLOADS:
+        entries = getattr(data, entity)
+        if not entries:
+            continue
+        model = MODELS[entity]
+        recorded = set(db.scalars(select(model.id).where(model.id.in_([entry.id for entry in entries]))))
+        for entry in entries:
+            if entry.id in recorded:
+                result.duplicates.append(entry.id)
+                continue
+            if entry.lot_id not in own_lots:
+                result.rejected.append(SyncRejection(entity=entity, id=entry.id, detail="Lot not found"))
+                continue
+            try:
+                with db.begin_nested():
+                    record(db, entry, current_user.id, **options)
+            except HTTPException as exc:
+                result.rejected.append(SyncRejection(entity=entity, id=entry.id, detail=exc.detail))
+            except IntegrityError:
+                result.rejected.append(SyncRejection(entity=entity, id=entry.id, detail="Entrée invalide"))
+            else:
+                recorded.add(entry.id)
+                result.applied.append(entry.id)
+                if options.get("refresh_financials") is False:
+                    refreshed_lots.add(entry.lot_id)
+
+    for lot_id in refreshed_lots:
+        LotFinancialService(db).refresh(lot_id)
+    db.commit()
+    return result
@@ -7,6 +7,7 @@ from app.api.deps import get_db, get_current_user
 from app.core.security import get_password_hash
 from app.models.user import User
 from app.schemas.user import UserResponse, UserUpdate, PasswordChange
+from app.services.token_service import TokenService
 
 router = APIRouter()
 
@@ -86,6 +87,9 @@ async def update_user(
     for field, value in update_data.items():
         setattr(user, field, value)
 
+    if update_data.get("is_active") is False:
+        TokenService(db).revoke_all_for_user(user.id)
+
     db.commit()
     db.refresh(user)
 
@@ -123,6 +127,7 @@ async def delete_user(
     if current_user.role == "manager" and user.role == "manager":
         raise HTTPException(status_code=403, detail="Acces refuse. Les gestionnaires ne peuvent pas supprimer d'autres gestionnaires.")
 
+    TokenService(db).revoke_all_for_user(user.id)
     db.delete(user)
     db.commit()
 
@@ -135,7 +140,11 @@ async def change_password(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Change user password."""
+    """Change user password.
+
+    Every session of the user is revoked, as on a password reset; this one
+    goes on with the new token pair of the response.
+    """
     from app.core.security import verify_password
 
     if not verify_password(password_data.current_password, current_user.password_hash):
@@ -145,6 +154,8 @@ async def change_password(
         )
 
     current_user.password_hash = get_password_hash(password_data.new_password)
-    db.commit()
+    token_service = TokenService(db)
+    token_service.revoke_all_for_user(current_user.id)
+    tokens = token_service.issue_tokens(current_user)  # Commits the change and the revocation
 
-    return {"message": "Mot de passe modifie avec succes."}
+    return {"message": "Mot de passe modifie avec succes.", **tokens.model_dump()}
@@ -0,0 +1,233 @@
+"""
+HTTP caching for clients on slow mobile links.
+
+- Conditional GET: `conditional_get` is a dependency of the data routers
+  (app.api). It derives a weak ETag and a Last-Modified from the data version
+  of the caller's organization (app.db.data_versions), and answers
+  If-None-Match / If-Modified-Since with 304 before the endpoint and its
+  other dependencies run. HTTPCacheMiddleware adds the validators to the 200
+  responses, with "Cache-Control: private, no-cache" so browsers keep the
+  body and revalidate it on every refetch. Responses read on a replica that
+  lags behind that version go without validators (`replica_validators`).
+- Compression: the same middleware compresses bodies above
+  COMPRESSION_MIN_BYTES with brotli (when installed) or gzip, following
+  Accept-Encoding. Streamed bodies (files, event streams) are left alone.
+
+Responses also depend on the day (ages, "today" windows), the user
+(permissions) and the code: the ETag covers the date, the user and
+ETAG_SALT, and Last-Modified is at least today's midnight.
+"""
+import gzip
+import hashlib
+import time
+from contextvars import ContextVar
+from datetime import date, datetime, timezone
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Dict, List, Optional
+
+from fastapi import HTTPException, Request
+
+from app.core.config import settings
+from app.core.profiling import profile_requested
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+# Validators of the current request, set by conditional_get for the middleware
+_validators: ContextVar[Optional[Dict[bytes, bytes]]] = ContextVar("http_cache_validators", default=None)
+# Data version conditional_get read for the current request (app.core.single_flight)
+_data_version: ContextVar[Optional[int]] = ContextVar("http_cache_data_version", default=None)
+
+# Bodies that are already compressed or must reach the client as they are written
+_UNCOMPRESSIBLE_TYPES = (b"image/", b"video/", b"audio/", b"application/pdf", b"application/zip",
+                         b"application/gzip", b"text/event-stream")
+
+
+def make_etag(user_id, organization_id, data_version: int, path: str, query: str, today: date) -> str:
+    key = f"{settings.ETAG_SALT}|{user_id}|{organization_id}|{data_version}|{today.isoformat()}|{path}?{query}"
+    return f'W/"{hashlib.sha1(key.encode()).hexdigest()[:24]}"'
+
+
+def last_modified_timestamp(data_updated_at: Optional[datetime], today: date) -> int:
+    """Last data write (stored in UTC), but not before the start of the (local) day."""
+    midnight = time.mktime(today.timetuple())
+    if data_updated_at is None:
+        return int(midnight)
+    return int(max(data_updated_at.replace(tzinfo=timezone.utc).timestamp(), midnight))
+
+
+def _etags(header: str) -> List[str]:
+    return [tag.strip().removeprefix("W/") for tag in header.split(",") if tag.strip()]
+
+
+def is_not_modified(headers, etag: str, last_modified: int) -> bool:
+    """Whether the client's copy is current (If-None-Match wins over If-Modified-Since)."""
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = _etags(if_none_match)
+        return "*" in tags or etag.removeprefix("W/") in tags
+    if_modified_since = headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return last_modified <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+async def conditional_get(request: Request) -> None:
+    """Answer 304 to GET requests whose copy is current; runs before the endpoint."""
+    validators = _validators.get()
+    if validators is None or request.method != "GET" or profile_requested(request.scope):
+        return
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return
+
+    from app.core.security import decode_token
+    from app.db.data_versions import user_data_version
+    from app.db.session import engine
+
+    payload = decode_token(token)
+    if not payload or payload.get("type", "access") != "access" or not payload.get("sub"):
+        return  # The endpoint's authentication answers
+    try:
+        with engine.connect() as connection:
+            version = user_data_version(connection, payload["sub"])
+    except ValueError:  # Not a user id
+        return
+    if version is None:
+        return
+
+    organization_id, data_version, data_updated_at = version
+    request.state.data_version = data_version  # For get_read_db (replica_validators)
+    _data_version.set(data_version)
+    today = date.today()
+    etag = make_etag(payload["sub"], organization_id, data_version, request.url.path, request.url.query, today)
+    last_modified = last_modified_timestamp(data_updated_at, today)
+    validators.update({
+        b"etag": etag.encode(),
+        b"last-modified": formatdate(last_modified, usegmt=True).encode(),
+        b"cache-control": b"private, no-cache",
+    })
+    if is_not_modified(request.headers, etag, last_modified):
+        headers = {name.decode(): value.decode() for name, value in validators.items()}
+        raise HTTPException(status_code=304, headers={**headers, "vary": "Authorization, Accept-Encoding"})
+
+
+def request_data_version() -> Optional[int]:
+    """Data version of the caller's organization read by conditional_get, if it ran."""
+    return _data_version.get()
+
+
+def replica_validators(request: Request, connection, user_id) -> None:
+    """Drop the validators of a response read on a replica that lags behind them.
+
+    conditional_get reads the data version on the primary: a body read on a
+    replica that has not replayed it yet must not be cached under its ETag.
+    """
+    validators = _validators.get()
+    data_version = getattr(request.state, "data_version", None)
+    if not validators or data_version is None:
+        return
+
+    from app.db.data_versions import user_data_version
+
+    version = user_data_version(connection, user_id)
+    if version is None or version[1] < data_version:
+        validators.clear()
+
+
+def _accepted_encoding(headers: Dict[bytes, bytes]) -> Optional[str]:
+    accepted = {}
+    for item in headers.get(b"accept-encoding", b"").decode("latin-1").split(","):
+        coding, _, params = item.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        if coding:
+            accepted[coding.strip().lower()] = quality
+    if brotli is not None and accepted.get("br", 0) > 0:
+        return "br"
+    if accepted.get("gzip", 0) > 0:
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=settings.COMPRESSION_BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=settings.COMPRESSION_GZIP_LEVEL, mtime=0)
+
+
+def _add_vary(headers: List, value: bytes) -> None:
+    for index, (name, current) in enumerate(headers):
+        if name.lower() == b"vary":
+            if value.lower() not in current.lower():
+                headers[index] = (name, current + b", " + value)
+            return
+    headers.append((b"vary", value))
+
+
+class HTTPCacheMiddleware:
+    """Adds the conditional GET validators to 200 responses and compresses bodies."""
+
+    def __init__(self, app, minimum_size: Optional[int] = None, compression: Optional[bool] = None):
+        self.app = app
+        self.minimum_size = settings.COMPRESSION_MIN_BYTES if minimum_size is None else minimum_size
+        self.compression = settings.COMPRESSION_ENABLED if compression is None else compression
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        validators = {}
+        token = _validators.set(validators) if settings.CONDITIONAL_GET_ENABLED else None
+        encoding = _accepted_encoding(dict(scope["headers"])) if self.compression else None
+        start = None
+
+        async def send_wrapper(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                if validators and message["status"] == 200:
+                    present = {name.lower() for name, _ in headers}
+                    headers += [(name, value) for name, value in validators.items() if name not in present]
+                    _add_vary(headers, b"Authorization")
+                content_type = next((value for name, value in headers if name.lower() == b"content-type"), b"")
+                compressible = self.compression and not content_type.startswith(_UNCOMPRESSIBLE_TYPES)
+                if compressible:
+                    _add_vary(headers, b"Accept-Encoding")
+                message = {**message, "headers": headers}
+                if not compressible or encoding is None:
+                    await send(message)
+                else:
+                    start = message  # Sent with the first body chunk
+                return
+
+            if start is None:
+                await send(message)
+                return
+            start_message, start = start, None
+            headers = start_message["headers"]
+            body = message.get("body", b"")
+            if (not message.get("more_body", False) and len(body) >= self.minimum_size
+                    and not any(name.lower() == b"content-encoding" for name, _ in headers)):
+                body = compress(body, encoding)
+                headers = [(name, value) for name, value in headers if name.lower() != b"content-length"]
+                headers += [(b"content-encoding", encoding.encode()), (b"content-length", str(len(body)).encode())]
+                message = {**message, "body": body}
+            await send({**start_message, "headers": headers})
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if token is not None:
+                _validators.reset(token)
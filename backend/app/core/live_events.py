@@ -0,0 +1,217 @@
+"""
+Live updates: change notifications pushed to the dashboards (Server-Sent Events).
+
+Committed writes publish the topics they touch (TOPICS, by table) to the
+subscribers of the organizations they wrote (app.db.data_versions finds
+them); GET /live/events streams them. Clients refetch the queries of
+those topics only instead of polling, so an idle dashboard holds an open
+connection and costs no query.
+
+A subscription coalesces: topics published before its stream sends them
+are merged into one event, so a burst of writes is one refetch and a slow
+client never piles up a queue. With LIVE_EVENTS_REDIS the workers also
+relay their notifications through a Redis channel to the subscribers of
+the other workers.
+"""
+import asyncio
+import json
+import logging
+import time
+import uuid
+from threading import Lock
+from typing import Dict, Iterable, Optional, Set
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Topic of each table; writes of the tables not listed (tokens, sequences,
+# users, derived stats) notify nothing
+TOPICS: Dict[str, str] = {
+    # Daily entries
+    "egg_productions": "production",
+    "mortalities": "production",
+    "weight_records": "production",
+    "feed_consumptions": "production",
+    "water_consumptions": "production",
+    "health_events": "production",
+    "vaccination_schedules": "production",
+    # Sales
+    "sales": "sales",
+    "clients": "sales",
+    # Expenses
+    "expenses": "expenses",
+    "expense_categories": "expenses",
+    "suppliers": "expenses",
+    # Alerts
+    "alerts": "alerts",
+    "alert_configs": "alerts",
+    # Stock movements
+    "feed_stocks": "stock",
+    "feed_stock_movements": "stock",
+    "egg_stocks": "stock",
+    "egg_stock_movements": "stock",
+    # Sites, buildings and lots
+    "organizations": "farm",
+    "sites": "farm",
+    "site_members": "farm",
+    "buildings": "farm",
+    "sections": "farm",
+    "lots": "farm",
+    "invitations": "farm",
+}
+
+
+def topics_of(tables: Iterable[str]) -> Set[str]:
+    return {TOPICS[table] for table in tables if table in TOPICS}
+
+
+class Subscription:
+    """Pending topics of one stream, merged until the stream sends them."""
+
+    def __init__(self, organization_id: str):
+        self.organization_id = organization_id
+        self._loop = asyncio.get_running_loop()
+        self._pending: Set[str] = set()
+        self._ready = asyncio.Event()
+
+    def push(self, topics: Set[str]) -> None:
+        """Thread-safe: commits run in the threadpool."""
+        try:
+            self._loop.call_soon_threadsafe(self._merge, topics)
+        except RuntimeError:  # Loop closed, the stream is gone
+            pass
+
+    def _merge(self, topics: Set[str]) -> None:
+        self._pending |= topics
+        self._ready.set()
+
+    async def next(self, timeout: float) -> Optional[Set[str]]:
+        """Topics published since the last call, None after `timeout` seconds without any."""
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        self._ready.clear()
+        topics, self._pending = self._pending, set()
+        return topics
+
+
+class RedisRelay:
+    """Relays the notifications of every worker through a Redis channel."""
+
+    CHANNEL = "bravopoultry:live"
+    RETRY_SECONDS = 30  # Publishing is skipped this long after Redis failed
+
+    def __init__(self, url: str):
+        import redis
+
+        self.url = url
+        self.client = redis.Redis.from_url(url, socket_timeout=1, socket_connect_timeout=1)
+        self.origin = uuid.uuid4().hex  # This worker's messages are delivered locally already
+        self._down_until = 0.0
+        self._listener: Optional[asyncio.Task] = None
+
+    def publish(self, organization_id: str, topics: Set[str]) -> None:
+        if time.monotonic() < self._down_until:
+            return
+        message = {"origin": self.origin, "organization_id": organization_id, "topics": sorted(topics)}
+        try:
+            self.client.publish(self.CHANNEL, json.dumps(message))
+        except Exception as exc:
+            self._down_until = time.monotonic() + self.RETRY_SECONDS
+            logger.warning("Live events relay unavailable: %s", exc)
+
+    def listen(self, broker: "LiveBroker") -> None:
+        """Start relaying the other workers' notifications (once per worker)."""
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.ensure_future(self._listen(broker))
+
+    async def _listen(self, broker: "LiveBroker") -> None:
+        import redis.asyncio
+
+        while True:
+            try:
+                async with redis.asyncio.from_url(self.url) as client, client.pubsub() as pubsub:
+                    await pubsub.subscribe(self.CHANNEL)
+                    async for message in pubsub.listen():
+                        if message["type"] != "message":
+                            continue
+                        data = json.loads(message["data"])
+                        if data["origin"] != self.origin:
+                            broker.deliver(data["organization_id"], set(data["topics"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning("Live events relay lost, retrying: %s", exc)
+                await asyncio.sleep(self.RETRY_SECONDS)
+
+
+class LiveBroker:
+    """In-process pub/sub of the organizations' change notifications."""
+
+    def __init__(self, relay: Optional[RedisRelay] = None):
+        self.relay = relay
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+        self._lock = Lock()
+
+    def subscribe(self, organization_id) -> Subscription:
+        subscription = Subscription(str(organization_id))
+        with self._lock:
+            self._subscribers.setdefault(subscription.organization_id, set()).add(subscription)
+        if self.relay is not None:
+            self.relay.listen(self)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.organization_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.organization_id]
+
+    def publish(self, organization_id, topics: Set[str]) -> None:
+        """Notify the subscribers of this worker, and of the others through the relay."""
+        if not topics:
+            return
+        self.deliver(str(organization_id), topics)
+        if self.relay is not None:
+            self.relay.publish(str(organization_id), topics)
+
+    def deliver(self, organization_id: str, topics: Set[str]) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers.get(organization_id, ()))
+        for subscription in subscribers:
+            subscription.push(topics)
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    def clear(self) -> None:
+        with self._lock:
+            self._subscribers.clear()
+
+
+def _default_relay() -> Optional[RedisRelay]:
+    if not settings.LIVE_EVENTS_REDIS:
+        return None
+    try:
+        return RedisRelay(settings.REDIS_URL)
+    except ImportError:
+        logger.warning("LIVE_EVENTS_REDIS is set but the redis package is not installed")
+        return None
+
+
+broker = LiveBroker(relay=_default_relay())
+
+
+def publish_changes(organization_ids: Iterable, tables: Iterable[str]) -> None:
+    """Commit hook of app.db.data_versions: notify the topics of the written tables."""
+    if not settings.LIVE_EVENTS_ENABLED:
+        return
+    topics = topics_of(tables)
+    if topics:
+        for organization_id in organization_ids:
+            broker.publish(organization_id, topics)
@@ -0,0 +1,301 @@
+"""
+Request instrumentation: SQL query counts, DB time and latency per route.
+
+- Engine hooks (`instrument_engine`) count every statement and its
+  execution time into the stats of the request running it, tracked in a
+  context variable so threadpool work is attributed too.
+- MetricsMiddleware (pure ASGI) times each request and records, per route
+  template, latency / response size / query count histograms.
+- `render_prometheus` exposes them, with the pool metrics of
+  app.db.engine, in the Prometheus text format (served at /metrics).
+
+Superusers also get `X-Query-Count` and `Server-Timing` response headers
+(set by get_current_user through `expose_timings`), to profile from the
+browser.
+
+Routes declare a maximum number of statements in app.core.query_budgets.
+Requests going over it are counted, logged with the fingerprints of their
+statements (when statement capture is on) and kept for the tests to fail on.
+"""
+import logging
+import re
+import time
+from collections import Counter, deque
+from contextvars import ContextVar
+from threading import Lock
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+logger = logging.getLogger(__name__)
+
+_LITERALS_RE = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_PARAM_LIST_RE = re.compile(r"\((?:\s*(?:\?|%\(\w+\)s|%s|:\w+)\s*,)+\s*(?:\?|%\(\w+\)s|%s|:\w+)\s*\)")
+_SPACES_RE = re.compile(r"\s+")
+
+
+def fingerprint(statement: str) -> str:
+    """Statement with its literals and IN lists collapsed, to group repeats."""
+    statement = _LITERALS_RE.sub("?", statement)
+    statement = _PARAM_LIST_RE.sub("(...)", statement)
+    return _SPACES_RE.sub(" ", statement).strip()
+
+
+class RequestStats:
+    """SQL activity of one request."""
+
+    __slots__ = ("queries", "db_time", "expose", "statements", "profile")
+
+    def __init__(self, capture_statements: bool = False):
+        self.queries = 0
+        self.db_time = 0.0
+        self.expose = False
+        self.statements: Optional[Counter] = Counter() if capture_statements else None
+        self.profile = None  # app.core.profiling.ProfileSession of a flagged request
+
+
+current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request", default=None)
+
+
+def expose_timings() -> None:
+    """Add the profiling headers to the current response."""
+    stats = current_request.get()
+    if stats is not None:
+        stats.expose = True
+
+
+def instrument_engine(engine) -> None:
+    """Count the statements of `engine` and their duration per request."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _end(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("query_start")
+        if not starts:
+            return
+        elapsed = time.perf_counter() - starts.pop()
+        stats = current_request.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.db_time += elapsed
+            if stats.statements is not None:
+                stats.statements[fingerprint(statement)] += 1
+            if stats.profile is not None and stats.profile.started:
+                stats.profile.record(conn.engine, statement, None if executemany else parameters, elapsed)
+
+
+class Histogram:
+    """Cumulative-bucket histogram (Prometheus semantics)."""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.sum += value
+        self.count += 1
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+
+
+class RouteMetrics:
+    """Histograms of one (method, route, status)."""
+
+    __slots__ = ("latency", "size", "queries", "db_time")
+
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.size = Histogram(SIZE_BUCKETS)
+        self.queries = Histogram(QUERY_BUCKETS)
+        self.db_time = 0.0
+
+
+class MetricsRegistry:
+    """Route metrics of the worker process."""
+
+    def __init__(self, max_violations: int = 100):
+        self._routes: Dict[Tuple[str, str, str], RouteMetrics] = {}
+        self._budget_exceeded: Counter = Counter()
+        self._violations: deque = deque(maxlen=max_violations)
+        self._lock = Lock()
+
+    def record(self, method: str, route: str, status: int, seconds: float, size: int, stats: RequestStats) -> None:
+        key = (method, route, str(status))
+        with self._lock:
+            metrics = self._routes.get(key)
+            if metrics is None:
+                metrics = self._routes[key] = RouteMetrics()
+            metrics.latency.observe(seconds)
+            metrics.size.observe(size)
+            metrics.queries.observe(stats.queries)
+            metrics.db_time += stats.db_time
+
+    def record_budget_violation(self, method: str, route: str, budget: int, stats: RequestStats) -> None:
+        violation = {
+            "route": f"{method} {route}",
+            "queries": stats.queries,
+            "budget": budget,
+            "statements": stats.statements.most_common(5) if stats.statements else [],
+        }
+        with self._lock:
+            self._budget_exceeded[(method, route)] += 1
+            self._violations.append(violation)
+        logger.warning("Query budget exceeded: %s ran %d statements (budget %d)%s", violation["route"],
+                       stats.queries, budget, "".join(f"\n  {count} x {statement}"
+                                                      for statement, count in violation["statements"]))
+
+    def budget_exceeded(self) -> Dict[Tuple[str, str], int]:
+        with self._lock:
+            return dict(self._budget_exceeded)
+
+    def budget_violations(self) -> List[Dict]:
+        """Most recent requests that went over their query budget."""
+        with self._lock:
+            return list(self._violations)
+
+    def snapshot(self) -> Dict[Tuple[str, str, str], RouteMetrics]:
+        with self._lock:
+            return dict(self._routes)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._routes.clear()
+            self._budget_exceeded.clear()
+            self._violations.clear()
+
+
+registry = MetricsRegistry()
+
+
+def route_template(scope) -> str:
+    # Routes of included routers only know their router-relative path; the
+    # effective context FastAPI stores in the scope has the full template
+    effective = scope.get("fastapi", {}).get("effective_route_context")
+    path = getattr(effective, "path", None) or getattr(scope.get("route"), "path", None)
+    return path or "unmatched"
+
+
+class MetricsMiddleware:
+    """Times requests and records their route metrics and SQL activity.
+
+    `budgets` maps "METHOD /route/{template}" to the maximum number of
+    statements of a request; `capture_statements` keeps their fingerprints
+    to report what went over.
+    """
+
+    def __init__(self, app, registry: MetricsRegistry = registry, exclude: Sequence[str] = ("/metrics",),
+                 budgets: Optional[Mapping[str, int]] = None, capture_statements: bool = False):
+        self.app = app
+        self.registry = registry
+        self.exclude = set(exclude)
+        self.budgets = budgets or {}
+        self.capture_statements = capture_statements
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.exclude:
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(self.capture_statements)
+        token = current_request.set(stats)
+        start = time.perf_counter()
+        status = 500
+        size = 0
+
+        async def send_wrapper(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if stats.expose:
+                    elapsed_ms = (time.perf_counter() - start) * 1000
+                    headers = list(message.get("headers", []))
+                    headers.append((b"x-query-count", str(stats.queries).encode()))
+                    headers.append((b"server-timing", (
+                        f'db;dur={stats.db_time * 1000:.1f};desc="{stats.queries} queries", app;dur={elapsed_ms:.1f}'
+                    ).encode()))
+                    message = {**message, "headers": headers}
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_request.reset(token)
+            method, route = scope["method"], route_template(scope)
+            self.registry.record(method, route, status, time.perf_counter() - start, size, stats)
+            budget = self.budgets.get(f"{method} {route}")
+            if budget is not None and stats.queries > budget:
+                self.registry.record_budget_violation(method, route, budget, stats)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels) -> str:
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _histogram_lines(name: str, histogram: Histogram, labels: Dict[str, str]) -> List[str]:
+    lines = [f"{name}_bucket{_labels(**labels, le=bound)} {count}"
+             for bound, count in zip(histogram.buckets, histogram.counts)]
+    lines.append(f"{name}_bucket{_labels(**labels, le='+Inf')} {histogram.count}")
+    lines.append(f"{name}_sum{_labels(**labels)} {histogram.sum}")
+    lines.append(f"{name}_count{_labels(**labels)} {histogram.count}")
+    return lines
+
+
+def render_prometheus(registry: MetricsRegistry = registry) -> str:
+    """Route and connection pool metrics in the Prometheus text format."""
+    from app.db.engine import get_pool_metrics
+
+    routes = sorted(registry.snapshot().items())
+    histograms = (
+        ("http_request_duration_seconds", "Request latency", "latency"),
+        ("http_response_size_bytes", "Response body size", "size"),
+        ("http_request_db_queries", "SQL statements per request", "queries"),
+    )
+    lines = []
+    for name, help_text, attribute in histograms:
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+        for (method, route, status), metrics in routes:
+            lines += _histogram_lines(name, getattr(metrics, attribute),
+                                      {"method": method, "route": route, "status": status})
+
+    lines += ["# HELP http_request_db_seconds_total SQL execution time", "# TYPE http_request_db_seconds_total counter"]
+    for (method, route, status), metrics in routes:
+        lines.append(f"http_request_db_seconds_total{_labels(method=method, route=route, status=status)} {metrics.db_time}")
+
+    lines += ["# HELP http_request_query_budget_exceeded_total Requests over their route query budget",
+              "# TYPE http_request_query_budget_exceeded_total counter"]
+    for (method, route), count in sorted(registry.budget_exceeded().items()):
+        lines.append(f"http_request_query_budget_exceeded_total{_labels(method=method, route=route)} {count}")
+
+    pools = get_pool_metrics()
+    pool_metrics = (
+        ("db_pool_checked_out", "gauge", "checked_out"),
+        ("db_pool_overflow", "gauge", "overflow"),
+        ("db_pool_size", "gauge", "size"),
+        ("db_pool_checkouts_total", "counter", "checkouts"),
+        ("db_pool_connects_total", "counter", "connects"),
+        ("db_pool_invalidations_total", "counter", "invalidations"),
+        ("db_pool_wait_milliseconds_total", "counter", "wait_time_total_ms"),
+    )
+    for name, kind, field in pool_metrics:
+        lines.append(f"# TYPE {name} {kind}")
+        lines += [f"{name}{_labels(pool=role)} {data[field]}" for role, data in pools.items() if field in data]
+
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,398 @@
+"""
+On-demand profiling of superuser requests.
+
+A request flagged with the `X-Profile: 1` header (or `?profile=1`) is
+profiled once get_current_user has authenticated a superuser
+(`start_profiling`); the flag is ignored for everyone else.
+
+- A sampling thread records the stack of the thread running the request
+  every PROFILE_INTERVAL_MS (wall clock: time spent waiting on the
+  database shows as well). That thread is the event loop's, shared with
+  the other requests of the worker: a sample taken while another asyncio
+  task runs is filed under a "[task <name>]" root frame, apart from the
+  request's own stacks (among those tasks, the single-flight computations
+  the request waits on). The code of plain `def` endpoints runs in the
+  threadpool and shows as the event loop waiting.
+- Its SQL statements are kept with their duration. The slowest distinct
+  SELECTs are then run again under EXPLAIN (never EXPLAIN ANALYZE, so
+  nothing is executed twice); parameters are not stored.
+
+The profile is a speedscope document (https://www.speedscope.app) with the
+statements under "sql". It is stored in PROFILES_DIR for download from
+/api/v1/admin/profiles/{id}. JSON responses come back wrapped as
+{"data": ..., "profile": ...}; others only get the X-Profile-Id header.
+Streaming responses (live events) are not profiled: they are passed
+through as they come, with `X-Profile: streaming`.
+
+Safe to leave on in production: at most PROFILE_MAX_CONCURRENT requests
+per worker are profiled at once (the others run normally, with
+`X-Profile: busy`), sampling stops after PROFILE_MAX_SECONDS and only the
+last PROFILE_KEEP profiles are kept.
+"""
+import asyncio
+import json
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+from app.core.config import settings
+from app.core.metrics import current_request, fingerprint, route_template
+
+SPEEDSCOPE_SCHEMA = "https://www.speedscope.app/file-format-schema.json"
+MAX_STATEMENTS = 1000
+MAX_STACK_DEPTH = 128
+_FLAG_VALUES = {"1", "true", "yes", "on"}
+_PROFILE_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+
+_slots = threading.BoundedSemaphore(max(settings.PROFILE_MAX_CONCURRENT, 1))
+
+
+def profile_requested(scope) -> bool:
+    """Whether the request carries the profiling flag (header or query string)."""
+    for name, value in scope.get("headers", ()):
+        if name == b"x-profile":
+            return value.decode("latin-1").strip().lower() in _FLAG_VALUES
+    query = scope.get("query_string", b"")
+    if b"profile" not in query:
+        return False
+    values = parse_qs(query.decode("latin-1")).get("profile", [""])
+    return values[-1].lower() in _FLAG_VALUES
+
+
+class SamplingProfiler:
+    """Samples the stack of one thread from a background thread.
+
+    With `loop` and `task`, the samples taken while another task of the
+    loop runs get that task as root frame.
+    """
+
+    def __init__(self, thread_id: int, interval: float, max_seconds: float,
+                 loop: Optional[asyncio.AbstractEventLoop] = None, task: Optional[asyncio.Task] = None):
+        self.thread_id = thread_id
+        self.loop = loop
+        self.task = task
+        self.interval = interval
+        self.max_seconds = max_seconds
+        self.frames: List[Dict] = []
+        self._frame_index: Dict[Tuple[str, str, int], int] = {}
+        self.samples: List[List[int]] = []
+        self.weights: List[float] = []  # Milliseconds
+        self.truncated = False
+        self.started_at = 0.0
+        self.elapsed = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self) -> None:
+        self.started_at = time.perf_counter()
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.elapsed = time.perf_counter() - self.started_at
+
+    def _run(self) -> None:
+        last = self.started_at
+        deadline = self.started_at + self.max_seconds
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                stack = self._stack(frame)
+                task = asyncio.current_task(self.loop) if self.loop is not None else None
+                if task is not None and task is not self.task:
+                    stack.insert(0, self._frame_id((f"[task {_task_name(task)}]", "<asyncio>", 0)))
+                self._add(stack, (now - last) * 1000)
+            last = now
+            if now >= deadline:
+                self.truncated = True
+                return
+
+    def _frame_id(self, key: Tuple[str, str, int]) -> int:
+        index = self._frame_index.get(key)
+        if index is None:
+            index = self._frame_index[key] = len(self.frames)
+            self.frames.append({"name": key[0], "file": key[1], "line": key[2]})
+        return index
+
+    def _stack(self, frame) -> List[int]:
+        stack = []
+        while frame is not None and len(stack) < MAX_STACK_DEPTH:
+            code = frame.f_code
+            stack.append(self._frame_id((getattr(code, "co_qualname", code.co_name), code.co_filename,
+                                         code.co_firstlineno)))
+            frame = frame.f_back
+        stack.reverse()
+        return stack
+
+    def _add(self, stack: List[int], weight: float) -> None:
+        # Consecutive identical stacks are merged, keeping the time order
+        if self.samples and self.samples[-1] == stack:
+            self.weights[-1] += weight
+        else:
+            self.samples.append(stack)
+            self.weights.append(weight)
+
+    def speedscope(self, name: str) -> Dict:
+        return {
+            "$schema": SPEEDSCOPE_SCHEMA,
+            "name": name,
+            "exporter": "bravopoultry",
+            "activeProfileIndex": 0,
+            "shared": {"frames": self.frames},
+            "profiles": [{
+                "type": "sampled",
+                "name": name,
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": round(sum(self.weights), 3),
+                "samples": self.samples,
+                "weights": [round(weight, 3) for weight in self.weights],
+            }],
+        }
+
+
+def _task_name(task: asyncio.Task) -> str:
+    coro = task.get_coro()
+    return getattr(coro, "__qualname__", None) or task.get_name()
+
+
+class ProfileSession:
+    """Profiling state of one flagged request (RequestStats.profile)."""
+
+    __slots__ = ("profiler", "user_id", "statements", "dropped", "busy", "stopped")
+
+    def __init__(self):
+        self.profiler: Optional[SamplingProfiler] = None
+        self.user_id: Optional[str] = None
+        self.statements: List[Tuple] = []
+        self.dropped = 0
+        self.busy = False
+        self.stopped = False
+
+    @property
+    def started(self) -> bool:
+        return self.profiler is not None
+
+    def stop(self) -> None:
+        """Stop sampling and free the profiling slot (once)."""
+        if self.started and not self.stopped:
+            self.stopped = True
+            self.profiler.stop()
+            _slots.release()
+
+    def record(self, engine, statement: str, parameters, seconds: float) -> None:
+        if len(self.statements) >= MAX_STATEMENTS:
+            self.dropped += 1
+            return
+        self.statements.append((engine, statement, parameters, seconds))
+
+
+def start_profiling(user_id) -> bool:
+    """Profile the current request if it was flagged (caller checked the superuser)."""
+    stats = current_request.get()
+    session = stats.profile if stats is not None else None
+    if session is None or session.started:
+        return False
+    if not _slots.acquire(blocking=False):
+        session.busy = True
+        return False
+    session.user_id = str(user_id)
+    try:
+        loop, task = asyncio.get_running_loop(), asyncio.current_task()
+    except RuntimeError:  # Called from the threadpool
+        loop = task = None
+    session.profiler = SamplingProfiler(threading.get_ident(), settings.PROFILE_INTERVAL_MS / 1000,
+                                        settings.PROFILE_MAX_SECONDS, loop=loop, task=task)
+    session.profiler.start()
+    return True
+
+
+def _explain_prefix(engine) -> Optional[str]:
+    return {"sqlite": "EXPLAIN QUERY PLAN ", "postgresql": "EXPLAIN "}.get(engine.dialect.name)
+
+
+def explain(engine, statement: str, parameters) -> List[str]:
+    """Plan of a SELECT on `engine`, one line per plan row."""
+    prefix = _explain_prefix(engine)
+    if prefix is None:
+        return []
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql(prefix + statement, parameters or ()).fetchall()
+    # SQLite: (id, parent, notused, detail); PostgreSQL: one text column
+    return [str(row[-1]) for row in rows]
+
+
+def sql_report(session: ProfileSession, limit: int) -> List[Dict]:
+    """Statements in execution order; the `limit` slowest distinct SELECTs with their plan."""
+    token = current_request.set(None)  # EXPLAINs are not part of the request
+    try:
+        slowest: Dict[str, int] = {}
+        for index, (_, statement, _, seconds) in enumerate(session.statements):
+            if statement.split(None, 1)[0].upper() not in ("SELECT", "WITH"):
+                continue
+            key = fingerprint(statement)
+            if key not in slowest or seconds > session.statements[slowest[key]][3]:
+                slowest[key] = index
+        explained = sorted(slowest.values(), key=lambda index: -session.statements[index][3])[:limit]
+
+        report = []
+        for index, (engine, statement, parameters, seconds) in enumerate(session.statements):
+            entry = {"statement": statement, "duration_ms": round(seconds * 1000, 3)}
+            if index in explained:
+                try:
+                    entry["explain"] = explain(engine, statement, parameters)
+                except Exception as exc:  # Statement not explainable as captured
+                    entry["explain_error"] = str(exc).splitlines()[0][:300]
+            report.append(entry)
+        return report
+    finally:
+        current_request.reset(token)
+
+
+class ProfileStore:
+    """Profiles saved as JSON files, the last `keep` ones."""
+
+    def __init__(self, directory: Optional[str] = None, keep: Optional[int] = None):
+        self._directory = directory
+        self._keep = keep
+        self._lock = threading.Lock()
+
+    @property
+    def directory(self) -> str:
+        return self._directory or settings.PROFILES_DIR or os.path.join(
+            os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "profiles")
+
+    def save(self, document: Dict) -> str:
+        profile_id = document["request"]["id"]
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, f"{profile_id}.json"), "w") as f:
+            json.dump(document, f, separators=(",", ":"), default=str)
+        self._prune()
+        return profile_id
+
+    def _prune(self) -> None:
+        keep = self._keep if self._keep is not None else settings.PROFILE_KEEP
+        with self._lock:
+            files = sorted(self._files(), key=lambda path: os.path.getmtime(path), reverse=True)
+            for path in files[keep:]:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+    def _files(self) -> List[str]:
+        if not os.path.isdir(self.directory):
+            return []
+        return [os.path.join(self.directory, name) for name in os.listdir(self.directory)
+                if _PROFILE_ID_RE.match(name[:-5]) and name.endswith(".json")]
+
+    def path(self, profile_id: str) -> Optional[str]:
+        if not _PROFILE_ID_RE.match(profile_id):
+            return None
+        path = os.path.join(self.directory, f"{profile_id}.json")
+        return path if os.path.exists(path) else None
+
+    def list(self) -> List[Dict]:
+        """Stored profiles, most recent first (request metadata only)."""
+        profiles = []
+        for path in self._files():
+            try:
+                with open(path) as f:
+                    profiles.append(json.load(f)["request"])
+            except (OSError, ValueError, KeyError):
+                continue
+        return sorted(profiles, key=lambda request: request["started_at"], reverse=True)
+
+
+profile_store = ProfileStore()
+
+
+class ProfilingMiddleware:
+    """Profiles flagged requests of superusers; must run inside MetricsMiddleware."""
+
+    def __init__(self, app, store: ProfileStore = profile_store):
+        self.app = app
+        self.store = store
+
+    async def __call__(self, scope, receive, send):
+        stats = current_request.get()
+        if scope["type"] != "http" or stats is None or not profile_requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        session = stats.profile = ProfileSession()
+        started_at = datetime.utcnow()
+        messages = []
+        streaming = False
+
+        async def send_wrapper(message):
+            nonlocal streaming
+            if message["type"] == "http.response.start" and session.busy:
+                message = {**message, "headers": [*message.get("headers", []), (b"x-profile", b"busy")]}
+            if not session.started or streaming:
+                await send(message)
+            elif message["type"] == "http.response.body" and message.get("more_body"):
+                # A streamed body may never end: sent as it comes, not profiled
+                streaming = True
+                session.stop()
+                start, *buffered = messages
+                await send({**start, "headers": [*start.get("headers", []), (b"x-profile", b"streaming")]})
+                for buffered_message in [*buffered, message]:
+                    await send(buffered_message)
+            else:
+                messages.append(message)  # Sent once the profile is attached
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            session.stop()
+        if not session.started or streaming:
+            return
+
+        from starlette.concurrency import run_in_threadpool
+
+        document = await run_in_threadpool(self._document, scope, session, started_at, messages)
+        await self._send_with_profile(send, messages, document)
+
+    def _document(self, scope, session: ProfileSession, started_at: datetime, messages: List[Dict]) -> Dict:
+        method, route = scope["method"], route_template(scope)
+        start = next((message for message in messages if message["type"] == "http.response.start"), {})
+        document = session.profiler.speedscope(f"{method} {route}")
+        document["request"] = {
+            "id": uuid.uuid4().hex,
+            "method": method,
+            "path": scope["path"],
+            "route": route,
+            "status": start.get("status"),
+            "user_id": session.user_id,
+            "started_at": started_at.isoformat(),
+            "duration_ms": round(session.profiler.elapsed * 1000, 3),
+            "samples": len(session.profiler.samples),
+            "sampling_truncated": session.profiler.truncated,
+            "sql_statements": len(session.statements) + session.dropped,
+            "sql_ms": round(sum(statement[3] for statement in session.statements) * 1000, 3),
+        }
+        document["sql"] = sql_report(session, settings.PROFILE_EXPLAIN_LIMIT)
+        self.store.save(document)
+        return document
+
+    @staticmethod
+    async def _send_with_profile(send, messages: List[Dict], document: Dict) -> None:
+        start = next(message for message in messages if message["type"] == "http.response.start")
+        body = b"".join(message.get("body", b"") for message in messages if message["type"] == "http.response.body")
+        headers = [(name, value) for name, value in start.get("headers", []) if name.lower() != b"content-length"]
+        content_type = next((value for name, value in headers if name.lower() == b"content-type"), b"")
+        if body and content_type.startswith(b"application/json"):
+            profile = json.dumps(document, separators=(",", ":"), default=str).encode()
+            body = b'{"data":' + body + b',"profile":' + profile + b"}"
+        headers += [(b"content-length", str(len(body)).encode()), (b"x-profile-id", document["request"]["id"].encode())]
+        await send({**start, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,195 @@
+"""
+Query budgets - maximum number of SQL statements per request, per route.
+
+Keys are "METHOD /route/{template}", as labelled by app.core.metrics. The
+middleware counts the requests going over their budget
+(http_request_query_budget_exceeded_total on /metrics) and logs the
+fingerprints of their statements; the test suite fails on them.
+
+Budgets are the count measured on the synthetic farm (scripts.synthetic_farm)
+plus a 25 % margin (at least 2), including first reads that store a
+snapshot and the data version read of conditional GET (app.core.http_cache).
+They must not depend on the amount of data: tests/test_query_budgets.py
+checks every GET route on a small and a large farm. A route doing one
+statement per row (N+1) is fixed with joined / batched loading, not by
+raising its budget.
+"""
+from typing import Dict
+
+QUERY_BUDGETS: Dict[str, int] = {
+    # auth
+    "POST /api/v1/auth/register": 7,
+    "POST /api/v1/auth/verify-email": 6,
+    "POST /api/v1/auth/resend-verification": 6,
+    "POST /api/v1/auth/login": 7,
+    "POST /api/v1/auth/login/phone": 7,
+    "GET /api/v1/auth/me": 3,
+    "POST /api/v1/auth/refresh": 7,
+    "POST /api/v1/auth/logout": 5,
+    "POST /api/v1/auth/forgot-password": 8,
+    "POST /api/v1/auth/reset-password": 7,
+    "GET /api/v1/auth/permissions": 3,
+
+    # users
+    "GET /api/v1/users": 4,
+    "GET /api/v1/users/{user_id}": 4,
+    "PATCH /api/v1/users/{user_id}": 6,
+    "DELETE /api/v1/users/{user_id}": 7,
+    "POST /api/v1/users/change-password": 6,
+
+    # invitations
+    "GET /api/v1/invitations": 4,
+    "POST /api/v1/invitations": 10,
+    "GET /api/v1/invitations/check/{token}": 4,
+    "POST /api/v1/invitations/accept": 10,
+    "POST /api/v1/invitations/{invitation_id}/resend": 8,
+    "DELETE /api/v1/invitations/{invitation_id}": 5,
+
+    # organizations
+    "GET /api/v1/organizations/current": 4,
+    "POST /api/v1/organizations": 7,
+    "PATCH /api/v1/organizations/{org_id}": 6,
+
+    # sites
+    "GET /api/v1/sites": 6,
+    "POST /api/v1/sites": 6,
+    "GET /api/v1/sites/{site_id}": 7,
+    "PATCH /api/v1/sites/{site_id}": 6,
+    "DELETE /api/v1/sites/{site_id}": 8,
+    "GET /api/v1/sites/{site_id}/members": 5,
+    "POST /api/v1/sites/{site_id}/members": 7,
+
+    # buildings
+    "GET /api/v1/buildings": 6,
+    "POST /api/v1/buildings": 9,
+    "GET /api/v1/buildings/{building_id}": 7,
+    "PATCH /api/v1/buildings/{building_id}": 10,
+    "DELETE /api/v1/buildings/{building_id}": 9,
+    "GET /api/v1/buildings/{building_id}/sections": 5,
+    "POST /api/v1/buildings/{building_id}/sections": 6,
+
+    # lots
+    "GET /api/v1/lots": 4,
+    "POST /api/v1/lots": 18,
+    "GET /api/v1/lots/{lot_id}": 8,
+    "PATCH /api/v1/lots/{lot_id}": 15,
+    "DELETE /api/v1/lots/{lot_id}": 22,
+    "POST /api/v1/lots/{lot_id}/daily-entry": 49,
+    "PUT /api/v1/lots/{lot_id}/daily-entry": 38,
+    "GET /api/v1/lots/{lot_id}/daily-entry/{entry_date}": 9,
+    "GET /api/v1/lots/{lot_id}/history": 9,
+    "POST /api/v1/lots/{lot_id}/close": 8,
+    "GET /api/v1/lots/{lot_id}/financial-summary": 17,
+    "POST /api/v1/lots/{lot_id}/financial-summary/recompute": 14,
+    "POST /api/v1/lots/{lot_id}/split": 62,
+    "GET /api/v1/lots/{lot_id}/split-history": 7,
+
+    # production
+    "GET /api/v1/production/eggs": 4,
+    "POST /api/v1/production/eggs": 33,
+    "GET /api/v1/production/weights": 4,
+    "POST /api/v1/production/weights": 9,
+    "GET /api/v1/production/mortalities": 5,
+    "POST /api/v1/production/mortalities": 21,
+    "GET /api/v1/production/laying-curve/standard": 3,
+    "GET /api/v1/production/laying-curve/analysis/{lot_id}": 6,
+
+    # feed
+    "GET /api/v1/feed/consumption": 5,
+    "POST /api/v1/feed/consumption": 8,
+    "GET /api/v1/feed/water": 5,
+    "POST /api/v1/feed/water": 8,
+    "GET /api/v1/feed/stock/all": 5,
+    "GET /api/v1/feed/stock": 4,
+    "POST /api/v1/feed/stock": 5,
+    "POST /api/v1/feed/stock/restock": 13,
+    "GET /api/v1/feed/stock/stats": 6,
+    "GET /api/v1/feed/stock/consumption-trend": 4,
+    "GET /api/v1/feed/monitoring/stats": 15,
+    "GET /api/v1/feed/stock/plan": 14,
+    "GET /api/v1/feed/stock/movements/all": 4,
+    "GET /api/v1/feed/stock/{stock_id}": 4,
+    "PATCH /api/v1/feed/stock/{stock_id}": 17,
+    "DELETE /api/v1/feed/stock/{stock_id}": 6,
+    "GET /api/v1/feed/stock/{stock_id}/movements": 4,
+
+    # standards
+    "GET /api/v1/standards": 3,
+    "GET /api/v1/standards/curve": 3,
+    "GET /api/v1/standards/custom": 4,
+    "POST /api/v1/standards/custom": 7,
+    "PUT /api/v1/standards/custom/{standard_id}": 7,
+    "DELETE /api/v1/standards/custom/{standard_id}": 6,
+
+    # health
+    "GET /api/v1/health/events": 5,
+    "POST /api/v1/health/events": 6,
+    "GET /api/v1/health/upcoming-vaccinations": 7,
+    "GET /api/v1/health/vaccination-schedules": 4,
+    "POST /api/v1/health/vaccination-schedules": 6,
+    "POST /api/v1/health/vaccination-schedules/apply-program": 12,
+    "GET /api/v1/health/lots/{lot_id}/vaccination-schedules": 5,
+    "DELETE /api/v1/health/lots/{lot_id}/vaccination-schedules": 4,
+    "PUT /api/v1/health/vaccination-schedules/{schedule_id}": 6,
+    "DELETE /api/v1/health/vaccination-schedules/{schedule_id}": 6,
+
+    # sales
+    "GET /api/v1/sales/eggs-stock": 18,
+    "POST /api/v1/sales/eggs-stock/adjustments": 19,
+    "GET /api/v1/sales/eggs-stock/{site_id}/movements": 5,
+    "GET /api/v1/sales": 4,
+    "POST /api/v1/sales": 29,
+    "GET /api/v1/sales/invoice/{invoice_number}": 4,
+    "POST /api/v1/sales/invoice/{invoice_number}/send-email": 8,
+    "PATCH /api/v1/sales/{sale_id}": 18,
+    "POST /api/v1/sales/{sale_id}/payment": 20,
+    "GET /api/v1/sales/clients": 4,
+    "POST /api/v1/sales/clients": 5,
+    "PATCH /api/v1/sales/clients/{client_id}": 6,
+
+    # expenses
+    "GET /api/v1/expenses": 4,
+    "POST /api/v1/expenses": 14,
+    "GET /api/v1/expenses/categories": 4,
+    "PATCH /api/v1/expenses/{expense_id}": 14,
+    "DELETE /api/v1/expenses/{expense_id}": 13,
+    "GET /api/v1/expenses/suppliers": 4,
+    "POST /api/v1/expenses/suppliers": 5,
+    "PATCH /api/v1/expenses/suppliers/{supplier_id}": 6,
+
+    # analytics
+    "GET /api/v1/analytics/lot/{lot_id}/performance": 8,
+    "GET /api/v1/analytics/site/{site_id}/summary": 10,
+    "GET /api/v1/analytics/comparison": 7,
+
+    # dashboard
+    "GET /api/v1/dashboard/overview": 23,
+    "GET /api/v1/dashboard/charts/eggs-trend": 5,
+    "GET /api/v1/dashboard/charts/financial-trend": 25,
+    "GET /api/v1/dashboard/alerts": 4,
+    "GET /api/v1/dashboard/bootstrap": 48,
+    "GET /api/v1/dashboard/financial-summary": 34,
+    "GET /api/v1/dashboard/ai-insights": 18,
+    "GET /api/v1/dashboard/forecasts": 12,
+
+    # admin
+    "GET /api/v1/admin/stats": 18,
+    "GET /api/v1/admin/db-pool": 3,
+    "GET /api/v1/admin/profiles": 3,
+    "GET /api/v1/admin/profiles/{profile_id}": 3,
+    "GET /api/v1/admin/users": 5,
+    "GET /api/v1/admin/organizations": 5,
+    "GET /api/v1/admin/data-size": 5,
+    "GET /api/v1/admin/activity": 8,
+    "PATCH /api/v1/admin/users/{user_id}/toggle-active": 7,
+    "PATCH /api/v1/admin/users/{user_id}/toggle-superuser": 6,
+    "DELETE /api/v1/admin/users/{user_id}": 8,
+
+    # live updates (the statements of the stream's opening only)
+    "GET /api/v1/live/events": 3,
+
+    # offline sync (upload: a day of entries of a lot and two rejected ones; each further
+    # entry is applied on its own savepoint, ~6 statements)
+    "GET /api/v1/sync": 15,
+    "POST /api/v1/sync": 64,
+}
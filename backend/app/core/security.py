@@ -1,9 +1,15 @@
+import time
+import uuid
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
 import bcrypt
 
 from app.core.config import settings
+from app.core.token_cache import VerifiedTokenCache, TokenDenylist
+
+verified_token_cache = VerifiedTokenCache(maxsize=settings.TOKEN_CACHE_SIZE)
+token_denylist = TokenDenylist(ttl_seconds=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -29,15 +35,43 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
+    to_encode.update({
+        "exp": expire,
+        "iat": time.time(),
+        "jti": uuid.uuid4().hex,
+        "type": "access",
+    })
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
 
 def decode_token(token: str) -> Optional[dict]:
-    """Decode and verify a JWT token."""
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        return payload
-    except JWTError:
+    """Decode and verify a JWT token.
+
+    Verified payloads are cached by signature until they expire, so only the
+    first request with a given token pays for signature verification.
+    Revoked tokens are rejected even when cached.
+    """
+    payload = verified_token_cache.get(token)
+    if payload is None:
+        try:
+            payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        except JWTError:
+            return None
+        verified_token_cache.put(token, payload)
+
+    if token_denylist.is_revoked(payload):
         return None
+    return payload
+
+
+def revoke_access_token(payload: dict) -> None:
+    """Revoke a single access token (logout)."""
+    jti = payload.get("jti")
+    if jti:
+        token_denylist.revoke_token(jti, payload.get("exp"))
+
+
+def revoke_user_access_tokens(user_id) -> None:
+    """Revoke every access token issued to a user so far."""
+    token_denylist.revoke_user(str(user_id))
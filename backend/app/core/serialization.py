@@ -0,0 +1,130 @@
+"""
+Fast JSON path for large list responses.
+
+List endpoints select plain columns (row tuples, no ORM objects) and turn
+each row into a dict with a RowSerializer derived from their response
+schema, then return a FastJSONResponse encoded with orjson. The rows come
+from the database, so they are not validated again: the serializer only
+reproduces what the Pydantic response model would output (Decimal as a
+string, enums as their value, defaults of absent fields, nested models).
+The response_model stays on the route for the OpenAPI schema.
+
+scripts/benchmark_serialization.py compares both paths on 10k rows.
+"""
+import datetime as dt
+import enum
+import json
+import types
+import typing
+import uuid
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Type
+
+from pydantic import BaseModel
+from starlette.responses import Response
+
+try:
+    import orjson
+except ImportError:  # The stdlib encoder is used without it (slower)
+    orjson = None
+
+
+def _default(value):
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (dt.datetime, dt.date, dt.time)):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, default=_default)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(Response):
+    """JSON response encoded with orjson; content must be JSON-ready (see RowSerializer)."""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def decimal_as_string(value) -> str:
+    """Decimal as Pydantic outputs it in JSON."""
+    return str(value if type(value) is Decimal else Decimal(str(value)))
+
+
+def decimal_as_number(value):
+    """Decimal as FastAPI's jsonable_encoder outputs it (routes without response_model)."""
+    value = value if type(value) is Decimal else Decimal(str(value))
+    return int(value) if value.as_tuple().exponent >= 0 else float(value)
+
+
+def _converter(annotation, decimal: Callable) -> Optional[Callable]:
+    """Conversion of a non-null value of `annotation`, None when it is already JSON-ready."""
+    origin = typing.get_origin(annotation)
+    if origin in (typing.Union, types.UnionType):
+        args = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+        return _converter(args[0], decimal) if len(args) == 1 else None
+    if origin in (list, List):
+        item = _converter(typing.get_args(annotation)[0], decimal)
+        if item is None:
+            return None
+        return lambda values: [None if value is None else item(value) for value in values]
+    if annotation is Decimal:
+        return decimal
+    if annotation is float:
+        return float
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return RowSerializer(annotation, decimal)
+    return None
+
+
+class RowSerializer:
+    """Dicts in the shape of `schema` for dumps(), from trusted mappings (database rows).
+
+    Enums, dates and UUIDs are left to the encoder; Decimals, floats and
+    nested models are converted as Pydantic would output them.
+    """
+
+    def __init__(self, schema: Type[BaseModel], decimal: Callable = decimal_as_string):
+        self.schema = schema
+        self._defaults = []
+        self._converters = []
+        for name, field in schema.model_fields.items():
+            converter = _converter(field.annotation, decimal)
+            default = None if field.is_required() else field.get_default(call_default_factory=True)
+            self._defaults.append((name, default))
+            if converter is not None:
+                self._converters.append((name, converter))
+
+    @property
+    def field_names(self) -> List[str]:
+        return [name for name, _ in self._defaults]
+
+    def columns(self, model, exclude: Iterable[str] = ()) -> List:
+        """Columns of `model` matching the schema fields, to select them as row tuples."""
+        mapped = model.__mapper__.columns.keys()
+        return [getattr(model, name) for name in self.field_names if name in mapped and name not in exclude]
+
+    def __call__(self, row: Mapping) -> Dict:
+        result = {name: row.get(name, default) for name, default in self._defaults}
+        for name, converter in self._converters:
+            value = result[name]
+            if value is not None:
+                result[name] = converter(value)
+        return result
+
+    def rows(self, rows: Sequence) -> List[Dict]:
+        """Serialize SQLAlchemy result rows (all from the same query)."""
+        if not rows:
+            return []
+        keys = rows[0]._fields
+        return [self(dict(zip(keys, row))) for row in rows]
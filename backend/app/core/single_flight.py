@@ -0,0 +1,269 @@
+"""
+Single-flight coalescing of expensive organization-level GET endpoints.
+
+Concurrent identical requests (same organization, same endpoint, same
+parameters) share one computation: the first one runs the endpoint, the
+others wait for its result instead of querying the database again. Nothing
+is kept once the computation is over; a request arriving after it runs its
+own (this is not a cache). The key includes the organization's data version
+(app.db.data_versions), read when the request arrives: a request never joins
+a flight started before a write it could already see, its own included.
+
+Endpoints opt in with the `single_flight` decorator, which takes their own
+settings (how long followers wait for another worker). The endpoint is a
+plain `def`, run in the threadpool, so the event loop keeps accepting the
+requests that join it.
+
+Within a worker the flights are asyncio tasks. With SINGLE_FLIGHT_REDIS,
+workers also coordinate through Redis: the leader holds a lock key while
+it computes and publishes the JSON of its result under its flight id;
+followers of other workers poll for it. LocalFlightStore is the in-memory
+stand-in of Redis for tests (or a single worker).
+"""
+import asyncio
+import functools
+import inspect
+import json
+import logging
+import time
+import uuid
+from threading import Lock
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from fastapi.encoders import jsonable_encoder
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.http_cache import request_data_version
+
+logger = logging.getLogger(__name__)
+
+
+class LocalFlightStore:
+    """In-memory key/value store with expiry, standing in for Redis."""
+
+    def __init__(self):
+        self._entries: Dict[str, Tuple[str, float]] = {}
+        self._lock = Lock()
+
+    def _live(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[1] <= time.monotonic():
+            del self._entries[key]
+            return None
+        return entry[0]
+
+    async def set_if_absent(self, key: str, value: str, ttl: float) -> bool:
+        with self._lock:
+            if self._live(key) is not None:
+                return False
+            self._entries[key] = (value, time.monotonic() + ttl)
+            return True
+
+    async def set(self, key: str, value: str, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+
+    async def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            return self._live(key)
+
+    async def delete_if(self, key: str, value: str) -> None:
+        with self._lock:
+            if self._live(key) == value:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class RedisFlightStore:
+    """Flight store on Redis (redis.asyncio), shared by every worker."""
+
+    # Deletes the lock only if this flight still holds it
+    _DELETE_IF = "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) end return 0"
+
+    def __init__(self, url: str):
+        import redis.asyncio
+
+        self.client = redis.asyncio.from_url(url, decode_responses=True)
+
+    async def set_if_absent(self, key: str, value: str, ttl: float) -> bool:
+        return bool(await self.client.set(key, value, nx=True, px=int(ttl * 1000)))
+
+    async def set(self, key: str, value: str, ttl: float) -> None:
+        await self.client.set(key, value, px=int(ttl * 1000))
+
+    async def get(self, key: str) -> Optional[str]:
+        return await self.client.get(key)
+
+    async def delete_if(self, key: str, value: str) -> None:
+        await self.client.eval(self._DELETE_IF, 1, key, value)
+
+
+class SingleFlight:
+    """Runs one computation per key at a time; concurrent callers share its result.
+
+    `store` coordinates several workers (Redis or LocalFlightStore); without
+    it, flights are only shared within this process.
+    """
+
+    def __init__(self, store=None, poll_interval: float = 0.05, result_ttl: float = 5.0):
+        self.store = store
+        self.poll_interval = poll_interval
+        self.result_ttl = result_ttl  # How long followers of other workers can fetch a result
+        self._flights: Dict[str, asyncio.Task] = {}
+        self.stats = {"leaders": 0, "followers": 0, "remote_followers": 0}
+
+    async def do(self, key: str, compute: Callable[[], Awaitable[Any]], wait_seconds: float) -> Any:
+        task = self._flights.get(key)
+        if task is None:
+            self.stats["leaders"] += 1
+            task = asyncio.ensure_future(self._lead(key, compute, wait_seconds))
+            self._flights[key] = task
+            task.add_done_callback(functools.partial(self._done, key))
+        else:
+            self.stats["followers"] += 1
+        # A disconnected caller stops waiting; the flight goes on for the others
+        return await asyncio.shield(task)
+
+    def _done(self, key: str, task: asyncio.Task) -> None:
+        if self._flights.get(key) is task:
+            del self._flights[key]
+        if not task.cancelled():
+            task.exception()  # Retrieved, even when every caller went away
+
+    async def _lead(self, key: str, compute, wait_seconds: float) -> Any:
+        if self.store is None:
+            return await compute()
+        try:
+            return await self._lead_across_workers(key, compute, wait_seconds)
+        except _StoreUnavailable as exc:
+            logger.warning("Single-flight store unavailable, computing locally: %s", exc.__cause__)
+            return await compute()
+
+    async def _lead_across_workers(self, key: str, compute, wait_seconds: float) -> Any:
+        lock_key = f"singleflight:{key}:lock"
+        deadline = time.monotonic() + wait_seconds
+        while time.monotonic() < deadline:
+            flight_id = uuid.uuid4().hex
+            if await self._store(self.store.set_if_absent(lock_key, flight_id, wait_seconds)):
+                try:
+                    result = await compute()
+                    await self._quietly(self._publish(key, flight_id, result))
+                    return result
+                finally:
+                    await self._quietly(self.store.delete_if(lock_key, flight_id))
+            encoded = await self._follow(key, lock_key, deadline)
+            if encoded is not None:
+                self.stats["remote_followers"] += 1
+                return json.loads(encoded)
+            # The other worker failed (no result): lead the next flight
+        return await compute()  # Waited long enough, compute it here
+
+    async def _follow(self, key: str, lock_key: str, deadline: float) -> Optional[str]:
+        """Result of the flight another worker leads, None if it ends without one."""
+        owner = None
+        while time.monotonic() < deadline:
+            current = await self._store(self.store.get(lock_key))
+            owner = current or owner
+            if owner is not None:
+                # Published before the lock is released
+                encoded = await self._store(self.store.get(f"singleflight:{key}:{owner}"))
+                if encoded is not None:
+                    return encoded
+            if current is None:
+                return None
+            await asyncio.sleep(self.poll_interval)
+        return None
+
+    async def _publish(self, key: str, flight_id: str, result: Any) -> None:
+        encoded = json.dumps(jsonable_encoder(result), separators=(",", ":"))
+        await self.store.set(f"singleflight:{key}:{flight_id}", encoded, self.result_ttl)
+
+    @staticmethod
+    async def _quietly(operation: Awaitable) -> None:
+        """Store writes after the computation: a failure must not fail (or rerun) it."""
+        try:
+            await operation
+        except Exception as exc:
+            logger.warning("Single-flight store write failed: %s", exc)
+
+    @staticmethod
+    async def _store(operation: Awaitable) -> Any:
+        try:
+            return await operation
+        except Exception as exc:
+            raise _StoreUnavailable() from exc
+
+    def clear(self) -> None:
+        self._flights.clear()
+        self.stats = {"leaders": 0, "followers": 0, "remote_followers": 0}
+
+
+class _StoreUnavailable(Exception):
+    pass
+
+
+def _default_store():
+    if not settings.SINGLE_FLIGHT_REDIS:
+        return None
+    try:
+        return RedisFlightStore(settings.REDIS_URL)
+    except ImportError:
+        logger.warning("SINGLE_FLIGHT_REDIS is set but the redis package is not installed")
+        return None
+
+
+flights = SingleFlight(store=_default_store())
+
+
+def _data_version(organization_id) -> int:
+    from app.db.data_versions import organization_data_version
+    from app.db.session import engine
+
+    with engine.connect() as connection:
+        return organization_data_version(connection, organization_id)
+
+
+def single_flight(wait_seconds: Optional[float] = None, organization_param: str = "current_user",
+                  exclude: Tuple[str, ...] = ("db",)):
+    """Coalesce concurrent identical calls of an endpoint of the caller's organization.
+
+    The key is the endpoint, the organization of `organization_param` and its
+    data version, and the other parameters (dependencies in `exclude` left
+    out). Followers of other workers wait up to `wait_seconds`
+    (SINGLE_FLIGHT_WAIT_SECONDS by default) before computing the result
+    themselves. A plain `def` endpoint runs in
+    the threadpool.
+    """
+
+    def decorator(endpoint):
+        is_async = inspect.iscoroutinefunction(endpoint)
+        name = f"{endpoint.__module__}.{endpoint.__qualname__}"
+
+        async def call(kwargs):
+            if is_async:
+                return await endpoint(**kwargs)
+            return await run_in_threadpool(endpoint, **kwargs)
+
+        @functools.wraps(endpoint)
+        async def wrapper(**kwargs):
+            if not settings.SINGLE_FLIGHT_ENABLED:
+                return await call(kwargs)
+            organization_id = getattr(kwargs.get(organization_param), "organization_id", None)
+            params = sorted((param, str(value)) for param, value in kwargs.items()
+                            if param != organization_param and param not in exclude)
+            version = request_data_version()  # Read by conditional_get, else read here
+            if version is None and organization_id:
+                version = await run_in_threadpool(_data_version, organization_id)
+            key = f"{name}:{organization_id}@{version}:{params}"
+            wait = settings.SINGLE_FLIGHT_WAIT_SECONDS if wait_seconds is None else wait_seconds
+            return await flights.do(key, lambda: call(kwargs), wait)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,115 @@
+"""
+In-memory token state shared by every request of a worker.
+
+- VerifiedTokenCache: bounded LRU of JWTs whose signature has already been
+  verified, so hot tokens skip the HMAC check until they expire.
+- TokenDenylist: revoked token ids (logout) and per-user revocation cutoffs
+  (deactivation, password change). Entries only live as long as the access
+  tokens they target, which keeps the structure small.
+"""
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, Optional, Tuple
+
+
+class VerifiedTokenCache:
+    """LRU of verified JWT payloads keyed by the token signature."""
+
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, Tuple[str, dict]]" = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, token: str) -> Optional[dict]:
+        """Return the cached payload for a token, or None on miss/expiry."""
+        signing_input, _, signature = token.rpartition(".")
+        with self._lock:
+            entry = self._entries.get(signature)
+            if entry is None:
+                return None
+            cached_input, payload = entry
+            # The signature only vouches for the exact header.payload it signed
+            if cached_input != signing_input:
+                return None
+            exp = payload.get("exp")
+            if exp is not None and exp <= time.time():
+                del self._entries[signature]
+                return None
+            self._entries.move_to_end(signature)
+            return payload
+
+    def put(self, token: str, payload: dict) -> None:
+        signing_input, _, signature = token.rpartition(".")
+        with self._lock:
+            self._entries[signature] = (signing_input, payload)
+            self._entries.move_to_end(signature)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class TokenDenylist:
+    """Revoked access tokens, by jti or by user issued-before cutoff."""
+
+    def __init__(self, ttl_seconds: int):
+        # Nothing issued before now - ttl can still be valid, so older
+        # revocations can be forgotten.
+        self.ttl_seconds = ttl_seconds
+        self._revoked_jtis: Dict[str, float] = {}
+        self._user_cutoffs: Dict[str, float] = {}
+        self._lock = Lock()
+        self._next_prune = 0.0
+
+    def revoke_token(self, jti: str, expires_at: Optional[float] = None) -> None:
+        """Revoke a single access token until its expiry."""
+        with self._lock:
+            self._revoked_jtis[jti] = expires_at or (time.time() + self.ttl_seconds)
+
+    def revoke_user(self, user_id: str) -> None:
+        """Revoke every access token issued to a user up to now."""
+        with self._lock:
+            self._user_cutoffs[str(user_id)] = time.time()
+
+    def is_revoked(self, payload: dict) -> bool:
+        now = time.time()
+        if now >= self._next_prune:
+            self._prune(now)
+
+        jti = payload.get("jti")
+        if jti is not None and jti in self._revoked_jtis:
+            return True
+
+        cutoff = self._user_cutoffs.get(str(payload.get("sub")))
+        if cutoff is not None:
+            issued_at = payload.get("iat")
+            # Tokens without iat predate this mechanism: treat them as old
+            if issued_at is None or issued_at <= cutoff:
+                return True
+        return False
+
+    def clear(self) -> None:
+        with self._lock:
+            self._revoked_jtis.clear()
+            self._user_cutoffs.clear()
+
+    def _prune(self, now: float) -> None:
+        with self._lock:
+            self._revoked_jtis = {
+                jti: exp for jti, exp in self._revoked_jtis.items() if exp > now
+            }
+            horizon = now - self.ttl_seconds
+            self._user_cutoffs = {
+                user_id: cutoff for user_id, cutoff in self._user_cutoffs.items()
+                if cutoff > horizon
+            }
+            self._next_prune = now + 60
+
+    def __len__(self) -> int:
+        return len(self._revoked_jtis) + len(self._user_cutoffs)
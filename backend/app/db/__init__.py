@@ -1,3 +1,3 @@
-from app.db.session import Base, engine, get_db, SessionLocal
+from app.db.session import Base, engine, replica_engine, get_db, SessionLocal, ReadSessionLocal, get_read_session
 
-__all__ = ["Base", "engine", "get_db", "SessionLocal"]
+__all__ = ["Base", "engine", "replica_engine", "get_db", "SessionLocal", "ReadSessionLocal", "get_read_session"]
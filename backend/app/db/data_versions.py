@@ -0,0 +1,238 @@
+"""
+Per-organization data versions.
+
+Every transaction that writes data of an organization increments
+organizations.data_version (and sets data_updated_at) before it commits, in
+the same transaction, so the version is shared by every worker and never
+runs ahead of the data. Conditional GET (app.core.http_cache) derives the
+ETag and Last-Modified of responses from it.
+
+The organizations of a transaction are the one of the session's user (set
+by get_current_user through `session.info["organization_id"]`) plus those
+of the written rows that carry an organization_id (or are organizations).
+Once it committed, `on_commit` gets them with the written tables (live
+updates, app.core.live_events).
+
+The same commit journals the rows it wrote of the SYNCED_TABLES in
+sync_changes, at the organization's new version (its change sequence):
+the delta sync of the field clients (app.services.sync) returns the rows
+journaled after the client's last sequence. Rows of the user's organization
+or carrying their own are journaled; writes outside a request (scripts) are
+not, and reach the clients with their next full sync. A bulk UPDATE or
+DELETE of a synced table cannot be journaled row by row: it journals a
+reset (RESET) that sends the organization's clients back to a full sync.
+
+Derived data is left out: the columns declared with info={"derived": True}
+(figures recomputed from the other data and the day, such as the feed
+supply plan) and the statements executed with the "derived" execution
+option. Storing them does not change the version, so reads may store them.
+"""
+import itertools
+from datetime import datetime
+from typing import Callable, Iterable, Optional, Set, Tuple
+
+import sqlalchemy as sa
+from sqlalchemy import event
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.db.types import GUID
+
+organizations = sa.table(
+    "organizations",
+    sa.column("id", GUID()),
+    sa.column("data_version", sa.Integer),
+    sa.column("data_updated_at", sa.DateTime),
+)
+users = sa.table("users", sa.column("id", GUID()), sa.column("organization_id", GUID()), sa.column("is_active", sa.Boolean))
+sync_changes = sa.table(
+    "sync_changes",
+    sa.column("id", sa.Integer),
+    sa.column("organization_id", GUID()),
+    sa.column("seq", sa.Integer),
+    sa.column("entity", sa.String),
+    sa.column("entity_id", GUID()),
+    sa.column("deleted", sa.Boolean),
+    sa.column("changed_at", sa.DateTime),
+)
+
+# Tables of the delta sync, in the order clients apply them (parents first)
+SYNCED_TABLES = (
+    "sites", "buildings", "lots",
+    "egg_productions", "weight_records", "mortalities", "feed_consumptions", "water_consumptions",
+)
+# Entity of the reset entries (entity_id is the organization)
+RESET = "*"
+
+
+def _changed_organizations(session, objects) -> set:
+    changed = session.info.setdefault("changed_organizations", set())
+    tables = session.info.setdefault("changed_tables", set())
+    for obj in objects:
+        table = getattr(obj, "__tablename__", None)
+        tables.add(table)
+        if table == "organizations":
+            changed.add(obj.id)
+        elif getattr(obj, "organization_id", None) is not None:
+            changed.add(obj.organization_id)
+    return changed
+
+
+def _derived_only(obj) -> bool:
+    """Whether an updated row only changed derived columns (or nothing)."""
+    state = sa.inspect(obj)
+    for attr in state.attrs:
+        if not attr.history.has_changes():
+            continue
+        prop = state.mapper.attrs[attr.key]
+        columns = getattr(prop, "columns", None)
+        if not columns or not all(column.info.get("derived") for column in columns):
+            return False
+    return True
+
+
+def _journal(session, objects, deleted: bool = False) -> None:
+    journal = session.info.setdefault("sync_journal", {})
+    for obj in objects:
+        table = getattr(obj, "__tablename__", None)
+        if table not in SYNCED_TABLES or obj.id is None:
+            continue
+        organization_id = getattr(obj, "organization_id", None) or session.info.get("organization_id")
+        if organization_id is not None:
+            journal[(table, obj.id)] = (organization_id, deleted)
+
+
+def _journal_bulk_write(orm_execute_state, table: str) -> None:
+    session = orm_execute_state.session
+    organization_id = session.info.get("organization_id")
+    if organization_id is None:
+        return
+    journal = session.info.setdefault("sync_journal", {})
+    parameters = orm_execute_state.parameters
+    rows = parameters if isinstance(parameters, (list, tuple)) else [parameters] if parameters else []
+    if orm_execute_state.is_insert and rows and all(row.get("id") is not None for row in rows):
+        for row in rows:
+            journal[(table, row["id"])] = (row.get("organization_id") or organization_id, False)
+    else:
+        journal[(RESET, organization_id)] = (organization_id, False)
+
+
+def _write_journal(session, journal: dict, versions: dict) -> None:
+    """Upsert the last change of each journaled row at its organization's new version."""
+    now = datetime.utcnow()
+    rows = [
+        {"organization_id": organization_id, "seq": versions[str(organization_id)], "entity": entity,
+         "entity_id": entity_id, "deleted": deleted, "changed_at": now}
+        for (entity, entity_id), (organization_id, deleted) in journal.items()
+        if str(organization_id) in versions
+    ]
+    if not rows:
+        return
+    options = {"data_version": True}
+    dialect = {"postgresql": postgresql, "sqlite": sqlite}.get(session.get_bind().dialect.name)
+    if dialect is not None:
+        statement = dialect.insert(sync_changes)
+        statement = statement.on_conflict_do_update(
+            index_elements=["entity", "entity_id"],
+            set_={name: statement.excluded[name] for name in ("organization_id", "seq", "deleted", "changed_at")},
+        )
+        session.execute(statement, rows, execution_options=options)
+    else:
+        session.execute(sync_changes.delete().where(sync_changes.c.entity_id.in_([row["entity_id"] for row in rows])),
+                        execution_options=options)
+        session.execute(sync_changes.insert(), rows, execution_options=options)
+
+
+def track_data_versions(session_factory,
+                        on_commit: Optional[Callable[[Iterable, Set[str]], None]] = None) -> None:
+    """Bump the data version of the organizations written by each transaction.
+
+    `on_commit(organization_ids, tables)` runs after the commit of each of them.
+    """
+
+    @event.listens_for(session_factory, "after_flush")
+    def _collect_flushed(session, flush_context):
+        dirty = [obj for obj in session.dirty if not _derived_only(obj)]
+        if not (session.new or dirty or session.deleted):
+            return
+        session.info["data_changed"] = True
+        _changed_organizations(session, itertools.chain(session.new, dirty, session.deleted))
+        _journal(session, itertools.chain(session.new, dirty))
+        _journal(session, session.deleted, deleted=True)
+
+    @event.listens_for(session_factory, "do_orm_execute")
+    def _collect_bulk_write(orm_execute_state):
+        options = orm_execute_state.execution_options
+        if options.get("data_version") or options.get("derived"):
+            return
+        if orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert:
+            orm_execute_state.session.info["data_changed"] = True
+            table = getattr(getattr(orm_execute_state.statement, "table", None), "name", None)
+            if table is not None:
+                orm_execute_state.session.info.setdefault("changed_tables", set()).add(table)
+            if table in SYNCED_TABLES:
+                _journal_bulk_write(orm_execute_state, table)
+
+    @event.listens_for(session_factory, "before_commit")
+    def _bump(session):
+        if session.in_nested_transaction():
+            return  # Savepoint release: the outermost commit bumps once
+        # Flushed here rather than by the commit so that the journal has the ids of the new rows
+        if session.new or session.dirty or session.deleted:
+            session.flush()
+        if not session.info.get("data_changed"):
+            return
+        changed = session.info.setdefault("changed_organizations", set())
+        if session.info.get("organization_id") is not None:
+            changed.add(session.info["organization_id"])
+        journal = session.info.get("sync_journal")
+        if journal:
+            changed.update(organization_id for organization_id, _ in journal.values())
+        if not changed:
+            return
+        statement = (
+            organizations.update()
+            .where(organizations.c.id.in_(sorted(changed, key=str)))
+            .values(data_version=organizations.c.data_version + 1, data_updated_at=datetime.utcnow())
+        )
+        if not journal:
+            session.execute(statement, execution_options={"data_version": True})
+            return
+        versions = session.execute(
+            statement.returning(organizations.c.id, organizations.c.data_version),
+            execution_options={"data_version": True},
+        ).all()
+        _write_journal(session, journal, {str(organization_id): version for organization_id, version in versions})
+
+    if on_commit is not None:
+        @event.listens_for(session_factory, "after_commit")
+        def _notify(session):
+            changed = session.info.get("changed_organizations")
+            if changed:
+                on_commit(set(changed), set(session.info.get("changed_tables", ())))
+
+    # Forgotten when the outermost transaction ends (commit, whose own flush
+    # collects again, or rollback); savepoints keep them for their parent
+    @event.listens_for(session_factory, "after_transaction_end")
+    def _reset(session, transaction):
+        if transaction.parent is None:
+            session.info.pop("data_changed", None)
+            session.info.pop("changed_organizations", None)
+            session.info.pop("changed_tables", None)
+            session.info.pop("sync_journal", None)
+
+
+def user_data_version(connection, user_id) -> Optional[Tuple[object, int, Optional[datetime]]]:
+    """(organization id, data version, data updated at) of an active user's organization."""
+    row = connection.execute(
+        sa.select(organizations.c.id, organizations.c.data_version, organizations.c.data_updated_at)
+        .select_from(users.join(organizations, organizations.c.id == users.c.organization_id))
+        .where(users.c.id == user_id, users.c.is_active == True)
+    ).first()
+    return tuple(row) if row is not None else None
+
+
+def organization_data_version(connection, organization_id) -> int:
+    """Current data version of an organization (0 before its first write)."""
+    return connection.execute(
+        sa.select(organizations.c.data_version).where(organizations.c.id == organization_id)
+    ).scalar() or 0
@@ -0,0 +1,168 @@
+"""
+Engine construction driven by settings.
+
+Builds the primary (and optional read-replica) engines with tuned pooling,
+per-connection setup (SQLite pragmas, PostgreSQL statement timeout) and
+pool metrics for monitoring.
+"""
+import time
+from threading import Lock
+from typing import Dict, Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+
+
+class PoolMetrics:
+    """Counters for one connection pool.
+
+    Gauges (size, checked out, overflow) are read live from the pool; wait
+    time is accumulated by InstrumentedQueuePool on every checkout.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.pool = None
+        self.checkouts = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+        self._lock = Lock()
+
+    def record_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.wait_time_total += seconds
+            if seconds > self.wait_time_max:
+                self.wait_time_max = seconds
+
+    def snapshot(self) -> Dict:
+        pool = self.pool
+        data = {
+            "name": self.name,
+            "pool_class": type(pool).__name__ if pool is not None else None,
+            "connects": self.connects,
+            "invalidations": self.invalidations,
+            "checkouts": self.checkouts,
+            "wait_time_total_ms": round(self.wait_time_total * 1000, 3),
+            "wait_time_max_ms": round(self.wait_time_max * 1000, 3),
+            "wait_time_avg_ms": round(self.wait_time_total * 1000 / self.checkouts, 3) if self.checkouts else 0.0,
+        }
+        if isinstance(pool, QueuePool):
+            data.update({
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),
+                "max_overflow": pool._max_overflow,
+            })
+        return data
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection."""
+
+    metrics: Optional[PoolMetrics] = None
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            if self.metrics is not None:
+                self.metrics.record_wait(time.perf_counter() - start)
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        if self.metrics is not None:
+            self.metrics.pool = pool
+        return pool
+
+
+# Metrics of every engine built by this module, by role ("primary", "replica")
+pool_metrics: Dict[str, PoolMetrics] = {}
+
+
+def is_sqlite(url: str) -> bool:
+    return url.startswith("sqlite")
+
+
+def _sqlite_pragmas(settings) -> Dict[str, object]:
+    pragmas = {
+        "journal_mode": settings.SQLITE_JOURNAL_MODE,
+        "synchronous": settings.SQLITE_SYNCHRONOUS,
+        "busy_timeout": settings.SQLITE_BUSY_TIMEOUT_MS,
+        # Negative cache_size is in KiB rather than pages
+        "cache_size": -settings.SQLITE_CACHE_SIZE_KB,
+        "mmap_size": settings.SQLITE_MMAP_SIZE_MB * 1024 * 1024,
+    }
+    return {name: value for name, value in pragmas.items() if value not in (None, "")}
+
+
+def build_engine(url: str, settings, role: str = "primary") -> Engine:
+    """Create an engine for `url` tuned from settings and register its metrics."""
+    metrics = PoolMetrics(role)
+    in_memory_sqlite = is_sqlite(url) and (":memory:" in url or url.rstrip("/") == "sqlite:")
+
+    kwargs = {"pool_pre_ping": settings.DB_POOL_PRE_PING}
+    if is_sqlite(url):
+        kwargs["connect_args"] = {
+            "check_same_thread": False,
+            "timeout": settings.SQLITE_BUSY_TIMEOUT_MS / 1000,
+        }
+    if not in_memory_sqlite:
+        kwargs.update(
+            poolclass=InstrumentedQueuePool,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+        )
+
+    engine = create_engine(url, **kwargs)
+    if isinstance(engine.pool, InstrumentedQueuePool):
+        engine.pool.metrics = metrics
+    metrics.pool = engine.pool
+
+    if is_sqlite(url):
+        pragmas = {} if in_memory_sqlite else _sqlite_pragmas(settings)
+
+        @event.listens_for(engine, "connect")
+        def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+            metrics.connects += 1
+            cursor = dbapi_connection.cursor()
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+            cursor.close()
+    else:
+        statement_timeout = settings.DB_STATEMENT_TIMEOUT_MS
+
+        @event.listens_for(engine, "connect")
+        def _apply_session_settings(dbapi_connection, connection_record):
+            metrics.connects += 1
+            if statement_timeout:
+                cursor = dbapi_connection.cursor()
+                cursor.execute(f"SET statement_timeout = {int(statement_timeout)}")
+                cursor.close()
+                # Keep the SET out of the first transaction's scope
+                dbapi_connection.commit()
+
+    @event.listens_for(engine, "invalidate")
+    def _count_invalidation(dbapi_connection, connection_record, exception):
+        metrics.invalidations += 1
+
+    if settings.METRICS_ENABLED:
+        from app.core.metrics import instrument_engine
+
+        instrument_engine(engine)
+
+    pool_metrics[role] = metrics
+    return engine
+
+
+def get_pool_metrics() -> Dict[str, Dict]:
+    """Snapshot of the pool metrics of every configured engine."""
+    return {role: metrics.snapshot() for role, metrics in pool_metrics.items()}
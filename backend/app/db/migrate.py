@@ -0,0 +1,133 @@
+"""
+Schema migrations (Alembic) for BravoPoultry.
+
+Apply pending revisions once per deploy, before the new workers start:
+
+    python -m app.db.migrate upgrade          # to head
+    python -m app.db.migrate current          # revision of the database
+    python -m app.db.migrate check            # exit code 1 when behind head
+    python -m app.db.migrate downgrade <rev>
+    python -m app.db.migrate stamp <rev>
+
+Workers never create or alter tables; at startup they only compare the
+database revision with the head revision (see `check_schema`). That check
+reads revision ids straight from the version files and the alembic_version
+table, so workers do not pay for importing Alembic.
+"""
+import os
+import re
+import sys
+from typing import Optional, Tuple
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+ALEMBIC_INI = os.path.join(BACKEND_DIR, "alembic.ini")
+VERSIONS_DIR = os.path.join(BACKEND_DIR, "migrations", "versions")
+
+_REVISION_RE = re.compile(r"^revision\s*=\s*['\"](\w+)['\"]", re.MULTILINE)
+_DOWN_REVISION_RE = re.compile(r"^down_revision\s*=\s*(.+)$", re.MULTILINE)
+
+
+def alembic_config(connection=None):
+    from alembic.config import Config
+
+    config = Config(ALEMBIC_INI)
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "migrations"))
+    if connection is not None:
+        config.attributes["connection"] = connection
+        config.attributes["configure_logger"] = False
+    return config
+
+
+def head_revision() -> Optional[str]:
+    """Head of the (linear) revision chain, read from the version files."""
+    revisions, parents = set(), set()
+    for filename in os.listdir(VERSIONS_DIR):
+        if not filename.endswith(".py"):
+            continue
+        with open(os.path.join(VERSIONS_DIR, filename)) as f:
+            source = f.read()
+        revision = _REVISION_RE.search(source)
+        if revision is None:
+            continue
+        revisions.add(revision.group(1))
+        down_revision = _DOWN_REVISION_RE.search(source)
+        if down_revision:
+            parents.update(re.findall(r"['\"](\w+)['\"]", down_revision.group(1)))
+    heads = revisions - parents
+    if len(heads) > 1:
+        raise RuntimeError(f"Multiple migration heads: {sorted(heads)}")
+    return heads.pop() if heads else None
+
+
+def current_revision(engine: Engine) -> Optional[str]:
+    with engine.connect() as connection:
+        if not inspect(connection).has_table("alembic_version"):
+            return None
+        return connection.execute(text("SELECT version_num FROM alembic_version")).scalar()
+
+
+def check_schema(engine: Engine) -> Tuple[Optional[str], Optional[str]]:
+    """Return (database revision, head revision) without touching the schema."""
+    return current_revision(engine), head_revision()
+
+
+def upgrade(engine: Engine, revision: str = "head") -> None:
+    """Apply migrations up to `revision`.
+
+    Works on fresh databases and on legacy ones built by create_all: the
+    early revisions only add what is missing.
+    """
+    from alembic import command
+
+    with engine.begin() as connection:
+        command.upgrade(alembic_config(connection), revision)
+
+
+def downgrade(engine: Engine, revision: str) -> None:
+    from alembic import command
+
+    with engine.begin() as connection:
+        command.downgrade(alembic_config(connection), revision)
+
+
+def stamp(engine: Engine, revision: str = "head") -> None:
+    from alembic import command
+
+    with engine.begin() as connection:
+        command.stamp(alembic_config(connection), revision)
+
+
+def main(argv=None) -> int:
+    from app.db.session import engine
+
+    args = list(sys.argv[1:] if argv is None else argv)
+    action = args[0] if args else "upgrade"
+
+    if action == "upgrade":
+        upgrade(engine, args[1] if len(args) > 1 else "head")
+        print(f"Database upgraded to revision {current_revision(engine)}")
+    elif action == "downgrade":
+        if len(args) < 2:
+            print("Usage: python -m app.db.migrate downgrade <revision>")
+            return 2
+        downgrade(engine, args[1])
+        print(f"Database downgraded to revision {current_revision(engine) or 'none'}")
+    elif action == "stamp":
+        stamp(engine, args[1] if len(args) > 1 else "head")
+        print(f"Database stamped at revision {current_revision(engine)}")
+    elif action in ("current", "check"):
+        current, head = check_schema(engine)
+        print(f"Database revision: {current or 'none'} (head: {head})")
+        if action == "check" and current != head:
+            return 1
+    else:
+        print(__doc__)
+        return 2
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
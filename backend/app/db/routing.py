@@ -0,0 +1,105 @@
+"""
+Read/write session routing.
+
+Read-heavy endpoints use `get_read_db` (see app.api.deps), which prefers the
+replica. A user who just committed a write is pinned to the primary for
+READ_YOUR_WRITES_SECONDS so they never see their own data lag behind.
+"""
+import time
+from threading import Lock
+from typing import Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+
+class RecentWriteTracker:
+    """Per-user "recently wrote" markers with a short expiry."""
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._markers: Dict[str, float] = {}
+        self._lock = Lock()
+
+    def mark(self, user_id: str) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._markers[str(user_id)] = now + self.ttl_seconds
+            if len(self._markers) > 1024:
+                self._markers = {uid: exp for uid, exp in self._markers.items() if exp > now}
+
+    def has_recent_write(self, user_id: Optional[str]) -> bool:
+        if user_id is None:
+            return False
+        expires_at = self._markers.get(str(user_id))
+        return expires_at is not None and expires_at > time.monotonic()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._markers.clear()
+
+
+class ReplicaHealth:
+    """Remembers a failed replica for a while so reads go to the primary."""
+
+    def __init__(self, retry_after_seconds: float = 30):
+        self.retry_after_seconds = retry_after_seconds
+        self._down_until = 0.0
+
+    @property
+    def available(self) -> bool:
+        return time.monotonic() >= self._down_until
+
+    def mark_down(self) -> None:
+        self._down_until = time.monotonic() + self.retry_after_seconds
+
+    def reset(self) -> None:
+        self._down_until = 0.0
+
+
+def track_writes(session_factory, tracker: RecentWriteTracker) -> None:
+    """Mark the session's user as a recent writer whenever it commits changes.
+
+    The user is attached by get_current_user through `session.info["user_id"]`.
+    """
+
+    @event.listens_for(session_factory, "after_flush")
+    def _flagged_flush(session, flush_context):
+        session.info["has_writes"] = True
+
+    @event.listens_for(session_factory, "do_orm_execute")
+    def _flagged_bulk_write(orm_execute_state):
+        if orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert:
+            orm_execute_state.session.info["has_writes"] = True
+
+    @event.listens_for(session_factory, "after_commit")
+    def _mark_writer(session):
+        if session.info.pop("has_writes", False):
+            user_id = session.info.get("user_id")
+            if user_id is not None:
+                tracker.mark(user_id)
+
+    @event.listens_for(session_factory, "after_rollback")
+    def _discard_writes(session):
+        session.info.pop("has_writes", None)
+
+
+def open_read_session(
+    primary_factory,
+    replica_factory,
+    replica_health: ReplicaHealth,
+    force_primary: bool,
+) -> Session:
+    """Open a session on the replica when possible, otherwise on the primary."""
+    if replica_factory is None or force_primary or not replica_health.available:
+        return primary_factory()
+
+    db = replica_factory()
+    try:
+        db.connection()  # Checks out (and pre-pings) a replica connection now
+    except DBAPIError:
+        db.close()
+        replica_health.mark_down()
+        return primary_factory()
+    return db
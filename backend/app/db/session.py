@@ -1,25 +1,34 @@
-from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
 from app.core.config import settings
+from app.core.live_events import publish_changes
+from app.db.engine import build_engine
+from app.db.data_versions import track_data_versions
+from app.db.routing import RecentWriteTracker, ReplicaHealth, track_writes, open_read_session
 
-# Create engine - configure based on database type
-if settings.DATABASE_URL.startswith("sqlite"):
-    engine = create_engine(
-        settings.DATABASE_URL,
-        connect_args={"check_same_thread": False}
-    )
-else:
-    engine = create_engine(
-        settings.DATABASE_URL,
-        pool_pre_ping=True,
-        pool_size=10,
-        max_overflow=20
-    )
+# Create engines - pooling, pragmas and timeouts come from settings
+engine = build_engine(settings.DATABASE_URL, settings, role="primary")
+replica_engine = (
+    build_engine(settings.DATABASE_REPLICA_URL, settings, role="replica")
+    if settings.DATABASE_REPLICA_URL else None
+)
 
-# Create session factory
+# Create session factories (read sessions fall back to the primary)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = (
+    sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
+    if replica_engine is not None else None
+)
+
+# Read-your-writes: users who just committed are routed to the primary
+recent_writes = RecentWriteTracker(ttl_seconds=settings.READ_YOUR_WRITES_SECONDS)
+replica_health = ReplicaHealth()
+track_writes(SessionLocal, recent_writes)
+
+# Per-organization data versions, behind the ETag of GET responses, and
+# the live update notifications of the committed writes
+track_data_versions(SessionLocal, on_commit=publish_changes)
 
 # Base class for models
 Base = declarative_base()
@@ -32,3 +41,13 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def get_read_session(user_id=None):
+    """Open a read-only session: replica unless unavailable or the user just wrote."""
+    return open_read_session(
+        SessionLocal,
+        ReadSessionLocal,
+        replica_health,
+        force_primary=recent_writes.has_recent_write(user_id),
+    )
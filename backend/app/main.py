@@ -1,17 +1,31 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from contextlib import asynccontextmanager
+import secrets
 
 from app.core.config import settings
 from app.api import api_router
-from app.db.session import engine, Base
+from app.core.http_cache import HTTPCacheMiddleware
+from app.core.metrics import MetricsMiddleware, render_prometheus
+from app.core.profiling import ProfilingMiddleware
+from app.core.query_budgets import QUERY_BUDGETS
+from app.db.session import engine
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup: Create tables
-    Base.metadata.create_all(bind=engine)
-    print("Database tables created")
+    # Startup: schema is managed by Alembic, workers only check the revision
+    from app.db import migrate
+
+    if settings.DB_MIGRATE_ON_STARTUP:
+        migrate.upgrade(engine)
+    current, head = migrate.check_schema(engine)
+    if current != head:
+        print(f"WARNING: database at revision {current or 'none'}, code expects {head}. "
+              f"Run: python -m app.db.migrate upgrade")
+    else:
+        print(f"Database schema at revision {current}")
     print(f"CORS Origins: {settings.cors_origins_list}")
     yield
     # Shutdown
@@ -38,6 +52,19 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# On-demand profiling of superuser requests (inside the metrics, which count the statements)
+if settings.METRICS_ENABLED and settings.PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+
+# Compression and conditional GET validators (outside the profiling, which rewrites the body)
+if settings.COMPRESSION_ENABLED or settings.CONDITIONAL_GET_ENABLED:
+    app.add_middleware(HTTPCacheMiddleware)
+
+# Request metrics (outermost, so CORS and routing are timed too)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware, budgets=QUERY_BUDGETS,
+                       capture_statements=settings.QUERY_BUDGET_STATEMENTS)
+
 # Include API router
 app.include_router(api_router, prefix=settings.API_V1_PREFIX)
 
@@ -57,6 +84,16 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics(request: Request):
+    """Prometheus metrics of this worker, for scrapers holding METRICS_TOKEN (not served without one)."""
+    if not settings.METRICS_ENABLED or not settings.METRICS_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not secrets.compare_digest(request.headers.get("authorization", ""), f"Bearer {settings.METRICS_TOKEN}"):
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
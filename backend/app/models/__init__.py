@@ -4,12 +4,18 @@ from app.models.site import Site, SiteMember
 from app.models.building import Building, Section
 from app.models.lot import Lot, LotStats
 from app.models.production import EggProduction, WeightRecord, Mortality
-from app.models.feed import FeedConsumption, WaterConsumption, FeedStock
+from app.models.feed import FeedConsumption, WaterConsumption, FeedStock, FeedStockMovement
 from app.models.health import HealthEvent, VaccinationSchedule
-from app.models.finance import Sale, Expense, Client, Supplier
+from app.models.finance import Sale, Expense, ExpenseCategoryDefinition, Client, Supplier
 from app.models.alert import Alert, AlertConfig
 from app.models.invitation import Invitation
 from app.models.email_verification import EmailVerificationToken
+from app.models.password_reset import PasswordResetToken
+from app.models.refresh_token import RefreshToken
+from app.models.breed_standard import BreedStandard
+from app.models.sequence import NumberSequence
+from app.models.egg_inventory import EggStock, EggStockMovement
+from app.models.sync import SyncChange
 
 __all__ = [
     "User",
@@ -18,10 +24,16 @@ __all__ = [
     "Building", "Section",
     "Lot", "LotStats",
     "EggProduction", "WeightRecord", "Mortality",
-    "FeedConsumption", "WaterConsumption", "FeedStock",
+    "FeedConsumption", "WaterConsumption", "FeedStock", "FeedStockMovement",
     "HealthEvent", "VaccinationSchedule",
-    "Sale", "Expense", "Client", "Supplier",
+    "Sale", "Expense", "ExpenseCategoryDefinition", "Client", "Supplier",
     "Alert", "AlertConfig",
     "Invitation",
     "EmailVerificationToken",
+    "PasswordResetToken",
+    "RefreshToken",
+    "BreedStandard",
+    "NumberSequence",
+    "EggStock", "EggStockMovement",
+    "SyncChange",
 ]
@@ -0,0 +1,34 @@
+import uuid
+from datetime import datetime
+from sqlalchemy import Column, String, DateTime, ForeignKey, Text, JSON, UniqueConstraint
+
+from app.db.session import Base
+from app.db.types import GUID
+
+
+class BreedStandard(Base):
+    """Organization-specific breed standard curves.
+
+    Overrides (or adds to) the built-in standards of app.services.standards
+    for the organization's lots of that breed. `curves` maps metric names
+    (weight_g, feed_g, water_ml, laying_rate, laying_rate_min,
+    laying_rate_max) to {"unit", "interpolation", "points"} specs.
+    """
+    __tablename__ = "breed_standards"
+    __table_args__ = (
+        UniqueConstraint("organization_id", "breed_key", name="uq_breed_standards_org_breed"),
+    )
+
+    id = Column(GUID(), primary_key=True, default=uuid.uuid4)
+    organization_id = Column(GUID(), ForeignKey("organizations.id", ondelete="CASCADE"), nullable=False, index=True)
+
+    breed = Column(String(100), nullable=False)  # Display name, e.g. "Kuroiler"
+    breed_key = Column(String(100), nullable=False)  # Normalized name used for lookups
+    lot_type = Column(String(20), nullable=True)  # "broiler", "layer"
+
+    curves = Column(JSON, nullable=False)
+    notes = Column(Text, nullable=True)
+
+    created_by = Column(GUID(), ForeignKey("users.id"), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
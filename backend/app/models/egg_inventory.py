@@ -0,0 +1,66 @@
+import uuid
+from datetime import datetime, date
+from sqlalchemy import Column, String, Integer, DateTime, Date, ForeignKey, Text, Enum, UniqueConstraint
+from sqlalchemy.orm import relationship
+import enum
+
+from app.db.session import Base
+from app.db.types import GUID
+
+
+class EggMovementType(str, enum.Enum):
+    PRODUCTION = "production"  # Oeufs vendables collectes
+    SALE = "sale"  # Vente plateaux/cartons
+    BREAKAGE = "breakage"  # Casse, pertes
+    ADJUSTMENT = "adjustment"  # Ajustement inventaire
+
+
+class EggStock(Base):
+    """Running balance of eggs in store at a site, per grade."""
+    __tablename__ = "egg_stocks"
+    __table_args__ = (
+        UniqueConstraint("site_id", "grade", name="uq_egg_stocks_site_grade"),
+    )
+
+    id = Column(GUID(), primary_key=True, default=uuid.uuid4)
+    organization_id = Column(GUID(), ForeignKey("organizations.id", ondelete="CASCADE"), nullable=False, index=True)
+    site_id = Column(GUID(), ForeignKey("sites.id", ondelete="CASCADE"), nullable=False)
+    grade = Column(String(20), nullable=False, default="standard")
+
+    # Balance and cumulated movements, in eggs
+    quantity = Column(Integer, nullable=False, default=0)
+    total_produced = Column(Integer, nullable=False, default=0)
+    total_sold = Column(Integer, nullable=False, default=0)
+    total_lost = Column(Integer, nullable=False, default=0)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Relationships
+    site = relationship("Site")
+
+
+class EggStockMovement(Base):
+    """Every change of an egg stock (positive in, negative out)."""
+    __tablename__ = "egg_stock_movements"
+
+    id = Column(GUID(), primary_key=True, default=uuid.uuid4)
+    stock_id = Column(GUID(), ForeignKey("egg_stocks.id", ondelete="CASCADE"), nullable=False, index=True)
+
+    movement_type = Column(Enum(EggMovementType), nullable=False)
+    quantity = Column(Integer, nullable=False)
+    balance_after = Column(Integer, nullable=False)
+
+    # Source record, so edits of it are booked as corrections
+    egg_production_id = Column(GUID(), ForeignKey("egg_productions.id", ondelete="SET NULL"), nullable=True, index=True)
+    sale_id = Column(GUID(), ForeignKey("sales.id", ondelete="SET NULL"), nullable=True, index=True)
+    lot_id = Column(GUID(), ForeignKey("lots.id"), nullable=True)
+
+    date = Column(Date, default=date.today)
+    notes = Column(Text, nullable=True)
+
+    recorded_by = Column(GUID(), ForeignKey("users.id"), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    # Relationships
+    stock = relationship("EggStock", backref="movements")
@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime, date
-from sqlalchemy import Column, String, Integer, DateTime, Date, ForeignKey, Numeric, Text, Enum
+from sqlalchemy import Column, String, Integer, DateTime, Date, ForeignKey, Numeric, Text, Enum, JSON
 from sqlalchemy.orm import relationship
 import enum
 
@@ -53,6 +53,7 @@ class FeedConsumption(Base):
 
     recorded_by = Column(GUID(), ForeignKey("users.id"), nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Relationships
     lot = relationship("Lot", back_populates="feed_consumptions")
@@ -87,6 +88,7 @@ class WaterConsumption(Base):
 
     recorded_by = Column(GUID(), ForeignKey("users.id"), nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Relationships
     lot = relationship("Lot", back_populates="water_consumptions")
@@ -118,6 +120,17 @@ class FeedStock(Base):
     last_restock_date = Column(Date, nullable=True)
     supplier_name = Column(String(100), nullable=True)
 
+    # Supply plan (see services/feed_planner.py): projected daily demand (kg)
+    # of the lots this stock serves, starting the day after planned_on, and
+    # the depletion and reorder figures derived from it and the balance;
+    # derived data, left out of the data version (app.db.data_versions)
+    planned_on = Column(Date, nullable=True, info={"derived": True})
+    demand_profile = Column(JSON, nullable=True, info={"derived": True})
+    daily_demand_kg = Column(Numeric(12, 2), nullable=True, info={"derived": True})
+    depletion_date = Column(Date, nullable=True, info={"derived": True})
+    reorder_date = Column(Date, nullable=True, info={"derived": True})
+    reorder_quantity_kg = Column(Numeric(12, 2), nullable=True, info={"derived": True})
+
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime, date
-from sqlalchemy import Column, String, Integer, DateTime, Date, ForeignKey, Numeric, Text, Enum, Boolean, JSON
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, Integer, DateTime, Date, ForeignKey, Numeric, Text, Enum, Boolean, JSON, Index
+from sqlalchemy.orm import relationship, validates
 import enum
 
 from app.db.session import Base
@@ -95,9 +95,76 @@ class ExpenseCategory(str, enum.Enum):
     OTHER = "other"
 
 
+# Canonical expense categories (id -> label)
+EXPENSE_CATEGORY_LABELS = {
+    "feed": "Aliment",
+    "chicks": "Poussins",
+    "veterinary": "Veterinaire",
+    "labor": "Main d'oeuvre",
+    "energy": "Energie",
+    "water": "Eau",
+    "transport": "Transport",
+    "packaging": "Emballage",
+    "equipment": "Equipement",
+    "maintenance": "Entretien",
+    "rent": "Loyer",
+    "insurance": "Assurance",
+    "taxes": "Impots et taxes",
+    "other": "Autre",
+}
+
+# Other spellings of the categories (legacy enum values, French names), lowercase;
+# expenses are normalized with them on write (canonical_expense_category)
+EXPENSE_CATEGORY_ALIASES = {
+    "medicine": "veterinary",
+    "salary": "labor",
+    "utilities": "energy",
+    "aliment": "feed",
+    "aliments": "feed",
+    "alimentation": "feed",
+    "poussins": "chicks",
+    "veterinaire": "veterinary",
+    "medicaments": "veterinary",
+    "vaccins": "veterinary",
+    "salaires": "labor",
+    "main d'oeuvre": "labor",
+    "electricite": "energy",
+    "energie": "energy",
+    "carburant": "energy",
+    "eau": "water",
+    "emballage": "packaging",
+    "equipement": "equipment",
+    "entretien": "maintenance",
+    "loyer": "rent",
+    "assurance": "insurance",
+    "impots": "taxes",
+    "autre": "other",
+}
+
+
+def canonical_expense_category(value) -> str:
+    """Category id of a category as typed; unknown categories are 'other'."""
+    key = (getattr(value, "value", value) or "").strip().lower()
+    if key in EXPENSE_CATEGORY_LABELS:
+        return key
+    return EXPENSE_CATEGORY_ALIASES.get(key, "other")
+
+
+class ExpenseCategoryDefinition(Base):
+    """Expense category dimension: canonical categories reports group by."""
+    __tablename__ = "expense_categories"
+
+    id = Column(String(50), primary_key=True)
+    label = Column(String(100), nullable=False)
+    sort_order = Column(Integer, nullable=False, default=0)
+
+
 class Expense(Base):
     """Expense records."""
     __tablename__ = "expenses"
+    __table_args__ = (
+        Index("ix_expenses_category_date", "category_id", "date"),
+    )
 
     id = Column(GUID(), primary_key=True, default=uuid.uuid4)
 
@@ -105,7 +172,8 @@ class Expense(Base):
     site_id = Column(GUID(), ForeignKey("sites.id"), nullable=True)
 
     date = Column(Date, nullable=False)
-    category = Column(String(50), nullable=False)  # Using String for flexibility with legacy values
+    category = Column(String(50), nullable=False)  # As typed; canonical id when it is a known category
+    category_id = Column(String(50), ForeignKey("expense_categories.id", name="fk_expenses_category_id"), nullable=True)  # Normalized on write
 
     description = Column(String(500), nullable=True)
     quantity = Column(Numeric(12, 2), nullable=True)
@@ -128,7 +196,7 @@ class Expense(Base):
     notes = Column(Text, nullable=True)
 
     # Split tracking - if this expense was created from splitting another lot
-    from_split_lot_id = Column(GUID(), ForeignKey("lots.id"), nullable=True)
+    from_split_lot_id = Column(GUID(), ForeignKey("lots.id"), nullable=True, index=True)
     original_expense_id = Column(GUID(), ForeignKey("expenses.id"), nullable=True)
 
     recorded_by = Column(GUID(), ForeignKey("users.id"), nullable=True)
@@ -139,6 +207,13 @@ class Expense(Base):
     site = relationship("Site", back_populates="expenses")
     supplier = relationship("Supplier", back_populates="expenses")
 
+    @validates("category")
+    def _normalize_category(self, key, value):
+        self.category_id = canonical_expense_category(value)
+        if self.category_id != "other" or (value or "").strip().lower() == "other":
+            return self.category_id
+        return value.strip() if value else value
+
 
 class Client(Base):
     """Client/customer records."""
@@ -90,7 +90,7 @@ class VaccinationSchedule(Base):
     id = Column(GUID(), primary_key=True, default=uuid.uuid4)
 
     # Target - can be global (lot_id=NULL) or per-lot
-    lot_id = Column(GUID(), ForeignKey("lots.id", ondelete="CASCADE"), nullable=True)
+    lot_id = Column(GUID(), ForeignKey("lots.id", ondelete="CASCADE"), nullable=True, index=True)
     breed = Column(String(100), nullable=True)  # NULL = all breeds
     lot_type = Column(String(20), nullable=True)  # "broiler", "layer", or NULL for all
 
@@ -112,7 +112,7 @@ class VaccinationSchedule(Base):
     notes = Column(Text, nullable=True)
 
     # Program info (for lot-specific schedules)
-    program_id = Column(String(50), nullable=True)  # e.g., "broiler_standard"
+    program_id = Column(String(50), nullable=True, index=True)  # e.g., "broiler_standard"
 
     # System vs user-defined
     is_system = Column(Boolean, default=False)  # System = predefined
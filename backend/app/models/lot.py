@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime, date
-from sqlalchemy import Column, String, Integer, DateTime, Date, ForeignKey, Boolean, Numeric, Text, Enum
+from sqlalchemy import Column, String, Integer, DateTime, Date, ForeignKey, Boolean, Numeric, Text, Enum, JSON
 from sqlalchemy.orm import relationship
 import enum
 
@@ -67,7 +67,7 @@ class Lot(Base):
     notes = Column(Text, nullable=True)
 
     # Split lot tracking
-    parent_lot_id = Column(GUID(), ForeignKey("lots.id"), nullable=True)
+    parent_lot_id = Column(GUID(), ForeignKey("lots.id"), nullable=True, index=True)
     split_date = Column(Date, nullable=True)  # Date when this lot was split from parent
     split_ratio = Column(Numeric(5, 4), nullable=True)  # Ratio of parent (e.g., 0.4000 = 40%)
 
@@ -138,15 +138,20 @@ class LotStats(Base):
     total_water_liters = Column(Numeric(12, 2), default=0)
     water_feed_ratio = Column(Numeric(4, 2), nullable=True)
 
-    # Financial
-    total_expenses = Column(Numeric(14, 2), default=0)
-    total_sales = Column(Numeric(14, 2), default=0)
-    gross_margin = Column(Numeric(14, 2), default=0)
-    cost_per_kg = Column(Numeric(10, 2), nullable=True)
-    cost_per_egg = Column(Numeric(10, 4), nullable=True)
+    # Financial (derived data, left out of the data version: app.db.data_versions)
+    total_expenses = Column(Numeric(14, 2), default=0, info={"derived": True})
+    total_sales = Column(Numeric(14, 2), default=0, info={"derived": True})
+    gross_margin = Column(Numeric(14, 2), default=0, info={"derived": True})
+    cost_per_kg = Column(Numeric(10, 2), nullable=True, info={"derived": True})
+    cost_per_egg = Column(Numeric(10, 4), nullable=True, info={"derived": True})
 
     # Performance score (0-100)
-    performance_score = Column(Numeric(5, 2), nullable=True)
+    performance_score = Column(Numeric(5, 2), nullable=True, info={"derived": True})
+
+    # Financial summary as served by /lots/{id}/financial-summary
+    # (see app.services.lot_financials)
+    financial_snapshot = Column(JSON, nullable=True, info={"derived": True})
+    financials_updated_at = Column(DateTime, nullable=True, info={"derived": True})
 
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, Enum, Text
+from sqlalchemy import Column, String, DateTime, Enum, Integer, Text
 from sqlalchemy.orm import relationship
 import enum
 
@@ -39,6 +39,11 @@ class Organization(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    # Bumped by every transaction writing data of the organization (app.db.data_versions);
+    # the ETag / Last-Modified of its GET responses derive from it
+    data_version = Column(Integer, nullable=False, default=0, server_default="0")
+    data_updated_at = Column(DateTime, nullable=True)
+
     # Relationships
     users = relationship("User", back_populates="organization")
     sites = relationship("Site", back_populates="organization")
@@ -55,6 +55,7 @@ class EggProduction(Base):
 
     recorded_by = Column(GUID(), ForeignKey("users.id"), nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Relationships
     lot = relationship("Lot", back_populates="egg_productions")
@@ -107,6 +108,7 @@ class WeightRecord(Base):
 
     recorded_by = Column(GUID(), ForeignKey("users.id"), nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Relationships
     lot = relationship("Lot", back_populates="weight_records")
@@ -153,6 +155,7 @@ class Mortality(Base):
 
     recorded_by = Column(GUID(), ForeignKey("users.id"), nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Relationships
     lot = relationship("Lot", back_populates="mortalities")
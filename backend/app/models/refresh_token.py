@@ -0,0 +1,54 @@
+import uuid
+import hashlib
+import secrets
+from datetime import datetime, timedelta
+from sqlalchemy import Column, String, Boolean, DateTime, ForeignKey
+from sqlalchemy.orm import relationship, backref
+
+from app.db.session import Base
+from app.db.types import GUID
+
+
+class RefreshToken(Base):
+    """Server-side refresh token.
+
+    Only a SHA-256 hash of the token is stored. Tokens are single use: each
+    refresh revokes the presented token and issues a new one in the same
+    family, so replaying a rotated token reveals theft and revokes the family.
+    """
+    __tablename__ = "refresh_tokens"
+
+    id = Column(GUID(), primary_key=True, default=uuid.uuid4)
+    user_id = Column(GUID(), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    family_id = Column(GUID(), nullable=False, index=True)
+    token_hash = Column(String(64), unique=True, index=True, nullable=False)
+    is_revoked = Column(Boolean, default=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False)
+
+    # Relationships
+    user = relationship("User", backref=backref("refresh_tokens", cascade="all, delete-orphan"))
+
+    @staticmethod
+    def hash_token(raw_token: str) -> str:
+        return hashlib.sha256(raw_token.encode("utf-8")).hexdigest()
+
+    @classmethod
+    def create_token(cls, user_id: uuid.UUID, expires_days: int, family_id: uuid.UUID = None):
+        """Create a refresh token. Returns (model, raw_token); only the hash is persisted."""
+        raw_token = secrets.token_urlsafe(48)
+        token = cls(
+            user_id=user_id,
+            family_id=family_id or uuid.uuid4(),
+            token_hash=cls.hash_token(raw_token),
+            expires_at=datetime.utcnow() + timedelta(days=expires_days)
+        )
+        return token, raw_token
+
+    @property
+    def is_expired(self) -> bool:
+        return datetime.utcnow() > self.expires_at
+
+    @property
+    def is_valid(self) -> bool:
+        return not self.is_revoked and not self.is_expired
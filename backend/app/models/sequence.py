@@ -0,0 +1,28 @@
+import uuid
+from datetime import datetime
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, UniqueConstraint
+
+from app.db.session import Base
+from app.db.types import GUID
+
+
+class NumberSequence(Base):
+    """Last number issued per organization, prefix and year.
+
+    Backs lot codes (LC/LP), invoice numbers (FAC) and delivery notes (BL).
+    Numbers are taken with an atomic increment of `last_value` (see
+    app.services.sequences), never by counting existing rows.
+    """
+    __tablename__ = "number_sequences"
+    __table_args__ = (
+        UniqueConstraint("organization_id", "prefix", "year", name="uq_number_sequences_org_prefix_year"),
+    )
+
+    id = Column(GUID(), primary_key=True, default=uuid.uuid4)
+    organization_id = Column(GUID(), ForeignKey("organizations.id", ondelete="CASCADE"), nullable=False)
+
+    prefix = Column(String(20), nullable=False)
+    year = Column(Integer, nullable=False)
+    last_value = Column(Integer, nullable=False, default=0)
+
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
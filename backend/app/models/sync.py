@@ -0,0 +1,31 @@
+from datetime import datetime
+from sqlalchemy import Column, String, Integer, DateTime, Boolean, ForeignKey, Index, UniqueConstraint
+
+from app.db.session import Base
+from app.db.types import GUID
+
+
+class SyncChange(Base):
+    """Last change of each synced row, in its organization's change sequence.
+
+    One row per entity (upserted at each change, see app.db.data_versions),
+    `deleted` for the tombstones of removed rows. `seq` is the organization's
+    data_version of the commit; GET /sync returns the rows changed after the
+    client's last seq. The "*" entity marks bulk writes that could not be
+    journaled row by row: clients past it download everything again.
+    """
+    __tablename__ = "sync_changes"
+    __table_args__ = (
+        UniqueConstraint("entity", "entity_id", name="uq_sync_changes_entity"),
+        Index("ix_sync_changes_org_seq", "organization_id", "seq", "id"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    organization_id = Column(GUID(), ForeignKey("organizations.id", ondelete="CASCADE"), nullable=False)
+    seq = Column(Integer, nullable=False)
+
+    entity = Column(String(50), nullable=False)  # Table name
+    entity_id = Column(GUID(), nullable=False)
+    deleted = Column(Boolean, nullable=False, default=False)
+
+    changed_at = Column(DateTime, default=datetime.utcnow)
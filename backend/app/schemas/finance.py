@@ -100,6 +100,7 @@ class ExpenseResponse(ExpenseBase):
     lot_id: Optional[UUID] = None
     lot_code: Optional[str] = None  # For display
     site_id: Optional[UUID] = None
+    category_id: Optional[str] = None  # Canonical category
     supplier_id: Optional[UUID] = None
     payment_date: Optional[date] = None
     receipt_url: Optional[str] = None
@@ -0,0 +1,68 @@
+from pydantic import BaseModel, Field, field_validator
+from typing import Optional, List, Dict, Tuple, Literal
+from uuid import UUID
+from datetime import datetime
+
+# Metric names of app.services.standards.data
+MetricName = Literal["weight_g", "feed_g", "water_ml", "laying_rate", "laying_rate_min", "laying_rate_max"]
+
+
+class CurveSpec(BaseModel):
+    unit: Literal["day", "week"] = "day"
+    interpolation: Literal["linear", "step"] = "linear"
+    points: List[Tuple[int, float]] = Field(..., min_length=1)  # (age, value)
+
+    @field_validator("points")
+    @classmethod
+    def check_points(cls, points):
+        ages = [age for age, _ in points]
+        if min(ages) < 0:
+            raise ValueError("Les ages doivent etre positifs")
+        if len(set(ages)) != len(ages):
+            raise ValueError("Un age ne peut apparaitre qu'une fois")
+        return sorted(points)
+
+
+class BreedStandardCreate(BaseModel):
+    breed: str = Field(..., min_length=1, max_length=100)
+    lot_type: Optional[Literal["broiler", "layer"]] = None
+    curves: Dict[MetricName, CurveSpec]
+    notes: Optional[str] = None
+
+
+class BreedStandardUpdate(BaseModel):
+    lot_type: Optional[Literal["broiler", "layer"]] = None
+    curves: Optional[Dict[MetricName, CurveSpec]] = None
+    notes: Optional[str] = None
+
+
+class BreedStandardResponse(BaseModel):
+    id: UUID
+    breed: str
+    breed_key: str
+    lot_type: Optional[str] = None
+    curves: Dict[str, CurveSpec]
+    notes: Optional[str] = None
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class StandardSummary(BaseModel):
+    key: str
+    name: str
+    lot_type: Optional[str] = None
+    metrics: List[str]
+    is_custom: bool = False
+
+
+class StandardCurveResponse(BaseModel):
+    key: str
+    name: str
+    lot_type: Optional[str] = None
+    is_custom: bool = False
+    unit: Literal["day", "week"]
+    ages: List[int]
+    series: Dict[str, List[float]]
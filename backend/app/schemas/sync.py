@@ -0,0 +1,62 @@
+from pydantic import BaseModel
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from app.schemas.feed import FeedConsumptionCreate, WaterConsumptionCreate
+from app.schemas.production import EggProductionCreate, WeightRecordCreate, MortalityCreate
+
+
+# Download
+class SyncBatch(BaseModel):
+    columns: List[str] = []
+    rows: List[List[Any]] = []
+    deleted: List[UUID] = []
+
+
+class SyncPage(BaseModel):
+    seq: int
+    reset: bool
+    has_more: bool
+    cursor: Optional[str] = None
+    changes: Dict[str, SyncBatch]
+
+
+# Upload: daily entries recorded offline, with the id generated by the client
+class EggProductionUpload(EggProductionCreate):
+    id: UUID
+
+
+class WeightRecordUpload(WeightRecordCreate):
+    id: UUID
+
+
+class MortalityUpload(MortalityCreate):
+    id: UUID
+
+
+class FeedConsumptionUpload(FeedConsumptionCreate):
+    id: UUID
+
+
+class WaterConsumptionUpload(WaterConsumptionCreate):
+    id: UUID
+
+
+class SyncUpload(BaseModel):
+    egg_productions: List[EggProductionUpload] = []
+    weight_records: List[WeightRecordUpload] = []
+    mortalities: List[MortalityUpload] = []
+    feed_consumptions: List[FeedConsumptionUpload] = []
+    water_consumptions: List[WaterConsumptionUpload] = []
+
+
+class SyncRejection(BaseModel):
+    entity: str
+    id: UUID
+    detail: str
+
+
+class SyncUploadResult(BaseModel):
+    applied: List[UUID] = []
+    duplicates: List[UUID] = []  # Already recorded (a retried upload)
+    rejected: List[SyncRejection] = []
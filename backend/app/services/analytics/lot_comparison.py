@@ -0,0 +1,191 @@
+"""
+Lot Comparison - Side-by-side comparison of many lots.
+
+Lots and their pre-calculated stats are fetched in one query. Daily series
+are fetched per table as (lot_id, date, value) rows already grouped by day
+in SQL, then aligned on age in days with NumPy, so flocks placed at
+different dates (and ages) line up on the same x axis.
+"""
+
+from datetime import date
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models.building import Building
+from app.models.feed import FeedConsumption
+from app.models.lot import Lot, LotStats, LotStatus
+from app.models.production import EggProduction, WeightRecord, Mortality
+from app.models.site import Site
+
+# Comparable metrics and the LotStats column each one reads
+STAT_METRICS = {
+    "total_mortality": LotStats.total_mortality,
+    "mortality_rate": LotStats.mortality_rate,
+    "total_eggs": LotStats.total_eggs,
+    "laying_rate": LotStats.average_laying_rate,
+    "peak_laying_rate": LotStats.peak_laying_rate,
+    "eggs_per_hen": LotStats.eggs_per_hen_housed,
+    "current_weight_g": LotStats.current_weight_g,
+    "daily_gain_g": LotStats.daily_gain_g,
+    "uniformity": LotStats.uniformity,
+    "total_feed_kg": LotStats.total_feed_kg,
+    "fcr": LotStats.feed_conversion_ratio,
+    "feed_per_egg": LotStats.feed_per_egg,
+    "total_water_liters": LotStats.total_water_liters,
+    "water_feed_ratio": LotStats.water_feed_ratio,
+    "total_expenses": LotStats.total_expenses,
+    "total_sales": LotStats.total_sales,
+    "gross_margin": LotStats.gross_margin,
+    "cost_per_kg": LotStats.cost_per_kg,
+    "cost_per_egg": LotStats.cost_per_egg,
+    "performance_score": LotStats.performance_score,
+}
+DEFAULT_METRICS = ["mortality_rate", "fcr", "laying_rate", "gross_margin", "performance_score"]
+# Metrics a lot without stats reports as 0, as the comparison always did (the others are null)
+ZERO_WITHOUT_STATS = {"mortality_rate", "laying_rate", "gross_margin"}
+
+# Per-age series: weight (g), laying rate (%), cumulative mortality (% of
+# initial birds) and feed per bird (g/bird/day)
+SERIES = ("weight", "laying_rate", "cumulative_mortality", "feed_per_bird")
+
+MAX_AGE_DAYS = 1000
+
+
+def _to_list(values: np.ndarray, digits: int = 2) -> List[Optional[float]]:
+    rounded = values.round(digits)
+    return [None if np.isnan(v) else v for v in rounded.tolist()]
+
+
+class LotComparisonService:
+    """Metrics and age-aligned series of many lots."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_lots(self, lot_ids: Sequence, organization_id, metrics: Sequence[str]):
+        """Lots of the organization with the requested stats columns, in one query."""
+        columns = [STAT_METRICS[name].label(name) for name in metrics]
+        rows = self.db.query(Lot, *columns).outerjoin(
+            LotStats, LotStats.lot_id == Lot.id
+        ).join(Building, Lot.building_id == Building.id).join(Site).filter(
+            Lot.id.in_(lot_ids),
+            Lot.status != LotStatus.DELETED,
+            Site.organization_id == organization_id
+        ).all()
+
+        order = {str(lot_id): i for i, lot_id in enumerate(lot_ids)}
+        return sorted(rows, key=lambda row: order.get(str(row[0].id), len(order)))
+
+    def _daily_rows(self, model, value_expr, lot_ids):
+        """(lot_id, date, value) grouped by lot and day."""
+        return self.db.query(
+            model.lot_id, model.date, value_expr
+        ).filter(model.lot_id.in_(lot_ids)).group_by(model.lot_id, model.date).all()
+
+    def _align(self, rows, lot_index: Dict[str, int], placement: np.ndarray, max_age: int):
+        """Scatter (lot_id, date, value) rows into a lots x ages matrix, NaN elsewhere.
+
+        Returns the matrix and the highest age seen.
+        """
+        matrix = np.full((len(lot_index), max_age + 1), np.nan)
+        if not rows:
+            return matrix, -1
+        lot_rows = np.array([lot_index[str(row[0])] for row in rows], dtype=np.int64)
+        ordinals = np.array([row[1].toordinal() for row in rows], dtype=np.int64)
+        values = np.array([np.nan if row[2] is None else float(row[2]) for row in rows])
+
+        ages = ordinals - placement[lot_rows]
+        keep = (ages >= 0) & (ages <= max_age)
+        matrix[lot_rows[keep], ages[keep]] = values[keep]
+        return matrix, int(ages[keep].max()) if keep.any() else -1
+
+    def get_series(self, lots: List[Lot], series: Sequence[str], max_age: int = MAX_AGE_DAYS) -> Dict:
+        """Per-age series of each lot. Age 0 is the hatch day."""
+        lot_ids = [lot.id for lot in lots]
+        lot_index = {str(lot.id): i for i, lot in enumerate(lots)}
+        # Ordinal of each lot's hatch day: age = date ordinal - hatch ordinal
+        placement = np.array([
+            lot.placement_date.toordinal() - (lot.age_at_placement or 0) for lot in lots
+        ], dtype=np.int64)
+        initial = np.array([float(lot.initial_quantity or 0) for lot in lots])
+
+        matrices: Dict[str, np.ndarray] = {}
+        highest_age = -1
+
+        if "weight" in series:
+            rows = self._daily_rows(WeightRecord, func.avg(WeightRecord.average_weight_g), lot_ids)
+            matrices["weight"], top = self._align(rows, lot_index, placement, max_age)
+            highest_age = max(highest_age, top)
+
+        if "laying_rate" in series:
+            rows = self._daily_rows(EggProduction, func.avg(EggProduction.laying_rate), lot_ids)
+            matrices["laying_rate"], top = self._align(rows, lot_index, placement, max_age)
+            highest_age = max(highest_age, top)
+
+        if "cumulative_mortality" in series or "feed_per_bird" in series:
+            rows = self._daily_rows(Mortality, func.sum(Mortality.quantity), lot_ids)
+            deaths, top = self._align(rows, lot_index, placement, max_age)
+            cumulative_deaths = np.cumsum(np.nan_to_num(deaths), axis=1)
+            if "cumulative_mortality" in series:
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    matrices["cumulative_mortality"] = np.where(
+                        initial[:, None] > 0, cumulative_deaths / initial[:, None] * 100, np.nan
+                    )
+                highest_age = max(highest_age, top)
+
+            if "feed_per_bird" in series:
+                rows = self._daily_rows(FeedConsumption, func.sum(FeedConsumption.quantity_kg), lot_ids)
+                feed_kg, top = self._align(rows, lot_index, placement, max_age)
+                # Birds alive at the start of the day
+                alive = initial[:, None] - np.hstack([np.zeros((len(lots), 1)), cumulative_deaths[:, :-1]])
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    matrices["feed_per_bird"] = np.where(alive > 0, feed_kg * 1000 / alive, np.nan)
+                highest_age = max(highest_age, top)
+
+        if "cumulative_mortality" in matrices:
+            # Only report cumulative mortality while the lot is in place
+            last_age = np.array([
+                (lot.actual_end_date or date.today()).toordinal() for lot in lots
+            ], dtype=np.int64) - placement
+            matrices["cumulative_mortality"][np.arange(max_age + 1)[None, :] > last_age[:, None]] = np.nan
+
+        length = max(highest_age, 0) + 1
+        return {
+            "ages": list(range(length)),
+            **{
+                name: {str(lot.id): _to_list(matrix[i, :length]) for i, lot in enumerate(lots)}
+                for name, matrix in matrices.items()
+            }
+        }
+
+    def compare(self, lot_ids: Sequence, organization_id, metrics: Optional[Sequence[str]] = None,
+                series: Optional[Sequence[str]] = None, max_age: int = MAX_AGE_DAYS) -> Dict:
+        metrics = list(metrics or DEFAULT_METRICS)
+        rows = self.get_lots(lot_ids, organization_id, metrics)
+        lots = [row[0] for row in rows]
+
+        comparisons = []
+        for row in rows:
+            lot = row[0]
+            entry = {
+                "lot_id": str(lot.id),
+                "code": lot.code,
+                "type": lot.type,
+                "breed": lot.breed,
+                "initial_quantity": lot.initial_quantity,
+                "placement_date": lot.placement_date.isoformat() if lot.placement_date else None,
+                "age_days": lot.age_days,
+            }
+            for name, value in zip(metrics, row[1:]):
+                if value is None and name in ZERO_WITHOUT_STATS:
+                    value = 0
+                entry[name] = round(float(value), 2) if value is not None else None
+            comparisons.append(entry)
+
+        result = {"lots": comparisons, "metrics": metrics}
+        if series and lots:
+            result["series"] = self.get_series(lots, series, max_age)
+        return result
@@ -0,0 +1,156 @@
+"""
+Lot Performance - Columnar computation of a lot's performance report.
+
+Totals come from SQL aggregates (one grouped query per table, mortality
+grouped by cause). Time series are fetched as plain column tuples, never as
+ORM objects, and reduced with NumPy.
+"""
+
+from decimal import Decimal
+from typing import Dict, Optional
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.models.feed import FeedConsumption
+from app.models.finance import Sale, Expense
+from app.models.lot import Lot
+from app.models.production import EggProduction, WeightRecord, Mortality
+
+
+def _column(rows, index: int, dtype=np.float64) -> np.ndarray:
+    """Column of row tuples as an array, NULL as NaN."""
+    return np.array([np.nan if row[index] is None else row[index] for row in rows], dtype=dtype)
+
+
+class LotPerformanceService:
+    """Performance report of one lot without loading its records as ORM objects."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_totals(self, lot_id) -> Dict[str, Decimal]:
+        """Feed, eggs, sales and expense totals of a lot in a single statement."""
+        def total(column, lot_column):
+            return select(func.coalesce(func.sum(column), 0)).where(lot_column == lot_id).scalar_subquery()
+
+        row = self.db.execute(select(
+            total(FeedConsumption.quantity_kg, FeedConsumption.lot_id).label("feed_kg"),
+            total(EggProduction.total_eggs, EggProduction.lot_id).label("eggs"),
+            total(Sale.total_amount, Sale.lot_id).label("sales"),
+            total(Expense.amount, Expense.lot_id).label("expenses"),
+        )).one()
+        return {
+            "feed_kg": Decimal(str(row.feed_kg)),
+            "eggs": int(row.eggs),
+            "sales": Decimal(str(row.sales)),
+            "expenses": Decimal(str(row.expenses)),
+        }
+
+    def get_mortality_by_cause(self, lot_id) -> Dict[str, int]:
+        rows = self.db.query(
+            Mortality.cause, func.sum(Mortality.quantity)
+        ).filter(Mortality.lot_id == lot_id).group_by(Mortality.cause).all()
+
+        by_cause: Dict[str, int] = {}
+        for cause, quantity in rows:
+            key = getattr(cause, "value", cause) or "unknown"
+            by_cause[key] = by_cause.get(key, 0) + int(quantity or 0)
+        return by_cause
+
+    def get_weight_series(self, lot_id):
+        return self.db.query(
+            WeightRecord.date, WeightRecord.average_weight_g, WeightRecord.age_days
+        ).filter(WeightRecord.lot_id == lot_id).order_by(WeightRecord.date).all()
+
+    def get_egg_series(self, lot_id):
+        return self.db.query(
+            EggProduction.date, EggProduction.total_eggs, EggProduction.laying_rate
+        ).filter(EggProduction.lot_id == lot_id).order_by(EggProduction.date).all()
+
+    def get_performance(self, lot: Lot) -> Dict:
+        totals = self.get_totals(lot.id)
+        by_cause = self.get_mortality_by_cause(lot.id)
+        weight_rows = self.get_weight_series(lot.id)
+        egg_rows = self.get_egg_series(lot.id)
+
+        total_mortality = sum(by_cause.values())
+        mortality_rate = (total_mortality / lot.initial_quantity * 100) if lot.initial_quantity else 0
+
+        total_feed_kg = totals["feed_kg"]
+        total_eggs = totals["eggs"]
+        total_sales = totals["sales"]
+
+        # Initial costs
+        initial_cost = Decimal(0)
+        if lot.chick_price_unit and lot.initial_quantity:
+            initial_cost += Decimal(str(lot.chick_price_unit)) * lot.initial_quantity
+        if lot.transport_cost:
+            initial_cost += Decimal(str(lot.transport_cost))
+        total_cost = totals["expenses"] + initial_cost
+
+        weights = _column(weight_rows, 1).round(2)
+        egg_rates = _column(egg_rows, 2)
+        egg_rates_rounded = np.nan_to_num(egg_rates).round(2)
+
+        # Feed conversion ratio (for broilers)
+        fcr: Optional[float] = None
+        if lot.type == "broiler" and len(weights) and total_feed_kg > 0:
+            latest_weight = Decimal(str(weight_rows[-1][1] or 0))
+            total_weight_gain_kg = latest_weight * (lot.current_quantity or 0) / 1000
+            if total_weight_gain_kg > 0:
+                fcr = float(total_feed_kg / total_weight_gain_kg)
+
+        # Average laying rate (for layers), over days with a recorded rate
+        avg_laying_rate: Optional[float] = None
+        if lot.type == "layer":
+            recorded = egg_rates[np.nan_to_num(egg_rates) != 0]
+            if len(recorded):
+                avg_laying_rate = float(recorded.mean())
+
+        weight_values = weights.tolist()
+        rate_values = egg_rates_rounded.tolist()
+
+        return {
+            "lot": {
+                "id": str(lot.id),
+                "code": lot.code,
+                "type": lot.type,
+                "breed": lot.breed,
+                "initial_quantity": lot.initial_quantity,
+                "current_quantity": lot.current_quantity,
+                "age_days": lot.age_days,
+                "status": lot.status
+            },
+            "mortality": {
+                "total": total_mortality,
+                "rate": round(mortality_rate, 2),
+                "by_cause": dict(sorted(by_cause.items(), key=lambda item: item[1], reverse=True))
+            },
+            "feed": {
+                "total_kg": float(round(total_feed_kg, 2)),
+                "fcr": round(fcr, 2) if fcr else None
+            },
+            "production": {
+                "total_eggs": total_eggs,
+                "average_laying_rate": round(avg_laying_rate, 2) if avg_laying_rate else None,
+                "eggs_per_hen": float(round(Decimal(total_eggs) / lot.initial_quantity, 2)) if lot.initial_quantity else 0
+            },
+            "financial": {
+                "total_sales": float(round(total_sales, 2)),
+                "total_expenses": float(round(total_cost, 2)),
+                "gross_margin": float(round(total_sales - total_cost, 2)),
+                "cost_per_bird": float(round(total_cost / lot.initial_quantity, 2)) if lot.initial_quantity else 0
+            },
+            "charts": {
+                "weight_progression": [
+                    {"date": row[0].isoformat(), "weight": weight_values[i], "age_days": row[2]}
+                    for i, row in enumerate(weight_rows)
+                ],
+                "egg_production": [
+                    {"date": row[0].isoformat(), "total": row[1], "rate": rate_values[i]}
+                    for i, row in enumerate(egg_rows)
+                ]
+            }
+        }
@@ -0,0 +1,156 @@
+"""
+Dependency Census - How many dependent rows of each kind an entity has.
+
+Each entity type (lot, building, site, organization) declares its
+dependents as a table, the column pointing at the owner (reached through
+joins if needed) and filters. A census of any number of owners is one
+statement: a UNION ALL of one grouped COUNT per dependent kind. When only
+a yes/no answer is needed, `has_any` asks for EXISTS of each kind instead,
+so the database stops at the first row found.
+
+Used by the deletion guards (lots, buildings, sites) and the admin data
+size reports.
+"""
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from sqlalchemy import String, cast, exists, func, literal, or_, select, union_all
+from sqlalchemy.orm import Session, aliased
+
+from app.models.building import Building
+from app.models.feed import FeedConsumption, WaterConsumption
+from app.models.finance import Sale, Expense
+from app.models.health import HealthEvent
+from app.models.lot import Lot, LotStatus
+from app.models.production import EggProduction, WeightRecord, Mortality
+from app.models.site import Site
+from app.models.user import User
+
+
+class Dependent:
+    """Rows of `model` counted against the owner id in `owner`."""
+
+    def __init__(self, name: str, model, owner, joins: Sequence = (), filters: Sequence = ()):
+        self.name = name
+        self.model = model
+        self.owner = owner
+        self.joins = joins  # (target, onclause, is_outer)
+        self.filters = filters
+
+    def _from(self):
+        source = self.model.__table__
+        for target, onclause, is_outer in self.joins:
+            source = source.join(target, onclause, isouter=is_outer)
+        return source
+
+    def count_query(self, owner_ids: List):
+        return select(
+            cast(literal(self.name), String(50)).label("kind"),
+            self.owner.label("owner_id"),
+            func.count().label("total")
+        ).select_from(self._from()).where(
+            self.owner.in_(owner_ids), *self.filters
+        ).group_by(self.owner)
+
+    def exists_clause(self, owner_id):
+        return exists(select(literal(1)).select_from(self._from()).where(self.owner == owner_id, *self.filters))
+
+
+# Production and finance rows recorded against a lot, named as in the
+# deletion warnings
+LOT_DATA = (
+    ("ventes", Sale),
+    ("depenses", Expense),
+    ("production_oeufs", EggProduction),
+    ("pesees", WeightRecord),
+    ("mortalites", Mortality),
+    ("consommation_aliment", FeedConsumption),
+    ("consommation_eau", WaterConsumption),
+    ("evenements_sante", HealthEvent),
+)
+
+_LIVE_LOT = Lot.status != LotStatus.DELETED
+
+
+def _organization_dependents() -> List[Dependent]:
+    lot_building = (Building, Lot.building_id == Building.id, False)
+    building_site = (Site, Building.site_id == Site.id, False)
+    dependents = [
+        Dependent("utilisateurs", User, User.organization_id),
+        Dependent("sites", Site, Site.organization_id),
+        Dependent("batiments", Building, Site.organization_id, joins=[building_site]),
+        Dependent("lots", Lot, Site.organization_id, joins=[lot_building, building_site], filters=[_LIVE_LOT]),
+    ]
+    for name, model in LOT_DATA:
+        if model in (Sale, Expense):
+            # Recorded against a site, a lot, or both
+            lot_site = aliased(Site)
+            dependents.append(Dependent(name, model, func.coalesce(Site.organization_id, lot_site.organization_id), joins=[
+                (Site, model.site_id == Site.id, True),
+                (Lot, model.lot_id == Lot.id, True),
+                (Building, Lot.building_id == Building.id, True),
+                (lot_site, Building.site_id == lot_site.id, True),
+            ]))
+        else:
+            dependents.append(Dependent(name, model, Site.organization_id, joins=[
+                (Lot, model.lot_id == Lot.id, False), lot_building, building_site
+            ], filters=[_LIVE_LOT]))
+    return dependents
+
+
+DEPENDENTS: Dict[str, List[Dependent]] = {
+    "lot": [Dependent(name, model, model.lot_id) for name, model in LOT_DATA],
+    "building": [
+        Dependent("lots_actifs", Lot, Lot.building_id, filters=[Lot.status == LotStatus.ACTIVE]),
+        Dependent("lots_autres", Lot, Lot.building_id,
+                  filters=[Lot.status != LotStatus.ACTIVE, _LIVE_LOT]),
+    ],
+    "site": [
+        Dependent("batiments", Building, Building.site_id, filters=[Building.is_active == True]),
+        Dependent("lots_actifs", Lot, Building.site_id,
+                  joins=[(Building, Lot.building_id == Building.id, False)],
+                  filters=[Building.is_active == True, Lot.status == LotStatus.ACTIVE]),
+        Dependent("lots_autres", Lot, Building.site_id,
+                  joins=[(Building, Lot.building_id == Building.id, False)],
+                  filters=[Building.is_active == True, Lot.status != LotStatus.ACTIVE, _LIVE_LOT]),
+    ],
+    "organization": _organization_dependents(),
+}
+
+
+class DependencyCensus:
+    """Dependent row counts of lots, buildings, sites and organizations."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    @staticmethod
+    def _dependents(entity: str, kinds: Optional[Iterable[str]]) -> List[Dependent]:
+        dependents = DEPENDENTS[entity]
+        if kinds is None:
+            return dependents
+        kinds = set(kinds)
+        return [dependent for dependent in dependents if dependent.name in kinds]
+
+    def count_many(self, entity: str, owner_ids: Sequence, kinds: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, int]]:
+        """{owner id: {kind: count}} for every owner, in one statement. Missing kinds count 0."""
+        dependents = self._dependents(entity, kinds)
+        result = {str(owner_id): {dependent.name: 0 for dependent in dependents} for owner_id in owner_ids}
+        if not owner_ids or not dependents:
+            return result
+
+        owner_ids = list(owner_ids)
+        statement = union_all(*[dependent.count_query(owner_ids) for dependent in dependents])
+        for kind, owner_id, total in self.db.execute(statement):
+            if owner_id is not None and str(owner_id) in result:
+                result[str(owner_id)][kind] = int(total)
+        return result
+
+    def count(self, entity: str, owner_id, kinds: Optional[Iterable[str]] = None) -> Dict[str, int]:
+        return self.count_many(entity, [owner_id], kinds)[str(owner_id)]
+
+    def has_any(self, entity: str, owner_id, kinds: Optional[Iterable[str]] = None) -> bool:
+        """Whether the owner has at least one dependent row (of `kinds`)."""
+        dependents = self._dependents(entity, kinds)
+        if not dependents:
+            return False
+        return bool(self.db.execute(select(or_(*[dependent.exists_clause(owner_id) for dependent in dependents]))).scalar())
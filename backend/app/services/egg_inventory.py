@@ -0,0 +1,270 @@
+"""
+Egg Inventory - Running egg balances per site and grade, with a ledger.
+
+Every change of a stock is a movement: sellable eggs collected (daily
+entries, production records), egg sales, breakage and inventory
+adjustments. A balance is changed with one atomic UPDATE ... RETURNING, so
+the stock view and sale-time checks read one row per site whatever the age
+of the farm, and two sales cannot both take the last trays.
+
+Movements keep a reference to their source record (production or sale).
+When a source is edited, it is re-synced: the difference between what it
+should count and what it already booked is recorded as a new movement.
+
+A site's stock is opened by its first write (production, sale, adjustment)
+by booking its production and sales history, so existing farms start from
+the same balance the old produced-minus-sold computation gave; until then
+the stock view reads that history without writing it.
+"""
+from datetime import date
+from typing import Dict, List, Optional
+
+from sqlalchemy import case, func, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.building import Building
+from app.models.egg_inventory import EggStock, EggStockMovement, EggMovementType
+from app.models.finance import Sale, SaleType
+from app.models.lot import Lot, LotStatus, LotType
+from app.models.production import EggProduction
+from app.models.site import Site
+
+EGGS_PER_TRAY = 30
+TRAYS_PER_CARTON = 12
+DEFAULT_GRADE = "standard"
+EGG_SALE_TYPES = (SaleType.EGGS_TRAY, SaleType.EGGS_CARTON)
+
+# Cumulated total of the stock each movement type feeds, and its sign
+_TOTALS = {
+    EggMovementType.PRODUCTION: ("total_produced", 1),
+    EggMovementType.SALE: ("total_sold", -1),
+    EggMovementType.BREAKAGE: ("total_lost", -1),
+}
+
+
+class InsufficientEggStock(Exception):
+    """A movement would take the stock below zero."""
+
+    def __init__(self, available_eggs: int):
+        self.available_eggs = max(0, available_eggs)
+        trays = self.available_eggs // EGGS_PER_TRAY
+        super().__init__(f"Stock insuffisant. Disponible: {trays} plateaux ({trays // TRAYS_PER_CARTON} cartons)")
+
+
+def sale_eggs(sale_type, quantity) -> int:
+    """Eggs in an egg sale of `quantity` trays or cartons (0 for other sales)."""
+    sale_type = SaleType(getattr(sale_type, "value", sale_type)) if sale_type else None
+    if sale_type not in EGG_SALE_TYPES or quantity is None:
+        return 0
+    trays = quantity * TRAYS_PER_CARTON if sale_type == SaleType.EGGS_CARTON else quantity
+    return int(trays) * EGGS_PER_TRAY
+
+
+class EggInventoryService:
+    """Egg stocks of an organization's sites."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    # --- Stocks ---------------------------------------------------------
+
+    def get_stock(self, site_id, grade: str = DEFAULT_GRADE) -> Optional[EggStock]:
+        return self.db.query(EggStock).filter(EggStock.site_id == site_id, EggStock.grade == grade).first()
+
+    def open_stock(self, site_id, organization_id, grade: str = DEFAULT_GRADE, source=None) -> EggStock:
+        """Stock of a site, created from its history on first use.
+
+        `source`, the flushed production or sale being booked, is left out of
+        the history: its own movement follows, checked like any other.
+        """
+        stock = self.get_stock(site_id, grade)
+        if stock is not None:
+            return stock
+        try:
+            with self.db.begin_nested():
+                stock = EggStock(organization_id=organization_id, site_id=site_id, grade=grade,
+                                 quantity=0, total_produced=0, total_sold=0, total_lost=0)
+                self.db.add(stock)
+                self.db.flush()
+                if grade == DEFAULT_GRADE:
+                    self._book_history(stock, source)
+            return stock
+        except IntegrityError:
+            # Opened by a concurrent request
+            return self.get_stock(site_id, grade)
+
+    def preview_stocks(self, organization_id, site_ids: List) -> Dict[str, EggStock]:
+        """{site id: stock} the sites would be opened with now, left out of the session (reads only)."""
+        produced = dict(self._history_productions(site_ids).with_entities(
+            Building.site_id, func.sum(EggProduction.sellable_eggs)
+        ).group_by(Building.site_id).all())
+        sold = dict(self.db.query(
+            Sale.site_id,
+            func.sum(case((Sale.sale_type == SaleType.EGGS_CARTON, Sale.quantity * TRAYS_PER_CARTON),
+                          else_=Sale.quantity))
+        ).filter(Sale.site_id.in_(site_ids), Sale.sale_type.in_(EGG_SALE_TYPES)).group_by(Sale.site_id).all())
+
+        stocks = {}
+        for site_id in site_ids:
+            total_produced = int(produced.get(site_id) or 0)
+            total_sold = int(sold.get(site_id) or 0) * EGGS_PER_TRAY
+            stocks[str(site_id)] = EggStock(
+                organization_id=organization_id, site_id=site_id, grade=DEFAULT_GRADE,
+                quantity=total_produced - total_sold, total_produced=total_produced, total_sold=total_sold,
+                total_lost=0,
+            )
+        return stocks
+
+    def _history_productions(self, site_ids: List):
+        """Production booked by the history: the active layer lots of the sites' active buildings,
+        as the old produced-minus-sold view counted it."""
+        return self.db.query(EggProduction).join(Lot, EggProduction.lot_id == Lot.id).join(
+            Building, Building.id == Lot.building_id
+        ).filter(
+            Building.site_id.in_(site_ids),
+            Building.is_active == True,
+            Lot.type == LotType.LAYER,
+            Lot.status == LotStatus.ACTIVE,
+            EggProduction.sellable_eggs > 0,
+        )
+
+    def _history(self, site_id, source=None) -> List[tuple]:
+        """(day, movement type, eggs, refs) of the history of a site, in booking order."""
+        productions = self._history_productions([site_id]).with_entities(
+            EggProduction.id, EggProduction.lot_id, EggProduction.date, EggProduction.sellable_eggs
+        ).filter(
+            *([EggProduction.id != source.id] if isinstance(source, EggProduction) else [])
+        ).all()
+        sales = self.db.query(Sale.id, Sale.date, Sale.sale_type, Sale.quantity).filter(
+            Sale.site_id == site_id,
+            Sale.sale_type.in_(EGG_SALE_TYPES),
+            *([Sale.id != source.id] if isinstance(source, Sale) else [])
+        ).all()
+
+        entries = [
+            (day, EggMovementType.PRODUCTION, int(eggs), {"egg_production_id": production_id, "lot_id": lot_id})
+            for production_id, lot_id, day, eggs in productions
+        ] + [
+            (day, EggMovementType.SALE, -sale_eggs(sale_type, quantity), {"sale_id": sale_id})
+            for sale_id, day, sale_type, quantity in sales
+        ]
+        entries.sort(key=lambda entry: (entry[0], entry[1] != EggMovementType.PRODUCTION))
+        return entries
+
+    def _book_history(self, stock: EggStock, source=None) -> None:
+        """Book the production and egg sales recorded before the stock existed (but `source`)."""
+        balance = 0
+        for day, movement_type, quantity, refs in self._history(stock.site_id, source):
+            balance += quantity
+            total, sign = _TOTALS[movement_type]
+            setattr(stock, total, getattr(stock, total) + sign * quantity)
+            self.db.add(EggStockMovement(stock_id=stock.id, movement_type=movement_type, quantity=quantity,
+                                         balance_after=balance, date=day, notes="Historique", **refs))
+        stock.quantity = balance
+        self.db.flush()
+
+    # --- Movements ------------------------------------------------------
+
+    def _apply(self, stock: EggStock, quantity: int, movement_type: EggMovementType,
+               check_balance: bool = False, **fields) -> EggStockMovement:
+        """Change a balance atomically and record the movement."""
+        values = {"quantity": EggStock.quantity + quantity}
+        if movement_type in _TOTALS:
+            total, sign = _TOTALS[movement_type]
+            values[total] = getattr(EggStock, total) + sign * quantity
+
+        statement = update(EggStock).where(EggStock.id == stock.id)
+        if check_balance and quantity < 0:
+            statement = statement.where(EggStock.quantity + quantity >= 0)
+        balance = self.db.execute(
+            statement.values(**values).returning(EggStock.quantity).execution_options(synchronize_session=False)
+        ).scalar()
+        self.db.expire(stock)
+        if balance is None:
+            raise InsufficientEggStock(stock.quantity)
+
+        movement = EggStockMovement(stock_id=stock.id, movement_type=movement_type, quantity=quantity,
+                                    balance_after=balance, **fields)
+        self.db.add(movement)
+        return movement
+
+    def _sync(self, ref_column, ref_id, stock: Optional[EggStock], target: int,
+              movement_type: EggMovementType, check_balance: bool = False, **fields) -> None:
+        """Bring what a source record booked to `target` eggs on `stock`.
+
+        Whatever it booked on other stocks (the record moved site) is reversed.
+        """
+        booked = {
+            str(stock_id): int(total or 0)
+            for stock_id, total in self.db.query(
+                EggStockMovement.stock_id, func.sum(EggStockMovement.quantity)
+            ).filter(ref_column == ref_id).group_by(EggStockMovement.stock_id).all()
+        }
+        for stock_id, total in booked.items():
+            if total and (stock is None or stock_id != str(stock.id)):
+                self._apply(self.db.get(EggStock, stock_id), -total, movement_type,
+                            notes="Correction", **fields)
+
+        if stock is not None:
+            delta = target - booked.get(str(stock.id), 0)
+            if delta:
+                self._apply(stock, delta, movement_type, check_balance=check_balance, **fields)
+
+    def _site_of_production(self, production: EggProduction):
+        building_id = production.building_id
+        if production.lot_id:
+            building_id = self.db.query(Lot.building_id).filter(Lot.id == production.lot_id).scalar()
+        if not building_id:
+            return None, None
+        return self.db.query(Building.site_id, Site.organization_id).join(
+            Site, Building.site_id == Site.id
+        ).filter(Building.id == building_id).first() or (None, None)
+
+    def sync_production(self, production: EggProduction, recorded_by=None) -> None:
+        """Book a created or edited production record (flushed) as sellable eggs in store."""
+        site_id, organization_id = self._site_of_production(production)
+        stock = self.open_stock(site_id, organization_id, source=production) if site_id else None
+        self._sync(EggStockMovement.egg_production_id, production.id, stock, int(production.sellable_eggs or 0),
+                   EggMovementType.PRODUCTION, egg_production_id=production.id, lot_id=production.lot_id,
+                   date=production.date, recorded_by=recorded_by)
+
+    def sync_sale(self, sale: Sale, organization_id, check_balance: bool = False, recorded_by=None) -> None:
+        """Book a created or edited sale (flushed). Raises InsufficientEggStock when checked."""
+        eggs = sale_eggs(sale.sale_type, sale.quantity)
+        stock = self.open_stock(sale.site_id, organization_id, source=sale) if sale.site_id and eggs else None
+        self._sync(EggStockMovement.sale_id, sale.id, stock, -eggs, EggMovementType.SALE,
+                   check_balance=check_balance, sale_id=sale.id, date=sale.date, recorded_by=recorded_by)
+
+    def withdraw_lot(self, lot_id) -> None:
+        """Reverse the production of a deleted lot."""
+        productions = self.db.query(EggProduction.id).filter(EggProduction.lot_id == lot_id).all()
+        for production_id, in productions:
+            self._sync(EggStockMovement.egg_production_id, production_id, None, 0,
+                       EggMovementType.PRODUCTION, egg_production_id=production_id, lot_id=lot_id)
+
+    def adjust(self, site_id, organization_id, quantity: int, movement_type: EggMovementType,
+               grade: str = DEFAULT_GRADE, notes: Optional[str] = None, recorded_by=None,
+               day: Optional[date] = None) -> EggStockMovement:
+        """Breakage (quantity < 0) or inventory correction of a stock."""
+        stock = self.open_stock(site_id, organization_id, grade)
+        return self._apply(stock, quantity, movement_type, check_balance=True, notes=notes,
+                           recorded_by=recorded_by, date=day or date.today())
+
+    # --- Reading --------------------------------------------------------
+
+    def balances(self, organization_id, site_ids: Optional[List] = None) -> Dict[str, Dict[str, EggStock]]:
+        """{site id: {grade: stock}} of the organization, in one query."""
+        query = self.db.query(EggStock).filter(EggStock.organization_id == organization_id)
+        if site_ids is not None:
+            query = query.filter(EggStock.site_id.in_(site_ids))
+        result: Dict[str, Dict[str, EggStock]] = {}
+        for stock in query.all():
+            result.setdefault(str(stock.site_id), {})[stock.grade] = stock
+        return result
+
+    def movements(self, site_id, grade: Optional[str] = None, limit: int = 50) -> List[EggStockMovement]:
+        query = self.db.query(EggStockMovement).join(EggStock).filter(EggStock.site_id == site_id)
+        if grade:
+            query = query.filter(EggStock.grade == grade)
+        return query.order_by(EggStockMovement.created_at.desc()).limit(limit).all()
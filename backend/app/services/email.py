@@ -1,9 +1,4 @@
-import smtplib
 import os
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from email.mime.base import MIMEBase
-from email import encoders
 from typing import Optional, List
 import logging
 
@@ -46,6 +41,13 @@ class EmailService:
             logger.warning(f"Email not configured. Would send to {to_email}: {subject}")
             return True  # Return True in dev mode
 
+        # Imported on first send: most workers never send mail
+        import smtplib
+        from email.mime.text import MIMEText
+        from email.mime.multipart import MIMEMultipart
+        from email.mime.base import MIMEBase
+        from email import encoders
+
         try:
             # Use mixed for attachments, alternative for just text/html
             if attachments:
@@ -0,0 +1,274 @@
+"""
+Feed Planner - Depletion dates and reorder quantities per feed stock.
+
+Each stock (silo, site store or organization-wide stock) serves the active
+lots that eat its feed type and have no more specific stock: a building
+stock before a site stock before a global stock. The projected demand of a
+lot is birds x breed standard feed at its future ages, calibrated on its
+recent consumption (see FlockForecaster.lot_feed_demand), and counts for a
+stock only on the days the lot's feed program is on that stock's feed type.
+
+A plan stores each stock's demand profile. Planning the whole organization
+runs once a day (first read after midnight) and on the first read after its
+lots changed (created, moved, closed or deleted: `invalidate`); a
+consumption, restock or adjustment movement only re-projects the moved
+stock's balance against its stored profile. Stocks running low get a STOCK_LOW alert, resolved once the
+stock is replenished.
+
+The planner only flushes: a write commits its movement and the re-projection
+together, a read commits the plan it stored. The plan columns are derived
+data (app.db.data_versions): storing them does not change the data version.
+"""
+import math
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Dict, List, Optional
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.models.alert import Alert, AlertType, AlertSeverity, AlertStatus
+from app.models.building import Building
+from app.models.feed import FeedStock
+from app.models.lot import Lot, LotStatus
+from app.models.site import Site
+from app.services.standards.data import FEED_PHASES
+
+PLAN_HORIZON_DAYS = 120
+# Days between an order and its delivery, and days an order should cover
+REORDER_LEAD_DAYS = 7
+REORDER_COVER_DAYS = 21
+
+
+def stock_alert_key(stock_id) -> str:
+    """metric_name of the STOCK_LOW alert of a stock."""
+    return f"feed_stock:{stock_id}"
+
+
+def _feed_type(stock: FeedStock) -> str:
+    return getattr(stock.feed_type, "value", stock.feed_type)
+
+
+def _phase_matrix(lots: List[Lot], today: date, horizon_days: int) -> np.ndarray:
+    """Feed type of each lot on each day after `today`, (n_lots, horizon_days)."""
+    phases = np.empty((len(lots), horizon_days), dtype=object)
+    offsets = np.arange(1, horizon_days + 1)
+    for i, lot in enumerate(lots):
+        lot_type = getattr(lot.type, "value", lot.type) or "broiler"
+        program = FEED_PHASES.get(lot_type, FEED_PHASES["broiler"])
+        starts = np.array([start for start, _ in program])
+        names = np.array([name for _, name in program], dtype=object)
+        hatch = lot.placement_date.toordinal() - (lot.age_at_placement or 0)
+        ages = today.toordinal() - hatch + offsets
+        phases[i] = names[np.maximum(np.searchsorted(starts, ages, side="right") - 1, 0)]
+    return phases
+
+
+class FeedPlanner:
+    """Supply plan of the feed stocks of an organization."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    # --- Planning -------------------------------------------------------
+
+    def _serving_lots(self, organization_id):
+        """Active lots of the organization with their building and site ids."""
+        return self.db.query(Lot, Building.id, Building.site_id).join(
+            Building, Lot.building_id == Building.id
+        ).join(Site, Building.site_id == Site.id).filter(
+            Site.organization_id == organization_id,
+            Site.is_active == True,
+            Building.is_active == True,
+            Lot.status == LotStatus.ACTIVE
+        ).all()
+
+    def plan_organization(self, organization_id, today: Optional[date] = None) -> List[FeedStock]:
+        """Rebuild the demand profile of every stock of the organization."""
+        from app.services.ml.forecast import FlockForecaster
+
+        today = today or date.today()
+        stocks = self.db.query(FeedStock).filter(
+            FeedStock.organization_id == organization_id
+        ).order_by(FeedStock.created_at).all()
+        if not stocks:
+            return []
+
+        # Most specific stock of each (location, feed type); the oldest one
+        # when a location has several stocks of the same type
+        by_location: Dict[tuple, int] = {}
+        for i, stock in enumerate(stocks):
+            feed_type = _feed_type(stock)
+            if stock.location_type == "building" and stock.building_id:
+                key = ("building", str(stock.building_id), feed_type)
+            elif stock.location_type == "site" and stock.site_id:
+                key = ("site", str(stock.site_id), feed_type)
+            else:
+                key = ("global", None, feed_type)
+            by_location.setdefault(key, i)
+
+        profiles = np.zeros((len(stocks), PLAN_HORIZON_DAYS))
+        rows = self._serving_lots(organization_id)
+        if rows:
+            lots = [row[0] for row in rows]
+            demand = FlockForecaster(self.db).lot_feed_demand(lots, PLAN_HORIZON_DAYS, today, organization_id)
+            phases = _phase_matrix(lots, today, PLAN_HORIZON_DAYS)
+
+            for feed_type in {_feed_type(stock) for stock in stocks}:
+                serving = np.array([
+                    by_location.get(("building", str(building_id), feed_type),
+                                    by_location.get(("site", str(site_id), feed_type),
+                                                    by_location.get(("global", None, feed_type), -1)))
+                    for _, building_id, site_id in rows
+                ])
+                served = serving >= 0
+                if served.any():
+                    np.add.at(profiles, serving[served], demand[served] * (phases[served] == feed_type))
+
+        active_alerts = self._active_alerts(organization_id)
+        for i, stock in enumerate(stocks):
+            stock.planned_on = today
+            stock.demand_profile = profiles[i].round(2).tolist()
+            self._project(stock, today)
+            self._sync_alert(stock, today, active_alerts.get(stock_alert_key(stock.id)))
+        self.db.flush()
+        return stocks
+
+    def ensure_planned(self, organization_id, today: Optional[date] = None) -> None:
+        """Plan the organization unless every stock was already planned today."""
+        today = today or date.today()
+        stale = self.db.query(FeedStock.id).filter(
+            FeedStock.organization_id == organization_id,
+            (FeedStock.planned_on.is_(None)) | (FeedStock.planned_on != today)
+        ).first()
+        if stale:
+            self.plan_organization(organization_id, today)
+
+    def invalidate(self, organization_id) -> None:
+        """Have the next read replan the organization after its lots changed
+        (a single UPDATE, not committed)."""
+        self.db.query(FeedStock).filter(FeedStock.organization_id == organization_id).execution_options(
+            derived=True
+        ).update({FeedStock.planned_on: None}, synchronize_session=False)
+
+    def on_movement(self, stock: FeedStock, today: Optional[date] = None) -> None:
+        """Re-project a stock after its balance changed."""
+        today = today or date.today()
+        if stock.planned_on != today or stock.demand_profile is None:
+            self.plan_organization(stock.organization_id, today)
+            return
+        alert = self.db.query(Alert).filter(
+            Alert.organization_id == stock.organization_id,
+            Alert.alert_type == AlertType.STOCK_LOW,
+            Alert.status == AlertStatus.ACTIVE,
+            Alert.metric_name == stock_alert_key(stock.id)
+        ).first()
+        self._project(stock, today)
+        self._sync_alert(stock, today, alert)
+        self.db.flush()
+
+    # --- Projection -----------------------------------------------------
+
+    @staticmethod
+    def _project(stock: FeedStock, today: date) -> None:
+        """Depletion and reorder figures of a stock from its balance and profile."""
+        elapsed = (today - stock.planned_on).days if stock.planned_on else 0
+        remaining = np.array((stock.demand_profile or [])[max(elapsed, 0):], dtype=np.float64)
+        balance = float(stock.quantity_kg or 0)
+        minimum = float(stock.min_quantity_kg or 0)
+
+        if not len(remaining) or remaining.sum() <= 0:
+            stock.daily_demand_kg = Decimal(0)
+            stock.depletion_date = None
+            stock.reorder_date = None
+            stock.reorder_quantity_kg = Decimal(0)
+            return
+
+        cumulative = np.cumsum(remaining)
+        stock.daily_demand_kg = Decimal(str(round(float(remaining[0]), 2)))
+
+        # Day index i is today + 1 + i; the stock runs out during the first
+        # day whose cumulative demand exceeds the balance
+        depleted = int(np.searchsorted(cumulative, balance, side="right"))
+        stock.depletion_date = today + timedelta(days=depleted + 1) if depleted < len(cumulative) else None
+
+        below_minimum = int(np.searchsorted(cumulative, balance - minimum, side="right"))
+        if balance <= minimum:
+            stock.reorder_date = today
+        elif below_minimum < len(cumulative):
+            stock.reorder_date = max(today, today + timedelta(days=below_minimum + 1 - REORDER_LEAD_DAYS))
+        else:
+            stock.reorder_date = None
+
+        # Order enough to stay above the minimum until the delivery after next
+        covered = cumulative[min(REORDER_LEAD_DAYS + REORDER_COVER_DAYS, len(cumulative)) - 1]
+        stock.reorder_quantity_kg = Decimal(max(0, math.ceil(covered + minimum - balance)))
+
+    # --- Alerts ---------------------------------------------------------
+
+    def _active_alerts(self, organization_id) -> Dict[str, Alert]:
+        alerts = self.db.query(Alert).filter(
+            Alert.organization_id == organization_id,
+            Alert.alert_type == AlertType.STOCK_LOW,
+            Alert.status == AlertStatus.ACTIVE
+        ).all()
+        return {alert.metric_name: alert for alert in alerts}
+
+    def _sync_alert(self, stock: FeedStock, today: date, alert: Optional[Alert]) -> None:
+        """Raise, update or resolve the STOCK_LOW alert of a stock."""
+        balance = float(stock.quantity_kg or 0)
+        low = (
+            balance <= float(stock.min_quantity_kg or 0)
+            or (stock.reorder_date is not None and stock.reorder_date <= today)
+        )
+        if not low:
+            if alert:
+                alert.status = AlertStatus.RESOLVED
+                alert.resolved_at = datetime.utcnow()
+                alert.resolution_note = "Stock reapprovisionne"
+            return
+
+        urgent = balance <= 0 or (
+            stock.depletion_date is not None and stock.depletion_date <= today + timedelta(days=REORDER_LEAD_DAYS)
+        )
+        message = f"Stock {_feed_type(stock)}: {balance:.0f} kg restants."
+        if stock.depletion_date:
+            message += f" Rupture prevue le {stock.depletion_date.strftime('%d/%m/%Y')}."
+        if stock.reorder_quantity_kg:
+            message += f" Commander environ {float(stock.reorder_quantity_kg):.0f} kg."
+
+        if alert is None:
+            alert = Alert(
+                organization_id=stock.organization_id,
+                site_id=stock.site_id,
+                alert_type=AlertType.STOCK_LOW,
+                metric_name=stock_alert_key(stock.id),
+            )
+            self.db.add(alert)
+        alert.severity = AlertSeverity.CRITICAL if urgent else AlertSeverity.WARNING
+        alert.title = f"Stock d'aliment bas ({_feed_type(stock)})"
+        alert.message = message
+        alert.metric_value = Decimal(str(round(balance, 2)))
+        alert.threshold_value = stock.min_quantity_kg
+
+    # --- Reading --------------------------------------------------------
+
+    @staticmethod
+    def summary(stock: FeedStock, today: Optional[date] = None) -> Dict:
+        today = today or date.today()
+        daily = float(stock.daily_demand_kg or 0)
+        return {
+            "stock_id": str(stock.id),
+            "feed_type": _feed_type(stock),
+            "location_type": stock.location_type,
+            "site_id": str(stock.site_id) if stock.site_id else None,
+            "building_id": str(stock.building_id) if stock.building_id else None,
+            "quantity_kg": float(stock.quantity_kg or 0),
+            "min_quantity_kg": float(stock.min_quantity_kg or 0),
+            "daily_demand_kg": daily,
+            "days_autonomy": (stock.depletion_date - today).days if stock.depletion_date else None,
+            "depletion_date": stock.depletion_date.isoformat() if stock.depletion_date else None,
+            "reorder_date": stock.reorder_date.isoformat() if stock.reorder_date else None,
+            "reorder_quantity_kg": float(stock.reorder_quantity_kg or 0),
+            "planned_on": stock.planned_on.isoformat() if stock.planned_on else None,
+        }
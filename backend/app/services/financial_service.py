@@ -7,17 +7,90 @@ Python loops for better performance.
 """
 
 from sqlalchemy.orm import Session
-from sqlalchemy import func, or_, case
+from sqlalchemy import event, func, or_, case
 from decimal import Decimal
 from datetime import date
-from typing import List, Optional, Dict, Any
+import itertools
+from threading import Lock
+from time import monotonic
+from typing import List, Optional, Dict, Any, Tuple
 from uuid import UUID
 
+from app.core.http_cache import request_data_version
+from app.db.data_versions import organization_data_version
 from app.models.lot import Lot, LotStatus
 from app.models.building import Building
 from app.models.site import Site
 from app.models.finance import Sale, Expense, PaymentStatus
 
+# Expenses written outside a request (scripts, which do not bump the data
+# version) by other processes show up in the rollups after this delay
+ROLLUP_TTL_SECONDS = 60
+
+
+class RollupCache:
+    """Expense totals by category per (sites, period, data version), shared by the requests of the process.
+
+    Cleared whenever a transaction of this process that wrote an expense commits.
+    """
+
+    def __init__(self, ttl: float = ROLLUP_TTL_SECONDS):
+        self.ttl = ttl
+        self._entries: Dict[Tuple, Tuple[float, Dict[str, float]]] = {}
+        self._lock = Lock()
+
+    def get(self, key: Tuple) -> Optional[Dict[str, float]]:
+        entry = self._entries.get(key)
+        if entry is None or monotonic() - entry[0] > self.ttl:
+            return None
+        return dict(entry[1])
+
+    def put(self, key: Tuple, value: Dict[str, float]) -> None:
+        now = monotonic()
+        with self._lock:
+            # Drops the expired entries, among them those of the older data versions
+            for stale in [k for k, (stored_at, _) in self._entries.items() if now - stored_at > self.ttl]:
+                del self._entries[stale]
+            self._entries[key] = (now, dict(value))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+expense_rollups = RollupCache()
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_expense_writes(session, flush_context) -> None:
+    if any(isinstance(obj, Expense) for obj in itertools.chain(session.new, session.dirty, session.deleted)):
+        session.info["expenses_written"] = True
+
+
+# Cleared at commit rather than at flush: a request reading in between would
+# cache the totals of before the write again
+@event.listens_for(Session, "after_commit")
+def _clear_expense_rollups(session) -> None:
+    if session.info.pop("expenses_written", False):
+        expense_rollups.clear()
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _forget_expense_writes(session, transaction) -> None:
+    if transaction.parent is None:
+        session.info.pop("expenses_written", None)
+
+
+def _rollup_data_version(db: Session) -> Optional[int]:
+    """Data version of the caller's organization: read by conditional_get, else read here."""
+    version = request_data_version()
+    if version is None and db.info.get("organization_id") is not None:
+        version = organization_data_version(db.connection(), db.info["organization_id"])
+    return version
+
 
 class FinancialService:
     """Centralized financial calculations with optimized queries."""
@@ -233,33 +306,42 @@ class FinancialService:
         include_lot_costs: bool = True
     ) -> Dict[str, float]:
         """
-        Get expenses grouped by category using SQL aggregation.
-        """
-        # Query expenses by category
-        query = self.db.query(
-            Expense.category,
-            func.sum(Expense.amount).label('total')
-        )
+        Get expenses grouped by canonical category using SQL aggregation.
 
-        if site_ids:
-            query = query.filter(
-                or_(
-                    Expense.site_id.in_(site_ids),
-                    Expense.site_id.is_(None)
-                )
+        Expense totals are cached per sites and period (see RollupCache);
+        lot initial costs are added on every call.
+        """
+        # Uncommitted expenses of this session are neither read from nor put in the cache
+        cached = not self.db.info.get("expenses_written")
+        key = (tuple(sorted(str(site_id) for site_id in site_ids)) if site_ids else None, start_date, end_date,
+               _rollup_data_version(self.db) if cached else None)
+        categories = expense_rollups.get(key) if cached else None
+        if categories is None:
+            # Indexed GROUP BY on the normalized category
+            query = self.db.query(
+                func.coalesce(Expense.category_id, 'other').label('category'),
+                func.sum(Expense.amount).label('total')
             )
 
-        if start_date:
-            query = query.filter(Expense.date >= start_date)
-        if end_date:
-            query = query.filter(Expense.date <= end_date)
-
-        query = query.group_by(Expense.category)
+            if site_ids:
+                query = query.filter(
+                    or_(
+                        Expense.site_id.in_(site_ids),
+                        Expense.site_id.is_(None)
+                    )
+                )
 
-        categories = {}
-        for row in query.all():
-            cat = row.category or 'other'
-            categories[cat] = float(round(Decimal(str(row.total or 0)), 2))
+            if start_date:
+                query = query.filter(Expense.date >= start_date)
+            if end_date:
+                query = query.filter(Expense.date <= end_date)
+
+            categories = {}
+            for row in query.group_by(Expense.category_id).all():
+                total = float(round(Decimal(str(row.total or 0)), 2))
+                categories[row.category] = categories.get(row.category, 0) + total
+            if cached:
+                expense_rollups.put(key, categories)
 
         # Add lot costs if requested
         if include_lot_costs:
@@ -1,27 +1,28 @@
-"""Invoice generation service using ReportLab."""
+"""Invoice generation service using ReportLab.
+
+ReportLab is imported when the first invoice is rendered, not at startup:
+it is by far the heaviest dependency of the API and most workers never
+generate a PDF.
+"""
 import os
 from datetime import datetime
 from decimal import Decimal
 from uuid import UUID
-from io import BytesIO
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import cm, mm
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image
-from reportlab.lib.enums import TA_CENTER, TA_RIGHT, TA_LEFT
-
-# Directory for storing invoices
+
+# Directory for storing invoices (created on first write)
 INVOICES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "invoices")
-os.makedirs(INVOICES_DIR, exist_ok=True)
 
 
-def generate_invoice_number(sale_id: str, date: datetime) -> str:
-    """Generate a unique invoice number."""
-    prefix = "FAC"
-    date_part = date.strftime("%Y%m%d")
-    short_id = sale_id[:8].upper()
-    return f"{prefix}-{date_part}-{short_id}"
+def generate_invoice_number(db, organization_id, date: datetime) -> str:
+    """Next invoice number of the organization, e.g. FAC-2026-1A2B3C4D-00042."""
+    from app.services.sequences import INVOICE_PREFIX, generate_document_number
+    return generate_document_number(db, organization_id, INVOICE_PREFIX, date)
+
+
+def generate_delivery_note_number(db, organization_id, date: datetime) -> str:
+    """Next delivery note number of the organization, e.g. BL-2026-1A2B3C4D-00042."""
+    from app.services.sequences import DELIVERY_NOTE_PREFIX, generate_document_number
+    return generate_document_number(db, organization_id, DELIVERY_NOTE_PREFIX, date)
 
 
 def format_currency(amount: Decimal) -> str:
@@ -48,6 +49,14 @@ def generate_invoice_pdf(
     """
     Generate a PDF invoice and return the file path.
     """
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.units import cm
+    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+    from reportlab.lib.enums import TA_CENTER, TA_RIGHT, TA_LEFT
+
+    os.makedirs(INVOICES_DIR, exist_ok=True)
     filename = f"{invoice_number}.pdf"
     filepath = os.path.join(INVOICES_DIR, filename)
 
@@ -1,8 +1,12 @@
 """
 Standard laying curve for layer hens.
 Based on typical commercial layer performance (ISA Brown, Lohmann, etc.)
+
+Expected rates come from the breed standards (app.services.standards): pass
+a lot's `BreedCurve` to use its breed or organization curve, otherwise the
+generic layer standard is used. The standards are loaded on first use.
 """
-from typing import Optional, Dict, Tuple
+from typing import Optional, Dict
 from enum import Enum
 
 
@@ -15,30 +19,6 @@ class LayingPhase(str, Enum):
     END_OF_CYCLE = "end_cycle"    # 52+ weeks: low production
 
 
-# Standard laying curve by age (weeks)
-# Format: (min_expected, max_expected, optimal)
-LAYING_CURVE: Dict[Tuple[int, int], Tuple[float, float, float]] = {
-    (0, 17): (0, 0, 0),           # Pre-lay: no eggs
-    (18, 18): (0, 10, 5),         # Week 18: first eggs
-    (19, 19): (5, 25, 15),        # Week 19: starting
-    (20, 20): (20, 50, 35),       # Week 20: rising
-    (21, 21): (40, 70, 55),       # Week 21: rising
-    (22, 22): (55, 80, 70),       # Week 22: rising
-    (23, 23): (70, 88, 80),       # Week 23: approaching peak
-    (24, 24): (80, 92, 88),       # Week 24: near peak
-    (25, 26): (85, 95, 92),       # Week 25-26: peak
-    (27, 30): (88, 96, 94),       # Week 27-30: peak plateau
-    (31, 35): (85, 94, 91),       # Week 31-35: early post-peak
-    (36, 40): (82, 92, 88),       # Week 36-40: post-peak
-    (41, 45): (78, 88, 84),       # Week 41-45: decline
-    (46, 50): (72, 84, 79),       # Week 46-50: decline
-    (51, 55): (65, 78, 72),       # Week 51-55: late cycle
-    (56, 60): (58, 72, 66),       # Week 56-60: late cycle
-    (61, 70): (50, 68, 60),       # Week 61-70: end of cycle
-    (71, 100): (40, 60, 50),      # 71+ weeks: very late
-}
-
-
 def get_age_weeks(age_days: int) -> int:
     """Convert age in days to weeks."""
     return age_days // 7
@@ -73,37 +53,56 @@ def get_phase_label(phase: LayingPhase) -> str:
     return labels.get(phase, "Inconnu")
 
 
-def get_expected_laying_rate(age_weeks: int) -> Dict:
+def _layer_curve(curve=None):
+    if curve is not None:
+        return curve
+    from app.services.standards.registry import standards_registry
+    return standards_registry.generic("layer")
+
+
+def get_expected_laying_rate(age_weeks: int, curve=None) -> Dict:
     """
     Get expected laying rate for a given age in weeks.
     Returns min, max, and optimal expected rates.
     """
-    for (min_week, max_week), (min_rate, max_rate, optimal) in LAYING_CURVE.items():
-        if min_week <= age_weeks <= max_week:
-            return {
-                "min_expected": min_rate,
-                "max_expected": max_rate,
-                "optimal_expected": optimal,
-                "age_weeks": age_weeks
-            }
-
-    # Default for very old flocks
+    from app.services.standards.data import LAYING, LAYING_MAX, LAYING_MIN
+
+    curve = _layer_curve(curve)
+    age_days = max(age_weeks, 0) * 7
     return {
-        "min_expected": 30,
-        "max_expected": 50,
-        "optimal_expected": 40,
+        "min_expected": round(curve.value(LAYING_MIN, age_days), 1),
+        "max_expected": round(curve.value(LAYING_MAX, age_days), 1),
+        "optimal_expected": round(curve.value(LAYING, age_days), 1),
         "age_weeks": age_weeks
     }
 
 
-def analyze_laying_performance(age_days: int, actual_rate: float) -> Dict:
+def get_expected_laying_rates(ages_days, curve=None) -> Dict:
+    """
+    Vectorized get_expected_laying_rate for a whole history.
+    Returns NumPy arrays of min, max and optimal rates, one per age in days.
+    """
+    import numpy as np
+    from app.services.standards.data import LAYING, LAYING_MAX, LAYING_MIN
+
+    curve = _layer_curve(curve)
+    # Expected rates are per week of age, like the scalar lookup
+    week_start_days = (np.maximum(np.asarray(ages_days, dtype=np.int64), 0) // 7) * 7
+    return {
+        "min_expected": curve.values(LAYING_MIN, week_start_days),
+        "max_expected": curve.values(LAYING_MAX, week_start_days),
+        "optimal_expected": curve.values(LAYING, week_start_days),
+    }
+
+
+def analyze_laying_performance(age_days: int, actual_rate: float, curve=None) -> Dict:
     """
     Analyze laying performance vs expected for the age.
     Returns detailed analysis with recommendations.
     """
     age_weeks = get_age_weeks(age_days)
     phase = get_laying_phase(age_weeks)
-    expected = get_expected_laying_rate(age_weeks)
+    expected = get_expected_laying_rate(age_weeks, curve)
 
     # Calculate performance score
     if expected["optimal_expected"] > 0:
@@ -158,25 +157,26 @@ def analyze_laying_performance(age_days: int, actual_rate: float) -> Dict:
     }
 
 
-def get_full_laying_curve() -> list:
+def get_full_laying_curve(curve=None) -> list:
     """
     Get the full standard laying curve for charting.
     Returns list of points from week 16 to week 72.
     """
-    curve = []
-    for week in range(16, 73):
-        expected = get_expected_laying_rate(week)
+    weeks = list(range(16, 73))
+    expected = get_expected_laying_rates([week * 7 for week in weeks], curve)
+    curve_points = []
+    for i, week in enumerate(weeks):
         phase = get_laying_phase(week)
-        curve.append({
+        curve_points.append({
             "week": week,
             "age_days": week * 7,
-            "min_expected": expected["min_expected"],
-            "max_expected": expected["max_expected"],
-            "optimal": expected["optimal_expected"],
+            "min_expected": round(float(expected["min_expected"][i]), 1),
+            "max_expected": round(float(expected["max_expected"][i]), 1),
+            "optimal": round(float(expected["optimal_expected"][i]), 1),
             "phase": phase.value,
             "phase_label": get_phase_label(phase)
         })
-    return curve
+    return curve_points
 
 
 def estimate_peak_date(placement_date, age_at_placement_days: int = 1) -> Dict:
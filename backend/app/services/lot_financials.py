@@ -0,0 +1,285 @@
+"""
+Lot Financials - Stored financial summary of each lot.
+
+The summary (expenses by category, sales, estimated egg revenue, cost per
+bird / kg / egg, break-even prices) is computed here and kept in
+LotStats.financial_snapshot, so /lots/{id}/financial-summary is a single
+row read. It is refreshed by the writes it depends on: sales, expenses,
+daily entries, lot edits and splits. Egg sales change the average tray
+price used by the revenue estimate of every layer lot of the organization:
+their summaries are dropped in one statement and recomputed on next read.
+The summaries are derived data (app.db.data_versions): storing one on read
+does not change the organization's data version.
+
+The scalar results are copied to LotStats columns (total_expenses,
+total_sales, gross_margin, cost_per_kg, cost_per_egg, performance_score)
+for lot comparisons and lists.
+"""
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import case, func, null
+from sqlalchemy.orm import Session
+
+from app.models.building import Building
+from app.models.finance import Sale, SaleType, Expense
+from app.models.lot import Lot, LotStats, LotStatus, LotType
+from app.models.production import EggProduction
+from app.models.site import Site
+
+EGGS_PER_TRAY = 30
+DEFAULT_PRICE_PER_TRAY = 1500  # Sans historique de ventes d'oeufs
+
+
+def _value(enum_or_str):
+    # Objects written in this request still hold the raw strings
+    return getattr(enum_or_str, "value", enum_or_str)
+
+
+def _ratio(numerator: float, denominator: float) -> Optional[float]:
+    return numerator / denominator if denominator else None
+
+
+def _rounded(value: Optional[float], digits: int = 2) -> Optional[float]:
+    return round(value, digits) if value is not None else None
+
+
+class LotFinancialService:
+    """Compute, store and read lot financial summaries."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    # --- Computation ----------------------------------------------------
+
+    def _expenses(self, lot: Lot, has_child_lots: bool):
+        """Expenses by category id, and the part inherited from a split."""
+        rows = self.db.query(
+            func.coalesce(Expense.category_id, "other"),
+            func.sum(Expense.amount),
+            func.count(Expense.id),
+            func.sum(case((Expense.from_split_lot_id.isnot(None), Expense.amount), else_=0))
+        ).filter(Expense.lot_id == lot.id).group_by(Expense.category_id).all()
+
+        breakdown = {}
+        for category, total, count, _ in rows:
+            entry = breakdown.setdefault(category, {"total": 0.0, "count": 0})
+            entry["total"] += float(total or 0)
+            entry["count"] += count
+        inherited = sum(float(split_total or 0) for *_, split_total in rows)
+        recorded = set(breakdown)
+
+        if lot.chick_price_unit and lot.initial_quantity and "chicks" not in recorded:
+            # A split lot keeps the chick cost of the birds it still has,
+            # the rest went to its child lots
+            quantity = lot.initial_quantity
+            if has_child_lots and lot.current_quantity:
+                quantity = lot.current_quantity
+            breakdown["chicks"] = {"total": float(lot.chick_price_unit) * quantity, "count": 1, "source": "lot"}
+
+        if lot.transport_cost and "transport" not in recorded:
+            breakdown["transport"] = {"total": float(lot.transport_cost), "count": 1, "source": "lot"}
+
+        if lot.other_initial_costs:
+            other = breakdown.setdefault("other", {"total": 0.0, "count": 1, "source": "lot"})
+            other["total"] += float(lot.other_initial_costs)
+
+        return breakdown, inherited
+
+    def _tray_price(self, lot: Lot) -> float:
+        """Average egg tray price of the lot's site, else of its organization."""
+        site_id = organization_id = None
+        if lot.building_id:
+            site_id, organization_id = self.db.query(Building.site_id, Site.organization_id).join(
+                Site, Building.site_id == Site.id
+            ).filter(Building.id == lot.building_id).first() or (None, None)
+
+        trays = (Sale.sale_type == SaleType.EGGS_TRAY, Sale.unit_price > 0)
+        price = None
+        if site_id:
+            price = self.db.query(func.avg(Sale.unit_price)).filter(Sale.site_id == site_id, *trays).scalar()
+        if (not price or price <= 0) and organization_id:
+            price = self.db.query(func.avg(Sale.unit_price)).join(Site, Sale.site_id == Site.id).filter(
+                Site.organization_id == organization_id, Site.is_active == True, *trays
+            ).scalar()
+        return float(price) if price and price > 0 else DEFAULT_PRICE_PER_TRAY
+
+    def compute(self, lot: Lot) -> Dict:
+        """Financial summary of a lot, as returned by the API."""
+        is_layer = lot.type == LotType.LAYER
+        child_lots_count = self.db.query(func.count(Lot.id)).filter(
+            Lot.parent_lot_id == lot.id, Lot.status != LotStatus.DELETED
+        ).scalar() or 0
+        expenses_breakdown, inherited_expenses = self._expenses(lot, child_lots_count > 0)
+        total_expenses = sum(entry["total"] for entry in expenses_breakdown.values())
+
+        sales = self.db.query(Sale).filter(Sale.lot_id == lot.id).order_by(Sale.created_at.desc()).all()
+        sales_list = []
+        total_revenue = 0.0
+        total_quantity_sold = 0.0
+        weight_sold_kg = 0.0
+        for sale in sales:
+            sale_amount = float(sale.total_amount or 0)
+            sale_qty = float(sale.quantity or 0)
+            total_revenue += sale_amount
+            total_quantity_sold += sale_qty
+            weight_sold_kg += float(sale.total_weight_kg or 0)
+            sales_list.append({
+                'id': str(sale.id),
+                'date': sale.date.isoformat() if sale.date else None,
+                'sale_type': _value(sale.sale_type) or 'other',
+                'quantity': sale_qty,
+                'unit': sale.unit,
+                'unit_price': float(sale.unit_price or 0),
+                'total_amount': sale_amount,
+                'client_name': sale.client_name,
+                'payment_status': _value(sale.payment_status) or 'pending',
+                'total_weight_kg': float(sale.total_weight_kg) if sale.total_weight_kg else None,
+                'average_weight_kg': float(sale.average_weight_kg) if sale.average_weight_kg else None,
+            })
+
+        current_birds = lot.current_quantity or 0
+        eggs_production = None
+        cost_per_kg = cost_per_egg = None
+        break_even = {}
+        if is_layer:
+            # Estimated revenue of the eggs produced, at the average tray price
+            sellable_eggs = int(self.db.query(func.coalesce(func.sum(EggProduction.sellable_eggs), 0)).filter(
+                EggProduction.lot_id == lot.id
+            ).scalar())
+            trays = sellable_eggs / EGGS_PER_TRAY
+            price_per_tray = self._tray_price(lot)
+            estimate = trays * price_per_tray
+            bird_revenue = total_revenue
+            total_revenue += estimate
+            cost_per_egg = _ratio(total_expenses, sellable_eggs)
+            eggs_production = {
+                'total_trays_produced': round(trays, 1),
+                'avg_price_per_tray': round(price_per_tray, 2),
+                'estimated_revenue': round(estimate, 2),
+                'is_estimate': True,
+                'note': 'Revenus estimés basés sur la production et le prix moyen de vente'
+            }
+            # Tray price covering the costs not covered by bird sales
+            break_even['price_per_tray'] = _rounded(_ratio(max(total_expenses - bird_revenue, 0), trays))
+        else:
+            # Weight sold plus live weight still in the house
+            live_weight_kg = 0.0
+            stats = self.db.get(LotStats, lot.id)
+            if stats and stats.current_weight_g and current_birds:
+                live_weight_kg = float(stats.current_weight_g) / 1000 * current_birds
+            cost_per_kg = _ratio(total_expenses, weight_sold_kg + live_weight_kg)
+            break_even['price_per_bird'] = _rounded(_ratio(total_expenses, total_quantity_sold + current_birds))
+            break_even['price_per_kg'] = _rounded(cost_per_kg)
+
+        gross_profit = total_revenue - total_expenses
+        profit_margin_percent = (gross_profit / total_revenue * 100) if total_revenue > 0 else 0
+
+        birds_sold = total_quantity_sold if lot.type == LotType.BROILER else 0
+        cost_per_bird = total_expenses / lot.initial_quantity if lot.initial_quantity else 0
+        revenue_per_bird = total_revenue / birds_sold if birds_sold > 0 else 0
+        profit_per_bird = gross_profit / birds_sold if birds_sold > 0 else 0
+
+        summary = {
+            'lot_id': str(lot.id),
+            'lot_code': lot.code,
+            'lot_type': _value(lot.type) or 'broiler',
+            'initial_quantity': lot.initial_quantity,
+            'current_quantity': current_birds,
+            'split_info': {
+                'is_split_lot': lot.parent_lot_id is not None,
+                'parent_lot_id': str(lot.parent_lot_id) if lot.parent_lot_id else None,
+                'split_date': lot.split_date.isoformat() if lot.split_date else None,
+                'split_ratio': float(lot.split_ratio) if lot.split_ratio else None,
+                'inherited_expenses': round(inherited_expenses if lot.parent_lot_id else 0, 2),
+                'has_child_lots': child_lots_count > 0,
+                'child_lots_count': child_lots_count
+            },
+            'summary': {
+                'total_expenses': round(total_expenses, 2),
+                'total_revenue': round(total_revenue, 2),
+                'gross_profit': round(gross_profit, 2),
+                'profit_margin_percent': round(profit_margin_percent, 1),
+                'profit_status': 'profit' if gross_profit > 0 else 'loss' if gross_profit < 0 else 'break_even'
+            },
+            'expenses_breakdown': expenses_breakdown,
+            'per_unit': {
+                'cost_per_bird': round(cost_per_bird, 2),
+                'revenue_per_bird': round(revenue_per_bird, 2),
+                'profit_per_bird': round(profit_per_bird, 2),
+                'birds_sold': int(birds_sold),
+                'cost_per_kg': _rounded(cost_per_kg),
+                'cost_per_egg': _rounded(cost_per_egg, 4),
+            },
+            'break_even': break_even,
+            'sales': sales_list,
+            'sales_count': len(sales_list)
+        }
+        if eggs_production is not None:
+            summary['eggs_production'] = eggs_production
+            summary['summary']['revenue_is_estimate'] = True
+        return summary
+
+    # --- Storage --------------------------------------------------------
+
+    def refresh(self, lot_id) -> Optional[Dict]:
+        """Recompute and store the summary of a lot (flushed, not committed)."""
+        lot = self.db.query(Lot).filter(Lot.id == lot_id, Lot.status != LotStatus.DELETED).first()
+        if not lot:
+            return None
+        self.db.flush()
+        summary = self.compute(lot)
+
+        stats = self.db.get(LotStats, lot.id)
+        if not stats:
+            stats = LotStats(lot_id=lot.id)
+            self.db.add(stats)
+        totals = summary['summary']
+        stats.total_expenses = totals['total_expenses']
+        stats.total_sales = totals['total_revenue']
+        stats.gross_margin = totals['gross_profit']
+        stats.cost_per_kg = summary['per_unit']['cost_per_kg']
+        stats.cost_per_egg = summary['per_unit']['cost_per_egg']
+        # Margin mapped to 0-100: -50 % or worse is 0, break-even 50, +50 % or better 100
+        stats.performance_score = min(max(50 + totals['profit_margin_percent'], 0), 100) if totals['total_revenue'] else None
+        stats.financial_snapshot = summary
+        stats.financials_updated_at = datetime.utcnow()
+        self.db.flush()
+        return summary
+
+    def refresh_many(self, lot_ids: Iterable) -> None:
+        for lot_id in {lot_id for lot_id in lot_ids if lot_id}:
+            self.refresh(lot_id)
+
+    def invalidate_egg_pricing(self, organization_id) -> None:
+        """Drop the stored summaries of the layer lots of an organization, closed
+        ones included, after an egg sale changed tray prices (a single UPDATE,
+        whatever the number of lots)."""
+        layer_lots = self.db.query(Lot.id).join(Building, Lot.building_id == Building.id).join(
+            Site, Building.site_id == Site.id
+        ).filter(
+            Site.organization_id == organization_id,
+            Lot.type == LotType.LAYER,
+            Lot.status != LotStatus.DELETED
+        )
+        self.db.query(LotStats).filter(LotStats.lot_id.in_(layer_lots.scalar_subquery())).execution_options(
+            derived=True
+        ).update({LotStats.financial_snapshot: null()}, synchronize_session=False)
+
+    def on_sale(self, sale: Sale, organization_id, previous_lot_id=None) -> None:
+        """Refresh what a created or edited sale changes."""
+        if sale.sale_type == SaleType.EGGS_TRAY:
+            self.invalidate_egg_pricing(organization_id)
+        self.refresh_many([sale.lot_id, previous_lot_id])
+
+    def get(self, lot: Lot) -> Dict:
+        """Stored summary of a lot, computed and stored (flushed) on first read.
+
+        A lot without stats yet is computed without storing: its next write stores it.
+        """
+        stats = self.db.get(LotStats, lot.id)
+        if stats is None:
+            return self.compute(lot)
+        if stats.financial_snapshot:
+            return stats.financial_snapshot
+        return self.refresh(lot.id)
@@ -0,0 +1,141 @@
+"""
+Vectorized flock curve models.
+
+Both models are fitted from per-lot sufficient statistics (sums over the
+observations), so a fit covers every lot in one batched NumPy pass and new
+daily data is folded in by adding its sums, without re-reading history.
+
+- Wood laying curve:  y(t) = a * t^b * exp(-c * t), t = weeks since onset + 1
+  Linear in log space: ln y = ln a + b ln t - c t (least squares).
+- Gompertz growth:    W(t) = A * exp(-b * exp(-k * t)), t = age in days
+  For a given asymptote A it is linear: ln(-ln(W / A)) = ln b - k t. Each lot
+  keeps the sums for a fixed grid of A; the fit picks the A with the lowest
+  residual.
+"""
+from typing import Dict
+
+import numpy as np
+
+# Asymptotic (mature) body weight candidates for the Gompertz fit, in grams
+GOMPERTZ_ASYMPTOTES = np.arange(1500.0, 12001.0, 250.0)
+
+MIN_WOOD_POINTS = 5
+MIN_GOMPERTZ_POINTS = 3
+
+_RIDGE = 1e-6
+
+
+# --- Wood laying curve ---------------------------------------------------
+
+def wood_stats(t: np.ndarray, y: np.ndarray) -> Dict[str, np.ndarray]:
+    """Sufficient statistics of observations (t weeks since onset + 1, y > 0)."""
+    mask = (y > 0) & (t > 0)
+    t, y = t[mask], y[mask]
+    x = np.stack([np.ones_like(t), np.log(t), -t], axis=1)
+    z = np.log(y)
+    return {"xtx": x.T @ x, "xtz": x.T @ z, "n": np.array(float(len(t)))}
+
+
+def empty_wood_stats() -> Dict[str, np.ndarray]:
+    return {"xtx": np.zeros((3, 3)), "xtz": np.zeros(3), "n": np.array(0.0)}
+
+
+def fit_wood(xtx: np.ndarray, xtz: np.ndarray, n: np.ndarray) -> np.ndarray:
+    """Batched least squares. Returns (n_lots, 3) rows of (a, b, c), NaN when underdetermined."""
+    xtx = np.asarray(xtx, dtype=np.float64)
+    xtz = np.asarray(xtz, dtype=np.float64)
+    solution = np.linalg.solve(xtx + _RIDGE * np.eye(3), xtz[..., None])[..., 0]
+    params = np.stack([np.exp(solution[..., 0]), solution[..., 1], solution[..., 2]], axis=-1)
+    params[np.asarray(n) < MIN_WOOD_POINTS] = np.nan
+    return params
+
+
+def wood_predict(params: np.ndarray, t) -> np.ndarray:
+    """Laying rate (%) of each lot (rows of params) at weeks-since-onset t."""
+    params = np.atleast_2d(params)
+    t = np.maximum(np.asarray(t, dtype=np.float64), 1e-9)
+    a, b, c = (params[:, i:i + 1] for i in range(3))
+    return np.clip(a * t ** b * np.exp(-c * t), 0, 100)
+
+
+def wood_peak(params: np.ndarray):
+    """(t_peak, y_peak) of each lot; t_peak = b / c, NaN when the curve has no maximum."""
+    params = np.atleast_2d(params)
+    a, b, c = params[:, 0], params[:, 1], params[:, 2]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t_peak = np.where((b > 0) & (c > 0), b / c, np.nan)
+    y_peak = np.clip(a * t_peak ** b * np.exp(-c * t_peak), 0, 100)
+    return t_peak, y_peak
+
+
+# --- Gompertz growth -----------------------------------------------------
+
+def gompertz_stats(t: np.ndarray, w: np.ndarray) -> Dict[str, np.ndarray]:
+    """Sufficient statistics per asymptote candidate of weights w at ages t."""
+    t = np.asarray(t, dtype=np.float64)
+    w = np.asarray(w, dtype=np.float64)
+    asymptotes = GOMPERTZ_ASYMPTOTES[:, None]
+    valid = (w[None, :] > 0) & (w[None, :] < asymptotes)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = np.where(valid, np.log(-np.log(np.where(valid, w[None, :] / asymptotes, 0.5))), 0.0)
+    tt = np.where(valid, t[None, :], 0.0)
+    return {
+        "n": valid.sum(axis=1).astype(np.float64),
+        "invalid": (~valid).sum(axis=1).astype(np.float64),
+        "st": tt.sum(axis=1),
+        "stt": (tt * tt).sum(axis=1),
+        "sz": z.sum(axis=1),
+        "stz": (tt * z).sum(axis=1),
+        "szz": (z * z).sum(axis=1),
+    }
+
+
+def empty_gompertz_stats() -> Dict[str, np.ndarray]:
+    zeros = np.zeros(len(GOMPERTZ_ASYMPTOTES))
+    return {key: zeros.copy() for key in ("n", "invalid", "st", "stt", "sz", "stz", "szz")}
+
+
+def fit_gompertz(stats: Dict[str, np.ndarray]) -> np.ndarray:
+    """Batched fit. `stats` arrays are (n_lots, n_asymptotes).
+
+    Returns (n_lots, 3) rows of (A, b, k), NaN when a lot has too few
+    weighings or no asymptote above all of them.
+    """
+    n, st, stt, sz, stz, szz = (np.asarray(stats[key], dtype=np.float64) for key in ("n", "st", "stt", "sz", "stz", "szz"))
+    invalid = np.asarray(stats["invalid"], dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        denominator = n * stt - st * st
+        slope = (n * stz - st * sz) / denominator
+        intercept = (sz - slope * st) / n
+        # Residual sum of squares of z = intercept + slope * t
+        sse = szz - 2 * intercept * sz - 2 * slope * stz + intercept ** 2 * n + 2 * intercept * slope * st + slope ** 2 * stt
+
+    usable = (invalid == 0) & (n >= MIN_GOMPERTZ_POINTS) & (denominator > 0) & (slope < 0)
+    sse = np.where(usable, sse, np.inf)
+    best = np.argmin(sse, axis=1)
+    rows = np.arange(len(best))
+
+    params = np.stack([
+        GOMPERTZ_ASYMPTOTES[best],
+        np.exp(intercept[rows, best]),
+        -slope[rows, best],
+    ], axis=1)
+    params[~np.isfinite(sse[rows, best])] = np.nan
+    return params
+
+
+def gompertz_predict(params: np.ndarray, t) -> np.ndarray:
+    """Weight (g) of each lot (rows of params) at ages t (days)."""
+    params = np.atleast_2d(params)
+    t = np.asarray(t, dtype=np.float64)
+    big_a, b, k = (params[:, i:i + 1] for i in range(3))
+    return big_a * np.exp(-b * np.exp(-k * t))
+
+
+def gompertz_age_at(params: np.ndarray, weights) -> np.ndarray:
+    """Age (days) at which each lot reaches `weights` (NaN if never)."""
+    params = np.atleast_2d(params)
+    big_a, b, k = params[:, 0], params[:, 1], params[:, 2]
+    weights = np.asarray(weights, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(weights < big_a, -np.log(-np.log(weights / big_a) / b) / k, np.nan)
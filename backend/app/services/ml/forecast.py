@@ -0,0 +1,391 @@
+"""
+Flock forecasting: laying curves, growth curves and feed demand.
+
+Fitted models are cached per lot with a fingerprint of their data (row
+count, first/last date, sum of values, time origin). On each request the
+fingerprints of all lots are read with one grouped query per table, and
+only lots whose data changed are refitted:
+
+- rows were only appended after the cached last date: their sums are added
+  to the cached statistics (incremental refit);
+- anything else (edits, deletions, backfill, moved placement date): the
+  lot's statistics are rebuilt from all its rows.
+
+Every stale lot is then refitted in one batched pass (see ml.curves), so
+serving forecasts for the dashboard never refits unchanged lots.
+"""
+import math
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.building import Building
+from app.models.feed import FeedConsumption
+from app.models.lot import Lot, LotType
+from app.models.production import EggProduction, WeightRecord
+from app.services.ml import curves
+
+DEFAULT_HORIZON_DAYS = 30
+DEFAULT_TARGET_WEIGHT_G = 2500
+FEED_CALIBRATION_DAYS = 7
+ONSET_AGE_DAYS = 18 * 7
+
+
+class LotModel:
+    """Cached fit of one lot."""
+
+    __slots__ = ("kind", "fingerprint", "stats", "params", "fitted_at")
+
+    def __init__(self, kind: str, fingerprint: Tuple, stats: Dict, params: np.ndarray):
+        self.kind = kind
+        self.fingerprint = fingerprint
+        self.stats = stats
+        self.params = params
+        self.fitted_at = datetime.utcnow()
+
+    @property
+    def count(self) -> int:
+        return self.fingerprint[0]
+
+    @property
+    def last_ordinal(self) -> int:
+        return self.fingerprint[2]
+
+
+class ForecastCache:
+    """LRU of fitted models by (kind, lot id), shared by all requests of the process.
+
+    Closed and deleted lots are never read again: bounded by `maxsize`, they
+    leave the cache as the least recently used.
+    """
+
+    def __init__(self, maxsize: int = 10000):
+        self.maxsize = maxsize
+        self._models: "OrderedDict[Tuple[str, str], LotModel]" = OrderedDict()
+        self._lock = Lock()
+        self.fits = 0
+        self.incremental_fits = 0
+
+    def get(self, kind: str, lot_id) -> Optional[LotModel]:
+        key = (kind, str(lot_id))
+        with self._lock:
+            model = self._models.get(key)
+            if model is not None:
+                self._models.move_to_end(key)
+            return model
+
+    def put(self, lot_id, model: LotModel) -> None:
+        key = (model.kind, str(lot_id))
+        with self._lock:
+            self._models[key] = model
+            self._models.move_to_end(key)
+            while len(self._models) > self.maxsize:
+                self._models.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._models.clear()
+            self.fits = 0
+            self.incremental_fits = 0
+
+    def __len__(self) -> int:
+        return len(self._models)
+
+
+forecast_cache = ForecastCache(maxsize=settings.FORECAST_CACHE_SIZE)
+
+
+class _Kind:
+    """How a model reads its observations from the database."""
+
+    def __init__(self, name: str, model, value_column, filters=()):
+        self.name = name
+        self.model = model
+        self.value_column = value_column
+        self.filters = filters
+
+
+LAYING = _Kind("laying", EggProduction, EggProduction.laying_rate, (EggProduction.laying_rate > 0,))
+GROWTH = _Kind("growth", WeightRecord, WeightRecord.average_weight_g, (WeightRecord.average_weight_g > 0,))
+
+
+def _hatch_ordinal(lot: Lot) -> int:
+    return lot.placement_date.toordinal() - (lot.age_at_placement or 0)
+
+
+class FlockForecaster:
+    """Fits (or reuses) lot models and builds forecasts in bulk."""
+
+    def __init__(self, db: Session, cache: ForecastCache = forecast_cache):
+        self.db = db
+        self.cache = cache
+
+    # --- Model maintenance ----------------------------------------------
+
+    def _fingerprints(self, kind: _Kind, lots: List[Lot]) -> Dict[str, Tuple]:
+        model = kind.model
+        rows = self.db.query(
+            model.lot_id,
+            func.count(),
+            func.min(model.date),
+            func.max(model.date),
+            func.sum(kind.value_column)
+        ).filter(model.lot_id.in_([lot.id for lot in lots]), *kind.filters).group_by(model.lot_id).all()
+
+        by_id = {str(lot.id): lot for lot in lots}
+        fingerprints = {}
+        for lot_id, count, first, last, total in rows:
+            lot = by_id[str(lot_id)]
+            if kind is LAYING:
+                # Laying time runs from the onset of lay: the recorded first egg,
+                # else the first record or 18 weeks of age, whichever is earlier
+                # (records may start mid-cycle)
+                if lot.first_egg_date:
+                    origin = lot.first_egg_date.toordinal()
+                else:
+                    origin = min(first.toordinal(), _hatch_ordinal(lot) + ONSET_AGE_DAYS)
+            else:
+                origin = _hatch_ordinal(lot)
+            fingerprints[str(lot_id)] = (int(count), first.toordinal(), last.toordinal(), float(total or 0), origin)
+        return fingerprints
+
+    def _observations(self, kind: _Kind, lot_ids: List, after: Optional[int] = None):
+        model = kind.model
+        query = self.db.query(model.lot_id, model.date, kind.value_column).filter(
+            model.lot_id.in_(lot_ids), *kind.filters
+        )
+        if after is not None:
+            query = query.filter(model.date > date.fromordinal(after))
+        by_lot: Dict[str, List] = {}
+        for lot_id, day, value in query.all():
+            by_lot.setdefault(str(lot_id), []).append((day.toordinal(), float(value)))
+        return by_lot
+
+    @staticmethod
+    def _stats(kind: _Kind, observations: List, origin: int) -> Dict:
+        ordinals = np.array([o for o, _ in observations], dtype=np.float64)
+        values = np.array([v for _, v in observations], dtype=np.float64)
+        if kind is LAYING:
+            return curves.wood_stats((ordinals - origin) / 7 + 1, values)
+        return curves.gompertz_stats(ordinals - origin, values)
+
+    @staticmethod
+    def _fit(kind: _Kind, stats: List[Dict]) -> np.ndarray:
+        stacked = {key: np.stack([s[key] for s in stats]) for key in stats[0]}
+        if kind is LAYING:
+            return curves.fit_wood(stacked["xtx"], stacked["xtz"], stacked["n"])
+        return curves.fit_gompertz(stacked)
+
+    def refresh(self, kind: _Kind, lots: List[Lot]) -> Dict[str, LotModel]:
+        """Up-to-date models of `lots` (lots without observations are left out)."""
+        if not lots:
+            return {}
+        fingerprints = self._fingerprints(kind, lots)
+        models: Dict[str, LotModel] = {}
+        incremental: Dict[str, LotModel] = {}
+        full: List[str] = []
+
+        for lot_id, fingerprint in fingerprints.items():
+            cached = self.cache.get(kind.name, lot_id)
+            if cached is not None and cached.fingerprint == fingerprint:
+                models[lot_id] = cached
+            elif (cached is not None and fingerprint[1] == cached.fingerprint[1]
+                    and fingerprint[4] == cached.fingerprint[4] and fingerprint[0] > cached.count):
+                # Same first day and time origin, more rows: maybe appended only
+                incremental[lot_id] = cached
+            else:
+                full.append(lot_id)
+
+        stale_ids, stale_stats = [], []
+
+        if incremental:
+            after = min(cached.last_ordinal for cached in incremental.values())
+            new_rows = self._observations(kind, list(incremental), after=after)
+            for lot_id, cached in incremental.items():
+                rows = [row for row in new_rows.get(lot_id, []) if row[0] > cached.last_ordinal]
+                fingerprint = fingerprints[lot_id]
+                appended_only = (
+                    cached.count + len(rows) == fingerprint[0]
+                    and math.isclose(cached.fingerprint[3] + sum(v for _, v in rows), fingerprint[3], abs_tol=1e-6)
+                )
+                if not appended_only:
+                    full.append(lot_id)
+                    continue
+                delta = self._stats(kind, rows, fingerprint[4])
+                stale_ids.append(lot_id)
+                stale_stats.append({key: cached.stats[key] + delta[key] for key in cached.stats})
+                self.cache.incremental_fits += 1
+
+        if full:
+            all_rows = self._observations(kind, full)
+            for lot_id in full:
+                stale_ids.append(lot_id)
+                stale_stats.append(self._stats(kind, all_rows.get(lot_id, []), fingerprints[lot_id][4]))
+
+        if stale_ids:
+            params = self._fit(kind, stale_stats)
+            for i, lot_id in enumerate(stale_ids):
+                model = LotModel(kind.name, fingerprints[lot_id], stale_stats[i], params[i])
+                self.cache.put(lot_id, model)
+                models[lot_id] = model
+            self.cache.fits += len(stale_ids)
+
+        return models
+
+    # --- Forecasts ------------------------------------------------------
+
+    def laying_forecasts(self, lots: List[Lot], horizon_days: int, today: date) -> Dict[str, Dict]:
+        models = self.refresh(LAYING, lots)
+        fitted = [lot for lot in lots if str(lot.id) in models and not np.isnan(models[str(lot.id)].params).any()]
+        if not fitted:
+            return {}
+
+        params = np.stack([models[str(lot.id)].params for lot in fitted])
+        onsets = np.array([models[str(lot.id)].fingerprint[4] for lot in fitted], dtype=np.float64)
+        days = today.toordinal() + np.arange(1, horizon_days + 1)
+        t = (days[None, :] - onsets[:, None]) / 7 + 1
+        rates = curves.wood_predict(params, t)
+        hens = np.array([float(lot.current_quantity or 0) for lot in fitted])
+        eggs = rates / 100 * hens[:, None]
+        t_peak, y_peak = curves.wood_peak(params)
+
+        forecasts = {}
+        for i, lot in enumerate(fitted):
+            onset = date.fromordinal(int(onsets[i]))
+            forecasts[str(lot.id)] = {
+                "model": "wood",
+                "params": {"a": float(params[i, 0]), "b": float(params[i, 1]), "c": float(params[i, 2])},
+                "observations": models[str(lot.id)].count,
+                "onset_date": onset.isoformat(),
+                "peak_date": (onset + timedelta(weeks=float(t_peak[i]) - 1)).isoformat() if np.isfinite(t_peak[i]) else None,
+                "peak_rate": round(float(y_peak[i]), 1) if np.isfinite(y_peak[i]) else None,
+                "laying_rate": rates[i].round(1).tolist(),
+                "eggs": eggs[i].round().astype(int).tolist(),
+                "eggs_next_7_days": int(round(eggs[i, :7].sum())),
+            }
+        return forecasts
+
+    def growth_forecasts(self, lots: List[Lot], horizon_days: int, today: date) -> Dict[str, Dict]:
+        models = self.refresh(GROWTH, lots)
+        fitted = [lot for lot in lots if str(lot.id) in models and not np.isnan(models[str(lot.id)].params).any()]
+        if not fitted:
+            return {}
+
+        params = np.stack([models[str(lot.id)].params for lot in fitted])
+        hatch = np.array([_hatch_ordinal(lot) for lot in fitted], dtype=np.float64)
+        ages = today.toordinal() + np.arange(1, horizon_days + 1)[None, :] - hatch[:, None]
+        weights = curves.gompertz_predict(params, ages)
+        targets = np.array([float(lot.target_weight_g or DEFAULT_TARGET_WEIGHT_G) for lot in fitted])
+        target_ages = curves.gompertz_age_at(params, targets)
+        current_ages = today.toordinal() - hatch
+
+        forecasts = {}
+        for i, lot in enumerate(fitted):
+            days_to_target = None
+            sale_date = None
+            if np.isfinite(target_ages[i]):
+                days_to_target = max(0, int(math.ceil(target_ages[i] - current_ages[i])))
+                sale_date = (today + timedelta(days=days_to_target)).isoformat()
+            forecasts[str(lot.id)] = {
+                "model": "gompertz",
+                "params": {"A": float(params[i, 0]), "b": float(params[i, 1]), "k": float(params[i, 2])},
+                "observations": models[str(lot.id)].count,
+                "weight_g": weights[i].round(0).tolist(),
+                "target_weight_g": float(targets[i]),
+                "target_age_days": round(float(target_ages[i]), 1) if np.isfinite(target_ages[i]) else None,
+                "days_to_target": days_to_target,
+                "estimated_sale_date": sale_date,
+            }
+        return forecasts
+
+    def lot_feed_demand(self, lots: List[Lot], horizon_days: int, today: date,
+                        organization_id=None) -> np.ndarray:
+        """Projected feed need (kg/day) of each lot for the days after `today`.
+
+        Each lot needs birds x breed standard feed at its future ages, scaled
+        by how much the lot actually ate vs the standard over the last days.
+        Returns a (n_lots, horizon_days) array.
+        """
+        from app.services.standards.curves import batch_values
+        from app.services.standards.data import FEED
+        from app.services.standards.registry import standards_registry
+
+        lot_ids = [lot.id for lot in lots]
+        since = today - timedelta(days=FEED_CALIBRATION_DAYS)
+        recent_feed = {
+            str(lot_id): (float(total or 0), int(days))
+            for lot_id, total, days in self.db.query(
+                FeedConsumption.lot_id,
+                func.sum(FeedConsumption.quantity_kg),
+                func.count(func.distinct(FeedConsumption.date))
+            ).filter(
+                FeedConsumption.lot_id.in_(lot_ids),
+                FeedConsumption.date > since,
+                FeedConsumption.date <= today
+            ).group_by(FeedConsumption.lot_id).all()
+        }
+
+        lot_curves = [standards_registry.resolve_lot(lot, db=self.db, organization_id=organization_id) for lot in lots]
+        current_ages = np.array([today.toordinal() - _hatch_ordinal(lot) for lot in lots], dtype=np.int64)
+        birds = np.array([float(lot.current_quantity or 0) for lot in lots])
+
+        # Calibration: recorded g/bird/day over the standard at the same age
+        standard_now = batch_values(lot_curves, FEED, current_ages)
+        calibration = np.ones(len(lots))
+        for i, lot in enumerate(lots):
+            total_kg, days = recent_feed.get(str(lot.id), (0.0, 0))
+            if days and birds[i] > 0 and standard_now[i] > 0:
+                calibration[i] = np.clip(total_kg * 1000 / days / birds[i] / standard_now[i], 0.5, 1.5)
+
+        future_ages = current_ages[:, None] + np.arange(1, horizon_days + 1)[None, :]
+        standard = np.nan_to_num(batch_values(lot_curves, FEED, future_ages))
+        return birds[:, None] * standard * calibration[:, None] / 1000
+
+    def feed_demand(self, lots: List[Lot], horizon_days: int, today: date,
+                    organization_id=None) -> Dict[str, Dict]:
+        """Projected feed need (kg/day) per site over the horizon."""
+        if not lots:
+            return {}
+        site_rows = self.db.query(Lot.id, Building.site_id).join(Building, Lot.building_id == Building.id).filter(
+            Lot.id.in_([lot.id for lot in lots])
+        ).all()
+        site_of = {str(lot_id): str(site_id) for lot_id, site_id in site_rows}
+        demand_kg = self.lot_feed_demand(lots, horizon_days, today, organization_id)
+
+        site_ids = sorted({site_of[str(lot.id)] for lot in lots if str(lot.id) in site_of})
+        site_index = {site_id: i for i, site_id in enumerate(site_ids)}
+        per_site = np.zeros((len(site_ids), horizon_days))
+        rows = [site_index.get(site_of.get(str(lot.id))) for lot in lots]
+        keep = np.array([row is not None for row in rows])
+        if keep.any():
+            np.add.at(per_site, np.array([row for row in rows if row is not None]), demand_kg[keep])
+
+        return {
+            site_id: {
+                "daily_kg": per_site[i].round(1).tolist(),
+                "next_7_days_kg": round(float(per_site[i, :7].sum()), 1),
+                "horizon_kg": round(float(per_site[i].sum()), 1),
+                "lots": [str(lot.id) for j, lot in enumerate(lots) if rows[j] == i],
+            }
+            for site_id, i in site_index.items()
+        }
+
+    def forecast(self, lots: List[Lot], horizon_days: int = DEFAULT_HORIZON_DAYS,
+                 organization_id=None, today: Optional[date] = None) -> Dict:
+        """Forecasts of every lot plus feed demand per site."""
+        today = today or date.today()
+        layers = [lot for lot in lots if lot.type == LotType.LAYER]
+        broilers = [lot for lot in lots if lot.type == LotType.BROILER]
+        return {
+            "generated_on": today.isoformat(),
+            "horizon_days": horizon_days,
+            "laying": self.laying_forecasts(layers, horizon_days, today),
+            "growth": self.growth_forecasts(broilers, horizon_days, today),
+            "feed_demand": self.feed_demand(lots, horizon_days, today, organization_id),
+        }
@@ -0,0 +1,92 @@
+"""
+Number sequences - Collision-free numbering of lots, invoices and delivery notes.
+
+Each (organization, prefix, year) has a counter row in number_sequences.
+A number is taken with a single `UPDATE ... SET last_value = last_value + 1
+RETURNING last_value` in the caller's transaction: constant time, and two
+concurrent requests can never get the same value (the row stays locked
+until the first transaction ends; SQLite serializes writers anyway).
+
+The counter of a year is created on its first use, seeded from numbers
+issued before sequences existed so they are not handed out again.
+"""
+from datetime import datetime
+from typing import Callable, Optional
+
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.sequence import NumberSequence
+
+LOT_PREFIXES = {"broiler": "LC", "layer": "LP"}  # LC=Chair, LP=Pondeuse
+INVOICE_PREFIX = "FAC"
+DELIVERY_NOTE_PREFIX = "BL"
+
+
+def next_value(db: Session, organization_id, prefix: str, year: int,
+               seed: Optional[Callable[[], int]] = None) -> int:
+    """Take the next number of a sequence.
+
+    `seed` returns the highest number already in use; it is only called
+    when the sequence of that year does not exist yet.
+    """
+    increment = update(NumberSequence).where(
+        NumberSequence.organization_id == organization_id,
+        NumberSequence.prefix == prefix,
+        NumberSequence.year == year
+    ).values(
+        last_value=NumberSequence.last_value + 1,
+        updated_at=datetime.utcnow()
+    ).returning(NumberSequence.last_value).execution_options(synchronize_session=False)
+
+    value = db.execute(increment).scalar()
+    if value is not None:
+        return value
+
+    # First number of the year
+    first = (seed() if seed else 0) + 1
+    try:
+        with db.begin_nested():
+            db.add(NumberSequence(organization_id=organization_id, prefix=prefix, year=year, last_value=first))
+        return first
+    except IntegrityError:
+        # Another request created it in the meantime
+        return db.execute(increment).scalar()
+
+
+def _org_tag(organization_id) -> str:
+    return str(organization_id).replace("-", "")[:8].upper()
+
+
+def generate_lot_code(db: Session, organization_id, lot_type: str, year: Optional[int] = None) -> str:
+    """Next lot code of the organization, e.g. LC-2026-0042."""
+    from app.models.building import Building
+    from app.models.lot import Lot
+    from app.models.site import Site
+
+    year = year or datetime.now().year
+    prefix = LOT_PREFIXES.get(getattr(lot_type, "value", lot_type), "LP")
+    pattern = f"{prefix}-{year}-"
+
+    def seed() -> int:
+        codes = db.query(Lot.code).join(Building, Lot.building_id == Building.id).join(
+            Site, Building.site_id == Site.id
+        ).filter(
+            Site.organization_id == organization_id,
+            Lot.code.like(f"{pattern}%")
+        ).all()
+        suffixes = [code[len(pattern):] for code, in codes]
+        return max((int(suffix) for suffix in suffixes if suffix.isdigit()), default=0)
+
+    return f"{pattern}{next_value(db, organization_id, prefix, year, seed):04d}"
+
+
+def generate_document_number(db: Session, organization_id, prefix: str, date: datetime) -> str:
+    """Next invoice or delivery note number, e.g. FAC-2026-1A2B3C4D-00042.
+
+    The organization tag keeps numbers (and invoice file names) unique
+    across organizations, each of which has its own continuous sequence.
+    """
+    value = next_value(db, organization_id, prefix, date.year)
+    return f"{prefix}-{date.year}-{_org_tag(organization_id)}-{value:05d}"
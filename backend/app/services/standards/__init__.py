@@ -0,0 +1,4 @@
+# Breed standards (weight, feed, water and laying curves).
+#
+# `data` is plain Python; `curves` and `registry` use NumPy, so import them
+# where they are used rather than at module import time.
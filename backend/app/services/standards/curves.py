@@ -0,0 +1,129 @@
+"""
+Breed standard curves as NumPy arrays indexed by age in days.
+
+A `BreedCurve` holds one float array per metric, so a scalar lookup is a
+single index and a whole history (or a lots x days matrix of ages) is one
+fancy-indexing pass.
+"""
+import re
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+
+from app.services.standards.data import (
+    DEFAULT_WATER_FEED_RATIO, FEED, MAX_AGE_DAYS, WATER,
+)
+
+
+def normalize_breed(breed: Optional[str]) -> str:
+    """Lookup key for a breed name: "ISA Brown" -> "isabrown"."""
+    return re.sub(r"[^a-z0-9]", "", (breed or "").lower())
+
+
+def build_series(spec: Dict, length: int = MAX_AGE_DAYS + 1) -> np.ndarray:
+    """Expand a curve spec (see data.py) into a per-day array."""
+    points = sorted((float(age), float(value)) for age, value in spec["points"])
+    ages = np.array([age for age, _ in points])
+    values = np.array([value for _, value in points])
+    weekly = spec.get("unit", "day") == "week"
+
+    grid = np.arange(-(-length // 7) if weekly else length, dtype=np.float64)
+    if spec.get("interpolation", "linear") == "step":
+        index = np.searchsorted(ages, grid, side="right") - 1
+        series = values[np.clip(index, 0, len(values) - 1)]
+    else:
+        series = np.interp(grid, ages, values)
+
+    if weekly:
+        series = np.repeat(series, 7)
+    return np.ascontiguousarray(series[:length], dtype=np.float64)
+
+
+class BreedCurve:
+    """Standard curves of one breed (or generic lot type)."""
+
+    def __init__(self, key: str, name: str, lot_type: Optional[str], series: Dict[str, np.ndarray],
+                 is_custom: bool = False):
+        self.key = key
+        self.name = name
+        self.lot_type = lot_type
+        self.series = series
+        self.is_custom = is_custom
+        for values in series.values():
+            values.flags.writeable = False
+
+    @classmethod
+    def from_spec(cls, key: str, spec: Dict, base: Optional["BreedCurve"] = None,
+                  is_custom: bool = False) -> "BreedCurve":
+        """Build a curve from a spec, on top of `base` curves when given.
+
+        Metrics missing from both are left out, except water which follows
+        feed (x water_feed_ratio) unless the spec gives its own water curve.
+        """
+        curves = spec.get("curves", {})
+        series = dict(base.series) if base is not None else {}
+        for metric, curve_spec in curves.items():
+            series[metric] = build_series(curve_spec)
+        if WATER not in curves and FEED in series and (FEED in curves or WATER not in series):
+            ratio = spec.get("water_feed_ratio", DEFAULT_WATER_FEED_RATIO)
+            series[WATER] = series[FEED] * ratio
+        return cls(
+            key=key,
+            name=spec.get("name") or (base.name if base is not None else key),
+            lot_type=spec.get("lot_type") or (base.lot_type if base is not None else None),
+            series=series,
+            is_custom=is_custom,
+        )
+
+    @property
+    def metrics(self) -> list:
+        return sorted(self.series)
+
+    def has(self, metric: str) -> bool:
+        return metric in self.series
+
+    def value(self, metric: str, age_days: int) -> float:
+        """Standard value at one age (ages past the curve use its last value)."""
+        values = self.series[metric]
+        return float(values[min(max(int(age_days), 0), len(values) - 1)])
+
+    def values(self, metric: str, ages_days) -> np.ndarray:
+        """Standard values for an array of ages, of any shape."""
+        values = self.series[metric]
+        ages = np.asarray(ages_days, dtype=np.int64)
+        return values[np.clip(ages, 0, len(values) - 1)]
+
+    def weekly(self, metric: str, weeks: Iterable[int]) -> np.ndarray:
+        """Standard values at the start of each week."""
+        return self.values(metric, np.asarray(list(weeks), dtype=np.int64) * 7)
+
+
+def stack_series(curves, metric: str) -> np.ndarray:
+    """(n_curves, n_days) matrix of one metric, NaN where a curve lacks it."""
+    matrix = np.full((len(curves), MAX_AGE_DAYS + 1), np.nan)
+    for row, curve in enumerate(curves):
+        if curve.has(metric):
+            matrix[row] = curve.series[metric]
+    return matrix
+
+
+def batch_values(curves, metric: str, ages_days) -> np.ndarray:
+    """Values of `metric` for many lots at once.
+
+    `curves[i]` is the curve of lot i and `ages_days` has one row per lot
+    (shape (n_lots,) or (n_lots, n_days)). Lots sharing a curve share its
+    row, so the lookup is a single pass over a small stacked table.
+    """
+    unique, rows = [], []
+    positions: Dict[int, int] = {}
+    for curve in curves:
+        position = positions.get(id(curve))
+        if position is None:
+            position = positions[id(curve)] = len(unique)
+            unique.append(curve)
+        rows.append(position)
+
+    table = stack_series(unique, metric)
+    ages = np.clip(np.asarray(ages_days, dtype=np.int64), 0, table.shape[1] - 1)
+    rows = np.asarray(rows, dtype=np.int64).reshape((-1,) + (1,) * (ages.ndim - 1))
+    return table[rows, ages]
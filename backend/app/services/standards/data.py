@@ -0,0 +1,191 @@
+"""
+Built-in breed standards.
+
+Plain Python data (no NumPy) so it can be read anywhere. Each standard maps
+metric names to a curve spec:
+
+    {"unit": "day" | "week", "interpolation": "linear" | "step",
+     "points": [(age, value), ...]}
+
+"linear" interpolates between points, "step" holds a point's value until the
+next point. Weekly curves are expanded to days (week w = days 7w..7w+6).
+
+Values are rounded performance objectives from the breeders' published
+guides (as-hatched broilers, brown layers, floor/cage average).
+"""
+from typing import Dict, List, Tuple
+
+# Metric names
+WEIGHT = "weight_g"              # Body weight (g)
+FEED = "feed_g"                  # Feed intake (g/bird/day)
+WATER = "water_ml"               # Water intake (ml/bird/day)
+LAYING = "laying_rate"           # Hen-day laying rate (%), optimal
+LAYING_MIN = "laying_rate_min"   # Lower bound of the normal range
+LAYING_MAX = "laying_rate_max"   # Upper bound of the normal range
+
+METRICS = (WEIGHT, FEED, WATER, LAYING, LAYING_MIN, LAYING_MAX)
+
+# Curves are stored up to this age; older ages use the last value
+MAX_AGE_WEEKS = 104
+MAX_AGE_DAYS = MAX_AGE_WEEKS * 7 + 6
+
+# Water is derived from feed when a standard has no water curve
+DEFAULT_WATER_FEED_RATIO = 2.0
+
+# Feed program by lot type: (first age in days, FeedType value) of each phase
+FEED_PHASES: Dict[str, List[Tuple[int, str]]] = {
+    "broiler": [(0, "starter"), (11, "grower"), (25, "finisher")],
+    "layer": [(0, "starter"), (56, "grower"), (112, "pre_layer"), (126, "layer")],
+}
+
+
+def feed_phase(lot_type: str, age_days: int) -> str:
+    """Feed type a lot of `lot_type` eats at `age_days`."""
+    phases = FEED_PHASES.get(lot_type, FEED_PHASES["broiler"])
+    current = phases[0][1]
+    for start, feed_type in phases:
+        if age_days >= start:
+            current = feed_type
+    return current
+
+
+def _daily(points, interpolation: str = "linear") -> Dict:
+    return {"unit": "day", "interpolation": interpolation, "points": points}
+
+
+def _weekly(points, interpolation: str = "linear") -> Dict:
+    return {"unit": "week", "interpolation": interpolation, "points": points}
+
+
+def _laying(rows: List[Tuple[int, float, float, float]], interpolation: str = "linear") -> Dict:
+    """Split (week, min, max, optimal) rows into the three laying curves."""
+    return {
+        LAYING_MIN: _weekly([(week, low) for week, low, _, _ in rows], interpolation),
+        LAYING_MAX: _weekly([(week, high) for week, _, high, _ in rows], interpolation),
+        LAYING: _weekly([(week, optimal) for week, _, _, optimal in rows], interpolation),
+    }
+
+
+_ROSS_308_WEIGHT = [
+    (0, 44), (7, 200), (14, 520), (21, 1000), (28, 1600),
+    (35, 2250), (42, 2900), (49, 3500), (56, 4000),
+]
+_ISA_BROWN_WEIGHT = [
+    (0, 40), (1, 65), (2, 120), (3, 190), (4, 270), (5, 360), (6, 460),
+    (8, 660), (10, 850), (12, 1030), (14, 1200), (16, 1360), (18, 1540),
+    (20, 1720), (24, 1880), (30, 1950), (40, 2000), (60, 2030), (80, 2050),
+]
+
+
+BUILTIN_STANDARDS: Dict[str, Dict] = {
+    # Generic standards, used when a lot has no (known) breed. Their feed and
+    # laying curves are the historical app tables, kept as step functions.
+    "broiler": {
+        "name": "Standard chair",
+        "lot_type": "broiler",
+        "curves": {
+            WEIGHT: _daily(_ROSS_308_WEIGHT),
+            FEED: _daily([
+                (0, 20), (8, 45), (15, 80), (22, 115), (29, 155), (36, 178), (43, 190),
+            ], "step"),
+        },
+    },
+    "layer": {
+        "name": "Standard pondeuse",
+        "lot_type": "layer",
+        "curves": {
+            WEIGHT: _weekly(_ISA_BROWN_WEIGHT),
+            FEED: _daily([
+                (0, 20), (15, 35), (29, 50), (43, 60), (57, 75), (85, 90), (126, 115),
+            ], "step"),
+            **_laying([
+                (0, 0, 0, 0), (18, 0, 10, 5), (19, 5, 25, 15), (20, 20, 50, 35),
+                (21, 40, 70, 55), (22, 55, 80, 70), (23, 70, 88, 80), (24, 80, 92, 88),
+                (25, 85, 95, 92), (27, 88, 96, 94), (31, 85, 94, 91), (36, 82, 92, 88),
+                (41, 78, 88, 84), (46, 72, 84, 79), (51, 65, 78, 72), (56, 58, 72, 66),
+                (61, 50, 68, 60), (71, 40, 60, 50), (101, 30, 50, 40),
+            ], "step"),
+        },
+    },
+    "ross308": {
+        "name": "Ross 308",
+        "lot_type": "broiler",
+        "aliases": ["ross", "ross 308"],
+        "curves": {
+            WEIGHT: _daily(_ROSS_308_WEIGHT),
+            FEED: _daily([
+                (0, 12), (7, 38), (14, 82), (21, 125), (28, 165),
+                (35, 195), (42, 215), (49, 230), (56, 238),
+            ]),
+            WATER: _daily([
+                (0, 22), (7, 68), (14, 148), (21, 225), (28, 297),
+                (35, 351), (42, 387), (49, 414), (56, 428),
+            ]),
+        },
+    },
+    "cobb500": {
+        "name": "Cobb 500",
+        "lot_type": "broiler",
+        "aliases": ["cobb", "cobb 500"],
+        "curves": {
+            WEIGHT: _daily([
+                (0, 42), (7, 185), (14, 480), (21, 950), (28, 1550),
+                (35, 2200), (42, 2850), (49, 3450), (56, 3950),
+            ]),
+            FEED: _daily([
+                (0, 12), (7, 36), (14, 78), (21, 120), (28, 160),
+                (35, 190), (42, 210), (49, 225), (56, 232),
+            ]),
+            WATER: _daily([
+                (0, 22), (7, 65), (14, 140), (21, 216), (28, 288),
+                (35, 342), (42, 378), (49, 405), (56, 418),
+            ]),
+        },
+    },
+    "isabrown": {
+        "name": "ISA Brown",
+        "lot_type": "layer",
+        "aliases": ["isa", "isa brown"],
+        "curves": {
+            WEIGHT: _weekly(_ISA_BROWN_WEIGHT),
+            FEED: _weekly([
+                (0, 10), (1, 10), (2, 17), (3, 23), (4, 29), (5, 35), (6, 41),
+                (8, 51), (10, 58), (12, 63), (14, 68), (16, 75), (18, 85),
+                (20, 100), (22, 110), (25, 116), (40, 117), (70, 115), (100, 113),
+            ]),
+            **_laying([
+                (0, 0, 0, 0), (17, 0, 0, 0), (18, 0, 12, 5), (19, 8, 30, 20),
+                (20, 35, 60, 50), (21, 60, 82, 75), (22, 76, 90, 87), (23, 84, 94, 92),
+                (24, 87, 95, 94), (25, 88, 96, 95), (30, 88, 96, 95), (35, 87, 95, 94),
+                (40, 85, 94, 93), (45, 83, 92, 91), (50, 80, 91, 89), (55, 78, 89, 87),
+                (60, 75, 88, 85), (65, 72, 85, 82), (70, 68, 83, 79), (75, 65, 80, 76),
+                (80, 62, 78, 73), (90, 55, 73, 67), (100, 48, 67, 60),
+            ]),
+        },
+    },
+    "lohmannbrown": {
+        "name": "Lohmann Brown",
+        "lot_type": "layer",
+        "aliases": ["lohmann", "lohmann brown", "lohmann brown classic"],
+        "curves": {
+            WEIGHT: _weekly([
+                (0, 38), (1, 70), (2, 125), (3, 195), (4, 275), (5, 365), (6, 455),
+                (8, 650), (10, 840), (12, 1010), (14, 1170), (16, 1330), (18, 1500),
+                (20, 1680), (24, 1850), (30, 1930), (40, 1980), (60, 2010), (80, 2030),
+            ]),
+            FEED: _weekly([
+                (0, 10), (1, 10), (2, 16), (3, 22), (4, 28), (5, 34), (6, 40),
+                (8, 50), (10, 57), (12, 62), (14, 67), (16, 73), (18, 83),
+                (20, 98), (22, 108), (25, 115), (40, 118), (70, 116), (100, 114),
+            ]),
+            **_laying([
+                (0, 0, 0, 0), (17, 0, 0, 0), (18, 0, 15, 8), (19, 10, 35, 25),
+                (20, 38, 65, 55), (21, 62, 84, 77), (22, 78, 91, 88), (23, 85, 94, 92),
+                (24, 87, 95, 93), (26, 88, 96, 94), (32, 88, 96, 94), (36, 86, 95, 93),
+                (40, 84, 93, 91), (45, 82, 92, 90), (50, 80, 90, 88), (55, 77, 89, 86),
+                (60, 74, 87, 84), (65, 71, 85, 81), (70, 67, 82, 78), (75, 64, 80, 75),
+                (80, 61, 77, 72), (90, 54, 72, 66), (100, 47, 66, 59),
+            ]),
+        },
+    },
+}
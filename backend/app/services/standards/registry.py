@@ -0,0 +1,103 @@
+"""
+Breed standards registry.
+
+Resolves the standard curves of a lot: organization custom curves first,
+then the built-in breed standards, then the generic standard of the lot
+type. Built-in curves are built once per process; custom curves are cached
+per organization and reloaded after CUSTOM_CACHE_SECONDS or when the
+organization edits them.
+"""
+import time
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+
+from app.services.standards.curves import BreedCurve, batch_values, normalize_breed
+from app.services.standards.data import BUILTIN_STANDARDS
+
+
+def _lot_type_value(lot_type) -> Optional[str]:
+    return getattr(lot_type, "value", lot_type)
+
+
+class StandardsRegistry:
+    """Built-in and per-organization breed standard curves."""
+
+    CUSTOM_CACHE_SECONDS = 300
+
+    def __init__(self, specs: Dict[str, Dict] = BUILTIN_STANDARDS):
+        self._specs = specs
+        self._builtin: Optional[Dict[str, BreedCurve]] = None
+        self._aliases: Dict[str, str] = {}
+        self._custom: Dict[str, Tuple[float, Dict[str, BreedCurve]]] = {}
+        self._lock = Lock()
+
+    def builtin(self) -> Dict[str, BreedCurve]:
+        if self._builtin is None:
+            with self._lock:
+                if self._builtin is None:
+                    aliases = {}
+                    for key, spec in self._specs.items():
+                        aliases[key] = key
+                        for alias in spec.get("aliases", []):
+                            aliases[normalize_breed(alias)] = key
+                    self._aliases = aliases
+                    self._builtin = {key: BreedCurve.from_spec(key, spec) for key, spec in self._specs.items()}
+        return self._builtin
+
+    def generic(self, lot_type) -> BreedCurve:
+        return self.builtin()["layer" if _lot_type_value(lot_type) == "layer" else "broiler"]
+
+    def builtin_for(self, breed: Optional[str], lot_type=None) -> BreedCurve:
+        builtin = self.builtin()
+        key = self._aliases.get(normalize_breed(breed))
+        return builtin[key] if key is not None else self.generic(lot_type)
+
+    def custom(self, db, organization_id) -> Dict[str, BreedCurve]:
+        """Custom curves of an organization, by breed key."""
+        if db is None or organization_id is None:
+            return {}
+        org_key = str(organization_id)
+        cached = self._custom.get(org_key)
+        if cached is not None and time.monotonic() - cached[0] < self.CUSTOM_CACHE_SECONDS:
+            return cached[1]
+
+        from app.models.breed_standard import BreedStandard
+
+        rows = db.query(BreedStandard).filter(BreedStandard.organization_id == organization_id).all()
+        curves = {}
+        for row in rows:
+            spec = {"name": row.breed, "lot_type": row.lot_type, "curves": row.curves or {}}
+            base = self.builtin_for(row.breed, row.lot_type)
+            curves[row.breed_key] = BreedCurve.from_spec(row.breed_key, spec, base=base, is_custom=True)
+        self._custom[org_key] = (time.monotonic(), curves)
+        return curves
+
+    def invalidate(self, organization_id=None) -> None:
+        if organization_id is None:
+            self._custom.clear()
+        else:
+            self._custom.pop(str(organization_id), None)
+
+    def resolve(self, breed: Optional[str], lot_type=None, db=None, organization_id=None) -> BreedCurve:
+        """Curve for a breed, preferring the organization's custom curve."""
+        custom = self.custom(db, organization_id).get(normalize_breed(breed))
+        if custom is not None:
+            return custom
+        return self.builtin_for(breed, lot_type)
+
+    def resolve_lot(self, lot, db=None, organization_id=None) -> BreedCurve:
+        return self.resolve(lot.breed, lot.type, db=db, organization_id=organization_id)
+
+    def catalog(self, db=None, organization_id=None) -> List[BreedCurve]:
+        """Every curve available to an organization (custom ones override)."""
+        curves = dict(self.builtin())
+        curves.update(self.custom(db, organization_id))
+        return list(curves.values())
+
+    def batch(self, lots, metric: str, ages_days, db=None, organization_id=None):
+        """Standard `metric` for many lots at once (see curves.batch_values)."""
+        curves = [self.resolve_lot(lot, db=db, organization_id=organization_id) for lot in lots]
+        return batch_values(curves, metric, ages_days)
+
+
+standards_registry = StandardsRegistry()
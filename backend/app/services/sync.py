@@ -0,0 +1,159 @@
+"""
+Delta sync of the field clients (tablets recording offline in the buildings).
+
+GET /sync pages through the organization's rows of SYNCED_TABLES in compact
+batches: per entity, the column names once, the rows as arrays and the ids
+of the deleted rows.
+
+- Without `since`, a full sync: every row, entity after entity (parents
+  first) by id. Its `seq` is the organization's data version read before
+  the first page, so a row written while the client pages is returned
+  again by the next delta sync rather than missed.
+- With `since`, a delta sync: the sync_changes journal entries after it
+  (app.db.data_versions writes them at each commit), by sequence. Rows are
+  read as they are now; tombstones become deleted ids.
+
+Pages go on with the opaque `cursor`; the `seq` of the last one is the
+client's next `since`. `reset` asks the client for a full sync: the journal
+holds a bulk write it could not follow row by row, or `since` is unknown.
+"""
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, or_, select
+from sqlalchemy.orm import Session
+
+from app.db.data_versions import RESET, SYNCED_TABLES
+from app.models.building import Building
+from app.models.feed import FeedConsumption, WaterConsumption
+from app.models.lot import Lot
+from app.models.organization import Organization
+from app.models.production import EggProduction, WeightRecord, Mortality
+from app.models.site import Site
+from app.models.sync import SyncChange
+
+MODELS = {
+    model.__tablename__: model
+    for model in (Site, Building, Lot, EggProduction, WeightRecord, Mortality, FeedConsumption, WaterConsumption)
+}
+assert tuple(MODELS) == SYNCED_TABLES
+
+
+class SyncCursorError(Exception):
+    """The cursor of a page is malformed."""
+
+
+def organization_filter(model, organization_id):
+    """Filter of the organization's rows of `model` (by site, building or lot)."""
+    if model is Site:
+        return Site.organization_id == organization_id
+    buildings = select(Building.id).join(Site, Site.id == Building.site_id).where(
+        Site.organization_id == organization_id
+    )
+    if model is Building:
+        return Building.id.in_(buildings)
+    lots = select(Lot.id).where(Lot.building_id.in_(buildings))
+    if model is Lot:
+        return Lot.id.in_(lots)
+    return or_(model.lot_id.in_(lots), model.building_id.in_(buildings))
+
+
+def _encode(*parts) -> str:
+    return ".".join("" if part is None else part.hex if isinstance(part, uuid.UUID) else str(part) for part in parts)
+
+
+def _decode(cursor: str) -> Tuple[str, int, int, Optional[uuid.UUID]]:
+    """(kind, seq, position, last id): "s" full sync (position: entity index), "d" delta (journal id)."""
+    try:
+        kind, seq, position, last_id = cursor.split(".")
+        if kind not in ("s", "d"):
+            raise ValueError(kind)
+        return kind, int(seq), int(position), uuid.UUID(last_id) if last_id else None
+    except ValueError as exc:
+        raise SyncCursorError(cursor) from exc
+
+
+class SyncService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def changes(self, organization_id, since: Optional[int] = None, cursor: Optional[str] = None,
+                limit: int = 1000) -> dict:
+        """One page of the organization's changes after `since` (everything without it)."""
+        if cursor:
+            kind, seq, position, last_id = _decode(cursor)
+            if kind == "s":
+                return self._snapshot(organization_id, seq, position, last_id, limit)
+            return self._delta(organization_id, seq, position, limit)
+        if since is None:
+            return self._snapshot(organization_id, self._version(organization_id), 0, None, limit)
+        if since > self._version(organization_id):
+            return _page(since, {}, reset=True)  # Another database, or restored from a backup
+        return self._delta(organization_id, since, None, limit)
+
+    def _version(self, organization_id) -> int:
+        return self.db.scalar(select(Organization.data_version).where(Organization.id == organization_id)) or 0
+
+    def _snapshot(self, organization_id, seq: int, index: int, after: Optional[uuid.UUID], limit: int) -> dict:
+        batches: Dict[str, dict] = {}
+        remaining = limit
+        while index < len(SYNCED_TABLES) and remaining > 0:
+            name = SYNCED_TABLES[index]
+            table = MODELS[name].__table__
+            query = select(table).where(organization_filter(MODELS[name], organization_id))
+            if after is not None:
+                query = query.where(table.c.id > after)
+            rows = self.db.execute(query.order_by(table.c.id).limit(remaining + 1)).all()
+            if rows[:remaining]:
+                batches[name] = _batch(table, rows[:remaining])
+            if len(rows) > remaining:
+                return _page(seq, batches, cursor=_encode("s", seq, index, rows[remaining - 1].id))
+            remaining -= len(rows)
+            index, after = index + 1, None
+        if index < len(SYNCED_TABLES):
+            return _page(seq, batches, cursor=_encode("s", seq, index, None))
+        return _page(seq, batches)
+
+    def _delta(self, organization_id, since: int, after_id: Optional[int], limit: int) -> dict:
+        version = self._version(organization_id)
+        later = SyncChange.seq > since
+        if after_id is not None:
+            later = or_(later, and_(SyncChange.seq == since, SyncChange.id > after_id))
+        entries = self.db.execute(
+            select(SyncChange.id, SyncChange.seq, SyncChange.entity, SyncChange.entity_id, SyncChange.deleted)
+            .where(SyncChange.organization_id == organization_id, later)
+            .order_by(SyncChange.seq, SyncChange.id)
+            .limit(limit + 1)
+        ).all()
+        has_more = len(entries) > limit
+        entries = entries[:limit]
+        if any(entry.entity == RESET for entry in entries):
+            return _page(since, {}, reset=True)
+
+        upserts: Dict[str, List] = {}
+        deletes: Dict[str, List] = {}
+        for entry in entries:
+            (deletes if entry.deleted else upserts).setdefault(entry.entity, []).append(entry.entity_id)
+        batches: Dict[str, dict] = {}
+        for name in SYNCED_TABLES:
+            if name in upserts:
+                table = MODELS[name].__table__
+                # Rows gone without a tombstone (written by a rolled back savepoint) are left out
+                rows = self.db.execute(select(table).where(table.c.id.in_(upserts[name]))).all()
+                if rows:
+                    batches[name] = _batch(table, rows)
+            if name in deletes:
+                batches.setdefault(name, {})["deleted"] = deletes[name]
+
+        if has_more:
+            last = entries[-1]
+            return _page(last.seq, batches, cursor=_encode("d", last.seq, last.id, None))
+        return _page(max([version] + [entry.seq for entry in entries]), batches)
+
+
+def _batch(table, rows) -> dict:
+    return {"columns": [column.name for column in table.columns], "rows": [list(row) for row in rows]}
+
+
+def _page(seq: int, changes: Dict[str, dict], cursor: Optional[str] = None, reset: bool = False) -> dict:
+    return {"seq": seq, "reset": reset, "has_more": cursor is not None, "cursor": cursor, "changes": changes}
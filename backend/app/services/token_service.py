@@ -0,0 +1,102 @@
+"""
+Token Service - Issues, rotates and revokes authentication tokens.
+
+Access tokens are short-lived JWTs verified statelessly (with an in-memory
+cache). Refresh tokens are opaque, stored hashed in `refresh_tokens` and
+rotated on every use.
+"""
+
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.security import create_access_token, revoke_user_access_tokens
+from app.models.refresh_token import RefreshToken
+from app.models.user import User
+from app.schemas.user import Token, UserResponse
+
+
+class RefreshTokenError(Exception):
+    """Raised when a refresh token cannot be exchanged."""
+
+
+class TokenService:
+    """Authentication token lifecycle."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def issue_tokens(self, user: User, family_id: Optional[UUID] = None) -> Token:
+        """Create an access/refresh token pair for a user. Commits the session."""
+        refresh_token, raw_refresh_token = RefreshToken.create_token(
+            user.id,
+            expires_days=settings.REFRESH_TOKEN_EXPIRE_DAYS,
+            family_id=family_id
+        )
+        self.db.add(refresh_token)
+        self.db.commit()
+
+        return Token(
+            access_token=create_access_token(data={"sub": str(user.id)}),
+            expires_in=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+            refresh_token=raw_refresh_token,
+            user=UserResponse.model_validate(user)
+        )
+
+    def rotate(self, raw_refresh_token: str) -> Token:
+        """Exchange a refresh token for a new pair, revoking the old one.
+
+        Presenting an already rotated token means it leaked: the whole
+        family is revoked and the legitimate holder must log in again.
+        """
+        stored = self._find(raw_refresh_token)
+        if stored is None:
+            raise RefreshTokenError("Session invalide")
+
+        if stored.is_revoked:
+            self.revoke_family(stored.family_id)
+            self.db.commit()
+            raise RefreshTokenError("Session revoquee")
+
+        if stored.is_expired:
+            raise RefreshTokenError("Session expiree")
+
+        user = self.db.query(User).filter(User.id == stored.user_id).first()
+        if user is None or not user.is_active:
+            stored.is_revoked = True
+            self.db.commit()
+            raise RefreshTokenError("Compte inactif")
+
+        stored.is_revoked = True
+        return self.issue_tokens(user, family_id=stored.family_id)
+
+    def revoke(self, raw_refresh_token: str) -> None:
+        """Revoke the family of a refresh token (logout from one device)."""
+        stored = self._find(raw_refresh_token)
+        if stored is not None:
+            self.revoke_family(stored.family_id)
+            self.db.commit()
+
+    def revoke_family(self, family_id: UUID) -> None:
+        self.db.query(RefreshToken).filter(
+            RefreshToken.family_id == family_id,
+            RefreshToken.is_revoked == False
+        ).update({"is_revoked": True}, synchronize_session=False)
+
+    def revoke_all_for_user(self, user_id: UUID) -> None:
+        """Revoke every session of a user (deactivation, password change).
+
+        Does not commit: callers revoke as part of their own transaction.
+        """
+        self.db.query(RefreshToken).filter(
+            RefreshToken.user_id == user_id,
+            RefreshToken.is_revoked == False
+        ).update({"is_revoked": True}, synchronize_session=False)
+        revoke_user_access_tokens(user_id)
+
+    def _find(self, raw_refresh_token: str) -> Optional[RefreshToken]:
+        return self.db.query(RefreshToken).filter(
+            RefreshToken.token_hash == RefreshToken.hash_token(raw_refresh_token)
+        ).first()
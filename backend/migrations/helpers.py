@@ -0,0 +1,66 @@
+"""
+Idempotent schema helpers for revisions.
+
+Databases created before Alembic were built by `create_all` and patched by
+hand-run scripts, so a revision cannot assume which of its changes already
+exist. These helpers make such revisions safe to apply to any of them.
+"""
+import sqlalchemy as sa
+from alembic import op
+
+
+def _inspector():
+    return sa.inspect(op.get_bind())
+
+
+def has_table(table_name: str) -> bool:
+    return _inspector().has_table(table_name)
+
+
+def has_column(table_name: str, column_name: str) -> bool:
+    return any(col["name"] == column_name for col in _inspector().get_columns(table_name))
+
+
+def has_index(table_name: str, index_name: str) -> bool:
+    return any(idx["name"] == index_name for idx in _inspector().get_indexes(table_name))
+
+
+def add_column_if_missing(table_name: str, column: sa.Column) -> bool:
+    if has_column(table_name, column.name):
+        return False
+    if not column.foreign_keys:
+        op.add_column(table_name, column)
+        return True
+
+    # SQLite cannot ALTER in a constraint: batch mode recreates the table there,
+    # and only adds named constraints
+    foreign_keys = list(column.foreign_keys)
+    with op.batch_alter_table(table_name) as batch_op:
+        batch_op.add_column(sa.Column(column.name, column.type, nullable=column.nullable,
+                                      server_default=column.server_default))
+        for fk in foreign_keys:
+            referred_table, referred_column = fk.target_fullname.split(".")
+            batch_op.create_foreign_key(f"fk_{table_name}_{column.name}", referred_table,
+                                        [column.name], [referred_column], ondelete=fk.ondelete)
+    return True
+
+
+def create_index_if_missing(index_name: str, table_name: str, columns, unique: bool = False) -> bool:
+    if has_index(table_name, index_name):
+        return False
+    op.create_index(index_name, table_name, columns, unique=unique)
+    return True
+
+
+def drop_columns(table_name: str, *column_names: str) -> None:
+    existing = [name for name in column_names if has_column(table_name, name)]
+    if not existing:
+        return
+    with op.batch_alter_table(table_name) as batch_op:
+        for name in existing:
+            batch_op.drop_column(name)
+
+
+def drop_index_if_exists(index_name: str, table_name: str) -> None:
+    if has_index(table_name, index_name):
+        op.drop_index(index_name, table_name=table_name)
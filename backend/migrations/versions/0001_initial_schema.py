@@ -0,0 +1,690 @@
+"""initial schema
+
+Every table of the application as of the switch to Alembic. Databases
+created earlier by create_all only get the tables they are missing; the
+following revisions port the ad-hoc column migrations.
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-19 03:09:58.374508
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.db.types import GUID
+from migrations.helpers import has_table
+
+# revision identifiers, used by Alembic.
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if not has_table('organizations'):
+        op.create_table('organizations',
+        sa.Column('id', GUID(), nullable=False),
+        sa.Column('name', sa.String(length=200), nullable=False),
+        sa.Column('type', sa.Enum('INDIVIDUAL', 'COMPANY', 'COOPERATIVE', 'GROUP', name='organizationtype'), nullable=True),
+        sa.Column('registration_number', sa.String(length=100), nullable=True),
+        sa.Column('tax_id', sa.String(length=50), nullable=True),
+        sa.Column('address', sa.Text(), nullable=True),
+        sa.Column('city', sa.String(length=100), nullable=True),
+        sa.Column('country', sa.String(length=100), nullable=True),
+        sa.Column('phone', sa.String(length=20), nullable=True),
+        sa.Column('email', sa.String(length=255), nullable=True),
+        sa.Column('website', sa.String(length=255), nullable=True),
+        sa.Column('logo_url', sa.String(length=500), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+        )
+
+    if not has_table('clients'):
+        op.create_table('clients',
+        sa.Column('id', GUID(), nullable=False),
+        sa.Column('organization_id', GUID(), nullable=False),
+        sa.Column('name', sa.String(length=200), nullable=False),
+        sa.Column('company', sa.String(length=200), nullable=True),
+        sa.Column('phone', sa.String(length=20), nullable=True),
+        sa.Column('phone_2', sa.String(length=20), nullable=True),
+        sa.Column('email', sa.String(length=255), nullable=True),
+        sa.Column('address', sa.Text(), nullable=True),
+        sa.Column('city', sa.String(length=100), nullable=True),
+        sa.Column('client_type', sa.String(length=50), nullable=True),
+        sa.Column('credit_limit', sa.Numeric(precision=14, scale=2), nullable=True),
+        sa.Column('payment_terms_days', sa.Integer(), nullable=True),
+        sa.Column('notes', sa.Text(), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['organization_id'], ['organizations.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+
+    if not has_table('sites'):
+        op.create_table('sites',
+        sa.Column('id', GUID(), nullable=False),
+        sa.Column('organization_id', GUID(), nullable=False),
+        sa.Column('name', sa.String(length=200), nullable=False),
+        sa.Column('code', sa.String(length=20), nullable=True),
+        sa.Column('address', sa.Text(), nullable=True),
+        sa.Column('city', sa.String(length=100), nullable=True),
+        sa.Column('region', sa.String(length=100), nullable=True),
+        sa.Column('country', sa.String(length=100), nullable=True),
+        sa.Column('gps_latitude', sa.Numeric(precision=10, scale=8), nullable=True),
+        sa.Column('gps_longitude', sa.Numeric(precision=11, scale=8), nullable=True),
+        sa.Column('total_capacity', sa.Numeric(precision=10, scale=0), nullable=True),
+        sa.Column('surface_hectares', sa.Numeric(precision=10, scale=2), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.Column('notes', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['organization_id'], ['organizations.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+
+    if not has_table('suppliers'):
+        op.create_table('suppliers',
+        sa.Column('id', GUID(), nullable=False),
+        sa.Column('organization_id', GUID(), nullable=False),
+        sa.Column('name', sa.String(length=200), nullable=False),
+        sa.Column('company', sa.String(length=200), nullable=True),
+        sa.Column('phone', sa.String(length=20), nullable=True),
+        sa.Column('phone_2', sa.String(length=20), nullable=True),
+        sa.Column('email', sa.String(length=255), nullable=True),
+        sa.Column('address', sa.Text(), nullable=True),
+        sa.Column('city', sa.String(length=100), nullable=True),
+        sa.Column('supplier_type', sa.String(length=50), nullable=True),
+        sa.Column('quality_rating', sa.Numeric(precision=3, scale=1), nullable=True),
+        sa.Column('delivery_rating', sa.Numeric(precision=3, scale=1), nullable=True),
+        sa.Column('price_rating', sa.Numeric(precision=3, scale=1), nullable=True),
+        sa.Column('notes', sa.Text(), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['organization_id'], ['organizations.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+
+    if not has_table('users'):
+        op.create_table('users',
+        sa.Column('id', GUID(), nullable=False),
+        sa.Column('organization_id', GUID(), nullable=True),
+        sa.Column('email', sa.String(length=255), nullable=False),
+        sa.Column('phone', sa.String(length=20), nullable=True),
+        sa.Column('password_hash', sa.String(length=255), nullable=False),
+        sa.Column('first_name', sa.String(length=100), nullable=False),
+        sa.Column('last_name', sa.String(length=100), nullable=False),
+        sa.Column('role', sa.Enum('OWNER', 'MANAGER', 'TECHNICIAN', 'ACCOUNTANT', 'VIEWER', name='userrole'), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.Column('is_superuser', sa.Boolean(), nullable=True),
+        sa.Column('is_verified', sa.Boolean(), nullable=True),
+        sa.Column('language', sa.String(length=5), nullable=True),
+        sa.Column('currency', sa.String(length=10), nullable=True),
+        sa.Column('timezone', sa.String(length=50), nullable=True),
+        sa.Column('avatar_url', sa.String(length=500), nullable=True),
+        sa.Column('last_login', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['organization_id'], ['organizations.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+        with op.batch_alter_table('users', schema=None) as batch_op:
+            batch_op.create_index(batch_op.f('ix_users_email'), ['email'], unique=True)
+            batch_op.create_index(batch_op.f('ix_users_phone'), ['phone'], unique=True)
+
+    if not has_table('alert_configs'):
+        op.create_table('alert_configs',
+        sa.Column('id', GUID(), nullable=False),
+        sa.Column('organization_id', GUID(), nullable=False),
+        sa.Column('site_id', GUID(), nullable=True),
+        sa.Column('alert_type', sa.Enum('MORTALITY_HIGH', 'LAYING_DROP', 'WEIGHT_LOW', 'FEED_CONSUMPTION_ABNORMAL', 'WATER_CONSUMPTION_ABNORMAL', 'STOCK_LOW', 'VACCINATION_DUE', 'PAYMENT_OVERDUE', 'TEMPERATURE_HIGH', 'TEMPERATURE_LOW', name='alerttype'), nullable=False),
+        sa.Column('is_enabled', sa.Boolean(), nullable=True),
+        sa.Column('threshold_value', sa.Numeric(precision=14, scale=4), nullable=True),
+        sa.Column('threshold_unit', sa.String(length=20), nullable=True),
+        sa.Column('notify_email', sa.Boolean(), nullable=True),
+        sa.Column('notify_sms', sa.Boolean(), nullable=True),
+        sa.Column('notify_push', sa.Boolean(), nullable=True),
+        sa.Column('notify_whatsapp', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['organization_id'], ['organizations.id'], ),
+        sa.ForeignKeyConstraint(['site_id'], ['sites.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+
+    if not has_table('buildings'):
+        op.create_table('buildings',
+        sa.Column('id', GUID(), nullable=False),
+        sa.Column('site_id', GUID(), nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('code', sa.String(length=20), nullable=True),
+        sa.Column('building_type', sa.Enum('BROILER', 'LAYER', 'BREEDER', 'PULLET', 'HATCHERY', 'FEED_STORAGE', 'EGG_STORAGE', 'MIXED', name='buildingtype'), nullable=False),
+        sa.Column('tracking_mode', sa.Enum('LOTS', 'DIRECT', name='trackingmode'), nullable=True),
+        sa.Column('capacity', sa.Integer(), nullable=True),
+        sa.Column('surface_m2', sa.Numeric(precision=10, scale=2), nullable=True),
+        sa.Column('ventilation_type', sa.Enum('NATURAL', 'TUNNEL', 'STATIC', 'MIXED', name='ventilationtype'), nullable=True),
+        sa.Column('has_electricity', sa.Boolean(), nullable=True),
+        sa.Column('has_water', sa.Boolean(), nullable=True),
+        sa.Column('has_generator', sa.Boolean(), nullable=True),
+        sa.Column('feeder_type', sa.String(length=50), nullable=True),
+        sa.Column('feeder_count', sa.Integer(), nullable=True),
+        sa.Column('drinker_type', sa.String(length=50), nullable=True),
+        sa.Column('drinker_count', sa.Integer(), nullable=True),
+        sa.Column('construction_year', sa.Integer(), nullable=True),
+        sa.Column('last_renovation', sa.DateTime(), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.Column('notes', sa.Text(), nullable=True),
+        sa.Column('current_quantity', sa.Integer(), nullable=True),
+        sa.Column('breed', sa.String(length=100), nullable=True),
+        sa.Column('supplier', sa.String(length=200), nullable=True),
+        sa.Column('placement_date', sa.Date(), nullable=True),
+        sa.Column('age_at_placement', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['site_id'], ['sites.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+        )
+
+    if not has_table('email_verification_tokens'):
+        op.create_table('email_verification_tokens',
+        sa.Column('id', GUID(), nullable=False),
+        sa.Column('user_id', GUID(), nullable=False),
+        sa.Column('token', sa.String(length=100), nullable=False),
+        sa.Column('is_used', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+        )
+        with op.batch_alter_table('email_verification_tokens', schema=None) as batch_op:
+            batch_op.create_index(batch_op.f('ix_email_verification_tokens_token'), ['token'], unique=True)
+
+    if not has_table('invitations'):
+        op.create_table('invitations',
+        sa.Column('id', GUID(), nullable=False),
+        sa.Column('organization_id', GUID(), nullable=False),
+        sa.Column('invited_by_id', GUID(), nullable=False),
+        sa.Column('email', sa.String(length=255), nullable=False),
+        sa.Column('first_name', sa.String(length=100), nullable=True),
+        sa.Column('last_name', sa.String(length=100), nullable=True),
+        sa.Column('phone', sa.String(length=20), nullable=True),
+        sa.Column('role', sa.String(length=50), nullable=True),
+        sa.Column('token', sa.String(length=100), nullable=False),
+        sa.Column('status', sa.Enum('PENDING', 'ACCEPTED', 'EXPIRED', 'CANCELLED', name='invitationstatus'), nullable=True),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.Column('accepted_at', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['invited_by_id'], ['users.id'], ),
+        sa.ForeignKeyConstraint(['organization_id'], ['organizations.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+        with op.batch_alter_table('invitations', schema=None) as batch_op:
+            batch_op.create_index(batch_op.f('ix_invitations_email'), ['email'], unique=False)
+            batch_op.create_index(batch_op.f('ix_invitations_token'), ['token'], unique=True)
+
+    if not has_table('password_reset_tokens'):
+        op.create_table('password_reset_tokens',
+        sa.Column('id', GUID(), nullable=False),
+        sa.Column('user_id', GUID(), nullable=False),
+        sa.Column('token', sa.String(length=100), nullable=False),
+        sa.Column('is_used', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+        )
+        with op.batch_alter_table('password_reset_tokens', schema=None) as batch_op:
+            batch_op.create_index(batch_op.f('ix_password_reset_tokens_token'), ['token'], unique=True)
+
+    if not has_table('site_members'):
+        op.create_table('site_members',
+        sa.Column('id', GUID(), nullable=False),
+        sa.Column('site_id', GUID(), nullable=False),
+        sa.Column('user_id', GUID(), nullable=False),
+        sa.Column('role', sa.Enum('ADMIN', 'MANAGER', 'TECHNICIAN', 'VIEWER', name='memberrole'), nullable=True),
+        sa.Column('can_edit', sa.Boolean(), nullable=True),
+        sa.Column('can_delete', sa.Boolean(), nullable=True),
+        sa.Column('can_manage_users', sa.Boolean(), nullable=True),
+        sa.Column('added_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['site_id'], ['sites.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+        )
+
+    if not has_table('feed_stocks'):
+        op.create_table('feed_stocks',
+        sa.Column('id', GUID(), nullable=False),
+        sa.Column('organization_id', GUID(), nullable=True),
+        sa.Column('site_id', GUID(), nullable=True),
+        sa.Column('building_id', GUID(), nullable=True),
+        sa.Column('location_type', sa.String(length=20), nullable=True),
+        sa.Column('feed_type', sa.Enum('STARTER', 'GROWER', 'FINISHER', 'PRE_LAYER', 'LAYER', 'BREEDER', name='feedtype'), nullable=False),
+        sa.Column('brand', sa.String(length=100), nullable=True),
+        sa.Column('quantity_kg', sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.Column('min_quantity_kg', sa.Numeric(precision=12, scale=2), nullable=True),
+        sa.Column('price_per_kg', sa.Numeric(precision=10, scale=2), nullable=True),
+        sa.Column('batch_number', sa.String(length=50), nullable=True),
+        sa.Column('expiry_date', sa.Date(), nullable=True),
+        sa.Column('last_restock_date', sa.Date(), nullable=True),
+        sa.Column('supplier_name', sa.String(length=100), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['building_id'], ['buildings.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['organization_id'], ['organizations.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['site_id'], ['sites.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+        )
+
+    if not has_table('sections'):
+        op.create_table('sections',
+        sa.Column('id', GUID(), nullable=False),
+        sa.Column('building_id', GUID(), nullable=False),
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('code', sa.String(length=20), nullable=True),
+        sa.Column('capacity', sa.Integer(), nullable=True),
+        sa.Column('position', sa.Integer(), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['building_id'], ['buildings.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+        )
+
+    if not has_table('lots'):
+        op.create_table('lots',
+        sa.Column('id', GUID(), nullable=False),
+        sa.Column('building_id', GUID(), nullable=True),
+        sa.Column('section_id', GUID(), nullable=True),
+        sa.Column('code', sa.String(length=50), nullable=True),
+        sa.Column('name', sa.String(length=100), nullable=True),
+        sa.Column('type', sa.Enum('BROILER', 'LAYER', name='lottype'), nullable=False),
+        sa.Column('status', sa.Enum('PREPARATION', 'ACTIVE', 'COMPLETED', 'SUSPENDED', 'DELETED', name='lotstatus'), nullable=True),
+        sa.Column('breed', sa.String(length=100), nullable=True),
+        sa.Column('supplier', sa.String(length=200), nullable=True),
+        sa.Column('initial_quantity', sa.Integer(), nullable=False),
+        sa.Column('current_quantity', sa.Integer(), nullable=True),
+        sa.Column('placement_date', sa.Date(), nullable=False),
+        sa.Column('age_at_placement', sa.Integer(), nullable=True),
+        sa.Column('expected_end_date', sa.Date(), nullable=True),
+        sa.Column('actual_end_date', sa.Date(), nullable=True),
+        sa.Column('transfer_to_laying_date', sa.Date(), nullable=True),
+        sa.Column('first_egg_date', sa.Date(), nullable=True),
+        sa.Column('chick_price_unit', sa.Numeric(precision=10, scale=2), nullable=True),
+        sa.Column('transport_cost', sa.Numeric(precision=12, scale=2), nullable=True),
+        sa.Column('other_initial_costs', sa.Numeric(precision=12, scale=2), nullable=True),
+        sa.Column('target_weight_g', sa.Integer(), nullable=True),
+        sa.Column('target_fcr', sa.Numeric(precision=4, scale=2), nullable=True),
+        sa.Column('target_laying_rate', sa.Numeric(precision=5, scale=2), nullable=True),
+        sa.Column('notes', sa.Text(), nullable=True),
+        sa.Column('parent_lot_id', GUID(), nullable=True),
+        sa.Column('split_date', sa.Date(), nullable=True),
+        sa.Column('split_ratio', sa.Numeric(precision=5, scale=4), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('created_by', GUID(), nullable=True),
+        sa.ForeignKeyConstraint(['building_id'], ['buildings.id'], ),
+        sa.ForeignKeyConstraint(['created_by'], ['users.id'], ),
+        sa.ForeignKeyConstraint(['parent_lot_id'], ['lots.id'], ),
+        sa.ForeignKeyConstraint(['section_id'], ['sections.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+        with op.batch_alter_table('lots', schema=None) as batch_op:
+            batch_op.create_index(batch_op.f('ix_lots_parent_lot_id'), ['parent_lot_id'], unique=False)
+
+    if not has_table('alerts'):
+        op.create_table('alerts',
+        sa.Column('id', GUID(), nullable=False),
+        sa.Column('organization_id', GUID(), nullable=False),
+        sa.Column('site_id', GUID(), nullable=True),
+        sa.Column('lot_id', GUID(), nullable=True),
+        sa.Column('alert_type', sa.Enum('MORTALITY_HIGH', 'LAYING_DROP', 'WEIGHT_LOW', 'FEED_CONSUMPTION_ABNORMAL', 'WATER_CONSUMPTION_ABNORMAL', 'STOCK_LOW', 'VACCINATION_DUE', 'PAYMENT_OVERDUE', 'TEMPERATURE_HIGH', 'TEMPERATURE_LOW', name='alerttype'), nullable=False),
+        sa.Column('severity', sa.Enum('INFO', 'WARNING', 'CRITICAL', name='alertseverity'), nullable=True),
+        sa.Column('status', sa.Enum('ACTIVE', 'ACKNOWLEDGED', 'RESOLVED', name='alertstatus'), nullable=True),
+        sa.Column('title', sa.String(length=200), nullable=False),
+        sa.Column('message', sa.Text(), nullable=False),
+        sa.Column('metric_name', sa.String(length=100), nullable=True),
+        sa.Column('metric_value', sa.Numeric(precision=14, scale=4), nullable=True),
+        sa.Column('threshold_value', sa.Numeric(precision=14, scale=4), nullable=True),
+        sa.Column('acknowledged_by', GUID(), nullable=True),
+        sa.Column('acknowledged_at', sa.DateTime(), nullable=True),
+        sa.Column('resolved_by', GUID(), nullable=True),
+        sa.Column('resolved_at', sa.DateTime(), nullable=True),
+        sa.Column('resolution_note', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['acknowledged_by'], ['users.id'], ),
+        sa.ForeignKeyConstraint(['lot_id'], ['lots.id'], ),
+        sa.ForeignKeyConstraint(['organization_id'], ['organizations.id'], ),
+        sa.ForeignKeyConstraint(['resolved_by'], ['users.id'], ),
+        sa.ForeignKeyConstraint(['site_id'], ['sites.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+
+    if not has_table('egg_productions'):
+        op.create_table('egg_productions',
+        sa.Column('id', GUID(), nullable=False),
+        sa.Column('lot_id', GUID(), nullable=True),
+        sa.Column('building_id', GUID(), nullable=True),
+        sa.Column('date', sa.Date(), nullable=False),
+        sa.Column('normal_eggs', sa.Integer(), nullable=True),
+        sa.Column('cracked_eggs', sa.Integer(), nullable=True),
+        sa.Column('dirty_eggs', sa.Integer(), nullable=True),
+        sa.Column('small_eggs', sa.Integer(), nullable=True),
+        sa.Column('double_yolk_eggs', sa.Integer(), nullable=True),
+        sa.Column('soft_shell_eggs', sa.Integer(), nullable=True),
+        sa.Column('eggs_size_s', sa.Integer(), nullable=True),
+        sa.Column('eggs_size_m', sa.Integer(), nullable=True),
+        sa.Column('eggs_size_l', sa.Integer(), nullable=True),
+        sa.Column('eggs_size_xl', sa.Integer(), nullable=True),
+        sa.Column('total_eggs', sa.Integer(), nullable=True),
+        sa.Column('sellable_eggs', sa.Integer(), nullable=True),
+        sa.Column('hen_count', sa.Integer(), nullable=True),
+        sa.Column('laying_rate', sa.Numeric(precision=5, scale=2), nullable=True),
+        sa.Column('avg_egg_weight_g', sa.Numeric(precision=6, scale=2), nullable=True),
+        sa.Column('notes', sa.Text(), nullable=True),
+        sa.Column('recorded_by', GUID(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['building_id'], ['buildings.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['lot_id'], ['lots.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['recorded_by'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+
+    if not has_table('expenses'):
+        op.create_table('expenses',
+        sa.Column('id', GUID(), nullable=False),
+        sa.Column('lot_id', GUID(), nullable=True),
+        sa.Column('site_id', GUID(), nullable=True),
+        sa.Column('date', sa.Date(), nullable=False),
+        sa.Column('category', sa.String(length=50), nullable=False),
+        sa.Column('description', sa.String(length=500), nullable=True),
+        sa.Column('quantity', sa.Numeric(precision=12, scale=2), nullable=True),
+        sa.Column('unit', sa.String(length=20), nullable=True),
+        sa.Column('unit_price', sa.Numeric(precision=10, scale=2), nullable=True),
+        sa.Column('amount', sa.Numeric(precision=14, scale=2), nullable=False),
+        sa.Column('supplier_id', GUID(), nullable=True),
+        sa.Column('supplier_name', sa.String(length=200), nullable=True),
+        sa.Column('is_paid', sa.Boolean(), nullable=True),
+        sa.Column('payment_date', sa.Date(), nullable=True),
+        sa.Column('payment_method', sa.String(length=50), nullable=True),
+        sa.Column('invoice_number', sa.String(length=50), nullable=True),
+        sa.Column('receipt_url', sa.String(length=500), nullable=True),
+        sa.Column('notes', sa.Text(), nullable=True),
+        sa.Column('from_split_lot_id', GUID(), nullable=True),
+        sa.Column('original_expense_id', GUID(), nullable=True),
+        sa.Column('recorded_by', GUID(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['from_split_lot_id'], ['lots.id'], ),
+        sa.ForeignKeyConstraint(['lot_id'], ['lots.id'], ),
+        sa.ForeignKeyConstraint(['original_expense_id'], ['expenses.id'], ),
+        sa.ForeignKeyConstraint(['recorded_by'], ['users.id'], ),
+        sa.ForeignKeyConstraint(['site_id'], ['sites.id'], ),
+        sa.ForeignKeyConstraint(['supplier_id'], ['suppliers.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+        with op.batch_alter_table('expenses', schema=None) as batch_op:
+            batch_op.create_index(batch_op.f('ix_expenses_from_split_lot_id'), ['from_split_lot_id'], unique=False)
+
+    if not has_table('feed_consumptions'):
+        op.create_table('feed_consumptions',
+        sa.Column('id', GUID(), nullable=False),
+        sa.Column('lot_id', GUID(), nullable=True),
+        sa.Column('building_id', GUID(), nullable=True),
+        sa.Column('date', sa.Date(), nullable=False),
+        sa.Column('feed_type', sa.Enum('STARTER', 'GROWER', 'FINISHER', 'PRE_LAYER', 'LAYER', 'BREEDER', name='feedtype'), nullable=True),
+        sa.Column('brand', sa.String(length=100), nullable=True),
+        sa.Column('batch_number', sa.String(length=50), nullable=True),
+        sa.Column('quantity_kg', sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.Column('price_per_kg', sa.Numeric(precision=10, scale=2), nullable=True),
+        sa.Column('total_cost', sa.Numeric(precision=12, scale=2), nullable=True),
+        sa.Column('supplier_id', GUID(), nullable=True),
+        sa.Column('bird_count', sa.Integer(), nullable=True),
+        sa.Column('feed_per_bird_g', sa.Numeric(precision=8, scale=2), nullable=True),
+        sa.Column('notes', sa.Text(), nullable=True),
+        sa.Column('recorded_by', GUID(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['building_id'], ['buildings.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['lot_id'], ['lots.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['recorded_by'], ['users.id'], ),
+        sa.ForeignKeyConstraint(['supplier_id'], ['suppliers.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+
+    if not has_table('feed_stock_movements'):
+        op.create_table('feed_stock_movements',
+        sa.Column('id', GUID(), nullable=False),
+        sa.Column('stock_id', GUID(), nullable=False),
+        sa.Column('movement_type', sa.Enum('RESTOCK', 'CONSUMPTION', 'ADJUSTMENT', 'TRANSFER', name='stockmovementtype'), nullable=False),
+        sa.Column('quantity_kg', sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.Column('supplier_name', sa.String(length=100), nullable=True),
+        sa.Column('invoice_number', sa.String(length=50), nullable=True),
+        sa.Column('unit_price', sa.Numeric(precision=10, scale=2), nullable=True),
+        sa.Column('total_amount', sa.Numeric(precision=12, scale=2), nullable=True),
+        sa.Column('lot_id', GUID(), nullable=True),
+        sa.Column('notes', sa.Text(), nullable=True),
+        sa.Column('recorded_by', GUID(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('date', sa.Date(), nullable=True),
+        sa.ForeignKeyConstraint(['lot_id'], ['lots.id'], ),
+        sa.ForeignKeyConstraint(['recorded_by'], ['users.id'], ),
+        sa.ForeignKeyConstraint(['stock_id'], ['feed_stocks.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+        )
+
+    if not has_table('health_events'):
+        op.create_table('health_events',
+        sa.Column('id', GUID(), nullable=False),
+        sa.Column('lot_id', GUID(), nullable=False),
+        sa.Column('inherited_from_lot_id', GUID(), nullable=True),
+        sa.Column('original_event_id', GUID(), nullable=True),
+        sa.Column('date', sa.Date(), nullable=False),
+        sa.Column('event_type', sa.Enum('VACCINATION', 'TREATMENT', 'VET_VISIT', 'LAB_ANALYSIS', 'PROPHYLAXIS', 'DEWORMING', 'VITAMIN', name='healtheventtype'), nullable=False),
+        sa.Column('product_name', sa.String(length=200), nullable=True),
+        sa.Column('manufacturer', sa.String(length=200), nullable=True),
+        sa.Column('batch_number', sa.String(length=50), nullable=True),
+        sa.Column('expiry_date', sa.Date(), nullable=True),
+        sa.Column('route', sa.Enum('WATER', 'FEED', 'INJECTION', 'SPRAY', 'EYE_DROP', 'ORAL', name='administrationroute'), nullable=True),
+        sa.Column('dose', sa.String(length=100), nullable=True),
+        sa.Column('duration_days', sa.Integer(), nullable=True),
+        sa.Column('target_disease', sa.String(length=200), nullable=True),
+        sa.Column('withdrawal_days_meat', sa.Integer(), nullable=True),
+        sa.Column('withdrawal_days_eggs', sa.Integer(), nullable=True),
+        sa.Column('withdrawal_end_date', sa.Date(), nullable=True),
+        sa.Column('veterinarian_name', sa.String(length=200), nullable=True),
+        sa.Column('veterinarian_phone', sa.String(length=20), nullable=True),
+        sa.Column('cost', sa.Numeric(precision=12, scale=2), nullable=True),
+        sa.Column('reminder_date', sa.Date(), nullable=True),
+        sa.Column('reminder_note', sa.String(length=500), nullable=True),
+        sa.Column('document_url', sa.String(length=500), nullable=True),
+        sa.Column('notes', sa.Text(), nullable=True),
+        sa.Column('recorded_by', GUID(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['inherited_from_lot_id'], ['lots.id'], ondelete='SET NULL'),
+        sa.ForeignKeyConstraint(['lot_id'], ['lots.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['original_event_id'], ['health_events.id'], ondelete='SET NULL'),
+        sa.ForeignKeyConstraint(['recorded_by'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+
+    if not has_table('lot_stats'):
+        op.create_table('lot_stats',
+        sa.Column('lot_id', GUID(), nullable=False),
+        sa.Column('total_mortality', sa.Integer(), nullable=True),
+        sa.Column('mortality_rate', sa.Numeric(precision=5, scale=2), nullable=True),
+        sa.Column('total_eggs', sa.Integer(), nullable=True),
+        sa.Column('average_laying_rate', sa.Numeric(precision=5, scale=2), nullable=True),
+        sa.Column('peak_laying_rate', sa.Numeric(precision=5, scale=2), nullable=True),
+        sa.Column('eggs_per_hen_housed', sa.Numeric(precision=8, scale=2), nullable=True),
+        sa.Column('current_weight_g', sa.Numeric(precision=10, scale=2), nullable=True),
+        sa.Column('daily_gain_g', sa.Numeric(precision=8, scale=2), nullable=True),
+        sa.Column('uniformity', sa.Numeric(precision=5, scale=2), nullable=True),
+        sa.Column('total_feed_kg', sa.Numeric(precision=12, scale=2), nullable=True),
+        sa.Column('feed_conversion_ratio', sa.Numeric(precision=5, scale=2), nullable=True),
+        sa.Column('feed_per_egg', sa.Numeric(precision=6, scale=3), nullable=True),
+        sa.Column('total_water_liters', sa.Numeric(precision=12, scale=2), nullable=True),
+        sa.Column('water_feed_ratio', sa.Numeric(precision=4, scale=2), nullable=True),
+        sa.Column('total_expenses', sa.Numeric(precision=14, scale=2), nullable=True),
+        sa.Column('total_sales', sa.Numeric(precision=14, scale=2), nullable=True),
+        sa.Column('gross_margin', sa.Numeric(precision=14, scale=2), nullable=True),
+        sa.Column('cost_per_kg', sa.Numeric(precision=10, scale=2), nullable=True),
+        sa.Column('cost_per_egg', sa.Numeric(precision=10, scale=4), nullable=True),
+        sa.Column('performance_score', sa.Numeric(precision=5, scale=2), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['lot_id'], ['lots.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('lot_id')
+        )
+
+    if not has_table('mortalities'):
+        op.create_table('mortalities',
+        sa.Column('id', GUID(), nullable=False),
+        sa.Column('lot_id', GUID(), nullable=True),
+        sa.Column('building_id', GUID(), nullable=True),
+        sa.Column('date', sa.Date(), nullable=False),
+        sa.Column('quantity', sa.Integer(), nullable=False),
+        sa.Column('cause', sa.Enum('disease', 'heat_stress', 'cold_stress', 'crushing', 'culling', 'predator', 'accident', 'laying_accident', 'dehydration', 'unknown', 'other', name='mortalitycause'), nullable=True),
+        sa.Column('symptoms', sa.Text(), nullable=True),
+        sa.Column('suspected_disease', sa.String(length=200), nullable=True),
+        sa.Column('photo_urls', sa.Text(), nullable=True),
+        sa.Column('notes', sa.Text(), nullable=True),
+        sa.Column('recorded_by', GUID(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['building_id'], ['buildings.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['lot_id'], ['lots.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['recorded_by'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+
+    if not has_table('sales'):
+        op.create_table('sales',
+        sa.Column('id', GUID(), nullable=False),
+        sa.Column('lot_id', GUID(), nullable=True),
+        sa.Column('site_id', GUID(), nullable=True),
+        sa.Column('date', sa.Date(), nullable=False),
+        sa.Column('sale_type', sa.Enum('EGGS_TRAY', 'EGGS_CARTON', 'LIVE_BIRDS', 'DRESSED_BIRDS', 'CULLED_HENS', 'MANURE', 'OTHER', name='saletype'), nullable=False),
+        sa.Column('quantity', sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.Column('unit', sa.String(length=20), nullable=True),
+        sa.Column('unit_price', sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.Column('total_amount', sa.Numeric(precision=14, scale=2), nullable=True),
+        sa.Column('line_items', sa.JSON(), nullable=True),
+        sa.Column('total_weight_kg', sa.Numeric(precision=10, scale=2), nullable=True),
+        sa.Column('average_weight_kg', sa.Numeric(precision=6, scale=2), nullable=True),
+        sa.Column('client_id', GUID(), nullable=True),
+        sa.Column('client_name', sa.String(length=200), nullable=True),
+        sa.Column('client_phone', sa.String(length=20), nullable=True),
+        sa.Column('payment_status', sa.Enum('PAID', 'PENDING', 'PARTIAL', 'OVERDUE', name='paymentstatus'), nullable=True),
+        sa.Column('amount_paid', sa.Numeric(precision=14, scale=2), nullable=True),
+        sa.Column('payment_date', sa.Date(), nullable=True),
+        sa.Column('payment_method', sa.String(length=50), nullable=True),
+        sa.Column('invoice_number', sa.String(length=50), nullable=True),
+        sa.Column('delivery_note_number', sa.String(length=50), nullable=True),
+        sa.Column('notes', sa.Text(), nullable=True),
+        sa.Column('recorded_by', GUID(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['client_id'], ['clients.id'], ),
+        sa.ForeignKeyConstraint(['lot_id'], ['lots.id'], ),
+        sa.ForeignKeyConstraint(['recorded_by'], ['users.id'], ),
+        sa.ForeignKeyConstraint(['site_id'], ['sites.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+
+    if not has_table('vaccination_schedules'):
+        op.create_table('vaccination_schedules',
+        sa.Column('id', GUID(), nullable=False),
+        sa.Column('lot_id', GUID(), nullable=True),
+        sa.Column('breed', sa.String(length=100), nullable=True),
+        sa.Column('lot_type', sa.String(length=20), nullable=True),
+        sa.Column('vaccine_name', sa.String(length=200), nullable=False),
+        sa.Column('target_disease', sa.String(length=200), nullable=False),
+        sa.Column('day_from', sa.Integer(), nullable=False),
+        sa.Column('day_to', sa.Integer(), nullable=True),
+        sa.Column('route', sa.Enum('WATER', 'FEED', 'INJECTION', 'SPRAY', 'EYE_DROP', 'ORAL', name='administrationroute'), nullable=True),
+        sa.Column('dose', sa.String(length=100), nullable=True),
+        sa.Column('is_mandatory', sa.Boolean(), nullable=True),
+        sa.Column('notes', sa.Text(), nullable=True),
+        sa.Column('program_id', sa.String(length=50), nullable=True),
+        sa.Column('is_system', sa.Boolean(), nullable=True),
+        sa.Column('organization_id', GUID(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['lot_id'], ['lots.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['organization_id'], ['organizations.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+        with op.batch_alter_table('vaccination_schedules', schema=None) as batch_op:
+            batch_op.create_index(batch_op.f('ix_vaccination_schedules_lot_id'), ['lot_id'], unique=False)
+            batch_op.create_index(batch_op.f('ix_vaccination_schedules_program_id'), ['program_id'], unique=False)
+
+    if not has_table('water_consumptions'):
+        op.create_table('water_consumptions',
+        sa.Column('id', GUID(), nullable=False),
+        sa.Column('lot_id', GUID(), nullable=True),
+        sa.Column('building_id', GUID(), nullable=True),
+        sa.Column('date', sa.Date(), nullable=False),
+        sa.Column('quantity_liters', sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.Column('treatment_product', sa.String(length=100), nullable=True),
+        sa.Column('treatment_dose', sa.String(length=50), nullable=True),
+        sa.Column('bird_count', sa.Integer(), nullable=True),
+        sa.Column('water_per_bird_ml', sa.Numeric(precision=8, scale=2), nullable=True),
+        sa.Column('water_feed_ratio', sa.Numeric(precision=4, scale=2), nullable=True),
+        sa.Column('notes', sa.Text(), nullable=True),
+        sa.Column('recorded_by', GUID(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['building_id'], ['buildings.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['lot_id'], ['lots.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['recorded_by'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+
+    if not has_table('weight_records'):
+        op.create_table('weight_records',
+        sa.Column('id', GUID(), nullable=False),
+        sa.Column('lot_id', GUID(), nullable=True),
+        sa.Column('building_id', GUID(), nullable=True),
+        sa.Column('date', sa.Date(), nullable=False),
+        sa.Column('age_days', sa.Integer(), nullable=True),
+        sa.Column('average_weight_g', sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.Column('sample_size', sa.Integer(), nullable=True),
+        sa.Column('min_weight_g', sa.Numeric(precision=10, scale=2), nullable=True),
+        sa.Column('max_weight_g', sa.Numeric(precision=10, scale=2), nullable=True),
+        sa.Column('std_deviation', sa.Numeric(precision=8, scale=2), nullable=True),
+        sa.Column('uniformity_cv', sa.Numeric(precision=5, scale=2), nullable=True),
+        sa.Column('standard_weight_g', sa.Numeric(precision=10, scale=2), nullable=True),
+        sa.Column('weight_vs_standard', sa.Numeric(precision=6, scale=2), nullable=True),
+        sa.Column('notes', sa.Text(), nullable=True),
+        sa.Column('recorded_by', GUID(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['building_id'], ['buildings.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['lot_id'], ['lots.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['recorded_by'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+
+
+def downgrade():
+    # Dropping a table drops its indexes
+    op.drop_table('weight_records')
+    op.drop_table('water_consumptions')
+    op.drop_table('vaccination_schedules')
+    op.drop_table('sales')
+    op.drop_table('mortalities')
+    op.drop_table('lot_stats')
+    op.drop_table('health_events')
+    op.drop_table('feed_stock_movements')
+    op.drop_table('feed_consumptions')
+    op.drop_table('expenses')
+    op.drop_table('egg_productions')
+    op.drop_table('alerts')
+    op.drop_table('lots')
+    op.drop_table('sections')
+    op.drop_table('feed_stocks')
+    op.drop_table('site_members')
+    op.drop_table('password_reset_tokens')
+    op.drop_table('invitations')
+    op.drop_table('email_verification_tokens')
+    op.drop_table('buildings')
+    op.drop_table('alert_configs')
+    op.drop_table('users')
+    op.drop_table('suppliers')
+    op.drop_table('sites')
+    op.drop_table('clients')
+    op.drop_table('organizations')
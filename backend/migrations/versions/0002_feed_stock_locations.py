@@ -0,0 +1,52 @@
+"""feed stock locations
+
+Ports migrate_feed_stocks.py: organization/building-level feed stocks and
+the purchase details of stock movements.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 09:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.db.types import GUID
+from migrations.helpers import add_column_if_missing, drop_columns
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    add_column_if_missing('feed_stocks', sa.Column('organization_id', GUID(), sa.ForeignKey('organizations.id', ondelete='CASCADE'), nullable=True))
+    add_column_if_missing('feed_stocks', sa.Column('building_id', GUID(), sa.ForeignKey('buildings.id', ondelete='CASCADE'), nullable=True))
+    add_column_if_missing('feed_stocks', sa.Column('location_type', sa.String(length=20), nullable=True, server_default='site'))
+    add_column_if_missing('feed_stocks', sa.Column('last_restock_date', sa.Date(), nullable=True))
+    add_column_if_missing('feed_stocks', sa.Column('supplier_name', sa.String(length=100), nullable=True))
+    add_column_if_missing('feed_stocks', sa.Column('created_at', sa.DateTime(), nullable=True))
+    add_column_if_missing('feed_stocks', sa.Column('updated_at', sa.DateTime(), nullable=True))
+
+    add_column_if_missing('feed_stock_movements', sa.Column('supplier_name', sa.String(length=100), nullable=True))
+    add_column_if_missing('feed_stock_movements', sa.Column('invoice_number', sa.String(length=50), nullable=True))
+    add_column_if_missing('feed_stock_movements', sa.Column('unit_price', sa.Numeric(precision=10, scale=2), nullable=True))
+    add_column_if_missing('feed_stock_movements', sa.Column('total_amount', sa.Numeric(precision=12, scale=2), nullable=True))
+    add_column_if_missing('feed_stock_movements', sa.Column('lot_id', GUID(), sa.ForeignKey('lots.id'), nullable=True))
+    add_column_if_missing('feed_stock_movements', sa.Column('notes', sa.Text(), nullable=True))
+    add_column_if_missing('feed_stock_movements', sa.Column('date', sa.Date(), nullable=True))
+
+    # Site-level stocks inherit the organization of their site
+    op.execute("""
+        UPDATE feed_stocks
+        SET organization_id = (
+            SELECT organization_id FROM sites WHERE sites.id = feed_stocks.site_id
+        )
+        WHERE organization_id IS NULL AND site_id IS NOT NULL
+    """)
+
+
+def downgrade():
+    drop_columns('feed_stock_movements', 'supplier_name', 'invoice_number', 'unit_price', 'total_amount', 'lot_id', 'notes', 'date')
+    drop_columns('feed_stocks', 'organization_id', 'building_id', 'location_type', 'last_restock_date', 'supplier_name', 'created_at', 'updated_at')
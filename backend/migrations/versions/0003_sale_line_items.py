@@ -0,0 +1,27 @@
+"""sale line items
+
+Ports add_line_items_to_sales.sql: several price lines in a single sale,
+stored as [{"quantity": 5, "unit_price": 1900, "subtotal": 9500}, ...].
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 09:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.helpers import add_column_if_missing, drop_columns
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    add_column_if_missing('sales', sa.Column('line_items', sa.JSON(), nullable=True))
+
+
+def downgrade():
+    drop_columns('sales', 'line_items')
@@ -0,0 +1,38 @@
+"""lot split tracking
+
+Ports add_lot_split_columns.sql: parent lot, split date/ratio on lots and
+the origin of expenses copied to split lots.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 09:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.db.types import GUID
+from migrations.helpers import add_column_if_missing, create_index_if_missing, drop_columns, drop_index_if_exists
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    add_column_if_missing('lots', sa.Column('parent_lot_id', GUID(), sa.ForeignKey('lots.id'), nullable=True))
+    add_column_if_missing('lots', sa.Column('split_date', sa.Date(), nullable=True))
+    add_column_if_missing('lots', sa.Column('split_ratio', sa.Numeric(precision=5, scale=4), nullable=True))
+    add_column_if_missing('expenses', sa.Column('from_split_lot_id', GUID(), sa.ForeignKey('lots.id'), nullable=True))
+    add_column_if_missing('expenses', sa.Column('original_expense_id', GUID(), sa.ForeignKey('expenses.id'), nullable=True))
+
+    create_index_if_missing('ix_lots_parent_lot_id', 'lots', ['parent_lot_id'])
+    create_index_if_missing('ix_expenses_from_split_lot_id', 'expenses', ['from_split_lot_id'])
+
+
+def downgrade():
+    drop_index_if_exists('ix_expenses_from_split_lot_id', 'expenses')
+    drop_index_if_exists('ix_lots_parent_lot_id', 'lots')
+    drop_columns('expenses', 'from_split_lot_id', 'original_expense_id')
+    drop_columns('lots', 'parent_lot_id', 'split_date', 'split_ratio')
@@ -0,0 +1,29 @@
+"""health event inheritance
+
+Ports add_health_event_inheritance.sql: track health events inherited from
+a parent lot during a split.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 09:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.db.types import GUID
+from migrations.helpers import add_column_if_missing, drop_columns
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    add_column_if_missing('health_events', sa.Column('inherited_from_lot_id', GUID(), sa.ForeignKey('lots.id', ondelete='SET NULL'), nullable=True))
+    add_column_if_missing('health_events', sa.Column('original_event_id', GUID(), sa.ForeignKey('health_events.id', ondelete='SET NULL'), nullable=True))
+
+
+def downgrade():
+    drop_columns('health_events', 'inherited_from_lot_id', 'original_event_id')
@@ -0,0 +1,34 @@
+"""lot vaccination schedules
+
+Ports add_lot_vaccination_schedules.sql: per-lot vaccination schedules and
+the program template they came from.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 09:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.db.types import GUID
+from migrations.helpers import add_column_if_missing, create_index_if_missing, drop_columns, drop_index_if_exists
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    add_column_if_missing('vaccination_schedules', sa.Column('lot_id', GUID(), sa.ForeignKey('lots.id', ondelete='CASCADE'), nullable=True))
+    add_column_if_missing('vaccination_schedules', sa.Column('program_id', sa.String(length=50), nullable=True))
+
+    create_index_if_missing('ix_vaccination_schedules_lot_id', 'vaccination_schedules', ['lot_id'])
+    create_index_if_missing('ix_vaccination_schedules_program_id', 'vaccination_schedules', ['program_id'])
+
+
+def downgrade():
+    drop_index_if_exists('ix_vaccination_schedules_program_id', 'vaccination_schedules')
+    drop_index_if_exists('ix_vaccination_schedules_lot_id', 'vaccination_schedules')
+    drop_columns('vaccination_schedules', 'lot_id', 'program_id')
@@ -0,0 +1,47 @@
+"""breed standards
+
+Organization-specific breed standard curves.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19 11:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.db.types import GUID
+from migrations.helpers import has_table
+
+# revision identifiers, used by Alembic.
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Databases built by create_all from current models already have it
+    if has_table('breed_standards'):
+        return
+    op.create_table('breed_standards',
+    sa.Column('id', GUID(), nullable=False),
+    sa.Column('organization_id', GUID(), nullable=False),
+    sa.Column('breed', sa.String(length=100), nullable=False),
+    sa.Column('breed_key', sa.String(length=100), nullable=False),
+    sa.Column('lot_type', sa.String(length=20), nullable=True),
+    sa.Column('curves', sa.JSON(), nullable=False),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.Column('created_by', GUID(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['created_by'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['organization_id'], ['organizations.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('organization_id', 'breed_key', name='uq_breed_standards_org_breed')
+    )
+    with op.batch_alter_table('breed_standards', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_breed_standards_organization_id'), ['organization_id'], unique=False)
+
+
+def downgrade():
+    op.drop_table('breed_standards')
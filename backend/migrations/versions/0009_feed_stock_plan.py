@@ -0,0 +1,32 @@
+"""feed stock plan
+
+Supply plan columns on feed stocks: demand profile, depletion and reorder.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19 12:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.helpers import add_column_if_missing, drop_columns
+
+# revision identifiers, used by Alembic.
+revision = '0009'
+down_revision = '0008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    add_column_if_missing('feed_stocks', sa.Column('planned_on', sa.Date(), nullable=True))
+    add_column_if_missing('feed_stocks', sa.Column('demand_profile', sa.JSON(), nullable=True))
+    add_column_if_missing('feed_stocks', sa.Column('daily_demand_kg', sa.Numeric(precision=12, scale=2), nullable=True))
+    add_column_if_missing('feed_stocks', sa.Column('depletion_date', sa.Date(), nullable=True))
+    add_column_if_missing('feed_stocks', sa.Column('reorder_date', sa.Date(), nullable=True))
+    add_column_if_missing('feed_stocks', sa.Column('reorder_quantity_kg', sa.Numeric(precision=12, scale=2), nullable=True))
+
+
+def downgrade():
+    drop_columns('feed_stocks', 'planned_on', 'demand_profile', 'daily_demand_kg',
+                 'depletion_date', 'reorder_date', 'reorder_quantity_kg')
@@ -0,0 +1,40 @@
+"""number sequences
+
+Per-organization counters for lot codes, invoice and delivery note numbers.
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-19 13:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.db.types import GUID
+from migrations.helpers import has_table
+
+# revision identifiers, used by Alembic.
+revision = '0010'
+down_revision = '0009'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Databases built by create_all from current models already have it
+    if has_table('number_sequences'):
+        return
+    op.create_table('number_sequences',
+    sa.Column('id', GUID(), nullable=False),
+    sa.Column('organization_id', GUID(), nullable=False),
+    sa.Column('prefix', sa.String(length=20), nullable=False),
+    sa.Column('year', sa.Integer(), nullable=False),
+    sa.Column('last_value', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['organization_id'], ['organizations.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('organization_id', 'prefix', 'year', name='uq_number_sequences_org_prefix_year')
+    )
+
+
+def downgrade():
+    op.drop_table('number_sequences')
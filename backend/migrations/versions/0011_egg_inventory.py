@@ -0,0 +1,76 @@
+"""egg inventory
+
+Per-site egg stock balances and their movement ledger. Balances of
+existing sites are rebuilt from production and sales history on first use
+(see app.services.egg_inventory).
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-19 14:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.db.types import GUID
+from migrations.helpers import has_table
+
+# revision identifiers, used by Alembic.
+revision = '0011'
+down_revision = '0010'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Databases built by create_all from current models already have them
+    if has_table('egg_stocks'):
+        return
+    op.create_table('egg_stocks',
+    sa.Column('id', GUID(), nullable=False),
+    sa.Column('organization_id', GUID(), nullable=False),
+    sa.Column('site_id', GUID(), nullable=False),
+    sa.Column('grade', sa.String(length=20), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('total_produced', sa.Integer(), nullable=False),
+    sa.Column('total_sold', sa.Integer(), nullable=False),
+    sa.Column('total_lost', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['organization_id'], ['organizations.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['site_id'], ['sites.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('site_id', 'grade', name='uq_egg_stocks_site_grade')
+    )
+    with op.batch_alter_table('egg_stocks', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_egg_stocks_organization_id'), ['organization_id'], unique=False)
+
+    op.create_table('egg_stock_movements',
+    sa.Column('id', GUID(), nullable=False),
+    sa.Column('stock_id', GUID(), nullable=False),
+    sa.Column('movement_type', sa.Enum('PRODUCTION', 'SALE', 'BREAKAGE', 'ADJUSTMENT', name='eggmovementtype'), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('balance_after', sa.Integer(), nullable=False),
+    sa.Column('egg_production_id', GUID(), nullable=True),
+    sa.Column('sale_id', GUID(), nullable=True),
+    sa.Column('lot_id', GUID(), nullable=True),
+    sa.Column('date', sa.Date(), nullable=True),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.Column('recorded_by', GUID(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['egg_production_id'], ['egg_productions.id'], ondelete='SET NULL'),
+    sa.ForeignKeyConstraint(['lot_id'], ['lots.id'], ),
+    sa.ForeignKeyConstraint(['recorded_by'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['sale_id'], ['sales.id'], ondelete='SET NULL'),
+    sa.ForeignKeyConstraint(['stock_id'], ['egg_stocks.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('egg_stock_movements', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_egg_stock_movements_egg_production_id'), ['egg_production_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_egg_stock_movements_sale_id'), ['sale_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_egg_stock_movements_stock_id'), ['stock_id'], unique=False)
+
+
+def downgrade():
+    op.drop_table('egg_stock_movements')
+    op.drop_table('egg_stocks')
+    sa.Enum(name='eggmovementtype').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,28 @@
+"""lot financial snapshot
+
+Stored financial summary of each lot, maintained on sale, expense and
+daily entry writes.
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-19 15:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.helpers import add_column_if_missing, drop_columns
+
+# revision identifiers, used by Alembic.
+revision = '0012'
+down_revision = '0011'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    add_column_if_missing('lot_stats', sa.Column('financial_snapshot', sa.JSON(), nullable=True))
+    add_column_if_missing('lot_stats', sa.Column('financials_updated_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    drop_columns('lot_stats', 'financial_snapshot', 'financials_updated_at')
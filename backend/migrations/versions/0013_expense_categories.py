@@ -0,0 +1,107 @@
+"""expense categories
+
+Expense category dimension (canonical categories and their aliases) and
+expenses.category_id, backfilled from the free-text category.
+
+Revision ID: 0013
+Revises: 0012
+Create Date: 2026-10-19 16:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.helpers import create_index_if_missing, drop_columns, drop_index_if_exists, has_column, has_table
+
+# revision identifiers, used by Alembic.
+revision = '0013'
+down_revision = '0012'
+branch_labels = None
+depends_on = None
+
+# Categories and aliases at this revision
+CATEGORIES = [
+    ('feed', 'Aliment'),
+    ('chicks', 'Poussins'),
+    ('veterinary', 'Veterinaire'),
+    ('labor', "Main d'oeuvre"),
+    ('energy', 'Energie'),
+    ('water', 'Eau'),
+    ('transport', 'Transport'),
+    ('packaging', 'Emballage'),
+    ('equipment', 'Equipement'),
+    ('maintenance', 'Entretien'),
+    ('rent', 'Loyer'),
+    ('insurance', 'Assurance'),
+    ('taxes', 'Impots et taxes'),
+    ('other', 'Autre'),
+]
+ALIASES = {
+    'medicine': 'veterinary', 'salary': 'labor', 'utilities': 'energy',
+    'aliment': 'feed', 'aliments': 'feed', 'alimentation': 'feed', 'poussins': 'chicks',
+    'veterinaire': 'veterinary', 'medicaments': 'veterinary', 'vaccins': 'veterinary',
+    'salaires': 'labor', "main d'oeuvre": 'labor', 'electricite': 'energy', 'energie': 'energy',
+    'carburant': 'energy', 'eau': 'water', 'emballage': 'packaging', 'equipement': 'equipment',
+    'entretien': 'maintenance', 'loyer': 'rent', 'assurance': 'insurance', 'impots': 'taxes',
+    'autre': 'other',
+}
+
+
+def upgrade():
+    # Databases built by create_all from current models already have the tables
+    if not has_table('expense_categories'):
+        op.create_table('expense_categories',
+        sa.Column('id', sa.String(length=50), nullable=False),
+        sa.Column('label', sa.String(length=100), nullable=False),
+        sa.Column('sort_order', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+        )
+    if not has_table('expense_category_aliases'):
+        op.create_table('expense_category_aliases',
+        sa.Column('alias', sa.String(length=50), nullable=False),
+        sa.Column('category_id', sa.String(length=50), nullable=False),
+        sa.ForeignKeyConstraint(['category_id'], ['expense_categories.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('alias')
+        )
+
+    bind = op.get_bind()
+    categories = sa.table('expense_categories', sa.column('id'), sa.column('label'), sa.column('sort_order'))
+    aliases = sa.table('expense_category_aliases', sa.column('alias'), sa.column('category_id'))
+    existing = {row[0] for row in bind.execute(sa.select(categories.c.id))}
+    op.bulk_insert(categories, [
+        {'id': category_id, 'label': label, 'sort_order': order}
+        for order, (category_id, label) in enumerate(CATEGORIES) if category_id not in existing
+    ])
+    existing = {row[0] for row in bind.execute(sa.select(aliases.c.alias))}
+    op.bulk_insert(aliases, [
+        {'alias': alias, 'category_id': category_id}
+        for alias, category_id in ALIASES.items() if alias not in existing
+    ])
+
+    if not has_column('expenses', 'category_id'):
+        with op.batch_alter_table('expenses') as batch_op:
+            batch_op.add_column(sa.Column('category_id', sa.String(length=50), nullable=True))
+            batch_op.create_foreign_key('fk_expenses_category_id', 'expense_categories', ['category_id'], ['id'])
+    create_index_if_missing('ix_expenses_category_date', 'expenses', ['category_id', 'date'])
+
+    # Backfill: known categories and aliases, anything else is 'other'
+    op.execute("""
+        UPDATE expenses
+        SET category_id = COALESCE(
+            (SELECT id FROM expense_categories WHERE id = LOWER(TRIM(expenses.category))),
+            (SELECT category_id FROM expense_category_aliases WHERE alias = LOWER(TRIM(expenses.category))),
+            'other'
+        )
+        WHERE category_id IS NULL
+    """)
+    op.execute("""
+        UPDATE expenses
+        SET category = category_id
+        WHERE category <> category_id AND (category_id <> 'other' OR LOWER(TRIM(category)) = 'other')
+    """)
+
+
+def downgrade():
+    drop_index_if_exists('ix_expenses_category_date', 'expenses')
+    drop_columns('expenses', 'category_id')
+    op.drop_table('expense_category_aliases')
+    op.drop_table('expense_categories')
@@ -0,0 +1,28 @@
+"""organization data version
+
+organizations.data_version and data_updated_at, bumped by every write of
+the organization's data; conditional GET validators derive from them.
+
+Revision ID: 0014
+Revises: 0013
+Create Date: 2026-10-19 18:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.helpers import add_column_if_missing, drop_columns
+
+# revision identifiers, used by Alembic.
+revision = '0014'
+down_revision = '0013'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    add_column_if_missing('organizations', sa.Column('data_version', sa.Integer(), nullable=False, server_default='0'))
+    add_column_if_missing('organizations', sa.Column('data_updated_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    drop_columns('organizations', 'data_version', 'data_updated_at')
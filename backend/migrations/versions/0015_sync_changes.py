@@ -0,0 +1,54 @@
+"""sync changes
+
+updated_at on the daily entry tables, and the sync_changes journal behind
+the delta sync of the field clients (GET /sync): the last change of each
+synced row in its organization's sequence, tombstones included.
+
+Revision ID: 0015
+Revises: 0014
+Create Date: 2026-10-19 20:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.db.types import GUID
+from migrations.helpers import add_column_if_missing, drop_columns, has_table
+
+# revision identifiers, used by Alembic.
+revision = '0015'
+down_revision = '0014'
+branch_labels = None
+depends_on = None
+
+DAILY_TABLES = ('egg_productions', 'weight_records', 'mortalities', 'feed_consumptions', 'water_consumptions')
+
+
+def upgrade():
+    for table in DAILY_TABLES:
+        if add_column_if_missing(table, sa.Column('updated_at', sa.DateTime(), nullable=True)):
+            op.execute(f'UPDATE {table} SET updated_at = created_at')
+
+    # Databases built by create_all from current models already have it. Rows
+    # written before are in the clients' first (full) sync, not in the journal
+    if has_table('sync_changes'):
+        return
+    op.create_table('sync_changes',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('organization_id', GUID(), nullable=False),
+    sa.Column('seq', sa.Integer(), nullable=False),
+    sa.Column('entity', sa.String(length=50), nullable=False),
+    sa.Column('entity_id', GUID(), nullable=False),
+    sa.Column('deleted', sa.Boolean(), nullable=False),
+    sa.Column('changed_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['organization_id'], ['organizations.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('entity', 'entity_id', name='uq_sync_changes_entity')
+    )
+    op.create_index('ix_sync_changes_org_seq', 'sync_changes', ['organization_id', 'seq', 'id'])
+
+
+def downgrade():
+    op.drop_index('ix_sync_changes_org_seq', table_name='sync_changes')
+    op.drop_table('sync_changes')
+    for table in DAILY_TABLES:
+        drop_columns(table, 'updated_at')
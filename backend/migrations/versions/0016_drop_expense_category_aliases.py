@@ -0,0 +1,35 @@
+"""drop expense category aliases
+
+The aliases of the expense categories are resolved in code
+(app.models.finance.EXPENSE_CATEGORY_ALIASES), on write: the table 0013
+seeded for its backfill was never read again.
+
+Revision ID: 0016
+Revises: 0015
+Create Date: 2026-10-19 22:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.helpers import has_table
+
+# revision identifiers, used by Alembic.
+revision = '0016'
+down_revision = '0015'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if has_table('expense_category_aliases'):
+        op.drop_table('expense_category_aliases')
+
+
+def downgrade():
+    # Back as 0013 left it, without its rows: nothing reads them
+    op.create_table('expense_category_aliases',
+    sa.Column('alias', sa.String(length=50), nullable=False),
+    sa.Column('category_id', sa.String(length=50), nullable=False),
+    sa.ForeignKeyConstraint(['category_id'], ['expense_categories.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('alias')
+    )
@@ -10,6 +10,7 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from sqlalchemy import text
 from app.db.session import engine, SessionLocal, Base
+from app.db import migrate
 
 # Import all models to ensure they're registered
 from app.models.user import User
@@ -46,15 +47,17 @@ def reset_database():
 
     print("\nDropping all tables...")
 
-    # Drop all tables
+    # Drop all tables, including the migration history
     Base.metadata.drop_all(bind=engine)
+    with engine.begin() as connection:
+        connection.execute(text("DROP TABLE IF EXISTS alembic_version"))
     print("All tables dropped.")
 
     print("\nRecreating all tables...")
 
-    # Recreate all tables
-    Base.metadata.create_all(bind=engine)
-    print("All tables recreated.")
+    # Recreate all tables through the migrations
+    migrate.upgrade(engine)
+    print(f"All tables recreated (revision {migrate.current_revision(engine)}).")
 
     print("\n" + "=" * 60)
     print("DATABASE RESET COMPLETE!")
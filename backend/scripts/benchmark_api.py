@@ -0,0 +1,239 @@
+"""
+Benchmark des endpoints principaux sur un jeu de donnees synthetique.
+
+Genere une base (scripts.synthetic_farm) a la taille demandee, puis joue
+des scenarios contre l'API en processus (TestClient, donc sans le reseau) :
+tableau de bord, insights, historique et resume financier d'un lot, ventes,
+statistiques de suivi. Pour chaque scenario :
+- latence p50 / p95 sur --runs requetes (apres une requete de chauffe),
+- nombre de requetes SQL par appel (compteur de app.core.metrics),
+- pic de memoire Python alloue pendant un appel (tracemalloc).
+
+Comme profile_startup : --save enregistre une reference JSON, --compare
+echoue (code 1) si une latence ou la memoire regresse de plus de
+--max-regression, ou si un scenario fait plus de requetes SQL.
+
+Usage:
+    cd backend
+    python -m scripts.benchmark_api
+    python -m scripts.benchmark_api --orgs 20 --sites 3 --buildings 4 --lots 2 --days 365 --save bench.json
+    python -m scripts.benchmark_api --database-url sqlite:///./bench.db --reuse --compare bench.json
+"""
+
+import argparse
+import json
+import math
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# (name, path) - placeholders are filled from the benchmark organization
+SCENARIOS = (
+    ("dashboard_overview", "/api/v1/dashboard/overview"),
+    ("ai_insights", "/api/v1/dashboard/ai-insights"),
+    ("lots_list", "/api/v1/lots"),
+    ("lot_history", "/api/v1/lots/{broiler_lot_id}/history?limit=100"),
+    ("lot_financial_summary", "/api/v1/lots/{layer_lot_id}/financial-summary"),
+    ("sales_list", "/api/v1/sales"),
+    ("monitoring_stats", "/api/v1/feed/monitoring/stats?lot_id={layer_lot_id}&days=30"),
+)
+
+
+def percentile(values: list, pct: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(values)
+    rank = max(math.ceil(pct / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def benchmark_context(db, org_index: int = 0) -> dict:
+    """Auth headers and entity ids of a generated organization."""
+    from app.core.security import create_access_token
+    from app.models import Building, Lot, Site, User
+    from app.models.lot import LotType
+    from scripts.synthetic_farm import owner_email
+
+    user = db.query(User).filter(User.email == owner_email(org_index)).one()
+    lots = dict(db.query(Lot.type, Lot.id).join(Building, Lot.building_id == Building.id).join(
+        Site, Building.site_id == Site.id
+    ).filter(Site.organization_id == user.organization_id).order_by(Lot.code).all())
+    return {
+        "headers": {"Authorization": f"Bearer {create_access_token({'sub': str(user.id)})}"},
+        "layer_lot_id": lots.get(LotType.LAYER),
+        "broiler_lot_id": lots.get(LotType.BROILER),
+    }
+
+
+def run_scenario(client, path: str, headers: dict, runs: int) -> dict:
+    """Latency percentiles, SQL statements and peak memory of one endpoint."""
+    from app.core.metrics import registry
+
+    def call():
+        response = client.get(path, headers=headers)
+        if response.status_code != 200:
+            raise RuntimeError(f"GET {path}: {response.status_code} {response.text[:500]}")
+        return response
+
+    call()  # Warm-up: caches, lazy imports, stored snapshots
+
+    registry.clear()
+    timings = []
+    size = 0
+    for _ in range(max(runs, 1)):
+        start = time.perf_counter()
+        size = len(call().content)
+        timings.append((time.perf_counter() - start) * 1000)
+    routes = registry.snapshot().values()
+    requests = sum(metrics.queries.count for metrics in routes)
+    queries = sum(metrics.queries.sum for metrics in routes)
+
+    # Separate call: tracemalloc slows allocations down
+    tracemalloc.start()
+    try:
+        call()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "runs": len(timings),
+        "p50_ms": round(statistics.median(timings), 2),
+        "p95_ms": round(percentile(timings, 95), 2),
+        "queries": round(queries / requests, 1) if requests else None,
+        "peak_kb": round(peak / 1024, 1),
+        "response_bytes": size,
+    }
+
+
+def run_scenarios(client, context: dict, runs: int = 20, only=None) -> dict:
+    results = {}
+    for name, template in SCENARIOS:
+        if only and name not in only:
+            continue
+        path = template.format(**context)
+        results[name] = run_scenario(client, path, context["headers"], runs)
+    return results
+
+
+def compare(report: dict, baseline: dict, max_regression: float, min_delta_ms: float = 2.0) -> list:
+    """Return the list of regressions of `report` against `baseline`.
+
+    Latency differences under `min_delta_ms` are ignored (timer noise on
+    fast endpoints); query counts must not grow at all.
+    """
+    failures = []
+    if report.get("dataset", {}).get("shape") != baseline.get("dataset", {}).get("shape"):
+        failures.append("dataset shape differs from the baseline, results are not comparable")
+        return failures
+
+    for name, reference in baseline["scenarios"].items():
+        result = report["scenarios"].get(name)
+        if result is None:
+            continue
+        for key in ("p50_ms", "p95_ms"):
+            allowed = reference[key] * (1 + max_regression)
+            if result[key] > allowed and result[key] - reference[key] >= min_delta_ms:
+                failures.append(f"{name}.{key}: {result[key]} > {allowed:.2f} (baseline {reference[key]})")
+        if reference.get("queries") is not None and (result["queries"] or 0) > reference["queries"]:
+            failures.append(f"{name}.queries: {result['queries']} > {reference['queries']}")
+        allowed = reference["peak_kb"] * (1 + max_regression)
+        if result["peak_kb"] > allowed:
+            failures.append(f"{name}.peak_kb: {result['peak_kb']} > {allowed:.1f} (baseline {reference['peak_kb']})")
+    return failures
+
+
+def print_report(report: dict) -> None:
+    dataset = report["dataset"]
+    print("=" * 78)
+    print("BENCHMARK API")
+    print("=" * 78)
+    print(f"Jeu de donnees: {dataset['shape']}")
+    print(f"Lignes:         {dataset['rows']}")
+    print(f"\n{'scenario':<24}{'p50 ms':>10}{'p95 ms':>10}{'SQL':>8}{'pic KB':>10}{'octets':>12}")
+    for name, result in report["scenarios"].items():
+        queries = "-" if result["queries"] is None else result["queries"]
+        print(f"{name:<24}{result['p50_ms']:>10}{result['p95_ms']:>10}{queries:>8}"
+              f"{result['peak_kb']:>10}{result['response_bytes']:>12}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark des endpoints de l'API")
+    for field, value in (("orgs", 2), ("sites", 2), ("buildings", 4), ("lots", 2), ("days", 90)):
+        parser.add_argument(f"--{field}", type=int, default=value)
+    parser.add_argument("--database-url", help="Base a utiliser (par defaut une base SQLite temporaire)")
+    parser.add_argument("--reuse", action="store_true", help="Ne pas regenerer si la base contient deja des donnees")
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--scenario", action="append", help="Limiter a ce scenario (repetable)")
+    parser.add_argument("--json", action="store_true", help="Sortie JSON")
+    parser.add_argument("--save", metavar="FILE", help="Enregistrer la reference")
+    parser.add_argument("--compare", metavar="FILE", help="Comparer a une reference")
+    parser.add_argument("--max-regression", type=float, default=0.25)
+    parser.add_argument("--min-delta-ms", type=float, default=2.0)
+    args = parser.parse_args(argv)
+
+    # Must be set before the app (and its engine) is imported
+    database_url = args.database_url or f"sqlite:///{tempfile.mkdtemp(prefix='bravopoultry-bench-')}/bench.db"
+    os.environ["DATABASE_URL"] = database_url
+    os.environ["METRICS_ENABLED"] = "true"
+
+    from fastapi.testclient import TestClient
+
+    from app.db.session import Base, SessionLocal, engine
+    from app.main import app
+    from app.models import Organization
+    from scripts.synthetic_farm import FarmShape, generate
+
+    shape = FarmShape(orgs=args.orgs, sites=args.sites, buildings=args.buildings, lots=args.lots, days=args.days)
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        if args.reuse and db.query(Organization).first():
+            from sqlalchemy import func, inspect, select
+
+            tables = inspect(engine).get_table_names()
+            rows = {table: db.scalar(select(func.count()).select_from(Base.metadata.tables[table]))
+                    for table in tables if table in Base.metadata.tables}
+        else:
+            start = time.perf_counter()
+            rows = generate(db, shape)
+            print(f"{sum(rows.values())} lignes generees en {time.perf_counter() - start:.1f} s", file=sys.stderr)
+        context = benchmark_context(db)
+    finally:
+        db.close()
+
+    # No lifespan: the schema was created above, not migrated
+    scenarios = run_scenarios(TestClient(app), context, runs=args.runs, only=args.scenario)
+
+    report = {
+        "dataset": {"shape": {field: getattr(shape, field) for field in ("orgs", "sites", "buildings", "lots", "days")},
+                    "rows": sum(rows.values())},
+        "scenarios": scenarios,
+    }
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReference enregistree dans {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        failures = compare(report, baseline, args.max_regression, args.min_delta_ms)
+        if failures:
+            print("\nREGRESSION DE PERFORMANCE:")
+            for failure in failures:
+                print(f"  - {failure}")
+            return 1
+        print("\nPas de regression de performance.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
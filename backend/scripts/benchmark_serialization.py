@@ -0,0 +1,319 @@
+"""
+Benchmark d'encodage JSON des grandes listes.
+
+Pour chaque liste (ventes, depenses, clients, lots, stocks d'aliment),
+genere N lignes telles que la base les renvoie puis mesure :
+- le chemin historique : objets -> model_validate -> revalidation du
+  response_model par FastAPI -> JSON Pydantic (ou jsonable_encoder pour
+  /feed/stock/all qui n'a pas de response_model),
+- le chemin rapide : lignes -> RowSerializer -> orjson (app.core.serialization).
+
+Les deux sorties sont comparees : le chemin rapide doit produire le meme
+JSON que le chemin historique.
+
+Usage:
+    cd backend
+    python -m scripts.benchmark_serialization
+    python -m scripts.benchmark_serialization --rows 10000 --runs 5 --json
+    python -m scripts.benchmark_serialization --save serialization_baseline.json
+    python -m scripts.benchmark_serialization --compare serialization_baseline.json --max-regression 0.25
+"""
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.core import serialization
+from app.core.serialization import RowSerializer, decimal_as_number
+from app.models.feed import FeedType
+from app.models.finance import PaymentStatus, SaleType
+from app.models.lot import LotStatus, LotType
+from app.schemas.feed import FeedStockResponse
+from app.schemas.finance import ClientResponse, ExpenseResponse, SaleResponse
+from app.schemas.lot import LotSummary
+
+START = date(2025, 1, 1)
+
+
+def _money(rng, high=100000):
+    return Decimal(rng.randint(0, high * 100)) / 100
+
+
+def _optional(rng, value, ratio=0.7):
+    return value if rng.random() < ratio else None
+
+
+def sale_row(rng, i):
+    line_items = None
+    if i % 4 == 0:
+        line_items = [
+            {"quantity": float(rng.randint(1, 200)), "unit_price": float(rng.randint(1000, 5000)), "subtotal": 0.0}
+            for _ in range(rng.randint(1, 3))
+        ]
+        for item in line_items:
+            item["subtotal"] = item["quantity"] * item["unit_price"]
+    quantity = Decimal(rng.randint(1, 500))
+    unit_price = _money(rng, 5000)
+    return {
+        "id": uuid.UUID(int=rng.getrandbits(128)),
+        "date": START + timedelta(days=i % 365),
+        "sale_type": rng.choice(list(SaleType)),
+        "quantity": quantity,
+        "unit": rng.choice(["tray", "kg", "bird", None]),
+        "unit_price": unit_price,
+        "total_weight_kg": _optional(rng, _money(rng, 2000), 0.3),
+        "average_weight_kg": _optional(rng, _money(rng, 4), 0.3),
+        "client_name": _optional(rng, f"Client {i % 50}"),
+        "client_phone": _optional(rng, "+221770000000"),
+        "payment_status": rng.choice(list(PaymentStatus)),
+        "amount_paid": _money(rng),
+        "payment_method": _optional(rng, "cash"),
+        "invoice_number": f"FAC-2025-{i:05d}",
+        "notes": _optional(rng, "Livraison au marche", 0.2),
+        "line_items": line_items,
+        "lot_id": _optional(rng, uuid.UUID(int=rng.getrandbits(128))),
+        "lot_code": _optional(rng, f"LOT-2025-{i % 40:03d}"),
+        "site_id": uuid.UUID(int=rng.getrandbits(128)),
+        "client_id": _optional(rng, uuid.UUID(int=rng.getrandbits(128))),
+        "total_amount": quantity * unit_price,
+        "payment_date": _optional(rng, START + timedelta(days=i % 365), 0.5),
+        "delivery_note_number": _optional(rng, f"BL-2025-{i:05d}", 0.3),
+        "created_at": datetime(2025, 1, 1, 8) + timedelta(minutes=i, microseconds=rng.randint(0, 999999)),
+    }
+
+
+def expense_row(rng, i):
+    return {
+        "id": uuid.UUID(int=rng.getrandbits(128)),
+        "date": START + timedelta(days=i % 365),
+        "category": rng.choice(["feed", "veterinary", "labor", "energy", "divers"]),
+        "description": _optional(rng, "Achat aliment demarrage"),
+        "quantity": _optional(rng, Decimal(rng.randint(1, 100)), 0.5),
+        "unit": _optional(rng, "sac", 0.5),
+        "unit_price": _optional(rng, _money(rng, 20000), 0.5),
+        "amount": _money(rng),
+        "supplier_name": _optional(rng, f"Fournisseur {i % 10}"),
+        "is_paid": rng.random() < 0.8,
+        "payment_method": _optional(rng, "mobile_money"),
+        "invoice_number": _optional(rng, f"F-{i:06d}", 0.4),
+        "notes": _optional(rng, "RAS", 0.2),
+        "lot_id": _optional(rng, uuid.UUID(int=rng.getrandbits(128))),
+        "lot_code": _optional(rng, f"LOT-2025-{i % 40:03d}"),
+        "site_id": uuid.UUID(int=rng.getrandbits(128)),
+        "category_id": _optional(rng, "feed"),
+        "supplier_id": _optional(rng, uuid.UUID(int=rng.getrandbits(128)), 0.4),
+        "payment_date": _optional(rng, START + timedelta(days=i % 365), 0.5),
+        "receipt_url": None,
+        "created_at": datetime(2025, 1, 1, 8) + timedelta(minutes=i),
+    }
+
+
+def client_row(rng, i):
+    total_purchases = _money(rng, 5000000)
+    return {
+        "id": uuid.UUID(int=rng.getrandbits(128)),
+        "organization_id": uuid.UUID(int=1),
+        "name": f"Client {i:05d}",
+        "company": _optional(rng, "Boutique du marche", 0.4),
+        "phone": _optional(rng, "+221770000000"),
+        "phone_2": None,
+        "email": _optional(rng, f"client{i}@example.com", 0.3),
+        "address": _optional(rng, "Rue 10, Dakar", 0.5),
+        "city": _optional(rng, "Dakar"),
+        "client_type": rng.choice(["retailer", "wholesaler", "restaurant", None]),
+        "credit_limit": _optional(rng, _money(rng, 1000000), 0.3),
+        "payment_terms_days": rng.choice([0, 15, 30]),
+        "notes": None,
+        "is_active": True,
+        "created_at": datetime(2024, 6, 1) + timedelta(hours=i),
+        "total_purchases": total_purchases,
+        "outstanding_balance": total_purchases - _money(rng, 10000),
+    }
+
+
+def lot_row(rng, i):
+    return {
+        "id": uuid.UUID(int=rng.getrandbits(128)),
+        "code": f"LOT-2025-{i:05d}",
+        "name": _optional(rng, f"Bande {i}"),
+        "type": rng.choice(list(LotType)),
+        "breed": rng.choice(["Cobb 500", "Ross 308", "Isa Brown"]),
+        "current_quantity": rng.randint(0, 10000),
+        "initial_quantity": 10000,
+        "age_days": rng.randint(1, 500),
+        "status": rng.choice(list(LotStatus)),
+        "building_id": uuid.UUID(int=rng.getrandbits(128)),
+        "building_name": f"Batiment {i % 20}",
+        "site_id": uuid.UUID(int=rng.getrandbits(128)),
+        "site_name": f"Site {i % 5}",
+        "chick_price_unit": _optional(rng, _money(rng, 1000)),
+        "transport_cost": _optional(rng, _money(rng, 50000)),
+        "other_initial_costs": _optional(rng, _money(rng, 50000), 0.3),
+        "placement_date": START + timedelta(days=i % 365),
+    }
+
+
+def feed_stock_row(rng, i):
+    return {
+        "id": uuid.UUID(int=rng.getrandbits(128)),
+        "feed_type": rng.choice(list(FeedType)),
+        "brand": _optional(rng, "Sanders"),
+        "quantity_kg": _money(rng, 20000),
+        "min_quantity_kg": Decimal("100.00"),
+        "price_per_kg": _optional(rng, _money(rng, 500)),
+        "batch_number": _optional(rng, f"B{i:05d}", 0.3),
+        "expiry_date": _optional(rng, START + timedelta(days=180), 0.5),
+        "location_type": rng.choice(["site", "building"]),
+        "organization_id": uuid.UUID(int=1),
+        "site_id": uuid.UUID(int=rng.getrandbits(128)),
+        "building_id": _optional(rng, uuid.UUID(int=rng.getrandbits(128)), 0.5),
+        "last_restock_date": _optional(rng, START + timedelta(days=i % 365)),
+        "supplier_name": _optional(rng, "Fournisseur 1"),
+        "updated_at": datetime(2025, 3, 1) + timedelta(minutes=i),
+        "site_name": f"Site {i % 5}",
+        "building_name": _optional(rng, f"Batiment {i % 20}", 0.5),
+    }
+
+
+# name -> (response schema, row factory, response_model on the route)
+LISTS = {
+    "sales": (SaleResponse, sale_row, True),
+    "expenses": (ExpenseResponse, expense_row, True),
+    "clients": (ClientResponse, client_row, True),
+    "lots": (LotSummary, lot_row, True),
+    "feed_stocks": (FeedStockResponse, feed_stock_row, False),
+}
+
+
+def make_rows(name: str, count: int, seed: int = 42) -> list:
+    """`count` rows of the list `name`, as the database returns them (enums, Decimals)."""
+    rng = random.Random(f"{seed}-{name}")
+    factory = LISTS[name][1]
+    return [factory(rng, i) for i in range(count)]
+
+
+def legacy_encoder(name: str):
+    """Encode as the list endpoints did: ORM objects -> models -> response_model -> JSON."""
+    schema, _, has_response_model = LISTS[name]
+    adapter = TypeAdapter(List[schema])
+
+    def encode(rows):
+        models = [schema.model_validate(SimpleNamespace(**row)) for row in rows]
+        if not has_response_model:
+            return json.dumps(jsonable_encoder([model.model_dump() for model in models])).encode("utf-8")
+        return adapter.dump_json(adapter.validate_python(models))
+    return encode
+
+
+def fast_encoder(name: str):
+    """Encode as the list endpoints do now: rows -> RowSerializer -> orjson."""
+    schema, _, has_response_model = LISTS[name]
+    serializer = RowSerializer(schema) if has_response_model else RowSerializer(schema, decimal=decimal_as_number)
+    return lambda rows: serialization.dumps([serializer(row) for row in rows])
+
+
+def _time(encode, rows, runs: int):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        body = encode(rows)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings, body
+
+
+def run_benchmark(rows: int = 10000, runs: int = 3, names=None) -> dict:
+    """Encode time of both paths per list; raises if their JSON differs."""
+    results = {}
+    for name in names or LISTS:
+        data = make_rows(name, rows)
+        legacy_ms, legacy_body = _time(legacy_encoder(name), data, runs)
+        fast_ms, fast_body = _time(fast_encoder(name), data, runs)
+        if json.loads(legacy_body) != json.loads(fast_body):
+            raise AssertionError(f"{name}: the fast path JSON differs from the Pydantic output")
+        legacy, fast = statistics.median(legacy_ms), statistics.median(fast_ms)
+        results[name] = {
+            "rows": rows,
+            "legacy_ms": round(legacy, 2),
+            "fast_ms": round(fast, 2),
+            "speedup": round(legacy / fast, 2) if fast else None,
+            "bytes": len(fast_body),
+        }
+    return {"rows": rows, "runs": runs, "orjson": serialization.orjson is not None, "lists": results}
+
+
+def compare(report: dict, baseline: dict, max_regression: float) -> list:
+    """Return the regressions of the fast path of `report` against `baseline`."""
+    failures = []
+    for name, result in sorted(report["lists"].items()):
+        reference = baseline["lists"].get(name)
+        if not reference:
+            continue
+        allowed = reference["fast_ms"] * (1 + max_regression)
+        if result["fast_ms"] > allowed:
+            failures.append(f"{name}.fast_ms: {result['fast_ms']} > {allowed:.2f} (baseline {reference['fast_ms']})")
+    return failures
+
+
+def print_report(report: dict) -> None:
+    print("=" * 60)
+    print(f"ENCODAGE JSON - {report['rows']} lignes, mediane de {report['runs']} runs")
+    print("=" * 60)
+    if not report["orjson"]:
+        print("orjson absent : encodeur json de la bibliotheque standard")
+    print(f"{'liste':<14}{'historique':>14}{'rapide':>12}{'gain':>8}{'taille':>12}")
+    for name, result in report["lists"].items():
+        print(
+            f"{name:<14}{result['legacy_ms']:>11.1f} ms{result['fast_ms']:>9.1f} ms"
+            f"{result['speedup']:>7.1f}x{result['bytes'] / 1024:>9.0f} Ko"
+        )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark d'encodage JSON des grandes listes")
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--list", action="append", choices=sorted(LISTS), help="Listes a mesurer (toutes par defaut)")
+    parser.add_argument("--json", action="store_true", help="Sortie JSON")
+    parser.add_argument("--save", metavar="FILE", help="Enregistrer la reference")
+    parser.add_argument("--compare", metavar="FILE", help="Comparer a une reference")
+    parser.add_argument("--max-regression", type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(rows=args.rows, runs=max(args.runs, 1), names=args.list)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReference enregistree dans {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        failures = compare(report, baseline, args.max_regression)
+        if failures:
+            print("\nREGRESSION D'ENCODAGE:")
+            for failure in failures:
+                print(f"  - {failure}")
+            return 1
+        print("\nPas de regression d'encodage.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
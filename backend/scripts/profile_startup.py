@@ -0,0 +1,202 @@
+"""
+Profil de demarrage de l'API (equivalent lisible de `python -X importtime`).
+
+Importe `app.main` dans un processus neuf avec -X importtime, puis affiche :
+- le temps total d'import et la memoire (RSS max) du processus,
+- les modules les plus couteux (temps propre et cumule),
+- le temps par paquet de premier niveau,
+- les sous-systemes lourds charges a l'import alors qu'ils devraient etre
+  paresseux (reportlab, numpy, alembic, smtplib...).
+
+Sert aussi de benchmark de demarrage : --save enregistre une reference JSON,
+--compare echoue (code 1) si le temps d'import ou la memoire regressent.
+
+Usage:
+    cd backend
+    python -m scripts.profile_startup
+    python -m scripts.profile_startup --top 40 --json
+    python -m scripts.profile_startup --runs 5 --save startup_baseline.json
+    python -m scripts.profile_startup --runs 5 --compare startup_baseline.json --max-regression 0.2
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that must only be imported when the feature using them runs: the
+# app modules importing one of them at top level (NumPy for the analytics,
+# forecasts and feed planning) are themselves imported inside the endpoint
+# or function that uses them. tests/test_startup.py checks app.main loads none.
+LAZY_MODULES = ("reportlab", "numpy", "alembic", "smtplib", "email.mime")
+
+_IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$")
+
+_PROBE = """
+import json, resource, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+if sys.platform == "darwin":
+    rss_kb //= 1024
+print(json.dumps({{
+    "import_ms": elapsed * 1000,
+    "max_rss_kb": rss_kb,
+    "modules": sorted(sys.modules),
+}}))
+"""
+
+
+def run_probe(module: str = "app.main") -> dict:
+    """Import `module` in a fresh interpreter and collect import timings."""
+    env = dict(os.environ)
+    env.setdefault("DATABASE_URL", "sqlite:///./bravopoultry.db")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-W", "ignore", "-c", _PROBE.format(module=module)],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Import of {module} failed:\n{result.stderr[-4000:]}")
+
+    probe = json.loads(result.stdout.strip().splitlines()[-1])
+    entries = []
+    for line in result.stderr.splitlines():
+        match = _IMPORTTIME_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            entries.append({
+                "module": name,
+                "self_ms": int(self_us) / 1000,
+                "cumulative_ms": int(cumulative_us) / 1000,
+                "depth": len(indent) // 2,
+            })
+    probe["entries"] = entries
+    return probe
+
+
+def summarize(probes: list, top: int = 25) -> dict:
+    """Aggregate one or more probe runs into a startup report."""
+    last = probes[-1]
+    entries = last["entries"]
+
+    by_package = defaultdict(float)
+    for entry in entries:
+        by_package[entry["module"].split(".")[0]] += entry["self_ms"]
+
+    loaded = set(last["modules"])
+    eager_heavy = [
+        name for name in LAZY_MODULES
+        if name in loaded or any(m.startswith(name + ".") for m in loaded)
+    ]
+
+    import_times = [p["import_ms"] for p in probes]
+    rss = [p["max_rss_kb"] for p in probes]
+    return {
+        "runs": len(probes),
+        "import_ms_median": round(statistics.median(import_times), 1),
+        "import_ms_min": round(min(import_times), 1),
+        "max_rss_kb_median": int(statistics.median(rss)),
+        "module_count": len(loaded),
+        "eager_heavy_modules": eager_heavy,
+        "top_self": [
+            {k: e[k] for k in ("module", "self_ms", "cumulative_ms")}
+            for e in sorted(entries, key=lambda e: e["self_ms"], reverse=True)[:top]
+        ],
+        "top_packages": [
+            {"package": name, "self_ms": round(ms, 1)}
+            for name, ms in sorted(by_package.items(), key=lambda kv: kv[1], reverse=True)[:top]
+        ],
+        "app_modules": [
+            {k: e[k] for k in ("module", "self_ms", "cumulative_ms")}
+            for e in sorted(entries, key=lambda e: e["cumulative_ms"], reverse=True)
+            if e["module"].startswith("app.")
+        ][:top],
+    }
+
+
+def compare(report: dict, baseline: dict, max_regression: float) -> list:
+    """Return the list of regressions of `report` against `baseline`."""
+    failures = []
+    for key in ("import_ms_median", "max_rss_kb_median"):
+        allowed = baseline[key] * (1 + max_regression)
+        if report[key] > allowed:
+            failures.append(f"{key}: {report[key]} > {allowed:.1f} (baseline {baseline[key]})")
+    new_heavy = set(report["eager_heavy_modules"]) - set(baseline.get("eager_heavy_modules", []))
+    if new_heavy:
+        failures.append(f"heavy modules now imported at startup: {sorted(new_heavy)}")
+    return failures
+
+
+def print_report(report: dict) -> None:
+    print("=" * 60)
+    print("PROFIL DE DEMARRAGE - import app.main")
+    print("=" * 60)
+    print(f"Runs:                 {report['runs']}")
+    print(f"Import (median):      {report['import_ms_median']} ms")
+    print(f"RSS max (median):     {report['max_rss_kb_median'] / 1024:.1f} MB")
+    print(f"Modules charges:      {report['module_count']}")
+    heavy = ", ".join(report["eager_heavy_modules"]) or "aucun"
+    print(f"Modules lourds a l'import: {heavy}")
+
+    print("\n--- Paquets (temps propre) ---")
+    for row in report["top_packages"]:
+        print(f"  {row['self_ms']:8.1f} ms  {row['package']}")
+
+    print("\n--- Modules (temps propre) ---")
+    for row in report["top_self"]:
+        print(f"  {row['self_ms']:8.1f} ms  (cumul {row['cumulative_ms']:8.1f})  {row['module']}")
+
+    print("\n--- Modules de l'application (cumul) ---")
+    for row in report["app_modules"]:
+        print(f"  {row['cumulative_ms']:8.1f} ms  {row['module']}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Profil de demarrage de l'API")
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--json", action="store_true", help="Sortie JSON")
+    parser.add_argument("--save", metavar="FILE", help="Enregistrer la reference")
+    parser.add_argument("--compare", metavar="FILE", help="Comparer a une reference")
+    parser.add_argument("--max-regression", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    probes = [run_probe(args.module) for _ in range(max(args.runs, 1))]
+    report = summarize(probes, top=args.top)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReference enregistree dans {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        failures = compare(report, baseline, args.max_regression)
+        if failures:
+            print("\nREGRESSION DE DEMARRAGE:")
+            for failure in failures:
+                print(f"  - {failure}")
+            return 1
+        print("\nPas de regression de demarrage.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,303 @@
+"""
+Generateur de fermes synthetiques pour les benchmarks.
+
+Contrairement a seed_test_data (une ferme, ajouts ORM ligne par ligne), la
+taille est parametrable : N organisations x sites x batiments x lots x jours
+d'historique. Les lignes sont ecrites par lots avec des INSERT executemany
+sur les tables (sans passer par les objets ORM), ce qui permet de construire
+un jeu de ~10M lignes en quelques minutes.
+
+Par lot et par jour : production d'oeufs (pondeuses) ou pesee hebdomadaire
+(chairs), mortalite, aliment et eau. Ventes et depenses chaque semaine.
+Les generateurs sont deterministes (graine fixe) pour que les benchmarks
+soient comparables d'une execution a l'autre.
+
+Usage:
+    cd backend
+    python -m scripts.synthetic_farm --orgs 2 --sites 2 --buildings 3 --lots 2 --days 90
+    DATABASE_URL=sqlite:///./bench.db python -m scripts.synthetic_farm --orgs 300 --sites 3 --buildings 4 --lots 2 --days 365
+"""
+
+import argparse
+import random
+import sys
+import time
+import uuid
+from collections import Counter
+from dataclasses import asdict, dataclass
+from datetime import date, timedelta
+from decimal import Decimal
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.core.security import get_password_hash
+from app.models import (
+    Building, Client, EggProduction, Expense, ExpenseCategoryDefinition, FeedConsumption, FeedStock,
+    FeedStockMovement, Lot, Mortality, Organization, Sale, Site, SiteMember, Supplier, User, WaterConsumption,
+    WeightRecord,
+)
+from app.models.building import BuildingType, TrackingMode
+from app.models.feed import FeedType, StockMovementType
+from app.models.finance import EXPENSE_CATEGORY_LABELS, PaymentStatus, SaleType
+from app.models.lot import LotStatus, LotType
+from app.models.production import MortalityCause
+from app.models.site import MemberRole
+from app.models.user import UserRole
+
+PASSWORD = "password123"
+CLIENTS_PER_ORG = 5
+SUPPLIERS_PER_ORG = 3
+
+
+@dataclass(frozen=True)
+class FarmShape:
+    """Taille du jeu de donnees genere."""
+
+    orgs: int = 1
+    sites: int = 2
+    buildings: int = 3  # par site, en alternance pondeuses / chairs
+    lots: int = 1  # lots actifs par batiment
+    days: int = 30  # jours d'historique par lot
+    birds: int = 5000  # effectif initial d'un lot
+    seed: int = 42
+
+    @property
+    def lot_count(self) -> int:
+        return self.orgs * self.sites * self.buildings * self.lots
+
+
+def owner_email(org_index: int) -> str:
+    return f"owner{org_index}@bench.example.com"
+
+
+class _Writer:
+    """Buffers rows per table and writes them with executemany inserts."""
+
+    def __init__(self, db: Session, batch_size: int):
+        self.db = db
+        self.batch_size = batch_size
+        self.buffers = {}
+        self.counts = Counter()
+
+    def add(self, model, row: dict) -> None:
+        rows = self.buffers.setdefault(model.__table__, [])
+        rows.append(row)
+        if len(rows) >= self.batch_size:
+            self.flush()
+
+    def _write(self, table) -> None:
+        rows = self.buffers.get(table)
+        if rows:
+            self.db.execute(table.insert(), rows)
+            self.counts[table.name] += len(rows)
+            self.buffers[table] = []
+
+    def flush(self) -> None:
+        # Parents before children: buffers are created in dependency order
+        for table in list(self.buffers):
+            self._write(table)
+
+
+def _ensure_expense_categories(db: Session) -> None:
+    if db.scalar(select(func.count()).select_from(ExpenseCategoryDefinition)):
+        return
+    db.execute(ExpenseCategoryDefinition.__table__.insert(), [
+        {"id": key, "label": label, "sort_order": index}
+        for index, (key, label) in enumerate(EXPENSE_CATEGORY_LABELS.items())
+    ])
+
+
+def _lot_history(writer: _Writer, rng: random.Random, lot: dict, site_id, owner_id, client_ids: list,
+                 shape: FarmShape, today: date) -> None:
+    """Daily entries, weekly sales and expenses of one lot."""
+    is_layer = lot["type"] == LotType.LAYER
+    birds = lot["initial_quantity"]
+    start = today - timedelta(days=shape.days - 1)
+
+    for offset in range(shape.days):
+        day = start + timedelta(days=offset)
+        age_days = lot["age_at_placement"] + offset
+
+        dead = rng.randint(0, max(birds // 1000, 1))
+        birds -= dead
+        if dead:
+            writer.add(Mortality, {
+                "id": uuid.uuid4(), "lot_id": lot["id"], "date": day, "quantity": dead,
+                "cause": rng.choice((MortalityCause.UNKNOWN, MortalityCause.HEAT_STRESS, MortalityCause.DISEASE)),
+                "recorded_by": owner_id,
+            })
+
+        feed_g = 115 if is_layer else min(20 + age_days * 4, 200)
+        feed_kg = round(birds * feed_g / 1000 * rng.uniform(0.95, 1.05), 2)
+        writer.add(FeedConsumption, {
+            "id": uuid.uuid4(), "lot_id": lot["id"], "date": day, "quantity_kg": feed_kg,
+            "feed_type": FeedType.LAYER if is_layer else (FeedType.STARTER if age_days <= 10 else FeedType.FINISHER),
+            "price_per_kg": Decimal("350"), "total_cost": Decimal(str(round(feed_kg * 350, 2))),
+            "bird_count": birds, "feed_per_bird_g": feed_g, "recorded_by": owner_id,
+        })
+        writer.add(WaterConsumption, {
+            "id": uuid.uuid4(), "lot_id": lot["id"], "date": day,
+            "quantity_liters": round(feed_kg * 2 * rng.uniform(0.9, 1.1), 2), "bird_count": birds,
+            "recorded_by": owner_id,
+        })
+
+        if is_layer:
+            laid = int(birds * rng.uniform(0.82, 0.92))
+            cracked = laid // 50
+            writer.add(EggProduction, {
+                "id": uuid.uuid4(), "lot_id": lot["id"], "date": day, "normal_eggs": laid - cracked,
+                "cracked_eggs": cracked, "total_eggs": laid, "sellable_eggs": laid - cracked,
+                "hen_count": birds, "laying_rate": round(laid / birds * 100, 2), "recorded_by": owner_id,
+            })
+        elif offset % 7 == 6:
+            weight_g = 45 + age_days * 60 * rng.uniform(0.95, 1.05)
+            writer.add(WeightRecord, {
+                "id": uuid.uuid4(), "lot_id": lot["id"], "date": day, "age_days": age_days,
+                "average_weight_g": round(weight_g, 2), "sample_size": 50, "recorded_by": owner_id,
+            })
+
+        if offset % 7 == 6:
+            if is_layer:
+                sale = {"sale_type": SaleType.EGGS_TRAY, "unit": "tray", "quantity": rng.randint(50, 300),
+                        "unit_price": Decimal(rng.choice(("1800", "1900", "2000")))}
+            else:
+                sold = rng.randint(50, 200)
+                sale = {"sale_type": SaleType.LIVE_BIRDS, "unit": "bird", "quantity": sold,
+                        "unit_price": Decimal("2500"), "total_weight_kg": round(sold * 1.8, 2)}
+            sale["total_amount"] = sale["quantity"] * sale["unit_price"]
+            paid = rng.random() < 0.7
+            writer.add(Sale, {
+                "id": uuid.uuid4(), "lot_id": lot["id"], "site_id": site_id, "date": day,
+                "payment_status": PaymentStatus.PAID if paid else PaymentStatus.PENDING,
+                "amount_paid": sale["total_amount"] if paid else 0, "client_id": rng.choice(client_ids),
+                "invoice_number": f"FAC-{lot['code']}-{offset:04d}", "recorded_by": owner_id, **sale,
+            })
+            writer.add(Expense, {
+                "id": uuid.uuid4(), "lot_id": lot["id"], "site_id": site_id, "date": day,
+                "category": "feed", "category_id": "feed", "description": "Aliment de la semaine",
+                "amount": Decimal(str(round(feed_kg * 7 * 350, 2))), "recorded_by": owner_id,
+            })
+
+
+def generate(db: Session, shape: FarmShape, batch_size: int = 10000, progress=None) -> dict:
+    """Write a synthetic dataset of `shape` and return the row count per table.
+
+    Commits once per organization.
+    """
+    rng = random.Random(shape.seed)
+    today = date.today()
+    password_hash = get_password_hash(PASSWORD)
+    writer = _Writer(db, batch_size)
+    _ensure_expense_categories(db)
+
+    for org_index in range(shape.orgs):
+        org_id = uuid.uuid4()
+        owner_id = uuid.uuid4()
+        writer.add(Organization, {"id": org_id, "name": f"Ferme Bench {org_index}"})
+        writer.add(User, {
+            "id": owner_id, "organization_id": org_id, "email": owner_email(org_index),
+            "password_hash": password_hash, "first_name": "Bench", "last_name": f"Owner {org_index}",
+            "role": UserRole.OWNER, "is_active": True, "is_verified": True,
+        })
+        client_ids = [uuid.uuid4() for _ in range(CLIENTS_PER_ORG)]
+        for index, client_id in enumerate(client_ids):
+            writer.add(Client, {"id": client_id, "organization_id": org_id, "name": f"Client {index + 1}",
+                                "client_type": "retailer", "is_active": True})
+        for index in range(SUPPLIERS_PER_ORG):
+            writer.add(Supplier, {"id": uuid.uuid4(), "organization_id": org_id, "name": f"Fournisseur {index + 1}",
+                                  "is_active": True})
+
+        lots = []
+        for site_index in range(shape.sites):
+            site_id = uuid.uuid4()
+            writer.add(Site, {
+                "id": site_id, "organization_id": org_id, "name": f"Site {org_index}-{site_index}",
+                "code": f"S{org_index}-{site_index}", "is_active": True,
+            })
+            writer.add(SiteMember, {"id": uuid.uuid4(), "site_id": site_id, "user_id": owner_id,
+                                    "role": MemberRole.ADMIN, "can_edit": True, "can_delete": True})
+            for feed_type in (FeedType.LAYER, FeedType.FINISHER):
+                stock_id = uuid.uuid4()
+                writer.add(FeedStock, {
+                    "id": stock_id, "organization_id": org_id, "site_id": site_id, "location_type": "site",
+                    "feed_type": feed_type, "quantity_kg": Decimal("5000"), "price_per_kg": Decimal("350"),
+                })
+                for week in range(0, shape.days, 7):
+                    writer.add(FeedStockMovement, {
+                        "id": uuid.uuid4(), "stock_id": stock_id, "movement_type": StockMovementType.RESTOCK,
+                        "quantity_kg": Decimal("2000"), "unit_price": Decimal("350"),
+                        "date": today - timedelta(days=week), "recorded_by": owner_id,
+                    })
+            for building_index in range(shape.buildings):
+                building_id = uuid.uuid4()
+                is_layer = building_index % 2 == 0
+                writer.add(Building, {
+                    "id": building_id, "site_id": site_id, "name": f"Batiment {building_index + 1}",
+                    "building_type": BuildingType.LAYER if is_layer else BuildingType.BROILER,
+                    "tracking_mode": TrackingMode.LOTS, "capacity": shape.birds * shape.lots, "is_active": True,
+                })
+                for lot_index in range(shape.lots):
+                    lot = {
+                        "id": uuid.uuid4(), "building_id": building_id,
+                        "code": f"LOT-B{org_index}-{site_index}{building_index}{lot_index}",
+                        "type": LotType.LAYER if is_layer else LotType.BROILER, "status": LotStatus.ACTIVE,
+                        "breed": "Isa Brown" if is_layer else "Cobb 500",
+                        "initial_quantity": shape.birds, "current_quantity": shape.birds,
+                        "placement_date": today - timedelta(days=shape.days - 1),
+                        "age_at_placement": 126 if is_layer else 1,
+                        "chick_price_unit": Decimal("600") if is_layer else Decimal("500"),
+                        "created_by": owner_id,
+                    }
+                    writer.add(Lot, lot)
+                    lots.append((lot, site_id))
+
+            writer.add(Expense, {
+                "id": uuid.uuid4(), "site_id": site_id, "date": today, "category": "energy",
+                "category_id": "energy", "description": "Electricite", "amount": Decimal("150000"),
+                "recorded_by": owner_id,
+            })
+
+        for lot, site_id in lots:
+            _lot_history(writer, rng, lot, site_id, owner_id, client_ids, shape, today)
+        writer.flush()
+        db.commit()
+        if progress:
+            progress(org_index + 1, sum(writer.counts.values()))
+
+    return dict(writer.counts)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Generateur de fermes synthetiques")
+    defaults = FarmShape()
+    for field, value in asdict(defaults).items():
+        parser.add_argument(f"--{field}", type=int, default=value)
+    parser.add_argument("--batch-size", type=int, default=10000)
+    args = parser.parse_args(argv)
+    shape = FarmShape(**{field: getattr(args, field) for field in asdict(defaults)})
+
+    from app.db.session import Base, SessionLocal, engine
+
+    Base.metadata.create_all(bind=engine)
+    start = time.perf_counter()
+
+    def progress(done, rows):
+        elapsed = time.perf_counter() - start
+        print(f"  [{done}/{shape.orgs}] {rows} lignes ({rows / max(elapsed, 1e-9):,.0f} lignes/s)")
+
+    db = SessionLocal()
+    try:
+        counts = generate(db, shape, batch_size=args.batch_size, progress=progress)
+    finally:
+        db.close()
+
+    print(f"\n{sum(counts.values())} lignes en {time.perf_counter() - start:.1f} s:")
+    for table, count in sorted(counts.items()):
+        print(f"  {count:>10}  {table}")
+    print(f"\nConnexion: {owner_email(0)} / {PASSWORD}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
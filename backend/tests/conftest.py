@@ -0,0 +1,105 @@
+import os
+import tempfile
+
+# Tests run against a throwaway SQLite database; must be set before app import
+_db_dir = tempfile.mkdtemp(prefix="bravopoultry-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_db_dir}/test.db")
+# Report the statements of the requests going over their query budget
+os.environ.setdefault("QUERY_BUDGET_STATEMENTS", "true")
+
+import pytest
+
+from app.core.metrics import registry
+from app.core.security import get_password_hash, verified_token_cache, token_denylist
+from app.db.engine import pool_metrics
+from app.db.session import Base, engine, SessionLocal
+from app.services.financial_service import expense_rollups
+import app.models  # noqa: F401 - register every model on Base.metadata
+from app.models.organization import Organization
+from app.models.user import User
+
+
+@pytest.fixture(autouse=True)
+def _clean_database():
+    Base.metadata.create_all(bind=engine)
+    registry.clear()
+    yield
+    Base.metadata.drop_all(bind=engine)
+    verified_token_cache.clear()
+    token_denylist.clear()
+    expense_rollups.clear()
+
+    violations = registry.budget_violations()
+    if violations:
+        pytest.fail("Query budget exceeded (app.core.query_budgets):\n" + "\n".join(
+            f"{v['route']}: {v['queries']} statements, budget {v['budget']}"
+            + "".join(f"\n    {count} x {statement}" for statement, count in v["statements"])
+            for v in violations
+        ))
+
+
+@pytest.fixture(autouse=True)
+def _restore_pool_metrics():
+    """Engines a test builds (migrations, replicas...) leave the pool metrics of the app's own."""
+    registered = dict(pool_metrics)
+    yield
+    pool_metrics.clear()
+    pool_metrics.update(registered)
+
+
+@pytest.fixture(autouse=True)
+def _invoices_dir(tmp_path, monkeypatch):
+    """Invoice PDFs of the sales a test records go to its temporary directory."""
+    from app.services import invoice
+
+    monkeypatch.setattr(invoice, "INVOICES_DIR", str(tmp_path / "invoices"))
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def user(db):
+    organization = Organization(name="Ferme Test")
+    db.add(organization)
+    db.flush()
+    user = User(
+        email="owner@example.com",
+        password_hash=get_password_hash("password123"),
+        first_name="Test",
+        last_name="Owner",
+        organization_id=organization.id,
+        is_verified=True,
+    )
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+
+@pytest.fixture
+def building(db, user):
+    from app.models.building import Building
+    from app.models.site import Site
+
+    site = Site(name="Site Test", organization_id=user.organization_id)
+    db.add(site)
+    db.flush()
+    building = Building(name="Batiment 1", site_id=site.id, building_type="broiler", capacity=5000)
+    db.add(building)
+    db.commit()
+    db.refresh(building)
+    return building
+
+
+@pytest.fixture
+def auth_headers(user):
+    from app.core.security import create_access_token
+
+    return {"Authorization": f"Bearer {create_access_token({'sub': str(user.id)})}"}
@@ -0,0 +1,98 @@
+from fastapi.testclient import TestClient
+
+from app.core.security import create_access_token, decode_token, verified_token_cache
+from app.main import app
+
+client = TestClient(app)
+
+
+def login():
+    response = client.post(
+        "/api/v1/auth/login",
+        data={"username": "owner@example.com", "password": "password123"},
+    )
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_login_returns_token_pair(user):
+    tokens = login()
+    assert tokens["refresh_token"]
+    assert tokens["expires_in"] > 0
+
+    response = client.get(
+        "/api/v1/auth/me", headers={"Authorization": f"Bearer {tokens['access_token']}"}
+    )
+    assert response.status_code == 200
+
+
+def test_refresh_rotates_and_detects_reuse(user):
+    tokens = login()
+
+    response = client.post("/api/v1/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 200
+    rotated = response.json()
+    assert rotated["refresh_token"] != tokens["refresh_token"]
+
+    # Replaying the rotated token revokes the whole family
+    response = client.post("/api/v1/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 401
+    response = client.post("/api/v1/auth/refresh", json={"refresh_token": rotated["refresh_token"]})
+    assert response.status_code == 401
+
+
+def test_logout_revokes_access_token(user):
+    tokens = login()
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+
+    response = client.post(
+        "/api/v1/auth/logout", json={"refresh_token": tokens["refresh_token"]}, headers=headers
+    )
+    assert response.status_code == 200
+    assert client.get("/api/v1/auth/me", headers=headers).status_code == 401
+    response = client.post("/api/v1/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 401
+
+
+def test_logout_with_refresh_token_only(user):
+    # The access token of the client expired: its session is still revoked
+    tokens = login()
+    response = client.post("/api/v1/auth/logout", json={"refresh_token": tokens["refresh_token"]},
+                           headers={"Authorization": "Bearer expired"})
+    assert response.status_code == 200
+    response = client.post("/api/v1/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 401
+
+    assert client.post("/api/v1/auth/logout").status_code == 401
+
+
+def test_change_password_revokes_other_sessions(user):
+    phone, laptop = login(), login()
+    headers = {"Authorization": f"Bearer {laptop['access_token']}"}
+
+    response = client.post("/api/v1/users/change-password", headers=headers,
+                           json={"current_password": "password123", "new_password": "nouveau-secret"})
+    assert response.status_code == 200
+    tokens = response.json()
+
+    # Every earlier token is revoked; this device goes on with the new pair
+    for session in (phone, laptop):
+        assert client.get("/api/v1/auth/me",
+                          headers={"Authorization": f"Bearer {session['access_token']}"}).status_code == 401
+        assert client.post("/api/v1/auth/refresh",
+                           json={"refresh_token": session["refresh_token"]}).status_code == 401
+    assert client.get("/api/v1/auth/me",
+                      headers={"Authorization": f"Bearer {tokens['access_token']}"}).status_code == 200
+    assert client.post("/api/v1/auth/refresh", json={"refresh_token": tokens["refresh_token"]}).status_code == 200
+
+
+def test_verified_tokens_are_cached():
+    token = create_access_token(data={"sub": "abc"})
+    assert decode_token(token)["sub"] == "abc"
+    assert verified_token_cache.get(token) is not None
+
+    # A forged payload reusing a cached signature is not served from cache
+    header, _, signature = token.split(".")
+    forged = f"{header}.eyJzdWIiOiJldmlsIn0.{signature}"
+    assert verified_token_cache.get(forged) is None
+    assert decode_token(forged) is None
@@ -0,0 +1,42 @@
+import copy
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from scripts.benchmark_api import SCENARIOS, benchmark_context, compare, percentile, run_scenarios
+from scripts.synthetic_farm import FarmShape, generate
+
+client = TestClient(app)
+
+
+def test_generator_and_scenarios(db):
+    shape = FarmShape(orgs=2, sites=1, buildings=2, lots=1, days=14, birds=1000)
+    rows = generate(db, shape, batch_size=50)
+    assert rows["lots"] == shape.lot_count == 4
+    assert rows["egg_productions"] == 2 * 14  # one layer lot per organization
+    assert rows["weight_records"] == 2 * 2  # weekly, broiler lots
+    assert rows["sales"] == 4 * 2
+
+    report = {"dataset": {"shape": {"orgs": 2}}, "scenarios": run_scenarios(client, benchmark_context(db), runs=3)}
+    assert set(report["scenarios"]) == {name for name, _ in SCENARIOS}
+    for result in report["scenarios"].values():
+        assert result["runs"] == 3
+        assert result["p95_ms"] >= result["p50_ms"] > 0
+        assert result["queries"] >= 1
+        assert result["peak_kb"] > 0
+
+    # The benchmark organization only sees its own data
+    assert len(client.get("/api/v1/lots", headers=benchmark_context(db)["headers"]).json()) == 2
+
+    assert compare(report, report, max_regression=0.25) == []
+    slower = copy.deepcopy(report)
+    slower["scenarios"]["sales_list"]["p50_ms"] = report["scenarios"]["sales_list"]["p50_ms"] * 2 + 10
+    slower["scenarios"]["lot_history"]["queries"] += 1
+    failures = compare(slower, report, max_regression=0.25)
+    assert [failure.split(":")[0] for failure in failures] == ["lot_history.queries", "sales_list.p50_ms"]
+
+
+def test_percentile():
+    assert percentile([5, 1, 3, 2, 4], 50) == 3
+    assert percentile(list(range(1, 101)), 95) == 95
+    assert percentile([7], 95) == 7
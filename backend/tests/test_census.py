@@ -0,0 +1,83 @@
+from datetime import date
+from decimal import Decimal
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models.finance import Sale, SaleType
+from app.models.lot import Lot, LotStatus, LotType
+from app.models.production import Mortality, WeightRecord
+from app.services.census import DependencyCensus
+
+client = TestClient(app)
+
+
+def make_lot(db, building, status=LotStatus.COMPLETED):
+    lot = Lot(building_id=building.id, type=LotType.BROILER, initial_quantity=100, current_quantity=100,
+              placement_date=date.today(), status=status)
+    db.add(lot)
+    db.flush()
+    return lot
+
+
+def test_lot_census_counts_and_exists(db, building):
+    lot = make_lot(db, building)
+    empty = make_lot(db, building)
+    db.add_all([
+        Mortality(lot_id=lot.id, date=date.today(), quantity=2),
+        Mortality(lot_id=lot.id, date=date.today(), quantity=1),
+        WeightRecord(lot_id=lot.id, date=date.today(), average_weight_g=800),
+    ])
+    db.commit()
+
+    census = DependencyCensus(db)
+    counts = census.count_many("lot", [lot.id, empty.id])
+    assert counts[str(lot.id)]["mortalites"] == 2
+    assert counts[str(lot.id)]["pesees"] == 1
+    assert counts[str(lot.id)]["ventes"] == 0
+    assert sum(counts[str(empty.id)].values()) == 0
+
+    assert census.has_any("lot", lot.id)
+    assert not census.has_any("lot", empty.id)
+    assert not census.has_any("lot", lot.id, kinds=["ventes", "depenses"])
+
+
+def test_organization_census_reaches_sales_by_site_or_lot(db, building, user, auth_headers):
+    lot = make_lot(db, building)
+    make_lot(db, building, status=LotStatus.DELETED)
+    db.add_all([
+        Sale(lot_id=lot.id, date=date.today(), sale_type=SaleType.LIVE_BIRDS, quantity=Decimal("1"),
+             unit_price=Decimal("10"), total_amount=Decimal("10")),
+        Sale(site_id=building.site_id, date=date.today(), sale_type=SaleType.EGGS_TRAY, quantity=Decimal("1"),
+             unit_price=Decimal("10"), total_amount=Decimal("10")),
+    ])
+    user.is_superuser = True
+    db.commit()
+
+    counts = DependencyCensus(db).count("organization", user.organization_id)
+    assert counts["utilisateurs"] == 1
+    assert counts["sites"] == 1 and counts["batiments"] == 1
+    assert counts["lots"] == 1
+    assert counts["ventes"] == 2
+
+    response = client.get("/api/v1/admin/data-size", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()[0]["counts"] == counts
+    assert response.json()[0]["total_rows"] == sum(counts.values())
+
+
+def test_site_deletion_guard_uses_census(db, building, auth_headers):
+    make_lot(db, building)
+    db.commit()
+
+    response = client.delete(f"/api/v1/sites/{building.site_id}", headers=auth_headers)
+    assert response.status_code == 400
+    detail = response.json()["detail"]
+    assert detail["error"] == "site_has_data"
+    assert detail["lots_count"] == 1
+    assert detail["buildings"] == [{"id": str(building.id), "name": building.name}]
+
+    response = client.delete(f"/api/v1/sites/{building.site_id}?force=true", headers=auth_headers)
+    assert response.status_code == 200
+    db.expire_all()
+    assert building.is_active is False
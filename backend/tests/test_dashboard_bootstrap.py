@@ -0,0 +1,83 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.core.config import settings
+from app.db.session import engine
+from app.main import app
+from scripts.benchmark_api import benchmark_context
+from scripts.synthetic_farm import FarmShape, generate
+
+client = TestClient(app)
+
+SEPARATE = {
+    "overview": "/api/v1/dashboard/overview",
+    "eggs_trend": "/api/v1/dashboard/charts/eggs-trend?days=14",
+    "financial_trend": "/api/v1/dashboard/charts/financial-trend?months=6",
+    "alerts": "/api/v1/dashboard/alerts",
+    "sites": "/api/v1/sites",
+}
+
+
+@pytest.fixture
+def farm(db):
+    from app.models.alert import Alert, AlertSeverity, AlertType
+    from app.models.building import Building
+    from app.models.site import Site
+    from app.models.user import User
+
+    generate(db, FarmShape(orgs=2, sites=2, buildings=2, lots=1, days=20, birds=1000))
+    context = benchmark_context(db)
+    owner = db.query(User).filter(User.email == "owner0@bench.example.com").one()
+    db.add(Alert(organization_id=owner.organization_id, alert_type=AlertType.MORTALITY_HIGH,
+                 severity=AlertSeverity.CRITICAL, title="Mortalite elevee", message="3% sur 7 jours"))
+    # An inactive building and an empty site are left out of every section
+    site = db.query(Site).filter(Site.organization_id == owner.organization_id).first()
+    db.query(Building).filter(Building.site_id == site.id).first().is_active = False
+    db.add(Site(name="Site vide", organization_id=owner.organization_id))
+    db.commit()
+    return context
+
+
+def count_statements(path, headers):
+    statements = []
+
+    def record(*args):
+        statements.append(1)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        response = client.get(path, headers=headers)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    assert response.status_code == 200, response.text
+    return response.json(), len(statements)
+
+
+@pytest.mark.parametrize("concurrency", [4, 1])
+def test_bootstrap_matches_the_separate_endpoints(farm, monkeypatch, concurrency):
+    monkeypatch.setattr(settings, "DASHBOARD_BOOTSTRAP_CONCURRENCY", concurrency)
+    headers = farm["headers"]
+    expected, separate_statements = {}, 0
+    for name, path in SEPARATE.items():
+        expected[name], statements = count_statements(path, headers)
+        separate_statements += statements
+
+    bootstrap, statements = count_statements("/api/v1/dashboard/bootstrap", headers)
+    assert list(bootstrap) == list(SEPARATE)
+    assert bootstrap == expected
+    assert expected["alerts"][0]["title"] == "Mortalite elevee"
+    assert sum(1 for site in expected["sites"] if site["active_lots_count"]) == 2
+    assert statements < separate_statements - 10
+
+
+def test_bootstrap_sections(farm):
+    headers = farm["headers"]
+    picked = client.get("/api/v1/dashboard/bootstrap?sections=sites,alerts&alerts_limit=0", headers=headers)
+    assert picked.status_code == 200
+    assert list(picked.json()) == ["sites", "alerts"]
+    assert picked.json()["alerts"] == []
+
+    unknown = client.get("/api/v1/dashboard/bootstrap?sections=overview,meteo", headers=headers)
+    assert unknown.status_code == 400
+    assert "meteo" in unknown.json()["detail"]
@@ -0,0 +1,48 @@
+from types import SimpleNamespace
+
+from sqlalchemy import text
+
+from app.db.engine import build_engine, get_pool_metrics
+
+engine_settings = SimpleNamespace(
+    DB_POOL_SIZE=2,
+    DB_MAX_OVERFLOW=1,
+    DB_POOL_TIMEOUT=5,
+    DB_POOL_RECYCLE=60,
+    DB_POOL_PRE_PING=True,
+    DB_STATEMENT_TIMEOUT_MS=0,
+    SQLITE_JOURNAL_MODE="WAL",
+    SQLITE_SYNCHRONOUS="NORMAL",
+    SQLITE_BUSY_TIMEOUT_MS=2500,
+    SQLITE_CACHE_SIZE_KB=1000,
+    SQLITE_MMAP_SIZE_MB=0,
+    METRICS_ENABLED=False,
+)
+
+
+def test_sqlite_pragmas_applied_on_connect(tmp_path):
+    engine = build_engine(f"sqlite:///{tmp_path}/tuned.db", engine_settings, role="test")
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 2500
+    engine.dispose()
+
+
+def test_pool_metrics_track_checkouts(tmp_path):
+    engine = build_engine(f"sqlite:///{tmp_path}/metrics.db", engine_settings, role="test")
+    with engine.connect():
+        with engine.connect():
+            snapshot = get_pool_metrics()["test"]
+            assert snapshot["checked_out"] == 2
+            assert snapshot["size"] == 2
+    snapshot = get_pool_metrics()["test"]
+    assert snapshot["checked_out"] == 0
+    assert snapshot["checkouts"] >= 2
+    assert snapshot["connects"] >= 1
+    engine.dispose()
+
+
+def test_test_engines_are_unregistered():
+    # Registered by the tests above, removed after each of them (conftest)
+    assert set(get_pool_metrics()) == {"primary"}
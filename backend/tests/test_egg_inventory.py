@@ -0,0 +1,152 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models.building import Building
+from app.models.egg_inventory import EggStock, EggStockMovement
+from app.models.finance import Sale, SaleType
+from app.models.lot import Lot, LotStatus, LotType
+from app.models.production import EggProduction
+
+client = TestClient(app)
+
+TODAY = date.today()
+
+
+def make_layer_lot(db, building):
+    layer_house = Building(name="Pondoir", site_id=building.site_id, building_type="layer", capacity=5000)
+    db.add(layer_house)
+    db.flush()
+    lot = Lot(building_id=layer_house.id, type=LotType.LAYER, initial_quantity=1000, current_quantity=1000,
+              placement_date=TODAY - timedelta(days=200))
+    db.add(lot)
+    db.commit()
+    return lot
+
+
+def stock_view(auth_headers):
+    response = client.get("/api/v1/sales/eggs-stock", headers=auth_headers)
+    assert response.status_code == 200
+    return response.json()[0]
+
+
+def test_daily_entries_and_sales_move_the_stock(db, building, auth_headers):
+    lot = make_layer_lot(db, building)
+
+    response = client.post(f"/api/v1/lots/{lot.id}/daily-entry", headers=auth_headers, json={
+        "date": TODAY.isoformat(), "eggs_normal": 900, "eggs_cracked": 20, "eggs_dirty": 30
+    })
+    assert response.status_code == 200, response.text
+    assert stock_view(auth_headers)["available_eggs"] == 930
+
+    # Editing the entry books the difference
+    response = client.put(f"/api/v1/lots/{lot.id}/daily-entry", headers=auth_headers, json={
+        "date": TODAY.isoformat(), "eggs_normal": 870, "eggs_dirty": 30
+    })
+    assert response.status_code == 200, response.text
+    view = stock_view(auth_headers)
+    assert view["available_eggs"] == 900 and view["total_produced"] == 900
+
+    sale = {"date": TODAY.isoformat(), "sale_type": "eggs_tray", "quantity": 20, "unit_price": 2000,
+            "site_id": str(building.site_id), "deduct_from_stock": True}
+    response = client.post("/api/v1/sales", headers=auth_headers, json=sale)
+    assert response.status_code == 200, response.text
+    view = stock_view(auth_headers)
+    assert view["available_eggs"] == 300 and view["available_trays"] == 10
+    assert view["total_sold_eggs"] == 600
+
+    response = client.post("/api/v1/sales", headers=auth_headers, json={**sale, "quantity": 11})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Stock insuffisant. Disponible: 10 plateaux (0 cartons)"
+    assert db.query(Sale).count() == 1
+
+    movements = client.get(f"/api/v1/sales/eggs-stock/{building.site_id}/movements", headers=auth_headers).json()
+    assert [m["balance_after"] for m in movements] == [300, 900, 930]
+
+
+def test_breakage_and_adjustments(db, building, auth_headers):
+    lot = make_layer_lot(db, building)
+    client.post(f"/api/v1/lots/{lot.id}/daily-entry", headers=auth_headers, json={
+        "date": TODAY.isoformat(), "eggs_normal": 100
+    })
+
+    url = "/api/v1/sales/eggs-stock/adjustments"
+    response = client.post(url, headers=auth_headers, json={"site_id": str(building.site_id), "quantity": 40})
+    assert response.status_code == 200, response.text
+    assert response.json()["quantity"] == -40 and response.json()["balance_after"] == 60
+
+    response = client.post(url, headers=auth_headers, json={
+        "site_id": str(building.site_id), "movement_type": "adjustment", "quantity": -70
+    })
+    assert response.status_code == 400
+
+    response = client.post(url, headers=auth_headers, json={
+        "site_id": str(building.site_id), "movement_type": "adjustment", "quantity": 5
+    })
+    view = stock_view(auth_headers)
+    assert view["available_eggs"] == 65 and view["total_lost_eggs"] == 40 and view["total_produced"] == 100
+
+
+def test_stock_is_opened_from_history(db, building, auth_headers):
+    lot = make_layer_lot(db, building)
+    # Like the old produced-minus-sold view, the history leaves out the lots that are not active
+    completed = make_layer_lot(db, building)
+    completed.status = LotStatus.COMPLETED
+    db.add_all([
+        EggProduction(lot_id=lot.id, date=TODAY - timedelta(days=2), normal_eggs=600, sellable_eggs=600, total_eggs=600),
+        EggProduction(lot_id=lot.id, date=TODAY - timedelta(days=1), normal_eggs=600, sellable_eggs=600, total_eggs=600),
+        EggProduction(lot_id=completed.id, date=TODAY - timedelta(days=1), normal_eggs=900, sellable_eggs=900,
+                      total_eggs=900),
+        Sale(site_id=building.site_id, date=TODAY - timedelta(days=1), sale_type=SaleType.EGGS_CARTON,
+             quantity=Decimal("2"), unit_price=Decimal("20000"), total_amount=Decimal("40000")),
+    ])
+    db.commit()
+
+    # Read without opening the stock
+    view = stock_view(auth_headers)
+    assert view["total_produced"] == 1200
+    assert view["total_sold_eggs"] == 720
+    assert view["available_eggs"] == 480
+    assert db.query(EggStock).count() == 0
+
+    # The first write opens it with the same balance
+    response = client.post("/api/v1/sales/eggs-stock/adjustments", headers=auth_headers, json={
+        "site_id": str(building.site_id), "movement_type": "breakage", "quantity": 30
+    })
+    assert response.status_code == 200, response.text
+    assert response.json()["balance_after"] == 450
+    assert db.query(EggStockMovement).count() == 4
+    assert stock_view(auth_headers)["available_eggs"] == 450
+    assert db.query(EggStock).count() == 1
+
+    # Deleting the lot withdraws its eggs
+    lot.status = "completed"
+    db.commit()
+    client.delete(f"/api/v1/lots/{lot.id}?force=true", headers=auth_headers)
+    db.expire_all()
+    assert db.query(EggStock).one().quantity == -750
+
+
+def test_first_sale_of_an_unopened_site_is_checked(db, building, auth_headers):
+    lot = make_layer_lot(db, building)
+    db.add(EggProduction(lot_id=lot.id, date=TODAY - timedelta(days=1), normal_eggs=300, sellable_eggs=300,
+                         total_eggs=300))
+    db.commit()
+    assert db.query(EggStock).count() == 0
+
+    sale = {"date": TODAY.isoformat(), "sale_type": "eggs_tray", "quantity": 500, "unit_price": 2000,
+            "site_id": str(building.site_id), "deduct_from_stock": True}
+    response = client.post("/api/v1/sales", headers=auth_headers, json=sale)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Stock insuffisant. Disponible: 10 plateaux (0 cartons)"
+    assert db.query(Sale).count() == 0
+
+    response = client.post("/api/v1/sales", headers=auth_headers, json={**sale, "quantity": 4})
+    assert response.status_code == 200, response.text
+    view = stock_view(auth_headers)
+    assert view["available_eggs"] == 180 and view["total_sold_eggs"] == 120
+    # The sale is booked once, as its own movement rather than as history
+    movements = db.query(EggStockMovement).filter(EggStockMovement.sale_id.isnot(None)).all()
+    assert [(m.quantity, m.notes) for m in movements] == [(-120, None)]
@@ -0,0 +1,65 @@
+from datetime import date
+from decimal import Decimal
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models.finance import Expense
+from app.services.financial_service import FinancialService, expense_rollups
+
+client = TestClient(app)
+
+TODAY = date.today()
+
+
+def test_categories_are_normalized_on_write(db, building, auth_headers):
+    created = {}
+    for category in ("MEDICINE", " Aliment ", "Vaccins lot 3", "feed"):
+        response = client.post("/api/v1/expenses", headers=auth_headers, json={
+            "date": TODAY.isoformat(), "category": category, "amount": 1000, "site_id": str(building.site_id)
+        })
+        assert response.status_code == 200, response.text
+        created[category] = response.json()
+
+    assert created["MEDICINE"]["category"] == created["MEDICINE"]["category_id"] == "veterinary"
+    assert created[" Aliment "]["category_id"] == "feed"
+    # Unknown categories keep their text and count as 'other'
+    assert created["Vaccins lot 3"]["category"] == "Vaccins lot 3"
+    assert created["Vaccins lot 3"]["category_id"] == "other"
+
+    response = client.get("/api/v1/expenses?category=aliments", headers=auth_headers)
+    assert len(response.json()) == 2
+
+    expense = db.get(Expense, created["feed"]["id"])
+    expense.category = "SALARY"
+    assert expense.category_id == "labor"
+
+
+def test_category_rollup_is_cached_per_period(db, building):
+    db.add_all([
+        Expense(site_id=building.site_id, date=TODAY, category="utilities", amount=Decimal("300")),
+        Expense(site_id=building.site_id, date=TODAY, category="energy", amount=Decimal("200")),
+    ])
+    db.commit()
+
+    service = FinancialService(db)
+    site_ids = [building.site_id]
+    totals = service.get_expenses_by_category(site_ids, TODAY, TODAY, include_lot_costs=False)
+    assert totals == {"energy": 500.0}
+    assert len(expense_rollups) == 1
+
+    # Served from the cache, then refreshed once an expense write commits
+    assert service.get_expenses_by_category(site_ids, TODAY, TODAY, include_lot_costs=False) == totals
+    db.add(Expense(site_id=building.site_id, date=TODAY, category="Loyer", amount=Decimal("100")))
+    db.flush()
+    assert len(expense_rollups) == 1
+    # The writing session reads its own expense without caching it
+    assert service.get_expenses_by_category(site_ids, TODAY, TODAY, include_lot_costs=False) == {
+        "energy": 500.0, "rent": 100.0
+    }
+    db.commit()
+    assert len(expense_rollups) == 0
+    assert service.get_expenses_by_category(site_ids, TODAY, TODAY, include_lot_costs=False) == {
+        "energy": 500.0, "rent": 100.0
+    }
+    assert len(expense_rollups) == 1
@@ -0,0 +1,144 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models.alert import Alert, AlertStatus, AlertType
+from app.models.feed import FeedStock, FeedType
+from app.models.lot import Lot, LotType
+from app.models.organization import Organization
+from app.services.feed_planner import FeedPlanner, PLAN_HORIZON_DAYS
+from app.services.standards.data import FEED
+from app.services.standards.registry import standards_registry
+
+client = TestClient(app)
+
+TODAY = date.today()
+
+
+def expected_demand(ages, birds=1000):
+    return np.array([standards_registry.generic("broiler").value(FEED, age) * birds / 1000 for age in ages])
+
+
+def setup_stocks(db, building, user):
+    # Broiler lot 20 days old: grower until day 24, finisher afterwards
+    lot = Lot(building_id=building.id, type=LotType.BROILER, initial_quantity=1000, current_quantity=1000,
+              placement_date=TODAY - timedelta(days=20), age_at_placement=0)
+    silo = FeedStock(organization_id=user.organization_id, site_id=building.site_id, building_id=building.id,
+                     location_type="building", feed_type=FeedType.GROWER, quantity_kg=Decimal("150"),
+                     min_quantity_kg=Decimal("100"))
+    store = FeedStock(organization_id=user.organization_id, location_type="global",
+                      feed_type=FeedType.FINISHER, quantity_kg=Decimal("5000"), min_quantity_kg=Decimal("100"))
+    db.add_all([lot, silo, store])
+    db.commit()
+    return lot, silo, store
+
+
+def test_plan_splits_demand_by_feed_phase_and_location(db, building, user):
+    lot, silo, store = setup_stocks(db, building, user)
+
+    FeedPlanner(db).plan_organization(user.organization_id, TODAY)
+
+    # The building silo serves days 21-24, the global store from day 25
+    grower = expected_demand(range(21, 25))
+    assert np.allclose(silo.demand_profile[:4], grower, atol=0.01)
+    assert not any(silo.demand_profile[4:])
+    assert not any(store.demand_profile[:4])
+    assert np.allclose(store.demand_profile[4:10], expected_demand(range(25, 31)), atol=0.01)
+    assert len(store.demand_profile) == PLAN_HORIZON_DAYS
+
+    # Each stock runs out on the first day its cumulative demand exceeds the balance
+    for stock, balance in ((silo, 150), (store, 5000)):
+        depleted = int(np.searchsorted(np.cumsum(stock.demand_profile), balance, side="right"))
+        assert stock.depletion_date == TODAY + timedelta(days=depleted + 1)
+
+
+def test_movements_reproject_and_sync_alerts(db, building, user, auth_headers, monkeypatch):
+    lot, silo, store = setup_stocks(db, building, user)
+    silo.quantity_kg = Decimal("20")
+    db.commit()
+
+    response = client.get("/api/v1/feed/stock/plan", headers=auth_headers)
+    assert response.status_code == 200
+    plan = {entry["stock_id"]: entry for entry in response.json()["stocks"]}
+    assert plan[str(silo.id)]["reorder_date"] == TODAY.isoformat()
+    assert plan[str(silo.id)]["reorder_quantity_kg"] > 80
+    assert str(silo.id) in [entry["stock_id"] for entry in response.json()["to_reorder"]]
+
+    alerts = db.query(Alert).filter(Alert.alert_type == AlertType.STOCK_LOW, Alert.status == AlertStatus.ACTIVE).all()
+    assert [alert.metric_name for alert in alerts] == [f"feed_stock:{silo.id}"]
+
+    # A restock re-projects the stored profile (no replanning) and resolves the alert
+    profile = list(silo.demand_profile)
+    with monkeypatch.context() as patch:
+        patch.setattr(FeedPlanner, "plan_organization", lambda *args, **kwargs: 1 / 0)
+        response = client.post("/api/v1/feed/stock/restock", headers=auth_headers, json={
+            "feed_type": "grower", "quantity_kg": 1000, "location_type": "building",
+            "site_id": str(building.site_id), "building_id": str(building.id)
+        })
+    assert response.status_code == 200
+    db.expire_all()
+    silo = db.get(FeedStock, silo.id)
+    assert silo.demand_profile == profile
+    assert silo.reorder_date is None
+    assert db.query(Alert).filter(Alert.status == AlertStatus.ACTIVE).count() == 0
+
+    stats = client.get("/api/v1/feed/monitoring/stats", headers=auth_headers).json()["summary"]
+    assert stats["planned_daily_feed_kg"] > 0
+    assert stats["days_autonomy"] == round(stats["total_stock_kg"] / stats["planned_daily_feed_kg"], 1)
+
+
+def test_lot_changes_replan_on_next_read(db, building, user, auth_headers):
+    lot, silo, store = setup_stocks(db, building, user)
+
+    def demand():
+        stocks = client.get("/api/v1/feed/stock/plan", headers=auth_headers).json()["stocks"]
+        return {entry["stock_id"]: entry["daily_demand_kg"] for entry in stocks}[str(silo.id)]
+
+    alone = demand()
+    assert alone > 0
+
+    # A second broiler lot of the same age in the building doubles the silo's demand
+    response = client.post("/api/v1/lots", headers=auth_headers, json={
+        "building_id": str(building.id), "type": "broiler", "initial_quantity": 1000,
+        "placement_date": (TODAY - timedelta(days=20)).isoformat(), "age_at_placement": 0
+    })
+    assert response.status_code == 200, response.text
+    assert demand() == pytest.approx(2 * alone, abs=0.02)
+
+    # Closed, then deleted: back to the first lot alone
+    second = response.json()["id"]
+    assert client.post(f"/api/v1/lots/{second}/close", headers=auth_headers).status_code == 200
+    assert demand() == alone
+    assert client.delete(f"/api/v1/lots/{second}", headers=auth_headers).status_code == 200
+    db.expire_all()
+    assert db.get(FeedStock, silo.id).planned_on is None
+    assert demand() == alone
+
+
+def test_plan_is_derived_data(db, building, user, auth_headers):
+    lot, silo, store = setup_stocks(db, building, user)
+    silo.quantity_kg = Decimal("5000")
+    db.commit()
+    organization = db.get(Organization, user.organization_id)
+    before = organization.data_version
+
+    # A read stores the plan without changing the data version
+    assert client.get("/api/v1/feed/stock/plan", headers=auth_headers).status_code == 200
+    db.expire_all()
+    assert db.get(FeedStock, silo.id).planned_on == TODAY
+    assert organization.data_version == before
+
+    # A movement commits once, with its re-projection
+    response = client.post("/api/v1/feed/stock/restock", headers=auth_headers, json={
+        "feed_type": "grower", "quantity_kg": 1000, "location_type": "building",
+        "site_id": str(building.site_id), "building_id": str(building.id)
+    })
+    assert response.status_code == 200
+    db.expire_all()
+    assert organization.data_version == before + 1
+    silo = db.get(FeedStock, silo.id)
+    assert silo.quantity_kg == Decimal("6000") and silo.daily_demand_kg > 0
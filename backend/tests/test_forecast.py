@@ -0,0 +1,103 @@
+import math
+from datetime import date, timedelta
+from decimal import Decimal
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models.lot import Lot, LotType
+from app.models.production import EggProduction, WeightRecord
+from app.services.ml.forecast import FlockForecaster, ForecastCache, LotModel
+
+client = TestClient(app)
+TODAY = date.today()
+
+
+def wood(t_weeks):
+    return 30 * t_weeks ** 0.6 * math.exp(-0.02 * t_weeks)
+
+
+def make_layer(db, building, days_of_lay):
+    onset = TODAY - timedelta(days=days_of_lay - 1)
+    lot = Lot(building_id=building.id, type=LotType.LAYER, initial_quantity=1000, current_quantity=1000,
+              placement_date=onset - timedelta(days=140), first_egg_date=onset)
+    db.add(lot)
+    db.flush()
+    for day in range(days_of_lay):
+        rate = wood(day / 7 + 1)
+        db.add(EggProduction(lot_id=lot.id, date=onset + timedelta(days=day),
+                             laying_rate=Decimal(str(round(rate, 2))), total_eggs=int(rate * 10)))
+    db.commit()
+    return lot
+
+
+def test_laying_models_refit_incrementally(db, building):
+    cache = ForecastCache()
+    lot = make_layer(db, building, 60)
+
+    forecast = FlockForecaster(db, cache).laying_forecasts([lot], 7, TODAY)[str(lot.id)]
+    assert abs(forecast["params"]["b"] - 0.6) < 0.01
+    assert abs(forecast["laying_rate"][0] - wood(60 / 7 + 1)) < 0.5
+    assert abs(forecast["eggs_next_7_days"] - sum(wood((60 + d) / 7 + 1) * 10 for d in range(7))) < 40
+    assert cache.fits == 1
+
+    # Unchanged data: served from the cache
+    FlockForecaster(db, cache).laying_forecasts([lot], 7, TODAY)
+    assert cache.fits == 1
+
+    # A new day is folded into the cached sums
+    db.add(EggProduction(lot_id=lot.id, date=TODAY + timedelta(days=1), laying_rate=Decimal("90")))
+    db.commit()
+    FlockForecaster(db, cache).laying_forecasts([lot], 7, TODAY)
+    assert (cache.fits, cache.incremental_fits) == (2, 1)
+    incremental = cache.get("laying", lot.id).stats["xtx"].copy()
+
+    # An edited row forces a full rebuild, which matches the incremental sums
+    record = db.query(EggProduction).filter(EggProduction.lot_id == lot.id).first()
+    record.laying_rate = record.laying_rate + 1
+    db.commit()
+    FlockForecaster(db, cache).laying_forecasts([lot], 7, TODAY)
+    assert (cache.fits, cache.incremental_fits) == (3, 1)
+    assert abs(cache.get("laying", lot.id).stats["xtx"] - incremental).max() < 1e-6
+
+
+
+def test_cache_drops_least_recently_used_models():
+    cache = ForecastCache(maxsize=2)
+    for lot_id in ("a", "b"):
+        cache.put(lot_id, LotModel("laying", (1, 0, 0), {}, None))
+    assert cache.get("laying", "a") is not None  # "b" is now the least recently used
+
+    cache.put("c", LotModel("laying", (1, 0, 0), {}, None))
+    assert len(cache) == 2
+    assert cache.get("laying", "b") is None
+    assert cache.get("laying", "a") is not None and cache.get("laying", "c") is not None
+
+def test_forecasts_endpoint(db, building, auth_headers):
+    layer = make_layer(db, building, 30)
+    broiler = Lot(building_id=building.id, type=LotType.BROILER, initial_quantity=1000, current_quantity=1000,
+                  placement_date=TODAY - timedelta(days=28), target_weight_g=2500)
+    db.add(broiler)
+    db.flush()
+    for age in (7, 14, 21, 28):
+        weight = 5000 * math.exp(-4.2 * math.exp(-0.04 * age))
+        db.add(WeightRecord(lot_id=broiler.id, date=broiler.placement_date + timedelta(days=age - 1),
+                            average_weight_g=Decimal(str(round(weight, 2)))))
+    db.commit()
+
+    response = client.get("/api/v1/dashboard/forecasts?horizon_days=14", headers=auth_headers)
+    assert response.status_code == 200
+    data = response.json()
+
+    growth = data["growth"][str(broiler.id)]
+    assert growth["params"]["A"] == 5000
+    assert abs(growth["target_age_days"] - 45) < 0.5
+    assert growth["days_to_target"] == 17
+
+    assert len(data["laying"][str(layer.id)]["laying_rate"]) == 14
+    demand = data["feed_demand"][str(building.site_id)]
+    assert sorted(demand["lots"]) == sorted([str(layer.id), str(broiler.id)])
+    assert len(demand["daily_kg"]) == 14 and demand["horizon_kg"] > 0
+
+    overview = client.get("/api/v1/dashboard/overview", headers=auth_headers).json()
+    assert overview["broiler_summary"]["lots"][0]["days_to_target"] == 17
@@ -0,0 +1,141 @@
+import gzip
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.core import http_cache
+from app.core.http_cache import is_not_modified, make_etag
+from app.db.session import SessionLocal, engine
+from app.main import app
+
+client = TestClient(app)
+
+
+def data_version(db, organization_id):
+    from app.models.organization import Organization
+
+    db.expire_all()
+    return db.get(Organization, organization_id).data_version
+
+
+class CountStatements:
+    def __enter__(self):
+        self.statements = []
+        event.listen(engine, "before_cursor_execute", self._record)
+        return self
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def __exit__(self, *exc):
+        event.remove(engine, "before_cursor_execute", self._record)
+
+
+def test_conditional_get(user, building, auth_headers, db):
+    first = client.get("/api/v1/sites", headers=auth_headers)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert etag.startswith('W/"')
+    assert first.headers["cache-control"] == "private, no-cache"
+    assert "Authorization" in first.headers["vary"]
+
+    # Current copy: 304 with the validators, before the endpoint and its dependencies run
+    with CountStatements() as counted:
+        cached = client.get("/api/v1/sites", headers={**auth_headers, "If-None-Match": etag})
+    assert cached.status_code == 304 and cached.content == b""
+    assert cached.headers["etag"] == etag
+    assert len(counted.statements) == 1  # The data version read
+    modified_since = first.headers["last-modified"]
+    assert client.get("/api/v1/sites", headers={**auth_headers, "If-Modified-Since": modified_since}).status_code == 304
+
+    # Another route, or a write of the organization, changes the ETag
+    assert client.get("/api/v1/lots", headers={**auth_headers, "If-None-Match": etag}).status_code == 200
+    renamed = client.patch(f"/api/v1/sites/{building.site_id}", headers=auth_headers, json={"name": "Site renomme"})
+    assert renamed.status_code == 200
+    fresh = client.get("/api/v1/sites", headers={**auth_headers, "If-None-Match": etag})
+    assert fresh.status_code == 200 and fresh.headers["etag"] != etag
+    assert fresh.json()[0]["name"] == "Site renomme"
+
+    # Not on auth routes, nor without a valid token
+    assert "etag" not in client.get("/api/v1/auth/me", headers=auth_headers).headers
+    assert client.get("/api/v1/sites", headers={"Authorization": "Bearer x", "If-None-Match": etag}).status_code == 401
+
+
+def test_writes_bump_the_organization_data_version(user, building, db):
+    from app.models.site import Site
+
+    before = data_version(db, user.organization_id)
+    session = SessionLocal()
+    try:
+        session.info["organization_id"] = user.organization_id
+        site = session.get(Site, building.site_id)
+        with session.begin_nested():
+            site.city = "Douala"
+            session.flush()
+        with session.begin_nested():
+            site.region = "Littoral"
+            session.flush()
+        session.commit()  # One bump for the transaction, not one per savepoint
+        assert data_version(db, user.organization_id) == before + 1
+
+        site.city = "Yaounde"
+        session.rollback()
+        session.commit()  # Nothing written
+        assert data_version(db, user.organization_id) == before + 1
+
+        # Rows carrying an organization_id bump it without a session user
+        session.info.clear()
+        session.get(Site, building.site_id).name = "Site B"
+        session.commit()
+        assert data_version(db, user.organization_id) == before + 2
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def buildings(building, db):
+    from app.models.building import Building
+
+    for index in range(40):
+        db.add(Building(name=f"Batiment {index}", site_id=building.site_id, building_type="broiler", capacity=5000))
+    db.commit()
+
+
+def test_compression(user, buildings, auth_headers):
+    plain = client.get("/api/v1/buildings", headers={**auth_headers, "Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    assert "Accept-Encoding" in plain.headers["vary"]
+
+    compressed = client.get("/api/v1/buildings", headers={**auth_headers, "Accept-Encoding": "gzip"})
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert int(compressed.headers["content-length"]) < len(plain.content)
+    assert compressed.json() == plain.json()
+
+    # Small bodies are sent as they are
+    small = client.get("/health", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+
+
+def test_brotli_is_preferred(user, buildings, auth_headers, monkeypatch):
+    monkeypatch.setattr(http_cache, "brotli", pytest.importorskip("brotli"))
+    response = client.get("/api/v1/buildings", headers={**auth_headers, "Accept-Encoding": "gzip, br"})
+    assert response.headers["content-encoding"] == "br"
+    assert len(response.json()) == 41
+    response = client.get("/api/v1/buildings", headers={**auth_headers, "Accept-Encoding": "gzip, br;q=0"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert gzip.decompress(http_cache.compress(b"x" * 100, "gzip")) == b"x" * 100
+
+
+def test_validators():
+    from datetime import date
+
+    etag = make_etag("user", "org", 3, "/api/v1/lots", "", date(2026, 1, 1))
+    assert etag != make_etag("user", "org", 4, "/api/v1/lots", "", date(2026, 1, 1))
+    assert etag != make_etag("user", "org", 3, "/api/v1/lots", "", date(2026, 1, 2))
+    assert is_not_modified({"if-none-match": f'"other", {etag}'}, etag, 0)
+    assert is_not_modified({"if-none-match": etag.removeprefix("W/")}, etag, 0)
+    assert is_not_modified({"if-none-match": "*"}, etag, 0)
+    assert not is_not_modified({"if-none-match": '"other"', "if-modified-since": "Thu, 01 Jan 2099 00:00:00 GMT"},
+                               etag, 0)
+    assert not is_not_modified({"if-modified-since": "not a date"}, etag, 0)
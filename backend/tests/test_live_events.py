@@ -0,0 +1,118 @@
+import asyncio
+import threading
+import time
+from datetime import timedelta
+
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.core.live_events import LiveBroker, broker, topics_of
+from app.core.security import create_access_token
+from app.db.session import SessionLocal
+from app.main import app
+
+client = TestClient(app)
+
+
+def add_alert(organization_id, title="Stock faible"):
+    from app.models.alert import Alert, AlertType
+
+    session = SessionLocal()
+    try:
+        session.add(Alert(organization_id=organization_id, alert_type=AlertType.STOCK_LOW, title=title,
+                          message="Aliment < 3 jours"))
+        session.commit()
+    finally:
+        session.close()
+
+
+def test_commits_notify_the_topics_they_wrote(user, building, db):
+    from app.models.building import Building
+    from app.models.organization import Organization
+    from app.models.user import User
+
+    other = Organization(name="Autre ferme")
+    db.add(other)
+    db.commit()
+
+    def write_building():
+        session = SessionLocal()
+        try:
+            session.info["organization_id"] = user.organization_id  # As get_current_user sets it
+            session.get(Building, building.id).capacity = 6000
+            session.commit()
+            session.get(User, user.id).first_name = "Nom"  # Not a notified table
+            session.commit()
+            session.get(Building, building.id).capacity = 7000
+            session.rollback()
+        finally:
+            session.close()
+
+    async def scenario():
+        mine, theirs = broker.subscribe(user.organization_id), broker.subscribe(other.id)
+        try:
+            await asyncio.to_thread(add_alert, user.organization_id)
+            await asyncio.to_thread(add_alert, user.organization_id, "Mortalite")
+            coalesced = await mine.next(1)
+            await asyncio.to_thread(write_building)
+            return coalesced, await mine.next(1), await mine.next(0.1), await theirs.next(0.1)
+        finally:
+            broker.unsubscribe(mine)
+            broker.unsubscribe(theirs)
+
+    assert asyncio.run(scenario()) == ({"alerts"}, {"farm"}, None, None)
+    assert broker.subscriber_count() == 0
+    assert topics_of(["sales", "egg_stock_movements", "refresh_tokens"]) == {"sales", "stock"}
+
+
+def test_other_workers_are_reached_through_the_relay():
+    class Relay:
+        def __init__(self):
+            self.brokers = []
+
+        def listen(self, broker):
+            pass
+
+        def publish(self, organization_id, topics):
+            for other in self.brokers:
+                if other is not sender:
+                    other.deliver(organization_id, topics)
+
+    relay = Relay()
+    sender, receiver = LiveBroker(relay), LiveBroker(relay)
+    relay.brokers = [sender, receiver]
+
+    async def scenario():
+        subscription = receiver.subscribe("org")
+        sender.publish("org", {"sales"})
+        return await subscription.next(1)
+
+    assert asyncio.run(scenario()) == {"sales"}
+
+
+def test_event_stream(user, monkeypatch):
+    monkeypatch.setattr(settings, "LIVE_HEARTBEAT_SECONDS", 0.3)
+    token = create_access_token({"sub": str(user.id)}, expires_delta=timedelta(seconds=2))
+
+    def write_later():
+        time.sleep(0.8)
+        add_alert(user.organization_id)
+
+    writer = threading.Thread(target=write_later)
+    writer.start()
+    # The stream ends with the token
+    started = time.monotonic()
+    response = client.get("/api/v1/live/events", headers={"Authorization": f"Bearer {token}"})
+    writer.join()
+
+    assert response.status_code == 200
+    assert time.monotonic() - started < 5
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert "content-encoding" not in response.headers and "etag" not in response.headers
+    body = response.text
+    assert body.startswith("retry: 5000\nevent: ready\n")
+    assert ": ping\n\n" in body
+    assert 'event: change\ndata: {"topics": ["alerts"]}\n\n' in body
+    assert broker.subscriber_count() == 0
+
+    assert client.get("/api/v1/live/events").status_code == 401
@@ -0,0 +1,97 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models.feed import FeedConsumption
+from app.models.lot import Lot, LotStats, LotType
+from app.models.production import Mortality, WeightRecord
+
+client = TestClient(app)
+
+
+def make_lot(db, building, placement_date, age_at_placement, weights):
+    lot = Lot(building_id=building.id, type=LotType.BROILER, initial_quantity=1000,
+              current_quantity=1000, placement_date=placement_date, age_at_placement=age_at_placement)
+    db.add(lot)
+    db.flush()
+    db.add(LotStats(lot_id=lot.id, mortality_rate=Decimal("1.5"), feed_conversion_ratio=Decimal("1.62")))
+    for age, weight in weights.items():
+        db.add(WeightRecord(lot_id=lot.id, date=placement_date + timedelta(days=age - age_at_placement),
+                            average_weight_g=weight))
+    return lot
+
+
+def test_comparison_aligns_series_on_age(db, building, auth_headers):
+    # Same ages, different calendar dates and ages at placement
+    first = make_lot(db, building, date.today() - timedelta(days=60), 1, {7: 180, 14: 470})
+    second = make_lot(db, building, date.today() - timedelta(days=20), 3, {7: 200})
+    db.add_all([
+        Mortality(lot_id=first.id, date=first.placement_date, quantity=10),
+        Mortality(lot_id=first.id, date=first.placement_date + timedelta(days=1), quantity=10),
+        FeedConsumption(lot_id=first.id, date=first.placement_date + timedelta(days=1), quantity_kg=Decimal("49.5")),
+    ])
+    db.commit()
+
+    response = client.get(
+        "/api/v1/analytics/comparison",
+        params={
+            "lot_ids": [str(second.id), str(first.id)],
+            "metrics": ["fcr", "mortality_rate"],
+            "series": ["weight", "cumulative_mortality", "feed_per_bird"],
+        },
+        headers=auth_headers,
+    )
+    assert response.status_code == 200
+    data = response.json()
+
+    assert [lot["lot_id"] for lot in data["lots"]] == [str(second.id), str(first.id)]
+    assert data["lots"][0]["fcr"] == 1.62 and data["lots"][0]["mortality_rate"] == 1.5
+
+    weight = data["series"]["weight"]
+    assert len(data["series"]["ages"]) == 15
+    assert weight[str(first.id)][7] == 180 and weight[str(first.id)][14] == 470
+    assert weight[str(second.id)][7] == 200 and weight[str(second.id)][14] is None
+
+    mortality = data["series"]["cumulative_mortality"][str(first.id)]
+    assert mortality[0] == 0 and mortality[1] == 1.0 and mortality[2] == 2.0 and mortality[14] == 2.0
+    assert data["series"]["feed_per_bird"][str(first.id)][2] == 50.0  # 49.5 kg for the 990 birds alive at day 2
+
+
+def test_comparison_rejects_unknown_metrics_and_other_organizations(db, building, auth_headers):
+    from app.models.building import Building
+    from app.models.organization import Organization
+    from app.models.site import Site
+
+    other_org = Organization(name="Autre ferme")
+    db.add(other_org)
+    db.flush()
+    other_site = Site(name="Autre site", organization_id=other_org.id)
+    db.add(other_site)
+    db.flush()
+    other_building = Building(name="B", site_id=other_site.id, building_type="broiler")
+    db.add(other_building)
+    db.flush()
+    lot = make_lot(db, building, date.today(), 1, {})
+    foreign_lot = make_lot(db, other_building, date.today(), 1, {})
+    db.commit()
+
+    response = client.get("/api/v1/analytics/comparison",
+                          params={"lot_ids": [str(lot.id)], "metrics": ["nope"]}, headers=auth_headers)
+    assert response.status_code == 400
+
+    response = client.get("/api/v1/analytics/comparison",
+                          params={"lot_ids": [str(lot.id), str(foreign_lot.id)]}, headers=auth_headers)
+    assert [entry["lot_id"] for entry in response.json()["lots"]] == [str(lot.id)]
+
+    # A lot without stats reads as it always did: 0 rates and margin, no FCR nor score
+    unmeasured = Lot(building_id=building.id, type=LotType.BROILER, initial_quantity=500, current_quantity=500,
+                     placement_date=date.today())
+    db.add(unmeasured)
+    db.commit()
+    response = client.get("/api/v1/analytics/comparison", params={"lot_ids": [str(unmeasured.id)]},
+                          headers=auth_headers)
+    (entry,) = response.json()["lots"]
+    assert entry["mortality_rate"] == 0 and entry["laying_rate"] == 0 and entry["gross_margin"] == 0
+    assert entry["fcr"] is None and entry["performance_score"] is None
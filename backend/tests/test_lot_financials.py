@@ -0,0 +1,109 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models.building import Building
+from app.models.lot import Lot, LotStats, LotStatus, LotType
+from app.models.organization import Organization
+from app.models.production import EggProduction
+from app.services.lot_financials import LotFinancialService
+
+client = TestClient(app)
+
+TODAY = date.today()
+
+
+def test_summary_is_maintained_on_writes(db, building, auth_headers, monkeypatch):
+    lot = Lot(building_id=building.id, type=LotType.BROILER, initial_quantity=1000, current_quantity=1000,
+              placement_date=TODAY - timedelta(days=30), chick_price_unit=Decimal("500"))
+    db.add(lot)
+    db.commit()
+
+    response = client.post("/api/v1/expenses", headers=auth_headers, json={
+        "date": TODAY.isoformat(), "category": "Feed", "amount": 300000, "lot_id": str(lot.id)
+    })
+    assert response.status_code == 200, response.text
+    client.post("/api/v1/expenses", headers=auth_headers, json={
+        "date": TODAY.isoformat(), "category": "feed", "amount": 100000, "lot_id": str(lot.id)
+    })
+    response = client.post("/api/v1/sales", headers=auth_headers, json={
+        "date": TODAY.isoformat(), "sale_type": "live_birds", "quantity": 400, "unit_price": 2500,
+        "total_weight_kg": 800, "lot_id": str(lot.id), "deduct_from_stock": True
+    })
+    assert response.status_code == 200, response.text
+
+    stats = db.get(LotStats, lot.id)
+    assert stats.financials_updated_at is not None
+    assert float(stats.total_expenses) == 900000
+    assert float(stats.total_sales) == 1000000
+    assert float(stats.gross_margin) == 100000
+    assert float(stats.cost_per_kg) == 1125  # 900 000 / 800 kg sold, no live weight recorded
+    assert float(stats.performance_score) == 60
+
+    # The summary is read from the stored snapshot
+    monkeypatch.setattr(LotFinancialService, "compute", lambda *args: 1 / 0)
+    summary = client.get(f"/api/v1/lots/{lot.id}/financial-summary", headers=auth_headers).json()
+    assert summary["expenses_breakdown"]["feed"] == {"total": 400000.0, "count": 2}
+    assert summary["expenses_breakdown"]["chicks"]["source"] == "lot"
+    assert summary["per_unit"]["cost_per_bird"] == 900
+    assert summary["break_even"]["price_per_bird"] == 900  # 400 sold + 600 in the house
+    assert summary["sales_count"] == 1
+    assert summary["summary"]["profit_status"] == "profit"
+
+
+def test_layer_lots_are_repriced_and_recomputed(db, building, auth_headers):
+    layer_house = Building(name="Pondoir", site_id=building.site_id, building_type="layer", capacity=5000)
+    db.add(layer_house)
+    db.flush()
+    lot = Lot(building_id=layer_house.id, type=LotType.LAYER, initial_quantity=1000, current_quantity=1000,
+              placement_date=TODAY - timedelta(days=200), chick_price_unit=Decimal("600"))
+    db.add(lot)
+    db.flush()
+    db.add(EggProduction(lot_id=lot.id, date=TODAY, normal_eggs=3000, sellable_eggs=3000, total_eggs=3000))
+    db.commit()
+
+    summary = client.get(f"/api/v1/lots/{lot.id}/financial-summary", headers=auth_headers).json()
+    assert summary["eggs_production"]["avg_price_per_tray"] == 1500
+    assert summary["summary"]["revenue_is_estimate"] is True
+    assert summary["per_unit"]["cost_per_egg"] == 200
+    assert summary["break_even"]["price_per_tray"] == 6000
+
+    closed = Lot(building_id=layer_house.id, type=LotType.LAYER, initial_quantity=1000, current_quantity=0,
+                 placement_date=TODAY - timedelta(days=600), status=LotStatus.COMPLETED)
+    db.add(closed)
+    db.flush()
+    LotFinancialService(db).refresh_many([lot.id, closed.id])
+    db.commit()
+
+    # An egg sale at the site changes the tray price of the estimate, closed lots included
+    client.post("/api/v1/sales", headers=auth_headers, json={
+        "date": TODAY.isoformat(), "sale_type": "eggs_tray", "quantity": 10, "unit_price": 2000,
+        "site_id": str(building.site_id)
+    })
+    db.expire_all()
+    assert db.get(LotStats, lot.id).financial_snapshot is None
+    assert db.get(LotStats, closed.id).financial_snapshot is None
+
+    # Recomputed and stored on read, without changing the data version (nor the ETag)
+    organization = db.get(Organization, building.site.organization_id)
+    version = organization.data_version
+    response = client.get(f"/api/v1/lots/{lot.id}/financial-summary", headers=auth_headers)
+    summary = response.json()
+    assert summary["eggs_production"]["avg_price_per_tray"] == 2000
+    assert summary["summary"]["total_revenue"] == 200000
+    db.expire_all()
+    assert db.get(LotStats, lot.id).financial_snapshot == summary
+    assert organization.data_version == version
+    cached = client.get(f"/api/v1/lots/{lot.id}/financial-summary",
+                        headers={**auth_headers, "If-None-Match": response.headers["etag"]})
+    assert cached.status_code == 304
+
+    # Changes made outside the API are picked up by an explicit recompute
+    db.add(EggProduction(lot_id=lot.id, date=TODAY - timedelta(days=1), normal_eggs=3000,
+                         sellable_eggs=3000, total_eggs=3000))
+    db.commit()
+    response = client.post(f"/api/v1/lots/{lot.id}/financial-summary/recompute", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()["eggs_production"]["total_trays_produced"] == 200
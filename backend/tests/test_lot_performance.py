@@ -0,0 +1,49 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models.feed import FeedConsumption
+from app.models.finance import Expense, Sale, SaleType
+from app.models.lot import Lot, LotType
+from app.models.production import EggProduction, Mortality, MortalityCause
+
+client = TestClient(app)
+
+
+def test_layer_performance_from_aggregates(db, building, auth_headers):
+    start = date.today() - timedelta(days=30)
+    lot = Lot(
+        building_id=building.id, type=LotType.LAYER, initial_quantity=1000,
+        current_quantity=990, placement_date=start - timedelta(days=140),
+        chick_price_unit=Decimal("500"), transport_cost=Decimal("10000"),
+    )
+    db.add(lot)
+    db.flush()
+    for day in range(30):
+        db.add(EggProduction(lot_id=lot.id, date=start + timedelta(days=day), total_eggs=900,
+                             laying_rate=Decimal("90.5") if day % 10 else None))
+        db.add(FeedConsumption(lot_id=lot.id, date=start + timedelta(days=day), quantity_kg=Decimal("110.25")))
+    db.add_all([
+        Mortality(lot_id=lot.id, date=start, quantity=4, cause=MortalityCause.PREDATOR),
+        Mortality(lot_id=lot.id, date=start, quantity=5),
+        Mortality(lot_id=lot.id, date=start + timedelta(days=1), quantity=1, cause=MortalityCause.PREDATOR),
+        Sale(lot_id=lot.id, date=start, sale_type=SaleType.EGGS_TRAY, quantity=100, unit="tray",
+             unit_price=Decimal("2000"), total_amount=Decimal("200000")),
+        Expense(lot_id=lot.id, date=start, category="feed", description="Aliment", amount=Decimal("150000")),
+    ])
+    db.commit()
+
+    response = client.get(f"/api/v1/analytics/lot/{lot.id}/performance", headers=auth_headers)
+    assert response.status_code == 200
+    data = response.json()
+
+    assert data["mortality"] == {"total": 10, "rate": 1.0, "by_cause": {"predator": 5, "unknown": 5}}
+    assert data["feed"]["total_kg"] == 3307.5
+    assert data["production"]["total_eggs"] == 27000
+    assert data["production"]["average_laying_rate"] == 90.5
+    assert data["financial"]["total_expenses"] == 660000.0
+    assert data["financial"]["gross_margin"] == -460000.0
+    assert len(data["charts"]["egg_production"]) == 30
+    assert data["charts"]["egg_production"][0] == {"date": start.isoformat(), "total": 900, "rate": 0.0}
@@ -0,0 +1,36 @@
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.core.metrics import registry
+from app.main import app
+
+client = TestClient(app)
+
+
+def test_queries_are_counted_per_route(user, building, auth_headers, db, monkeypatch):
+    registry.clear()
+    response = client.get(f"/api/v1/buildings/{building.id}", headers=auth_headers)
+    assert response.status_code == 200
+    assert "x-query-count" not in response.headers
+
+    # Superusers get the profiling headers
+    user.is_superuser = True
+    db.commit()
+    response = client.get(f"/api/v1/buildings/{building.id}", headers=auth_headers)
+    queries = int(response.headers["x-query-count"])
+    assert queries >= 2  # user lookup and building
+    assert response.headers["server-timing"].startswith("db;dur=")
+    assert f'desc="{queries} queries"' in response.headers["server-timing"]
+
+    # Not served without a scrape token
+    assert client.get("/metrics").status_code == 404
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "scrape")
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer other"}).status_code == 401
+
+    body = client.get("/metrics", headers={"Authorization": "Bearer scrape"}).text
+    labels = 'method="GET",route="/api/v1/buildings/{building_id}",status="200"'
+    assert f"http_request_duration_seconds_count{{{labels}}} 2" in body
+    assert f'http_request_db_queries_bucket{{{labels},le="+Inf"}} 2' in body
+    assert "http_response_size_bytes_sum" in body
+    assert 'db_pool_checkouts_total{pool="primary"}' in body
@@ -0,0 +1,54 @@
+from alembic.autogenerate import compare_metadata
+from alembic.operations import Operations
+from alembic.runtime.migration import MigrationContext
+from sqlalchemy import inspect, text
+
+from app.db.engine import build_engine
+from app.db.migrate import check_schema, downgrade, head_revision, upgrade
+from app.db.session import Base
+from app.core.config import settings
+
+
+def make_engine(tmp_path, name):
+    return build_engine(f"sqlite:///{tmp_path}/{name}.db", settings, role=f"migrations-{name}")
+
+
+def test_fresh_database_upgrades_to_model_schema(tmp_path):
+    engine = make_engine(tmp_path, "fresh")
+    upgrade(engine)
+
+    assert check_schema(engine) == (head_revision(), head_revision())
+    with engine.connect() as connection:
+        diff = compare_metadata(MigrationContext.configure(connection), Base.metadata)
+    assert diff == []
+    engine.dispose()
+
+
+def test_legacy_create_all_database_is_adopted(tmp_path):
+    engine = make_engine(tmp_path, "legacy")
+    Base.metadata.create_all(bind=engine)
+    # A database that never ran the hand-written column migrations
+    with engine.begin() as connection:
+        connection.execute(text("ALTER TABLE sales DROP COLUMN line_items"))
+        connection.execute(text("ALTER TABLE lots DROP COLUMN split_ratio"))
+        # SQLite cannot drop a column of a foreign key in place
+        with Operations(MigrationContext.configure(connection)).batch_alter_table("lots") as batch_op:
+            batch_op.drop_index("ix_lots_parent_lot_id")
+            batch_op.drop_column("parent_lot_id")
+
+    upgrade(engine)
+
+    columns = inspect(engine)
+    assert "line_items" in {c["name"] for c in columns.get_columns("sales")}
+    assert {"split_ratio", "parent_lot_id"} <= {c["name"] for c in columns.get_columns("lots")}
+    assert ["parent_lot_id"] in [fk["constrained_columns"] for fk in columns.get_foreign_keys("lots")]
+    assert check_schema(engine)[0] == head_revision()
+    engine.dispose()
+
+
+def test_downgrade_to_base(tmp_path):
+    engine = make_engine(tmp_path, "roundtrip")
+    upgrade(engine)
+    downgrade(engine, "base")
+    assert inspect(engine).get_table_names() == ["alembic_version"]
+    engine.dispose()
@@ -0,0 +1,137 @@
+import asyncio
+import threading
+import time
+from datetime import timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import profiling
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.core.profiling import SPEEDSCOPE_SCHEMA, SamplingProfiler, profile_requested
+from app.main import app
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def profiles_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "PROFILES_DIR", str(tmp_path))
+    return tmp_path
+
+
+def test_superuser_request_is_profiled(user, building, auth_headers, db, profiles_dir):
+    user.is_superuser = True
+    db.commit()
+
+    plain = client.get("/api/v1/dashboard/overview", headers=auth_headers)
+    response = client.get("/api/v1/dashboard/overview", headers={**auth_headers, "X-Profile": "1"})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["data"] == plain.json()
+
+    profile = body["profile"]
+    assert profile["$schema"] == SPEEDSCOPE_SCHEMA
+    (sampled,) = profile["profiles"]
+    assert sampled["type"] == "sampled" and len(sampled["samples"]) == len(sampled["weights"])
+    assert all(0 <= index < len(profile["shared"]["frames"]) for stack in sampled["samples"] for index in stack)
+    assert profile["request"]["route"] == "/api/v1/dashboard/overview"
+    assert profile["request"]["sql_statements"] == len(profile["sql"]) >= 2
+    explained = [statement for statement in profile["sql"] if "explain" in statement]
+    assert explained and all(statement["statement"].startswith("SELECT") for statement in explained)
+    assert any("SCAN" in line or "SEARCH" in line for statement in explained for line in statement["explain"])
+
+    # Stored for later download
+    profile_id = response.headers["x-profile-id"]
+    assert profile_id == profile["request"]["id"]
+    assert (profiles_dir / f"{profile_id}.json").exists()
+    listed = client.get("/api/v1/admin/profiles", headers=auth_headers).json()
+    assert [entry["id"] for entry in listed] == [profile_id]
+    download = client.get(f"/api/v1/admin/profiles/{profile_id}", headers=auth_headers)
+    assert download.json()["sql"] == profile["sql"]
+    assert client.get("/api/v1/admin/profiles/../../etc", headers=auth_headers).status_code == 404
+
+
+def test_flag_is_ignored_for_other_users(user, auth_headers, profiles_dir):
+    response = client.get("/api/v1/auth/me?profile=1", headers=auth_headers)
+    assert response.status_code == 200
+    assert "x-profile-id" not in response.headers
+    assert response.json()["email"] == user.email
+    assert list(profiles_dir.iterdir()) == []
+    assert client.get("/api/v1/admin/profiles", headers=auth_headers).status_code == 403
+
+
+def test_concurrent_profiles_are_capped(user, auth_headers, db, profiles_dir, monkeypatch):
+    user.is_superuser = True
+    db.commit()
+    slots = threading.BoundedSemaphore(1)
+    slots.acquire()  # Another request being profiled
+    monkeypatch.setattr(profiling, "_slots", slots)
+
+    response = client.get("/api/v1/auth/me", headers={**auth_headers, "X-Profile": "1"})
+    assert response.status_code == 200
+    assert response.headers["x-profile"] == "busy"
+    assert response.json()["email"] == user.email
+
+
+def test_profile_requested():
+    assert profile_requested({"headers": [(b"x-profile", b"true")], "query_string": b""})
+    assert profile_requested({"headers": [], "query_string": b"days=7&profile=1"})
+    assert not profile_requested({"headers": [], "query_string": b"profile=0"})
+    assert not profile_requested({"headers": [(b"x-profile", b"0")], "query_string": b"profile=1"})
+
+
+def busy_wait(seconds=0.05):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def test_sampling_profiler_records_the_thread_stacks():
+    profiler = SamplingProfiler(threading.get_ident(), interval=0.001, max_seconds=5)
+    profiler.start()
+    busy_wait()
+    profiler.stop()
+
+    document = profiler.speedscope("test")
+    (sampled,) = document["profiles"]
+    assert sampled["samples"] and sampled["endValue"] > 0
+    names = {document["shared"]["frames"][index]["name"] for stack in sampled["samples"] for index in stack}
+    assert any(name.endswith("busy_wait") for name in names)
+
+
+def test_samples_of_other_tasks_are_tagged():
+    async def other_request():
+        busy_wait()
+
+    async def profiled():
+        profiler = SamplingProfiler(threading.get_ident(), interval=0.001, max_seconds=5,
+                                    loop=asyncio.get_running_loop(), task=asyncio.current_task())
+        profiler.start()
+        busy_wait()
+        await asyncio.create_task(other_request())
+        profiler.stop()
+        return profiler.speedscope("test")
+
+    document = asyncio.run(profiled())
+    frames = document["shared"]["frames"]
+    roots = {frames[stack[0]]["name"] for stack in document["profiles"][0]["samples"]}
+    assert "[task test_samples_of_other_tasks_are_tagged.<locals>.other_request]" in roots
+    tagged = [stack for stack in document["profiles"][0]["samples"] if frames[stack[0]]["name"].startswith("[task")]
+    assert all(not frames[index]["name"].endswith("profiled") for stack in tagged for index in stack)
+
+
+def test_streaming_responses_are_not_profiled(user, db, profiles_dir):
+    user.is_superuser = True
+    db.commit()
+    token = create_access_token({"sub": str(user.id)}, expires_delta=timedelta(seconds=1))
+
+    response = client.get("/api/v1/live/events?profile=1", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
+    assert response.headers["x-profile"] == "streaming"
+    assert "x-profile-id" not in response.headers
+    assert response.text.startswith("retry: ")
+    assert list(profiles_dir.iterdir()) == []
+    assert profiling._slots.acquire(blocking=False)
+    profiling._slots.release()
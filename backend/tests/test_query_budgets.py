@@ -0,0 +1,134 @@
+from datetime import date, datetime, timedelta
+
+from fastapi.testclient import TestClient
+
+from app.core.metrics import (
+    MetricsRegistry, RequestStats, fingerprint, registry, render_prometheus,
+)
+from app.core.query_budgets import QUERY_BUDGETS
+from app.db.session import Base, engine
+from app.main import app
+from scripts.benchmark_api import benchmark_context
+from scripts.synthetic_farm import FarmShape, generate
+
+client = TestClient(app)
+
+SMALL = FarmShape(orgs=1, sites=1, buildings=2, lots=1, days=8, birds=500)
+LARGE = FarmShape(orgs=2, sites=2, buildings=4, lots=2, days=30, birds=500)
+# Lookups that run but find no file: generated sales have no PDF, no profile is stored
+EXPECTED_STATUS = {"/api/v1/sales/invoice/{invoice_number}": 404, "/api/v1/admin/profiles/{profile_id}": 404}
+# Event streams last as long as the token, their budget is checked by their own tests
+STREAMS = {"/api/v1/live/events"}
+
+
+def api_routes():
+    """(method, template) of every API route."""
+    return {(method.upper(), path) for path, operations in app.openapi()["paths"].items()
+            if path.startswith("/api/v1") for method in operations}
+
+
+def test_every_route_has_a_budget():
+    declared = {tuple(key.split(" ", 1)) for key in QUERY_BUDGETS}
+    routes = api_routes()
+    assert sorted(routes - declared) == [], "routes without a query budget"
+    assert sorted(declared - routes) == [], "budgets of routes that no longer exist"
+
+
+def _path_values(db) -> dict:
+    from app.models import FeedStock, Invitation, Lot, Sale, Site, User
+
+    context = benchmark_context(db)
+    owner = db.query(User).filter(User.email == "owner0@bench.example.com").one()
+    owner.is_superuser = True  # Admin routes
+    layer = db.get(Lot, context["layer_lot_id"])
+    site = db.query(Site).filter(Site.organization_id == owner.organization_id).order_by(Site.name).first()
+    invitation = Invitation(organization_id=owner.organization_id, invited_by_id=owner.id,
+                            email="invite@bench.example.com", token="budget-check-token",
+                            expires_at=datetime.utcnow() + timedelta(days=7))
+    db.add(invitation)
+    db.commit()
+    lot_ids = [str(lot_id) for lot_id in (context["layer_lot_id"], context["broiler_lot_id"])]
+    stock_id = db.query(FeedStock.id).filter(FeedStock.site_id == site.id).order_by(FeedStock.feed_type).first()[0]
+    return {
+        "headers": context["headers"],
+        "lots": lot_ids,
+        "user_id": str(owner.id),
+        "site_id": str(site.id),
+        "building_id": str(layer.building_id),
+        "entry_date": (date.today() - timedelta(days=1)).isoformat(),
+        "stock_id": str(stock_id),
+        "invoice_number": db.query(Sale.invoice_number).filter(Sale.lot_id == layer.id).first()[0],
+        "token": invitation.token,
+        "profile_id": "0" * 32,
+    }
+
+
+def _count_get_queries(db, shape: FarmShape) -> dict:
+    """Statements of every GET route (worst of the layer and broiler lot), after a warm-up call."""
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    generate(db, shape)
+    values = _path_values(db)
+
+    counts = {}
+    for method, template in sorted(api_routes()):
+        if method != "GET" or template in STREAMS:
+            continue
+        operation = app.openapi()["paths"][template]["get"]
+        for lot_id in values["lots"]:
+            route_values = {**values, "lot_id": lot_id, "lot_ids": values["lots"]}
+            url = template.format(**route_values)
+            params = {parameter["name"]: route_values[parameter["name"]] for parameter in operation.get("parameters", [])
+                      if parameter["in"] == "query" and parameter.get("required")}
+            client.get(url, headers=values["headers"], params=params)  # Stored snapshots, opened stocks
+
+            registry.clear()
+            response = client.get(url, headers=values["headers"], params=params)
+            if response.status_code != EXPECTED_STATUS.get(template, 200):  # Layer-only or broiler-only route
+                continue
+            (metrics,) = registry.snapshot().values()
+            counts[template] = max(counts.get(template, 0), int(metrics.queries.sum))
+        assert template in counts, f"GET {template}: no successful call ({response.status_code} {response.text[:300]})"
+    registry.clear()
+    return counts
+
+
+def test_get_query_counts_do_not_grow_with_data(db):
+    small = _count_get_queries(db, SMALL)
+    large = _count_get_queries(db, LARGE)
+
+    failures = []
+    for template, queries in sorted(large.items()):
+        budget = QUERY_BUDGETS[f"GET {template}"]
+        if queries > budget:
+            failures.append(f"GET {template}: {queries} statements, budget {budget}")
+        if queries > small[template]:
+            failures.append(f"GET {template}: {small[template]} statements on the small farm, {queries} on the large one")
+    assert failures == []
+
+
+def test_budget_violations_are_recorded_with_their_statements():
+    stats = RequestStats(capture_statements=True)
+    stats.queries = 3
+    for lot in ("a", "b", "c"):
+        stats.statements[fingerprint(f"SELECT * FROM lots WHERE id = '{lot}' AND age > {len(lot)}")] += 1
+
+    metrics = MetricsRegistry()
+    metrics.record_budget_violation("GET", "/api/v1/lots/{lot_id}", 2, stats)
+    (violation,) = metrics.budget_violations()
+    assert violation["statements"] == [("SELECT * FROM lots WHERE id = ? AND age > ?", 3)]
+    assert metrics.budget_exceeded() == {("GET", "/api/v1/lots/{lot_id}"): 1}
+    assert fingerprint("SELECT 1 FROM t WHERE id IN (?, ?, ?)") == "SELECT ? FROM t WHERE id IN (...)"
+
+
+def test_requests_over_budget_are_reported(user, auth_headers, monkeypatch):
+    monkeypatch.setitem(QUERY_BUDGETS, "GET /api/v1/auth/me", 0)
+    assert client.get("/api/v1/auth/me", headers=auth_headers).status_code == 200
+
+    (violation,) = registry.budget_violations()
+    assert violation["route"] == "GET /api/v1/auth/me"
+    assert violation["budget"] == 0 and violation["queries"] >= 1
+    assert violation["statements"][0][0].startswith("SELECT")
+    body = render_prometheus(registry)
+    assert 'http_request_query_budget_exceeded_total{method="GET",route="/api/v1/auth/me"} 1' in body
+    registry.clear()  # Expected violation, not one for the suite to fail on
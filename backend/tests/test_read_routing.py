@@ -0,0 +1,113 @@
+import sqlite3
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.db import session as db_session
+from app.db.engine import build_engine
+from app.main import app
+from app.models.user import User
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def replica(tmp_path, monkeypatch):
+    """A second SQLite file standing in for a streaming replica."""
+    replica_path = tmp_path / "replica.db"
+    replica_engine = build_engine(f"sqlite:///{replica_path}", settings, role="replica")
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
+    monkeypatch.setattr(db_session, "ReadSessionLocal", factory)
+    db_session.recent_writes.clear()
+    db_session.replica_health.reset()
+
+    def sync():
+        primary_path = db_session.engine.url.database
+        source = sqlite3.connect(primary_path)
+        target = sqlite3.connect(replica_path)
+        source.backup(target)
+        source.close()
+        target.close()
+
+    yield sync
+    replica_engine.dispose()
+
+
+def test_reads_prefer_replica(replica, user):
+    db = db_session.get_read_session(str(user.id))
+    try:
+        assert "replica" in str(db.get_bind().url)
+    finally:
+        db.close()
+
+
+def test_recent_writer_is_pinned_to_primary(replica, user, db):
+    db.info["user_id"] = str(user.id)
+    user_row = db.query(User).filter(User.id == user.id).first()
+    user_row.first_name = "Renamed"
+    db.commit()
+
+    pinned = db_session.get_read_session(str(user.id))
+    other = db_session.get_read_session("someone-else")
+    try:
+        assert pinned.get_bind() is db_session.engine
+        assert "replica" in str(other.get_bind().url)
+    finally:
+        pinned.close()
+        other.close()
+
+
+def test_unreachable_replica_falls_back_to_primary(tmp_path, monkeypatch):
+    broken = build_engine(f"sqlite:///{tmp_path}/missing/dir/replica.db", settings, role="replica")
+    monkeypatch.setattr(db_session, "ReadSessionLocal", sessionmaker(bind=broken))
+    db_session.replica_health.reset()
+
+    db = db_session.get_read_session(None)
+    try:
+        assert db.get_bind() is db_session.engine
+        assert not db_session.replica_health.available
+    finally:
+        db.close()
+        db_session.replica_health.reset()
+
+
+def test_admin_stats_read_from_replica_until_user_writes(replica, user, db):
+    user.is_superuser = True
+    db.commit()
+    replica()
+
+    # A user created only on the primary is invisible to replica reads
+    db.add(User(email="late@example.com", password_hash="x", first_name="La", last_name="Te"))
+    db.commit()
+
+    headers = {"Authorization": f"Bearer {create_access_token(data={'sub': str(user.id)})}"}
+    assert client.get("/api/v1/admin/stats", headers=headers).json()["total_users"] == 1
+
+    response = client.patch(f"/api/v1/users/{user.id}", json={"first_name": "Admin"}, headers=headers)
+    assert response.status_code == 200
+    assert client.get("/api/v1/admin/stats", headers=headers).json()["total_users"] == 2
+
+
+def test_lagging_replica_responses_carry_no_etag(replica, user, db):
+    from app.models.organization import Organization
+
+    replica()
+    headers = {"Authorization": f"Bearer {create_access_token(data={'sub': str(user.id)})}"}
+    first = client.get("/api/v1/dashboard/alerts", headers=headers)
+    assert first.status_code == 200 and first.headers["etag"]
+
+    # Written on the primary by someone else: the replica has not replayed it yet
+    db.get(Organization, user.organization_id).name = "Ferme renommee"
+    db.commit()
+    stale = client.get("/api/v1/dashboard/alerts", headers={**headers, "If-None-Match": first.headers["etag"]})
+    assert stale.status_code == 200
+    assert "etag" not in stale.headers and "last-modified" not in stale.headers
+
+    replica()
+    fresh = client.get("/api/v1/dashboard/alerts", headers=headers)
+    assert fresh.headers["etag"] != first.headers["etag"]
+    assert client.get("/api/v1/dashboard/alerts",
+                      headers={**headers, "If-None-Match": fresh.headers["etag"]}).status_code == 304
@@ -0,0 +1,65 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+
+from fastapi.testclient import TestClient
+
+from app.db.session import SessionLocal
+from app.main import app
+from app.models.lot import Lot, LotType
+from app.models.organization import Organization
+from app.services.sequences import generate_document_number, generate_lot_code, next_value
+
+client = TestClient(app)
+
+YEAR = datetime.now().year
+
+
+def test_sequences_are_per_organization_prefix_and_year(db, user):
+    other = Organization(name="Autre Ferme")
+    db.add(other)
+    db.commit()
+
+    assert [next_value(db, user.organization_id, "LC", 2026) for _ in range(3)] == [1, 2, 3]
+    assert next_value(db, user.organization_id, "LC", 2027) == 1
+    assert next_value(db, user.organization_id, "LP", 2026) == 1
+    assert next_value(db, other.id, "LC", 2026) == 1
+    db.commit()
+
+    number = generate_document_number(db, user.organization_id, "FAC", datetime(2026, 3, 1))
+    assert number == f"FAC-2026-{str(user.organization_id).replace('-', '')[:8].upper()}-00001"
+
+
+def test_lot_codes_continue_after_legacy_codes(db, building, user, auth_headers):
+    # Code issued before sequences existed, and a later deleted lot
+    db.add(Lot(building_id=building.id, type=LotType.BROILER, code=f"LC-{YEAR}-0007",
+               initial_quantity=100, current_quantity=100, placement_date=date.today()))
+    db.commit()
+
+    payload = {"building_id": str(building.id), "type": "broiler", "initial_quantity": 500,
+               "placement_date": date.today().isoformat()}
+    first = client.post("/api/v1/lots", json=payload, headers=auth_headers)
+    assert first.status_code in (200, 201), first.text
+    assert first.json()["code"] == f"LC-{YEAR}-0008"
+
+    client.delete(f"/api/v1/lots/{first.json()['id']}", headers=auth_headers)
+    second = client.post("/api/v1/lots", json=payload, headers=auth_headers)
+    assert second.json()["code"] == f"LC-{YEAR}-0009"
+
+
+def test_parallel_allocation_is_collision_free(user):
+    def allocate(_):
+        session = SessionLocal()
+        try:
+            codes = []
+            for _ in range(5):
+                codes.append(generate_lot_code(session, user.organization_id, "layer"))
+                session.commit()
+            return codes
+        finally:
+            session.close()
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        codes = [code for batch in pool.map(allocate, range(8)) for code in batch]
+
+    assert len(set(codes)) == 40
+    assert sorted(codes) == [f"LP-{YEAR}-{n:04d}" for n in range(1, 41)]
@@ -0,0 +1,113 @@
+import json
+from decimal import Decimal
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.testclient import TestClient
+
+from app.core.serialization import FastJSONResponse, RowSerializer, decimal_as_number, dumps
+from app.main import app
+from app.schemas.feed import FeedStockResponse
+from app.schemas.finance import ClientResponse, ExpenseResponse, SaleResponse
+from app.schemas.lot import LotSummary
+from scripts.benchmark_api import benchmark_context
+from scripts.benchmark_serialization import LISTS, run_benchmark
+from scripts.synthetic_farm import FarmShape, generate
+
+client = TestClient(app)
+
+
+def by_id(items):
+    return {item["id"]: item for item in items}
+
+
+def test_list_endpoints_match_the_response_models(db):
+    from app.models import Building, Client, Expense, FeedStock, Lot, Sale, Site
+    from app.models.finance import PaymentStatus
+
+    generate(db, FarmShape(orgs=1, sites=1, buildings=2, lots=1, days=15, birds=500))
+    sale = db.query(Sale).order_by(Sale.created_at).first()
+    sale.line_items = [{"quantity": 10.0, "unit_price": 2500.0, "subtotal": 25000.0},
+                       {"quantity": 2.5, "unit_price": 1999.99, "subtotal": 4999.975}]
+    sale.payment_status = PaymentStatus.PARTIAL
+    db.commit()
+    headers = benchmark_context(db)["headers"]
+    lot_codes = dict(db.query(Lot.id, Lot.code).all())
+
+    sales = client.get("/api/v1/sales", headers=headers).json()
+    expected = []
+    for sale in db.query(Sale).all():
+        data = SaleResponse.model_validate(sale).model_dump(mode="json")
+        data["lot_code"] = lot_codes.get(sale.lot_id)
+        expected.append(data)
+    assert by_id(sales) == by_id(expected)
+    assert any(sale["line_items"] and sale["payment_status"] == "partial" for sale in sales)
+
+    expenses = client.get("/api/v1/expenses", headers=headers).json()
+    expected = []
+    for expense in db.query(Expense).all():
+        data = ExpenseResponse.model_validate(expense).model_dump(mode="json")
+        data["lot_code"] = lot_codes.get(expense.lot_id)
+        expected.append(data)
+    assert expenses and by_id(expenses) == by_id(expected)
+
+    clients = client.get("/api/v1/sales/clients", headers=headers).json()
+    expected = []
+    for row in db.query(Client).all():
+        sold = [sale for sale in db.query(Sale).filter(Sale.client_id == row.id)]
+        total = sum((sale.total_amount for sale in sold), Decimal(0))
+        data = ClientResponse.model_validate(row)
+        data.total_purchases = total
+        data.outstanding_balance = total - sum((sale.amount_paid for sale in sold), Decimal(0))
+        expected.append(data.model_dump(mode="json"))
+    assert [row["name"] for row in clients] == sorted(row["name"] for row in clients)
+    assert by_id(clients) == by_id(expected)
+
+    lots = client.get("/api/v1/lots", headers=headers).json()
+    expected = []
+    for lot in db.query(Lot).all():
+        expected.append(LotSummary(
+            id=lot.id, code=lot.code, name=lot.name, type=lot.type.value, breed=lot.breed,
+            current_quantity=lot.current_quantity, initial_quantity=lot.initial_quantity, age_days=lot.age_days,
+            status=lot.status.value, building_id=lot.building_id, building_name=lot.building.name,
+            site_id=lot.building.site.id, site_name=lot.building.site.name, chick_price_unit=lot.chick_price_unit,
+            transport_cost=lot.transport_cost, other_initial_costs=lot.other_initial_costs,
+            placement_date=lot.placement_date,
+        ).model_dump(mode="json"))
+    assert by_id(lots) == by_id(expected)
+
+    # No response_model on this route: Decimals stay JSON numbers
+    stocks = client.get("/api/v1/feed/stock/all", headers=headers).json()
+    expected = []
+    for stock in db.query(FeedStock).all():
+        data = FeedStockResponse.model_validate(stock).model_dump()
+        if stock.site_id:
+            data["site_name"] = db.get(Site, stock.site_id).name
+        if stock.building_id:
+            data["building_name"] = db.get(Building, stock.building_id).name
+        expected.append(jsonable_encoder(data))
+    assert stocks and by_id(stocks) == by_id(expected)
+    assert all(isinstance(stock["quantity_kg"], (int, float)) for stock in stocks)
+
+
+def test_row_serializer():
+    row = {
+        "id": "1", "date": "2025-01-01", "sale_type": "other", "quantity": Decimal("3"), "unit_price": 1.5,
+        "total_amount": Decimal("4.50"), "created_at": "2025-01-01T00:00:00",
+        "line_items": [{"quantity": 3.0, "unit_price": Decimal("1.50")}],
+    }
+    data = RowSerializer(SaleResponse)(row)
+    assert data["payment_status"] == "pending" and data["amount_paid"] == "0"  # Schema defaults
+    assert data["unit_price"] == "1.5" and data["total_amount"] == "4.50"
+    assert data["line_items"] == [{"quantity": "3.0", "unit_price": "1.50", "subtotal": None}]
+    assert data["lot_code"] is None
+
+    assert decimal_as_number(Decimal("12")) == 12 and decimal_as_number(Decimal("12.50")) == 12.5
+    assert json.loads(dumps({"amount": Decimal("1.10")})) == {"amount": "1.10"}
+    assert FastJSONResponse([1]).headers["content-type"] == "application/json"
+
+
+def test_benchmark_paths_produce_the_same_json():
+    report = run_benchmark(rows=200, runs=1)
+    assert set(report["lists"]) == set(LISTS)
+    for result in report["lists"].values():
+        assert result["rows"] == 200 and result["fast_ms"] > 0 and result["bytes"] > 0
@@ -0,0 +1,164 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from sqlalchemy import event
+
+from app.core.single_flight import LocalFlightStore, SingleFlight, flights, single_flight
+from app.db.session import engine
+from app.main import app
+
+
+@pytest.fixture(autouse=True)
+def _clear_flights():
+    flights.clear()
+    yield
+    flights.clear()
+
+
+def counted(result, delay=0.05):
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(delay)
+        return result
+
+    return compute, calls
+
+
+def test_concurrent_calls_share_one_computation():
+    single = SingleFlight()
+    compute, calls = counted({"eggs": 120})
+
+    async def scenario():
+        results = await asyncio.gather(*(single.do("org:overview", compute, 1.0) for _ in range(5)))
+        other = await single.do("org:trend", compute, 1.0)
+        again = await single.do("org:overview", compute, 1.0)  # Not a cache
+        return results, other, again
+
+    results, other, again = asyncio.run(scenario())
+    assert results == [{"eggs": 120}] * 5 and other == again == {"eggs": 120}
+    assert len(calls) == 3
+    assert single.stats == {"leaders": 3, "followers": 4, "remote_followers": 0}
+
+
+def test_errors_reach_every_caller():
+    single = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.02)
+        raise ValueError("base indisponible")
+
+    async def scenario():
+        return await asyncio.gather(*(single.do("key", fail, 1.0) for _ in range(3)), return_exceptions=True)
+
+    errors = asyncio.run(scenario())
+    assert all(isinstance(error, ValueError) for error in errors)
+    assert single.stats["leaders"] == 1
+
+
+def test_workers_share_one_computation_through_the_store():
+    store = LocalFlightStore()
+    first, second = SingleFlight(store, poll_interval=0.01), SingleFlight(store, poll_interval=0.01)
+    compute, calls = counted({"day": "2026-01-01", "amount": 12500}, delay=0.1)
+
+    async def scenario():
+        return await asyncio.gather(first.do("key", compute, 1.0), second.do("key", compute, 1.0))
+
+    assert asyncio.run(scenario()) == [{"day": "2026-01-01", "amount": 12500}] * 2
+    assert len(calls) == 1
+    assert second.stats["remote_followers"] == 1
+
+
+def test_a_worker_computes_itself_when_the_leader_fails_or_is_slow():
+    store = LocalFlightStore()
+    first, second = SingleFlight(store, poll_interval=0.01), SingleFlight(store, poll_interval=0.01)
+    compute, calls = counted("ok", delay=0.05)
+
+    async def fail():
+        await asyncio.sleep(0.05)
+        raise ValueError("perdu")
+
+    async def failed_leader():
+        return await asyncio.gather(first.do("key", fail, 1.0), second.do("key", compute, 1.0),
+                                    return_exceptions=True)
+
+    error, result = asyncio.run(failed_leader())
+    assert isinstance(error, ValueError) and result == "ok"
+    assert len(calls) == 1
+
+    slow, _ = counted("lent", delay=0.3)
+
+    async def slow_leader():
+        return await asyncio.gather(first.do("slow", slow, 1.0), second.do("slow", compute, 0.05))
+
+    assert asyncio.run(slow_leader()) == ["lent", "ok"]
+
+
+def test_an_unavailable_store_falls_back_to_local_flights():
+    class DownStore(LocalFlightStore):
+        async def set_if_absent(self, key, value, ttl):
+            raise ConnectionError("redis down")
+
+    single = SingleFlight(DownStore())
+    compute, calls = counted(42)
+
+    async def scenario():
+        return await asyncio.gather(*(single.do("key", compute, 1.0) for _ in range(3)))
+
+    assert asyncio.run(scenario()) == [42] * 3
+    assert len(calls) == 1
+
+
+
+def test_requests_after_a_write_do_not_join_an_earlier_flight(user, db):
+    from app.models.organization import Organization
+
+    calls = []
+
+    @single_flight()
+    async def endpoint(current_user=None):
+        calls.append(1)
+        flight = len(calls)
+        await asyncio.sleep(0.1)
+        return flight
+
+    caller = SimpleNamespace(organization_id=user.organization_id)
+
+    async def scenario():
+        before = asyncio.gather(endpoint(current_user=caller), endpoint(current_user=caller))
+        await asyncio.sleep(0.05)  # Running when the write commits
+        db.get(Organization, user.organization_id).name = "Ferme renommee"
+        db.commit()
+        after = await endpoint(current_user=caller)
+        return await before, after
+
+    assert asyncio.run(scenario()) == ([1, 1], 2)
+    assert flights.stats["leaders"] == 2 and flights.stats["followers"] == 1
+
+def test_dashboard_requests_are_coalesced(user, building, auth_headers):
+    def slow_statement(*args):
+        time.sleep(0.02)
+
+    async def scenario(paths):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await asyncio.gather(*(client.get(path, headers=auth_headers) for path in paths))
+
+    alone = asyncio.run(scenario(["/api/v1/dashboard/overview"]))[0]
+    assert alone.status_code == 200
+    flights.clear()
+
+    event.listen(engine, "before_cursor_execute", slow_statement)
+    try:
+        responses = asyncio.run(scenario(["/api/v1/dashboard/overview"] * 4 + ["/api/v1/sites"]))
+    finally:
+        event.remove(engine, "before_cursor_execute", slow_statement)
+    assert all(response.status_code == 200 for response in responses)
+    assert all(response.json() == alone.json() for response in responses[:4])
+    assert responses[4].json()[0]["name"] == "Site Test"
+    # The sites list runs its own flight; the overview ran once
+    assert flights.stats["leaders"] == 2 and flights.stats["followers"] == 3
@@ -0,0 +1,72 @@
+import numpy as np
+from fastapi.testclient import TestClient
+
+from app.api.endpoints.feed import get_optimal_feed_consumption, get_optimal_water_consumption
+from app.core.security import create_access_token
+from app.main import app
+from app.services.laying_curve import get_expected_laying_rate, get_expected_laying_rates
+from app.services.standards.curves import batch_values
+from app.services.standards.data import FEED, LAYING, WEIGHT
+from app.services.standards.registry import StandardsRegistry, standards_registry
+
+client = TestClient(app)
+
+
+def test_generic_curves_keep_historical_tables():
+    assert [get_optimal_feed_consumption(age) for age in (0, 7, 8, 21, 42, 43, 90)] == [20, 20, 45, 80, 178, 190, 190]
+    assert [get_optimal_feed_consumption(age, "layer") for age in (14, 15, 84, 85, 125, 126)] == [20, 35, 75, 90, 90, 115]
+    assert get_optimal_water_consumption(30, "broiler") == 310
+
+    assert get_expected_laying_rate(10)["optimal_expected"] == 0
+    assert get_expected_laying_rate(28) == {
+        "min_expected": 88, "max_expected": 96, "optimal_expected": 94, "age_weeks": 28
+    }
+    assert get_expected_laying_rate(100)["optimal_expected"] == 50
+    assert get_expected_laying_rate(150)["optimal_expected"] == 40
+
+
+def test_vectorized_lookups_match_scalar_ones():
+    curve = standards_registry.resolve("Ross 308", "broiler")
+    ages = np.arange(-3, 70).reshape(1, -1).repeat(4, axis=0)
+    assert np.array_equal(curve.values(WEIGHT, ages)[0], [curve.value(WEIGHT, a) for a in ages[0]])
+
+    rates = get_expected_laying_rates([0, 130, 131, 200])
+    assert rates["optimal_expected"].tolist() == [
+        get_expected_laying_rate(w)["optimal_expected"] for w in (0, 18, 18, 28)
+    ]
+
+
+def test_breed_resolution_and_batch_lookup():
+    registry = StandardsRegistry()
+    assert registry.resolve("ISA Brown", "layer").key == "isabrown"
+    assert registry.resolve("cobb-500", "broiler").key == "cobb500"
+    assert registry.resolve("Inconnue", "layer").key == "layer"
+    assert registry.resolve(None, None).key == "broiler"
+
+    curves = [registry.resolve("Ross 308"), registry.resolve("ISA Brown"), registry.resolve("Ross 308")]
+    values = batch_values(curves, LAYING, [[175, 200], [175, 200], [175, 200]])
+    assert np.isnan(values[0]).all() and np.isnan(values[2]).all()
+    assert values[1].tolist() == [curves[1].value(LAYING, 175), curves[1].value(LAYING, 200)]
+
+
+def test_custom_standard_overrides_builtin(db, user):
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': str(user.id)})}"}
+    response = client.post("/api/v1/standards/custom", headers=headers, json={
+        "breed": "Cobb 500",
+        "lot_type": "broiler",
+        "curves": {"feed_g": {"unit": "week", "points": [[0, 30], [6, 200]]}},
+    })
+    assert response.status_code == 200
+    standard_id = response.json()["id"]
+
+    curve = standards_registry.resolve("COBB 500", "broiler", db=db, organization_id=user.organization_id)
+    assert curve.is_custom
+    assert curve.value(FEED, 21) == 115  # Week 3 of a linear 30 -> 200 g over 6 weeks
+    assert curve.value(WEIGHT, 42) == 2850  # Not overridden: built-in Cobb 500
+
+    response = client.get("/api/v1/standards/curve?breed=Cobb 500&unit=day&max_age=7", headers=headers)
+    assert response.json()["is_custom"] is True
+    assert response.json()["series"]["feed_g"] == [30.0] * 7 + [58.3]
+
+    client.delete(f"/api/v1/standards/custom/{standard_id}", headers=headers)
+    assert not standards_registry.resolve("Cobb 500", db=db, organization_id=user.organization_id).is_custom
@@ -0,0 +1,34 @@
+import json
+import os
+import subprocess
+import sys
+
+from alembic.script import ScriptDirectory
+
+from app.db.migrate import alembic_config, head_revision
+from scripts.profile_startup import BACKEND_DIR, LAZY_MODULES
+
+PROBE = """
+import json, sys
+import app.main
+print(json.dumps(sorted(sys.modules)))
+"""
+
+
+def test_app_import_does_not_load_heavy_modules():
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=BACKEND_DIR,
+        env=dict(os.environ),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    loaded = json.loads(result.stdout.strip().splitlines()[-1])
+
+    for name in LAZY_MODULES:
+        assert not any(m == name or m.startswith(name + ".") for m in loaded), name
+
+
+def test_head_revision_matches_alembic():
+    assert head_revision() == ScriptDirectory.from_config(alembic_config()).get_current_head()
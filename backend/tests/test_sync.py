@@ -0,0 +1,168 @@
+import uuid
+from datetime import date, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.db.session import SessionLocal
+from app.main import app
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def lot(db, building):
+    from app.models.lot import Lot, LotType
+
+    lot = Lot(building_id=building.id, code="LP-001", type=LotType.LAYER, initial_quantity=1000,
+              current_quantity=1000, placement_date=date.today() - timedelta(days=150), age_at_placement=1)
+    db.add(lot)
+    db.commit()
+    db.refresh(lot)
+    return lot
+
+
+def pull(headers, since=None, limit=None):
+    """Every page of a sync: (rows by entity and id, deleted ids by entity, seq)."""
+    rows, deleted, cursor = {}, {}, None
+    while True:
+        params = {"since": since, "limit": limit, "cursor": cursor}
+        response = client.get("/api/v1/sync", params={k: v for k, v in params.items() if v is not None},
+                              headers=headers)
+        assert response.status_code == 200, response.text
+        page = response.json()
+        if page["reset"]:
+            return None, None, page["seq"]
+        for entity, batch in page["changes"].items():
+            for row in batch.get("rows", []):
+                record = dict(zip(batch["columns"], row))
+                rows.setdefault(entity, {})[record["id"]] = record
+            deleted.setdefault(entity, set()).update(batch.get("deleted", []))
+        if not page["has_more"]:
+            return rows, deleted, page["seq"]
+        cursor = page["cursor"]
+
+
+def write(organization_id, change):
+    """Commit a change in a session of the organization, as a request of its user would."""
+    session = SessionLocal()
+    try:
+        session.info["organization_id"] = organization_id
+        change(session)
+        session.commit()
+    finally:
+        session.close()
+
+
+def test_full_then_delta_sync(user, building, lot, auth_headers, db):
+    from app.models.building import Building
+    from app.models.organization import Organization
+    from app.models.production import EggProduction
+    from app.models.site import Site
+
+    other = Organization(name="Voisin")
+    db.add(other)
+    db.flush()
+    db.add(Site(name="Site voisin", organization_id=other.id))
+    db.commit()
+
+    # Full sync, one row per page
+    rows, _, seq = pull(auth_headers, limit=1)
+    assert {entity: list(ids) for entity, ids in rows.items()} == {
+        "sites": [str(building.site_id)], "buildings": [str(building.id)], "lots": [str(lot.id)],
+    }
+    assert [site["name"] for site in rows["sites"].values()] == ["Site Test"]
+    assert rows["lots"][str(lot.id)]["current_quantity"] == 1000
+
+    # Entries recorded through the API are in the next delta, with the lot they changed
+    today = date.today().isoformat()
+    assert client.post("/api/v1/production/eggs", json={"lot_id": str(lot.id), "date": today, "normal_eggs": 800},
+                       headers=auth_headers).status_code == 200
+    assert client.post("/api/v1/production/mortalities", json={"lot_id": str(lot.id), "date": today, "quantity": 3},
+                       headers=auth_headers).status_code == 200
+    rows, deleted, next_seq = pull(auth_headers, since=seq)
+    assert next_seq > seq
+    assert set(rows) == {"egg_productions", "mortalities", "lots"}
+    assert rows["lots"][str(lot.id)]["current_quantity"] == 997
+    production = next(iter(rows["egg_productions"].values()))
+    assert production["total_eggs"] == 800 and production["updated_at"]
+    assert pull(auth_headers, since=next_seq) == ({}, {}, next_seq)
+
+    # Deletes are tombstones
+    production_id = uuid.UUID(production["id"])
+    write(user.organization_id, lambda session: session.delete(session.get(EggProduction, production_id)))
+    rows, deleted, seq = pull(auth_headers, since=next_seq)
+    assert rows == {} and deleted == {"egg_productions": {str(production_id)}}
+    assert "egg_productions" not in pull(auth_headers)[0]
+
+    # A bulk write cannot be followed row by row: back to a full sync
+    write(user.organization_id, lambda session: session.query(Building).filter(
+        Building.id == building.id).update({Building.capacity: 6000}, synchronize_session=False))
+    assert pull(auth_headers, since=seq) == (None, None, seq)
+    assert pull(auth_headers, since=seq + 1000)[0] is None
+
+    invalid = client.get("/api/v1/sync", params={"cursor": "s.1.x."}, headers=auth_headers)
+    assert invalid.status_code == 400
+
+
+def test_upload_is_idempotent(user, building, lot, auth_headers, db):
+    from app.models.building import Building
+    from app.models.lot import Lot, LotStats, LotType
+    from app.models.organization import Organization
+    from app.models.site import Site
+
+    other = Organization(name="Voisin")
+    db.add(other)
+    db.flush()
+    site = Site(name="Site voisin", organization_id=other.id)
+    db.add(site)
+    db.flush()
+    house = Building(name="Batiment voisin", site_id=site.id, building_type="layer", capacity=500)
+    db.add(house)
+    db.flush()
+    foreign_lot = Lot(building_id=house.id, type=LotType.LAYER, initial_quantity=500, current_quantity=500,
+                      placement_date=date.today() - timedelta(days=150))
+    db.add(foreign_lot)
+    db.commit()
+    _, _, seq = pull(auth_headers)
+
+    day = date.today() - timedelta(days=1)
+    ids = {name: str(uuid.uuid4()) for name in ("eggs", "same_day", "foreign", "mortality", "weight", "water")}
+    upload = {
+        "egg_productions": [
+            {"id": ids["eggs"], "lot_id": str(lot.id), "date": day.isoformat(), "normal_eggs": 900, "hen_count": 1000},
+            {"id": ids["same_day"], "lot_id": str(lot.id), "date": day.isoformat(), "normal_eggs": 10},
+            {"id": ids["foreign"], "lot_id": str(foreign_lot.id), "date": day.isoformat(), "normal_eggs": 10},
+        ],
+        "mortalities": [{"id": ids["mortality"], "lot_id": str(lot.id), "date": day.isoformat(), "quantity": 5}],
+        "weight_records": [{"id": ids["weight"], "lot_id": str(lot.id), "date": day.isoformat(),
+                            "average_weight_g": 1800}],
+        "water_consumptions": [{"id": ids["water"], "lot_id": str(lot.id), "date": day.isoformat(),
+                                "quantity_liters": 200}],
+    }
+    response = client.post("/api/v1/sync", json=upload, headers=auth_headers)
+    assert response.status_code == 200, response.text
+    result = response.json()
+    assert result["applied"] == [ids["eggs"], ids["weight"], ids["mortality"], ids["water"]]
+    assert result["duplicates"] == []
+    assert {rejection["id"]: rejection["detail"] for rejection in result["rejected"]} == {
+        ids["same_day"]: "Production already recorded for this date",
+        ids["foreign"]: "Lot not found",
+    }
+
+    db.expire_all()
+    assert db.get(Lot, lot.id).current_quantity == 995
+    assert db.query(LotStats).filter(LotStats.lot_id == lot.id).one().financials_updated_at is not None
+    assert db.get(Lot, foreign_lot.id).egg_productions == []
+
+    # Sent again (the answer was lost): nothing is recorded twice
+    retried = client.post("/api/v1/sync", json=upload, headers=auth_headers).json()
+    assert retried["applied"] == []
+    assert sorted(retried["duplicates"]) == sorted([ids["eggs"], ids["weight"], ids["mortality"], ids["water"]])
+    assert len(retried["rejected"]) == 2
+
+    rows, _, _ = pull(auth_headers, since=seq)
+    assert rows["egg_productions"][ids["eggs"]]["laying_rate"] == "90.00"
+    assert set(rows["weight_records"]) == {ids["weight"]}
+    assert set(rows["water_consumptions"]) == {ids["water"]}
+    assert rows["lots"][str(lot.id)]["current_quantity"] == 995
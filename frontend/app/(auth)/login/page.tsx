@@ -67,7 +67,7 @@ export default function LoginPage() {
         headers: { 'Content-Type': 'multipart/form-data' },
       })
 
-      setAuth(response.data.access_token, response.data.user, rememberMe)
+      setAuth(response.data.access_token, response.data.user, rememberMe, response.data.refresh_token)
       toast.success('Connexion reussie!')
       router.push('/overview')
     } catch (error: any) {
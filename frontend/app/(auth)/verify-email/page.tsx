@@ -38,7 +38,7 @@ function VerifyEmailContent() {
       })
 
       // Save auth data
-      setAuth(response.data.access_token, response.data.user)
+      setAuth(response.data.access_token, response.data.user, true, response.data.refresh_token)
       setStatus('success')
       toast.success('Email verifie avec succes!')
 
@@ -6,6 +6,7 @@ import Link from 'next/link'
 import Image from 'next/image'
 import { usePathname } from 'next/navigation'
 import { useAuthStore } from '@/lib/store'
+import { api } from '@/lib/api'
 import {
   LayoutDashboard,
   Warehouse,
@@ -30,6 +31,7 @@ import {
 } from 'lucide-react'
 import { useState } from 'react'
 import { useBodyScrollLock } from '@/hooks/use-body-scroll-lock'
+import { useLiveUpdates } from '@/hooks/use-live-updates'
 
 // Navigation simplifiee - 10 items au lieu de 22
 const navGroups = [
@@ -84,6 +86,9 @@ export default function DashboardLayout({
   // Lock body scroll when mobile sidebar is open
   useBodyScrollLock(sidebarOpen)
 
+  // Change events of the organization refetch the affected queries, instead of polling
+  useLiveUpdates(_hasHydrated && !!token)
+
   useEffect(() => {
     // Only check auth after hydration is complete
     if (_hasHydrated && !token) {
@@ -101,6 +106,11 @@ export default function DashboardLayout({
   }
 
   const handleLogout = () => {
+    // Revoke the session server-side; local logout does not wait for it. The interceptor sends
+    // the current access token (from storage, refreshed since login); the refresh token alone
+    // is enough for the server when it has expired
+    const refreshToken = localStorage.getItem('refresh_token') || sessionStorage.getItem('refresh_token')
+    api.post('/auth/logout', { refresh_token: refreshToken }).catch(() => {})
     logout()
     router.push('/login')
   }
@@ -1,6 +1,6 @@
 'use client'
 
-import { useQuery } from '@tanstack/react-query'
+import { useQuery, useQueryClient } from '@tanstack/react-query'
 import { api } from '@/lib/api'
 import {
   Egg,
@@ -19,11 +19,18 @@ import { AlertsList } from '@/components/dashboard/alerts-list'
 import { ActiveLots } from '@/components/dashboard/active-lots'
 
 export default function OverviewPage() {
+  const queryClient = useQueryClient()
   const { data: dashboard, isLoading } = useQuery({
     queryKey: ['dashboard'],
     queryFn: async () => {
-      const response = await api.get('/dashboard/overview')
-      return response.data
+      // Whole first screen in one round trip; the charts, alerts and sites read their sections from the cache
+      const response = await api.get('/dashboard/bootstrap')
+      const { overview, eggs_trend, financial_trend, alerts, sites } = response.data
+      queryClient.setQueryData(['eggs-trend'], eggs_trend)
+      queryClient.setQueryData(['financial-trend'], financial_trend)
+      queryClient.setQueryData(['alerts'], alerts)
+      queryClient.setQueryData(['sites'], sites)
+      return overview
     },
   })
 
@@ -397,6 +397,7 @@ function OrganizationSettings({ organization, onSave }: { organization: any; onS
 
 // Security Settings
 function SecuritySettings({ onSave }: { onSave: () => void }) {
+  const { setAuth, rememberMe } = useAuthStore()
   const [showPassword, setShowPassword] = useState(false)
   const [passwords, setPasswords] = useState({
     current: '',
@@ -423,10 +424,12 @@ function SecuritySettings({ onSave }: { onSave: () => void }) {
     setIsSubmitting(true)
 
     try {
-      await api.post('/users/change-password', {
+      const response = await api.post('/users/change-password', {
         current_password: passwords.current,
         new_password: passwords.new,
       })
+      // Every session was revoked: this one goes on with the new tokens
+      setAuth(response.data.access_token, response.data.user, rememberMe, response.data.refresh_token)
       setPasswords({ current: '', new: '', confirm: '' })
       onSave()
     } catch (err: any) {
@@ -98,7 +98,7 @@ function AcceptInvitationContent() {
       })
 
       // Store auth data
-      setAuth(response.data.access_token, response.data.user)
+      setAuth(response.data.access_token, response.data.user, true, response.data.refresh_token)
       setSuccess(true)
 
       // Redirect after a short delay
@@ -2,6 +2,7 @@
 
 import { useQuery } from '@tanstack/react-query'
 import { api } from '@/lib/api'
+import { useLiveStatus } from '@/hooks/use-live-updates'
 import {
   Brain,
   TrendingUp,
@@ -33,13 +34,15 @@ interface Insight {
 }
 
 export function AIInsights() {
+  const live = useLiveStatus((state) => state.connected)
   const { data, isLoading } = useQuery({
     queryKey: ['ai-insights'],
     queryFn: async () => {
       const response = await api.get('/dashboard/ai-insights')
       return response.data
     },
-    refetchInterval: 60000,
+    // Refetched on change events while the live stream is connected
+    refetchInterval: live ? false : 60000,
   })
 
   if (isLoading) {
@@ -0,0 +1,132 @@
+'use client'
+
+import { useEffect } from 'react'
+import { useQueryClient } from '@tanstack/react-query'
+import { create } from 'zustand'
+import { API_URL, refreshAccessToken } from '@/lib/api'
+
+// Queries to refetch for each topic of the server's change events (app.core.live_events.TOPICS)
+const TOPIC_QUERIES: Record<string, string[]> = {
+  production: [
+    'dashboard', 'dashboard-overview', 'eggs-trend', 'ai-insights', 'daily-entry', 'lot', 'lots', 'lot-history',
+    'egg-productions', 'all-egg-productions', 'weight-records', 'all-weight-records', 'feed-consumption',
+    'feed-consumption-trend', 'water', 'health-events', 'recent-health-events', 'upcoming-vaccinations',
+    'lot-vaccination-schedules', 'monitoring-stats', 'feed-monitoring-stats', 'eggs-analytics',
+    'weights-analytics', 'laying-analysis', 'lots-analytics',
+  ],
+  sales: [
+    'dashboard', 'dashboard-overview', 'financial-trend', 'financial-summary', 'ai-insights', 'sales', 'clients',
+    'client-unpaid-sales', 'lot-financial-summary', 'sales-analytics',
+  ],
+  expenses: [
+    'dashboard', 'dashboard-overview', 'financial-trend', 'financial-summary', 'expenses', 'suppliers',
+    'purchases', 'lot-financial-summary', 'lots-for-finance', 'expenses-analytics',
+  ],
+  alerts: ['dashboard', 'alerts', 'ai-insights'],
+  stock: [
+    'feed-stocks', 'feed-stock-stats', 'feed-stock-history', 'feed-stocks-for-lot', 'feed-stocks-for-consumption',
+    'sites-eggs-stock',
+  ],
+  farm: [
+    'dashboard', 'dashboard-overview', 'sites', 'site', 'buildings', 'building', 'lots', 'lot', 'all-lots',
+    'active-lots-for-sales', 'organization', 'invitations',
+  ],
+}
+
+const MAX_RETRY_MS = 60000
+
+interface LiveState {
+  connected: boolean
+  setConnected: (connected: boolean) => void
+}
+
+// Whether change events are received: polling is only needed without them
+export const useLiveStatus = create<LiveState>((set) => ({
+  connected: false,
+  setConnected: (connected) => set({ connected }),
+}))
+
+const getToken = () => localStorage.getItem('token') || sessionStorage.getItem('token')
+
+/**
+ * Subscribe to the change events of the organization (GET /live/events)
+ * and refetch the queries of the written topics only.
+ * Uses fetch rather than EventSource, which cannot send the Authorization header.
+ */
+export function useLiveUpdates(enabled: boolean) {
+  const queryClient = useQueryClient()
+  const setConnected = useLiveStatus((state) => state.setConnected)
+
+  useEffect(() => {
+    if (!enabled) return
+    const controller = new AbortController()
+    let retryMs = 5000
+    let timer: ReturnType<typeof setTimeout> | undefined
+
+    const handle = (block: string) => {
+      let event = 'message'
+      let data = ''
+      for (const line of block.split('\n')) {
+        if (line.startsWith('event:')) event = line.slice(6).trim()
+        else if (line.startsWith('data:')) data += line.slice(5).trim()
+        else if (line.startsWith('retry:')) retryMs = Number(line.slice(6)) || retryMs
+      }
+      if (event === 'ready') {
+        setConnected(true)
+      } else if (event === 'change' && data) {
+        const keys = new Set<string>()
+        for (const topic of JSON.parse(data).topics as string[]) {
+          for (const key of TOPIC_QUERIES[topic] || []) keys.add(key)
+        }
+        keys.forEach((key) => queryClient.invalidateQueries({ queryKey: [key] }))
+      }
+    }
+
+    const connect = async (failures: number) => {
+      let token = getToken()
+      if (!token) return
+      try {
+        let response = await fetch(`${API_URL}/api/v1/live/events`, {
+          headers: { Authorization: `Bearer ${token}`, Accept: 'text/event-stream' },
+          signal: controller.signal,
+        })
+        if (response.status === 401 && (token = await refreshAccessToken())) {
+          response = await fetch(`${API_URL}/api/v1/live/events`, {
+            headers: { Authorization: `Bearer ${token}`, Accept: 'text/event-stream' },
+            signal: controller.signal,
+          })
+        }
+        if (!response.ok || !response.body) throw new Error(`live events: ${response.status}`)
+
+        const reader = response.body.pipeThrough(new TextDecoderStream()).getReader()
+        let buffer = ''
+        failures = 0
+        for (;;) {
+          const { value, done } = await reader.read()
+          if (done) break
+          buffer += value
+          let end: number
+          while ((end = buffer.indexOf('\n\n')) !== -1) {
+            handle(buffer.slice(0, end))
+            buffer = buffer.slice(end + 2)
+          }
+        }
+      } catch {
+        if (controller.signal.aborted) return
+        failures += 1
+      }
+      // Stream ended with its token: reconnect right away (with a refreshed token).
+      // Failed: back off, queries poll again meanwhile
+      setConnected(false)
+      const delay = failures === 0 ? 1000 : Math.min(retryMs * 2 ** (failures - 1), MAX_RETRY_MS)
+      timer = setTimeout(() => connect(failures), delay)
+    }
+
+    connect(0)
+    return () => {
+      controller.abort()
+      clearTimeout(timer)
+      setConnected(false)
+    }
+  }, [enabled, queryClient, setConnected])
+}
@@ -1,6 +1,6 @@
 import axios from 'axios'
 
-const API_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000'
+export const API_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000'
 
 export const api = axios.create({
   baseURL: `${API_URL}/api/v1`,
@@ -24,10 +24,46 @@ api.interceptors.request.use(
   (error) => Promise.reject(error)
 )
 
+const getStorage = () =>
+  localStorage.getItem('token') ? localStorage : sessionStorage
+
+const clearSession = () => {
+  localStorage.removeItem('token')
+  sessionStorage.removeItem('token')
+  localStorage.removeItem('refresh_token')
+  sessionStorage.removeItem('refresh_token')
+  localStorage.removeItem('auth-storage')
+  sessionStorage.removeItem('auth-storage')
+}
+
+// Single in-flight refresh shared by all requests that hit a 401 together
+let refreshPromise: Promise<string | null> | null = null
+
+export const refreshAccessToken = (): Promise<string | null> => {
+  if (!refreshPromise) {
+    const storage = getStorage()
+    const refreshToken = storage.getItem('refresh_token')
+    refreshPromise = (refreshToken
+      ? axios
+          .post(`${API_URL}/api/v1/auth/refresh`, { refresh_token: refreshToken })
+          .then((response) => {
+            storage.setItem('token', response.data.access_token)
+            storage.setItem('refresh_token', response.data.refresh_token)
+            return response.data.access_token as string
+          })
+          .catch(() => null)
+      : Promise.resolve(null)
+    ).finally(() => {
+      refreshPromise = null
+    })
+  }
+  return refreshPromise
+}
+
 // Response interceptor to handle errors
 api.interceptors.response.use(
   (response) => response,
-  (error) => {
+  async (error) => {
     if (error.response?.status === 401) {
       // Token expired or invalid - but NOT on login page (login returns 401 for bad credentials)
       if (typeof window !== 'undefined') {
@@ -36,10 +72,16 @@ api.interceptors.response.use(
 
         // Only redirect if not already on login page and not a login attempt
         if (!isLoginPage && !isAuthEndpoint) {
-          localStorage.removeItem('token')
-          sessionStorage.removeItem('token')
-          localStorage.removeItem('auth-storage')
-          sessionStorage.removeItem('auth-storage')
+          // Access tokens are short-lived: try a silent refresh once
+          if (!error.config._retried) {
+            const token = await refreshAccessToken()
+            if (token) {
+              error.config._retried = true
+              error.config.headers.Authorization = `Bearer ${token}`
+              return api(error.config)
+            }
+          }
+          clearSession()
           window.location.href = '/login'
         }
       }
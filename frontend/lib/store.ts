@@ -20,7 +20,7 @@ interface AuthState {
   user: User | null
   rememberMe: boolean
   _hasHydrated: boolean
-  setAuth: (token: string, user: User, rememberMe?: boolean) => void
+  setAuth: (token: string, user: User, rememberMe?: boolean, refreshToken?: string) => void
   logout: () => void
   setHasHydrated: (state: boolean) => void
 }
@@ -69,20 +69,23 @@ export const useAuthStore = create<AuthState>()(
       user: null,
       rememberMe: true,
       _hasHydrated: false,
-      setAuth: (token, user, rememberMe = true) => {
-        // Also store token separately for API interceptor
-        if (rememberMe) {
-          localStorage.setItem('token', token)
-          sessionStorage.removeItem('token')
-        } else {
-          sessionStorage.setItem('token', token)
-          localStorage.removeItem('token')
+      setAuth: (token, user, rememberMe = true, refreshToken) => {
+        // Also store tokens separately for API interceptor
+        const storage = rememberMe ? localStorage : sessionStorage
+        const other = rememberMe ? sessionStorage : localStorage
+        storage.setItem('token', token)
+        other.removeItem('token')
+        other.removeItem('refresh_token')
+        if (refreshToken) {
+          storage.setItem('refresh_token', refreshToken)
         }
         set({ token, user, rememberMe })
       },
       logout: () => {
         localStorage.removeItem('token')
         sessionStorage.removeItem('token')
+        localStorage.removeItem('refresh_token')
+        sessionStorage.removeItem('refresh_token')
         set({ token: null, user: null, rememberMe: true })
       },
       setHasHydrated: (state) => {